@@ -0,0 +1,198 @@
+# =============================================================================
+# - วัดความเร็ว (แถว/วินาที) และหน่วยความจำสูงสุดของ validator แต่ละตัวใน validate_gdb.py
+#   ใช้เป็น baseline เทียบก่อน/หลังแก้โค้ด
+# - validator 1 ตัว x featureclass 1 ชั้น รันใน process ใหม่ทุกครั้ง (spawn)
+#   หน่วยความจำสูงสุด (peak RSS) จึงเป็นของ validator นั้นล้วน ๆ ไม่ปนกับตัวอื่น
+# - ข้อมูลทดสอบ: GDB ที่มีอยู่ (--gdb / --root) หรือสร้างใหม่ด้วย make_synthetic_gdb.py (--generate)
+# - ผลเขียนเป็น JSON (--output) และเทียบกับผลรอบก่อนได้ (--baseline)
+# =============================================================================
+
+import os
+import io
+import sys
+import json
+import time
+import argparse
+import platform
+import tempfile
+import contextlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import resource
+except ImportError:  # Windows ไม่มี resource ใช้ --tracemalloc แทน
+    resource = None
+
+
+###############################################
+#----------------- ค่าตั้งต้น
+###############################################
+BENCHMARK_VALIDATORS = ["validate_parcel", "validate_road", "validate_parcel_rel", "check_for_exact_overlaps"]  # validator ที่วัด ("all" = ทุกตัว)
+BENCHMARK_BACKEND = "openfilegdb"  # READER_BACKEND ที่ใช้วัด
+BENCHMARK_JSON_PATH = os.path.join(os.getcwd(), "benchmark_result.json")  # ไฟล์ผลการวัด
+REPEAT = 1  # จำนวนรอบต่อ validator (เก็บรอบที่เร็วที่สุด)
+OVERLAP_LAYERS = ("PARCEL", "PARCEL_NS3K", "ROAD", "BLOCK_FIX", "BLOCK_PRICE", "BLOCK_BLUE")  # ชั้นที่วัด check_for_exact_overlaps
+
+
+def _peak_rss_mb():
+    """peak RSS ของ process นี้ (MB) หรือ None ถ้าวัดไม่ได้"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024  # macOS เป็นไบต์ Linux เป็น KB
+
+
+def _run_one(validator, fc_path, backend, work_dir, use_tracemalloc):
+    """
+    (รันใน process ลูก) รัน validator 1 ครั้งกับ featureclass 1 ชั้น คืน dict ผลการวัด
+    """
+    import validate_gdb
+    from gdb_report import ErrorStore
+
+    validate_gdb.READER_BACKEND = backend
+    validate_gdb.OVERLAP_ROOT = work_dir
+    rows = validate_gdb.get_row_source(backend).get_count(fc_path)
+    func = getattr(validate_gdb, validator)
+    error_list = ErrorStore()
+    rss_before = _peak_rss_mb()
+
+    if use_tracemalloc:
+        import tracemalloc
+        tracemalloc.start()
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    with contextlib.redirect_stdout(io.StringIO()):  # validator พิมพ์ log ทุกชั้น ไม่ต้องแสดงตอนวัด
+        if validator == "check_for_exact_overlaps":
+            func(fc_path, error_list, work_dir, "benchmark", verbose=False)
+        else:
+            func(fc_path, error_list, "benchmark")
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+    traced_peak = None
+    if use_tracemalloc:
+        traced_peak = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+        tracemalloc.stop()
+
+    rss_after = _peak_rss_mb()
+    return {
+        "validator": validator,
+        "featureclass": os.path.basename(fc_path),
+        "gdb": os.path.dirname(fc_path),
+        "rows": rows,
+        "errors": len(error_list),
+        "wall_s": round(wall, 4),
+        "cpu_s": round(cpu, 4),
+        "rows_per_s": round(rows / wall, 1) if wall else None,
+        "peak_rss_mb": round(rss_after, 1) if rss_after is not None else None,
+        "rss_growth_mb": round(rss_after - rss_before, 1) if rss_after is not None else None,
+        "traced_peak_mb": round(traced_peak, 1) if traced_peak is not None else None,
+    }
+
+
+def benchmark_targets(gdb_paths, validators, backend=BENCHMARK_BACKEND):
+    """คืน list ของ (validator, fc_path) ที่จะวัด ตามชั้นข้อมูลที่มีใน GDB"""
+    from validate_gdb import VALIDATION_MAP, get_row_source
+
+    source = get_row_source(backend)
+    targets = []
+    for gdb in gdb_paths:
+        for fc in source.list_layers(gdb):
+            layer_key = next((k for k, v in VALIDATION_MAP.items() if v["pattern"].match(fc)), None)
+            if layer_key is None:
+                continue
+            for validator in validators:
+                if validator == "check_for_exact_overlaps":
+                    if layer_key in OVERLAP_LAYERS:
+                        targets.append((validator, os.path.join(gdb, fc)))
+                elif VALIDATION_MAP[layer_key]["func"].__name__ == validator:
+                    targets.append((validator, os.path.join(gdb, fc)))
+    return targets
+
+
+def run_benchmark(targets, backend=BENCHMARK_BACKEND, repeat=REPEAT, use_tracemalloc=False):
+    """วัดทุกคู่ (validator, fc_path) คู่ละ process ใหม่ คืน list ของผล (รอบที่เร็วที่สุด)"""
+    context = multiprocessing.get_context("spawn")
+    results = []
+    with tempfile.TemporaryDirectory(prefix="gdb_benchmark_") as work_dir:
+        for validator, fc_path in targets:
+            best = None
+            for _ in range(max(1, repeat)):
+                with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                    result = executor.submit(_run_one, validator, fc_path, backend, work_dir, use_tracemalloc).result()
+                if best is None or result["wall_s"] < best["wall_s"]:
+                    best = result
+            results.append(best)
+            print(f"  {validator:<26} {best['featureclass']:<20} {best['rows']:>10,} แถว "
+                  f"{best['wall_s']:>8.2f} วินาที {best['rows_per_s'] or 0:>12,.0f} แถว/วินาที "
+                  f"peak {best['peak_rss_mb'] if best['peak_rss_mb'] is not None else '-'} MB "
+                  f"(+{best['rss_growth_mb'] if best['rss_growth_mb'] is not None else '-'} MB)")
+    return results
+
+
+def compare_with_baseline(results, baseline_path):
+    """พิมพ์อัตราเร็วเทียบกับผลรอบก่อน (จับคู่ด้วย validator + featureclass)"""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {(r["validator"], r["featureclass"]): r for r in json.load(f)["results"]}
+    print(f"\nเทียบกับ baseline: {baseline_path}")
+    for r in results:
+        old = baseline.get((r["validator"], r["featureclass"]))
+        if not old or not old.get("rows_per_s") or not r["rows_per_s"]:
+            continue
+        print(f"  {r['validator']:<26} {r['featureclass']:<20} x{r['rows_per_s'] / old['rows_per_s']:.2f} "
+              f"({old['rows_per_s']:,.0f} -> {r['rows_per_s']:,.0f} แถว/วินาที)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="วัดความเร็วและหน่วยความจำของ validator ใน validate_gdb.py")
+    parser.add_argument("--gdb", nargs="+", default=[], help="GDB ที่ใช้วัด")
+    parser.add_argument("--root", help="วัดทุก GDB ใต้โฟลเดอร์นี้ (โครงสร้างเดียวกับ ROOT_DIR)")
+    parser.add_argument("--generate", type=int, metavar="ROWS", help="สร้าง GDB สังเคราะห์ขนาด ROWS แถว (PARCEL) ไว้วัด")
+    parser.add_argument("--validators", nargs="+", default=BENCHMARK_VALIDATORS, help="ชื่อฟังก์ชัน validator หรือ all")
+    parser.add_argument("--backend", default=BENCHMARK_BACKEND, choices=["arcpy", "openfilegdb"])
+    parser.add_argument("--repeat", type=int, default=REPEAT)
+    parser.add_argument("--tracemalloc", action="store_true", help="วัดหน่วยความจำ Python สูงสุดด้วย tracemalloc (ช้าลง)")
+    parser.add_argument("--output", default=BENCHMARK_JSON_PATH, help="ไฟล์ JSON ผลการวัด")
+    parser.add_argument("--baseline", help="ไฟล์ JSON ผลรอบก่อน สำหรับเทียบ")
+    args = parser.parse_args(argv)
+
+    from validate_gdb import VALIDATION_MAP, find_gdb_paths
+
+    validators = args.validators
+    if validators == ["all"]:
+        validators = [v["func"].__name__ for v in VALIDATION_MAP.values()] + ["check_for_exact_overlaps"]
+
+    with contextlib.ExitStack() as stack:
+        gdb_paths = list(args.gdb)
+        if args.root:
+            gdb_paths += find_gdb_paths(args.root)
+        if args.generate:
+            from make_synthetic_gdb import make_gdb, parse_rates, ERROR_RATE, SEED
+            data_dir = stack.enter_context(tempfile.TemporaryDirectory(prefix="gdb_synthetic_"))
+            gdb = os.path.join(data_dir, "50_เชียงใหม่", "GDB_50_1", "GDB_50_1.gdb")
+            print(f"-> สร้าง GDB สังเคราะห์ {args.generate:,} แถว: {gdb}")
+            make_gdb(gdb, "50", 1, args.generate, parse_rates(ERROR_RATE, None), SEED)
+            gdb_paths.append(gdb)
+        if not gdb_paths:
+            parser.error("ต้องระบุ --gdb, --root หรือ --generate")
+
+        targets = benchmark_targets(gdb_paths, validators, args.backend)
+        print(f"\nวัด {len(targets)} รายการ (backend: {args.backend}, repeat: {args.repeat})")
+        results = run_benchmark(targets, args.backend, args.repeat, args.tracemalloc)
+
+    report = {
+        "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "backend": args.backend,
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=1)
+    print(f"\nบันทึกผลการวัด: {args.output}")
+
+    if args.baseline:
+        compare_with_baseline(results, args.baseline)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,64 +1,55 @@
 # =============================================================================
-# - รันบน ArcGIS Pro Python environment (ต้องมี arcpy)
+# - รันบน ArcGIS Pro Python environment (ต้องมี arcpy หรือใช้ reader_backend = "openfilegdb")
 # - Script v1 (ปรับปรุง 2025-10-28)
 # - สำหรับเช็คว่า GDB มี Featureclass ที่กำหนด ครบหรือไม่ ใช่หรือมั่ว ชัวร์หรือไม่ ####
+# - รูปแบบชื่อ Featureclass ใช้ VALIDATION_MAP ของ validate_gdb.py (ชุดเดียวกับที่ตรวจมาตรฐาน)
+# - ไม่ต้องโหลด pandas: เขียนเอกเซลด้วย gdb_report (openpyxl) และ arcpy จะถูกโหลดเมื่ออ่าน GDB แรกเท่านั้น
 # =============================================================================
 import os
-import re
-import arcpy
-import pandas as pd
+from gdb_discovery import discover_gdbs
+from gdb_reader import get_row_source
+from gdb_report import ExcelSheetStream, new_workbook, save_workbook
+from validate_gdb import VALIDATION_MAP
 
 # === ตั้งค่า ===
 root_dir = r"D:\A02-Projects\WarRoom\GDB"
 output_excel = r"D:\A02-Projects\WarRoom\Report\check_gdb.xlsx"
+catalogue_path = r"D:\A02-Projects\WarRoom\_gdb_catalogue.json"  # รายการ .gdb ที่ค้นพบ (ไฟล์เดียวกับ GDB_CATALOGUE_PATH ของ validate_gdb.py)
+reader_backend = "arcpy"  # วิธีอ่านรายชื่อ featureclass: "arcpy" หรือ "openfilegdb" (ไม่ต้องมี arcpy เริ่มเร็วกว่า)
 
-# === กำหนดฟีเจอร์คลาสที่จะตรวจสอบ === #
-patterns = {
-    "PARCEL": re.compile(r"^PARCEL_\d{2}_\d{2}$", re.IGNORECASE),
-    "PARCEL_NS3K": re.compile(r"^PARCEL_\d{2}_NS3K_\d{2}$", re.IGNORECASE),
-    "ROAD": re.compile(r"^ROAD_\d{2}$", re.IGNORECASE),
-    "BLOCK_FIX": re.compile(r"^BLOCK_FIX_\d{2}$", re.IGNORECASE),
-    "BLOCK_PRICE": re.compile(r"^BLOCK_PRICE_\d{2}$", re.IGNORECASE),
-    "BLOCK_BLUE": re.compile(r"^BLOCK_BLUE_\d{2}$", re.IGNORECASE),
-    "PARCEL_REL": re.compile(r"^PARCEL_REL_\d{2}$", re.IGNORECASE),
-    "NS3K_REL": re.compile(r"^NS3K_REL_\d{2}$", re.IGNORECASE),
-}
+# === ฟีเจอร์คลาสที่จะตรวจสอบ (PARCEL, PARCEL_NS3K, ROAD, BLOCK_*, PARCEL_REL, NS3K_REL) === #
+patterns = {key: meta["pattern"] for key, meta in VALIDATION_MAP.items()}
 
 # === เก็บข้อมูล === #
 results = []
+source = get_row_source(reader_backend)
 
-for dirpath, dirnames, filenames in os.walk(root_dir):
-    for dirname in dirnames:
-        if dirname.lower().endswith(".gdb"):
-            gdb_path = os.path.join(dirpath, dirname)
-            print(f"Checking: {gdb_path}")
-            arcpy.env.workspace = gdb_path
+# ค้นหา .gdb (อ่านหลายโฟลเดอร์พร้อมกัน + ใช้รายการเดิมจาก catalogue กับโฟลเดอร์ที่ไม่เปลี่ยน)
+for gdb_path in discover_gdbs(root_dir, catalogue_path):
+    print(f"Checking: {gdb_path}")
 
-            counts = {k: 0 for k in patterns.keys()}
+    counts = {k: 0 for k in patterns.keys()}
 
-            try:
-                feature_classes = arcpy.ListFeatureClasses()
-                if feature_classes:
-                    for fc in feature_classes:
-                        for key, pattern in patterns.items():
-                            if pattern.match(fc):
-                                counts[key] += 1
-                else:
-                    print(f"  ไม่พบฟีเจอร์คลาสใน {gdb_path}")
-            except Exception as e:
-                print(f"  ซวยแล้ว {gdb_path}: {e}")
+    try:
+        feature_classes = source.list_feature_classes(gdb_path)
+        if feature_classes:
+            for fc in feature_classes:
+                for key, pattern in patterns.items():
+                    if pattern.match(fc):
+                        counts[key] += 1
+        else:
+            print(f"  ไม่พบฟีเจอร์คลาสใน {gdb_path}")
+    except Exception as e:
+        print(f"  ซวยแล้ว {gdb_path}: {e}")
 
-            row = {"Full Path": gdb_path}
-            row.update(counts)
-            results.append(row)
+    results.append([gdb_path] + [counts[k] for k in patterns.keys()])
 
 # === รายงานเป็นเอกเซล ===
-df = pd.DataFrame(results)
-df = df[
-    ["Full Path", "PARCEL", "PARCEL_NS3K", "ROAD", "BLOCK_FIX", 
-     "BLOCK_PRICE", "BLOCK_BLUE", "PARCEL_REL", "NS3K_REL"]
-]
 os.makedirs(os.path.dirname(output_excel), exist_ok=True)
-df.to_excel(output_excel, index=False)
+workbook = new_workbook()
+sheet = ExcelSheetStream(workbook, "Sheet1", ["Full Path"] + list(patterns.keys()))
+for row in results:
+    sheet.append(row)
+save_workbook(workbook, output_excel)
 
 print(f"\n✅ เสร็จละจ้า! ตรวจสอบข้อมูลได้ที่: {output_excel}")
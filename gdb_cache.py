@@ -0,0 +1,128 @@
+# =============================================================================
+# - cache ผลตรวจของแต่ละ GDB สำหรับการรันซ้ำ (incremental run)
+#   fingerprint ของ GDB = ชื่อไฟล์ + ขนาด + เวลาแก้ไข (mtime) ของทุกไฟล์ในโฟลเดอร์ .gdb
+#   (เลือกให้ hash เนื้อไฟล์ด้วยได้) + ลายเซ็นของโค้ดตรวจ/การตั้งค่า
+# - GDB ที่ fingerprint ไม่เปลี่ยนจากรอบก่อน จะไม่ตรวจซ้ำ
+#   ใช้ผลเดิม (All_DATA, Error SUM) และคัดลอกรายงาน Excel ของ GDB นั้นจาก cache แทน
+# - โครงสร้าง cache: CACHE_DIR/<key>.json (+ <key>.xlsx ถ้ามี error)
+#   key = sha1 ของ path GDB
+# - ไฟล์ Parquet ของ GDB (gdb_store) ไม่คัดลอกเก็บ ใช้ไฟล์เดิมใน store (entry["store_files"])
+#   ถ้าไฟล์นั้นถูกลบไปแล้ว จะถือว่าไม่มี cache และตรวจใหม่
+# =============================================================================
+
+import os
+import json
+import shutil
+import hashlib
+
+CACHE_VERSION = 1
+_HASH_CHUNK = 1024 * 1024
+_IGNORED_SUFFIXES = (".lock",)  # ไฟล์ lock ของ ArcGIS เกิด/หายตามการเปิดไฟล์ ไม่ใช่ข้อมูล
+
+
+def gdb_fingerprint(gdb_path, hash_contents=False, signature=""):
+    """
+    คืน fingerprint (hex) ของโฟลเดอร์ .gdb จากชื่อไฟล์ ขนาด และ mtime ของทุกไฟล์
+    hash_contents=True จะอ่านเนื้อไฟล์ทั้งหมดมา hash ด้วย (ช้ากว่า แต่ไม่พึ่ง mtime)
+    signature : ข้อความที่รวมเข้าไปด้วย (เช่น ลายเซ็นของโค้ดตรวจ) เปลี่ยนเมื่อไรผลเดิมใช้ไม่ได้
+    """
+    digest = hashlib.sha1(f"v{CACHE_VERSION}|{signature}".encode("utf-8"))
+    with os.scandir(gdb_path) as it:
+        entries = sorted(
+            (e for e in it if e.is_file() and not e.name.lower().endswith(_IGNORED_SUFFIXES)),
+            key=lambda e: e.name,
+        )
+    for entry in entries:
+        st = entry.stat()
+        digest.update(f"|{entry.name}|{st.st_size}|{st.st_mtime_ns}".encode("utf-8"))
+        if hash_contents:
+            with open(entry.path, "rb") as f:
+                for chunk in iter(lambda: f.read(_HASH_CHUNK), b""):
+                    digest.update(chunk)
+    return digest.hexdigest()
+
+
+def source_signature(paths, settings=None):
+    """
+    ลายเซ็นของไฟล์โค้ด (เนื้อไฟล์) + ค่าการตั้งค่า ใช้รวมใน fingerprint
+    แก้กฎตรวจหรือเปลี่ยนการตั้งค่าเมื่อไร cache เดิมจะไม่ถูกใช้
+    """
+    digest = hashlib.sha1()
+    for path in paths:
+        with open(path, "rb") as f:
+            digest.update(f.read())
+    digest.update(json.dumps(settings or {}, sort_keys=True, default=str).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """
+    เก็บ / อ่านผลตรวจของแต่ละ GDB ใน cache_dir
+    """
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+
+    def _paths(self, gdb):
+        key = hashlib.sha1(os.path.normcase(os.path.abspath(gdb)).encode("utf-8")).hexdigest()
+        base = os.path.join(self.cache_dir, key)
+        return base + ".json", base + ".xlsx"
+
+    def lookup(self, gdb, fingerprint):
+        """คืน entry ของ GDB ถ้า fingerprint ตรงกับรอบก่อน (และไฟล์รายงานยังอยู่) ไม่งั้นคืน None"""
+        json_path, xlsx_path = self._paths(gdb)
+        try:
+            with open(json_path, encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if entry.get("fingerprint") != fingerprint or entry.get("gdb") != gdb:
+            return None
+        if entry.get("has_report") and not os.path.isfile(xlsx_path):
+            return None
+        if not all(os.path.isfile(p) for p in (entry.get("store_files") or {}).values()):
+            return None
+        return entry
+
+    def store(self, gdb, fingerprint, result, report_path=None):
+        """
+        บันทึกผลตรวจของ GDB (result จาก process_gdb) และสำเนารายงาน Excel (ถ้ามี)
+        เขียนไฟล์ชั่วคราวก่อนแล้วค่อยแทนที่ ไฟล์ cache จึงไม่เสียแม้ process ตายกลางทาง
+        ผลที่ตรวจล้มเหลว (result["failed"]) ไม่บันทึก
+        """
+        if result.get("failed"):
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        json_path, xlsx_path = self._paths(gdb)
+        has_report = bool(report_path) and os.path.isfile(report_path)
+        if has_report:
+            shutil.copyfile(report_path, xlsx_path + ".tmp")
+            os.replace(xlsx_path + ".tmp", xlsx_path)
+        entry = {
+            "gdb": gdb,
+            "fingerprint": fingerprint,
+            "has_report": has_report,
+            "data_records": result["data_records"],
+            "summary_records": result["summary_records"],
+            "error_count": result["error_count"],
+            "store_files": result.get("store_files"),
+        }
+        with open(json_path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(json_path + ".tmp", json_path)
+
+    def restore(self, entry, run_timestamp, report_path):
+        """
+        คืน result แบบเดียวกับ process_gdb จาก entry ใน cache (Timestamp เป็นของรอบนี้)
+        และคัดลอกรายงาน Excel เดิมไปไว้ที่ report_path
+        """
+        if entry["has_report"]:
+            _, xlsx_path = self._paths(entry["gdb"])
+            shutil.copyfile(xlsx_path, report_path)
+        return {
+            "gdb": entry["gdb"],
+            "data_records": [[run_timestamp] + list(r[1:]) for r in entry["data_records"]],
+            "summary_records": [[run_timestamp] + list(r[1:]) for r in entry["summary_records"]],
+            "error_count": entry["error_count"],
+            "cached": True,
+        }
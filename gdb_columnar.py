@@ -0,0 +1,76 @@
+# =============================================================================
+# - ฟังก์ชันช่วยตรวจ PARCEL / PARCEL_NS3K แบบ columnar (numpy / pandas)
+#   ใช้โดย check_parcel_columnar ใน validate_gdb.py
+# - validate_gdb.py import โมดูลนี้เมื่อเริ่มตรวจแบบ columnar ครั้งแรกเท่านั้น
+#   worker / การรันที่ไม่ได้ตรวจ PARCEL จึงไม่ต้องโหลด numpy / pandas
+# =============================================================================
+
+import numpy as np
+import pandas as pd
+
+
+def digit_string_mask(s, length):
+    """True เมื่อค่าเป็น String ตัวเลขล้วน และยาว length หลัก"""
+    try:
+        return (s.str.isdigit().eq(True) & s.str.len().eq(length)).to_numpy()
+    except AttributeError:  # ไม่มีค่าที่เป็น String เลย
+        return np.zeros(len(s), dtype=bool)
+
+def number_column(s):
+    """แปลงคอลัมน์ Number เป็น float (NULL -> NaN)"""
+    return pd.to_numeric(pd.Series(s, dtype=object), errors="coerce").astype(float).to_numpy()
+
+def int_string_column(values, valid):
+    """int(ค่า) ของแถว valid แบบเดียวกับ int() ของ Python (แปลงไม่ได้ -> NaN)"""
+    out = pd.to_numeric(pd.Series(values, dtype=object).where(valid), errors="coerce").astype(float).to_numpy()
+    # ตัวเลขที่ pandas แปลงไม่ได้ (เช่น เลขไทย) ลองด้วย int() อีกครั้ง
+    for r in np.flatnonzero(valid & np.isnan(out)).tolist():
+        try:
+            out[r] = int(values[r])
+        except Exception:
+            pass
+    return out
+
+def in_values(x, values):
+    """trunc(x) อยู่ใน values (เหมือน int(float(x)) in values, NaN = False)"""
+    return np.isin(np.trunc(x), list(values)) & np.isfinite(x)
+
+def branch_keys(branch_s):
+    """BRANCH_CODE ที่ตัดช่องว่างแล้ว ใช้จัดกลุ่มตรวจค่าซ้ำ (ค่าว่าง -> "NULL")"""
+    keys = branch_s.str.strip() if branch_s.notna().any() else branch_s.copy()
+    empty = branch_s.isna() | branch_s.eq("")
+    return keys.mask(empty, "NULL").to_numpy(dtype=object)
+
+def prefix_mismatch_mask(branch_s, cwt_s, candidates):
+    """branch ไม่ขึ้นต้นด้วย CHANGWAT_CODE (ตรวจเฉพาะแถว candidates และ CHANGWAT_CODE เป็น String)"""
+    mismatch = np.zeros(len(branch_s), dtype=bool)
+    try:
+        cwt_len = cwt_s.str.len()
+    except AttributeError:
+        return mismatch
+    for length in cwt_len.dropna().unique():
+        rows = candidates & cwt_len.eq(length).to_numpy()
+        if rows.any():
+            prefix = branch_s[rows].str.slice(0, int(length))
+            mismatch[rows] = (prefix != cwt_s[rows]).to_numpy()
+    return mismatch
+
+def duplicate_groups(key_columns, oids, valid, groups=None):
+    """
+    หา key ที่ซ้ำ (ทุกคอลัมน์ตรงกัน) เฉพาะแถว valid
+    คืน list ของ (key tuple, [oid,...]) เรียงตามแถวแรกที่พบ key นั้น
+    groups : KeyGroups ที่มีงบหน่วยความจำ ถ้า key ทั้งหมดเกินงบจะเก็บ key ทีละแถวลงในนี้แทนการจัดกลุ่มด้วย pandas
+    """
+    rows = np.flatnonzero(valid)
+    if len(rows) < 2:
+        return []
+    if groups is not None and not groups.fits(len(rows)):
+        for r in rows.tolist():
+            groups.add(tuple(col[r] for col in key_columns), oids[r])
+        return list(groups.duplicates())
+    frame = pd.DataFrame({i: col[rows] for i, col in enumerate(key_columns)})
+    dup_rows = rows[frame.duplicated(keep=False).to_numpy()]
+    groups = {}
+    for r in dup_rows.tolist():
+        groups.setdefault(tuple(col[r] for col in key_columns), []).append(oids[r])
+    return list(groups.items())
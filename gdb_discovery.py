@@ -0,0 +1,160 @@
+# =============================================================================
+# - ค้นหาโฟลเดอร์ .gdb ใต้ ROOT_DIR (ใช้ร่วมกันระหว่าง validate_gdb.py และ check_featureclass_in_gdb.py)
+# - อ่านรายการในโฟลเดอร์ด้วย os.scandir หลายโฟลเดอร์พร้อมกัน (thread) ทีละชั้นความลึก
+#   เหมาะกับ share บน SMB ที่การอ่านแต่ละโฟลเดอร์รอ network นาน
+# - เก็บผลไว้ใน catalogue (JSON): ทุกโฟลเดอร์ที่เคยอ่าน + mtime + โฟลเดอร์ย่อย + .gdb (พร้อม mtime)
+#   รอบถัดไปโฟลเดอร์ที่ mtime ไม่เปลี่ยน ใช้รายการเดิม (stat ครั้งเดียว ไม่ต้องอ่านรายการใหม่)
+#   โฟลเดอร์ที่มีการเพิ่ม/ลบ/เปลี่ยนชื่อรายการข้างใน mtime จะเปลี่ยน จึงถูกอ่านใหม่
+# - ลำดับของ GDB เหมือน os.walk แบบเดิม และไม่ค้นหาข้างใน .gdb (บางจังหวัดมี GDB ซ้อนกัน)
+# =============================================================================
+
+import os
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+CATALOGUE_VERSION = 1
+DISCOVERY_WORKERS = 16  # จำนวนโฟลเดอร์ที่อ่านพร้อมกัน
+
+
+def _is_gdb(name):
+    return name.lower().endswith(".gdb")
+
+
+def _list_dir(path, cached, rescan):
+    """
+    อ่านโฟลเดอร์ 1 โฟลเดอร์ คืน (entry, อ่านใหม่หรือไม่) หรือ None ถ้าอ่านไม่ได้
+    entry = {"mtime": ..., "subdirs": [ชื่อ], "gdbs": {ชื่อ: mtime}}
+    """
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+    if not rescan and cached is not None and cached.get("mtime") == mtime:
+        gdbs = {}
+        for name in cached["gdbs"]:
+            try:
+                gdbs[name] = os.stat(os.path.join(path, name)).st_mtime_ns
+            except OSError:  # รายการเดิมใช้ไม่ได้ อ่านใหม่
+                gdbs = None
+                break
+        if gdbs is not None:
+            return {"mtime": mtime, "subdirs": cached["subdirs"], "gdbs": gdbs}, False
+
+    subdirs, gdbs = [], {}
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                try:
+                    if not entry.is_dir():
+                        continue
+                    if _is_gdb(entry.name):
+                        gdbs[entry.name] = entry.stat().st_mtime_ns
+                    elif not entry.is_symlink():  # ไม่ตาม symlink เหมือน os.walk
+                        subdirs.append(entry.name)
+                except OSError:
+                    continue
+    except OSError:
+        return None
+    return {"mtime": mtime, "subdirs": subdirs, "gdbs": gdbs}, True
+
+
+class GdbCatalogue:
+    """
+    catalogue ของโฟลเดอร์ที่ค้นหาแล้ว {path โฟลเดอร์: entry} (ใช้ได้หลาย root ในไฟล์เดียว)
+    path = None ไม่บันทึกลงไฟล์ (อ่านใหม่ทุกครั้ง)
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.dirs = {}
+        if path and os.path.exists(path):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    data = json.load(f)
+                if data.get("version") == CATALOGUE_VERSION:
+                    self.dirs = data["dirs"]
+            except (OSError, ValueError, KeyError):
+                self.dirs = {}
+
+    def save(self):
+        if not self.path:
+            return
+        folder = os.path.dirname(self.path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        with open(self.path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump({"version": CATALOGUE_VERSION, "dirs": self.dirs}, f, ensure_ascii=False)
+        os.replace(self.path + ".tmp", self.path)
+
+    def refresh(self, root_dir, workers=DISCOVERY_WORKERS, rescan=False):
+        """
+        อ่านโฟลเดอร์ใต้ root_dir ทีละชั้นความลึก (ชั้นเดียวกันอ่านพร้อมกัน) แล้วปรับ catalogue
+        rescan=True อ่านรายการใหม่ทุกโฟลเดอร์ ไม่ใช้รายการเดิม
+        คืน (จำนวนโฟลเดอร์ที่อ่านใหม่, จำนวนโฟลเดอร์ที่ใช้รายการเดิม)
+        """
+        root_dir = os.path.abspath(root_dir)
+        visited = {}
+        scanned = reused = 0
+        level = [root_dir]
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            while level:
+                results = executor.map(lambda p: _list_dir(p, self.dirs.get(p), rescan), level)
+                next_level = []
+                for path, result in zip(level, results):
+                    if result is None:
+                        continue
+                    entry, fresh = result
+                    visited[path] = entry
+                    scanned += fresh
+                    reused += not fresh
+                    next_level.extend(os.path.join(path, name) for name in entry["subdirs"])
+                level = next_level
+
+        # ลบโฟลเดอร์ใต้ root_dir ที่ไม่มีแล้ว
+        prefix = os.path.join(root_dir, "")
+        for path in [p for p in self.dirs if p == root_dir or p.startswith(prefix)]:
+            if path not in visited:
+                del self.dirs[path]
+        self.dirs.update(visited)
+        return scanned, reused
+
+    def gdb_paths(self, root_dir):
+        """path ของ .gdb ใต้ root_dir ตามลำดับแบบ os.walk (จาก catalogue ที่ refresh แล้ว)"""
+        root_dir = os.path.abspath(root_dir)
+        paths = []
+        stack = [root_dir]
+        while stack:
+            path = stack.pop()
+            entry = self.dirs.get(path)
+            if entry is None:
+                continue
+            paths.extend(os.path.join(path, name) for name in entry["gdbs"])
+            stack.extend(os.path.join(path, name) for name in reversed(entry["subdirs"]))
+        return paths
+
+    def gdb_mtimes(self, root_dir):
+        """{path .gdb: mtime (ns)} ใต้ root_dir"""
+        mtimes = {}
+        for path in self.gdb_paths(root_dir):
+            parent, name = os.path.split(path)
+            mtimes[path] = self.dirs[parent]["gdbs"][name]
+        return mtimes
+
+
+def discover_gdbs(root_dir, catalogue_path=None, workers=DISCOVERY_WORKERS, rescan=False):
+    """
+    คืน list ของ path .gdb ใต้ root_dir (ลำดับเดียวกับ os.walk) และบันทึก catalogue ถ้าระบุ catalogue_path
+    """
+    catalogue = GdbCatalogue(catalogue_path)
+    scanned, reused = catalogue.refresh(root_dir, workers, rescan)
+    if reused:
+        print(f"  catalogue: อ่านใหม่ {scanned} โฟลเดอร์, ใช้รายการเดิม {reused} โฟลเดอร์")
+    try:
+        catalogue.save()
+    except OSError as e:
+        print(f"  !! ไม่สามารถบันทึก catalogue {catalogue_path}: {e}")
+    paths = catalogue.gdb_paths(root_dir)
+    abs_root = os.path.abspath(root_dir)
+    if root_dir != abs_root:  # คืน path ในรูปเดียวกับ root_dir ที่ส่งมา (แบบ os.walk)
+        paths = [os.path.join(root_dir, os.path.relpath(p, abs_root)) for p in paths]
+    return paths
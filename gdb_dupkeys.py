@@ -0,0 +1,165 @@
+# =============================================================================
+# - ตัวเก็บกลุ่ม key -> [OID,...] สำหรับตรวจค่าซ้ำ (Duplicate UTM / Duplicate Value) ที่คุมหน่วยความจำได้
+#   ใช้แทน defaultdict(list) ในกฎ unique_within / unique_key (gdb_rules) และการตรวจ PARCEL แบบ columnar
+# - key เก็บเป็น bytes (repr ของ tuple) แทน tuple ของ object ทีละค่า ใช้หน่วยความจำน้อยกว่าหลายเท่า
+# - เกินงบหน่วยความจำ (budget) แล้วเรียงกลุ่มที่มีอยู่ตาม key เขียนลงดิสก์เป็น 1 ชุด (run) แล้วเริ่มใหม่
+#   ตอนจบอ่านทุกชุดพร้อมกันแบบ merge (heapq.merge) ทีละ record รวม key เดียวกันที่อยู่คนละชุด
+# - ผลเหมือนแบบในหน่วยความจำทุกประการ: กลุ่มเรียงตามแถวแรกที่พบ key, OID ในกลุ่มเรียงตามแถว
+#   key ที่รายงานเป็นค่าของแถวแรก
+# - budget = None : ไม่เขียนลงดิสก์เลย (แบบเดิม)
+# - pressure (เช่น gdb_memory.memory_pressure) คืน True เมื่อ process ใช้หน่วยความจำเกินงบ
+#   จะลดงบเหลือ pressure_budget ระหว่างเก็บ (เช็คทุก PRESSURE_CHECK_ROWS แถว)
+# =============================================================================
+
+import os
+import ast
+import heapq
+import shutil
+import pickle
+import tempfile
+import itertools
+
+KEY_OVERHEAD = 150  # ไบต์โดยประมาณของ 1 กลุ่มใหม่ใน dict (entry + bytes object + list + เลขแถว) ไม่รวมความยาว key
+OID_OVERHEAD = 36   # ไบต์โดยประมาณของ OID ที่เพิ่มเข้ากลุ่มเดิม
+PRESSURE_CHECK_ROWS = 4096  # เช็ค pressure ทุกกี่แถว
+
+_BASIC_TYPES = (str, int, type(None))
+_FAST_TYPES = frozenset(_BASIC_TYPES)
+
+
+def encode_key(key):
+    """
+    key tuple -> bytes ที่เท่ากันเมื่อ key เท่ากัน (แบบเดียวกับการเทียบ key ของ dict)
+    คืน None ถ้า key ซ้ำกับแถวอื่นไม่ได้ (มี NaN: NaN != NaN)
+    ค่าที่ไม่ใช่ str / int / float / None เก็บด้วย pickle
+    """
+    if _FAST_TYPES.issuperset(map(type, key)):  # กรณีปกติ: str / int / None ล้วน
+        return b"R" + repr(key).encode("utf-8", "surrogatepass")
+    values = []
+    for v in key:
+        if type(v) is float:
+            if v != v:
+                return None
+            if v in (float("inf"), float("-inf")):
+                return b"P" + pickle.dumps(key, 4)
+            v = v + 0.0  # -0.0 -> 0.0 (เท่ากันใน dict)
+        elif not isinstance(v, _BASIC_TYPES) or type(v) is bool:
+            return b"P" + pickle.dumps(key, 4)
+        values.append(v)
+    return b"R" + repr(tuple(values)).encode("utf-8", "surrogatepass")
+
+def decode_key(data):
+    if data[:1] == b"P":
+        return pickle.loads(data[1:])
+    return ast.literal_eval(data[1:].decode("utf-8", "surrogatepass"))
+
+
+class KeyGroups:
+    """
+    เก็บ OID ตาม key ทีละแถว (add) แล้วคืนเฉพาะ key ที่ซ้ำ (duplicates)
+
+    budget    : ไบต์โดยประมาณที่ให้เก็บในหน่วยความจำ (None = ไม่จำกัด)
+    spill_dir : โฟลเดอร์สำหรับไฟล์ชั่วคราวของชุดที่เขียนลงดิสก์ (None = temp ของระบบ)
+    pressure  : callable คืน True เมื่อหน่วยความจำของ process ตึง -> ใช้ pressure_budget แทน budget
+    spilled   : จำนวนชุดที่เขียนลงดิสก์ (สำหรับ log / perf)
+    """
+
+    def __init__(self, budget=None, spill_dir=None, pressure=None, pressure_budget=None):
+        self.budget = budget
+        self.spill_dir = spill_dir
+        self.pressure = pressure
+        self.pressure_budget = pressure_budget
+        self.groups = {}  # encode_key(key) -> [แถวแรกที่พบ, OID, OID, ...]
+        self.size = 0
+        self.rows = 0
+        self.spilled = 0
+        self._folder = None
+        self._runs = []
+
+    def _check_pressure(self):
+        """สลับไปใช้ pressure_budget เมื่อ pressure() เป็น True (ครั้งเดียว)"""
+        if self.pressure is not None and self.pressure():
+            self.pressure = None
+            if self.pressure_budget is not None and (self.budget is None or self.pressure_budget < self.budget):
+                self.budget = self.pressure_budget
+
+    def fits(self, rows, key_bytes=64):
+        """True ถ้า key ของ rows แถว (ยาวราว key_bytes) น่าจะอยู่ในงบหน่วยความจำได้ทั้งหมด"""
+        self._check_pressure()
+        return self.budget is None or rows * (KEY_OVERHEAD + key_bytes) <= self.budget
+
+    def add(self, key, oid):
+        self.rows += 1
+        if self.pressure is not None and self.rows % PRESSURE_CHECK_ROWS == 0:
+            self._check_pressure()
+        encoded = encode_key(key)
+        if encoded is None:
+            return
+        group = self.groups.get(encoded)
+        if group is None:
+            self.groups[encoded] = [self.rows, oid]
+            self.size += KEY_OVERHEAD + len(encoded)
+        else:
+            group.append(oid)
+            self.size += OID_OVERHEAD
+        if self.budget is not None and self.size > self.budget:
+            self._spill()
+
+    def _spill(self):
+        """เขียนกลุ่มที่มีอยู่ เรียงตาม key ลงไฟล์ 1 ชุด แล้วล้าง dict"""
+        if self._folder is None:
+            self._folder = tempfile.mkdtemp(prefix="gdb_dupkeys_", dir=self.spill_dir)
+        path = os.path.join(self._folder, f"run_{len(self._runs):04d}.bin")
+        with open(path, "wb") as f:
+            for encoded in sorted(self.groups):
+                group = self.groups[encoded]
+                pickle.dump((encoded, group[0], group[1:]), f, 4)
+        self._runs.append(path)
+        self.spilled += 1
+        self.groups = {}
+        self.size = 0
+
+    @staticmethod
+    def _read_run(path):
+        with open(path, "rb") as f:
+            while True:
+                try:
+                    yield pickle.load(f)
+                except EOFError:
+                    return
+
+    def duplicates(self):
+        """
+        (key, [OID,...]) ของ key ที่พบมากกว่า 1 แถว เรียงตามแถวแรกที่พบ key
+        เรียกครั้งเดียวตอนจบ (ลบไฟล์ชั่วคราวเมื่ออ่านครบ)
+        """
+        if not self._runs:
+            for encoded, group in self.groups.items():
+                if len(group) > 2:
+                    yield decode_key(encoded), group[1:]
+            return
+        try:
+            if self.groups:
+                self._spill()
+            found = []
+            runs = [self._read_run(path) for path in self._runs]
+            # ชุดเรียงตามเวลา: key เดียวกันจากชุดก่อนมาก่อน (แถวแรกน้อยกว่า) OID จึงเรียงตามแถว
+            merged = heapq.merge(*runs, key=lambda record: (record[0], record[1]))
+            for encoded, records in itertools.groupby(merged, key=lambda record: record[0]):
+                records = list(records)
+                oids = [oid for _, _, run_oids in records for oid in run_oids]
+                if len(oids) > 1:
+                    found.append((records[0][1], encoded, oids))
+            found.sort(key=lambda item: item[0])
+            for _, encoded, oids in found:
+                yield decode_key(encoded), oids
+        finally:
+            self.close()
+
+    def close(self):
+        """ลบไฟล์ชั่วคราว (เรียกซ้ำได้)"""
+        if self._folder is not None:
+            shutil.rmtree(self._folder, ignore_errors=True)
+            self._folder = None
+        self._runs = []
+        self.groups = {}
@@ -0,0 +1,102 @@
+# =============================================================================
+# - journal ของการรัน 1 รอบ (ไฟล์ JSON lines) สำหรับทำต่อเมื่อการรันหยุดกลางทาง (--resume)
+#   บรรทัดแรก  = ข้อมูลของรอบ (run_timestamp, gdb_report_dir, รายชื่อ GDB ตามลำดับ)
+#   บรรทัดถัดไป = ผลของ GDB ที่ตรวจเสร็จ 1 บรรทัดต่อ GDB (flush + fsync ทันที)
+# - บรรทัดสุดท้ายที่เขียนไม่ครบ (เครื่องดับระหว่างเขียน) จะถูกข้าม GDB นั้นจะถูกตรวจใหม่
+# - GDB ที่ตรวจล้มเหลวกลางทาง (result["failed"]) ไม่ถูกบันทึก จึงถูกตรวจใหม่เช่นกัน
+# =============================================================================
+
+import os
+import json
+
+JOURNAL_VERSION = 1
+
+
+class RunJournal:
+    """
+    journal ของการรัน 1 รอบ
+
+    Attributes
+    ----------
+    run_timestamp : str
+        Timestamp ของรอบ (ใช้ค่าเดิมตอน resume รายงานสรุปจึงเหมือนเดิม)
+    gdb_report_dir : str
+        โฟลเดอร์รายงานของรอบ
+    gdb_paths : list
+        GDB ทั้งหมดของรอบตามลำดับ
+    completed : dict
+        {gdb: result} ของ GDB ที่ตรวจเสร็จแล้ว
+    """
+
+    def __init__(self, path, header, completed=None):
+        self.path = path
+        self.run_timestamp = header["run_timestamp"]
+        self.gdb_report_dir = header["gdb_report_dir"]
+        self.gdb_paths = list(header["gdb_paths"])
+        self.completed = completed or {}
+        self._file = None
+
+    @classmethod
+    def start(cls, path, run_timestamp, gdb_report_dir, gdb_paths):
+        """เริ่ม journal ใหม่ (เขียนทับของรอบก่อน)"""
+        header = {
+            "version": JOURNAL_VERSION,
+            "run_timestamp": run_timestamp,
+            "gdb_report_dir": gdb_report_dir,
+            "gdb_paths": list(gdb_paths),
+        }
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        journal = cls(path, header)
+        journal._file = open(path, "w", encoding="utf-8")
+        journal._write(header)
+        return journal
+
+    @classmethod
+    def load(cls, path):
+        """อ่าน journal เดิมเพื่อทำต่อ คืน None ถ้าไม่มีไฟล์หรือไฟล์ใช้ไม่ได้"""
+        try:
+            with open(path, "rb") as f:
+                lines = f.read().splitlines()
+        except OSError:
+            return None
+        records = []
+        for line in lines:
+            try:
+                records.append(json.loads(line.decode("utf-8")))
+            except ValueError:  # บรรทัดที่เขียนไม่ครบ (รวมถึงตัวอักษรที่ถูกตัดครึ่ง)
+                continue
+        if not records or records[0].get("version") != JOURNAL_VERSION:
+            return None
+
+        header = records[0]
+        completed = {result["gdb"]: result for result in records[1:] if "gdb" in result}
+        journal = cls(path, header, completed)
+        # เขียน journal ใหม่โดยตัดบรรทัดที่เสียออก (เขียนไฟล์ชั่วคราวก่อน แล้วค่อยแทนที่) แล้วเขียนต่อท้าย
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            for record in [header] + list(completed.values()):
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(path + ".tmp", path)
+        journal._file = open(path, "a", encoding="utf-8")
+        return journal
+
+    def _write(self, record):
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def record(self, result):
+        """
+        บันทึกผลของ GDB ที่ตรวจเสร็จ (result จาก process_gdb)
+        ผลที่ตรวจล้มเหลว (result["failed"]) ไม่บันทึก --resume จะตรวจ GDB นั้นใหม่
+        """
+        if result.get("failed"):
+            return
+        self.completed[result["gdb"]] = result
+        self._write(result)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
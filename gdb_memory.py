@@ -0,0 +1,230 @@
+# =============================================================================
+# - วัดหน่วยความจำระหว่างตรวจ: RSS ของ process (อ่านทุก interval วินาทีด้วย thread เบื้องหลัง)
+#   และหน่วยความจำที่ Python จองไว้ (tracemalloc ถ้าเปิด)
+# - measure() ของ gdb_perf เปิด "หน้าต่าง" (window) ซ้อนกันได้ตามระดับ gdb / featureclass / phase
+#   แต่ละหน้าต่างได้ค่าสูงสุดระหว่างเปิด (Peak_RSS_MB / Peak_Py_MB ใน Sheet 'Perf')
+# - งบหน่วยความจำ (budget): RSS เกินงบครั้งแรกจะเรียก on_over_budget (จาก thread เบื้องหลัง) ครั้งเดียว
+#   ผู้เรียกใช้สลับไปโหมดประหยัดหน่วยความจำ (เช่น จำกัดแถวรายละเอียด, เขียน key ค่าซ้ำลงดิสก์)
+#   memory_pressure() ให้โค้ดที่ทำงานนานเช็คเองได้
+# - ไม่ต้องมีไลบรารีเพิ่ม: Windows ใช้ GetProcessMemoryInfo (ctypes), Linux อ่าน /proc/self/statm
+#   มี psutil จะใช้ psutil (ระบบอื่น)
+# - process_gdb เริ่มด้วย start_monitor() และหยุดด้วย stop_monitor() (ไม่ได้เริ่ม = ไม่ทำอะไร เหมือน gdb_perf)
+# =============================================================================
+
+import os
+import sys
+import threading
+
+MB = 1024 * 1024
+
+_monitor = None  # monitor ของ GDB ที่กำลังตรวจใน process นี้
+
+
+def _windows_rss():
+    import ctypes
+    from ctypes import wintypes
+
+    class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+        _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD),
+                    ("PeakWorkingSetSize", ctypes.c_size_t), ("WorkingSetSize", ctypes.c_size_t),
+                    ("QuotaPeakPagedPoolUsage", ctypes.c_size_t), ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t), ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                    ("PagefileUsage", ctypes.c_size_t), ("PeakPagefileUsage", ctypes.c_size_t)]
+
+    counters = PROCESS_MEMORY_COUNTERS()
+    counters.cb = ctypes.sizeof(counters)
+    process = ctypes.windll.kernel32.GetCurrentProcess()
+    if not ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+        return None
+    return counters.WorkingSetSize
+
+def _linux_rss():
+    with open("/proc/self/statm", "rb") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+def _psutil_rss():
+    import psutil
+    return psutil.Process().memory_info().rss
+
+def _rss_reader():
+    """ฟังก์ชันอ่าน RSS ของระบบนี้ (None = อ่านไม่ได้)"""
+    for reader in ((_windows_rss,) if sys.platform == "win32" else ()) + (_linux_rss, _psutil_rss):
+        try:
+            if reader() is not None:
+                return reader
+        except Exception:
+            continue
+    return None
+
+_read_rss = None
+
+def current_rss():
+    """RSS ของ process ตอนนี้ (ไบต์) หรือ None ถ้าอ่านไม่ได้"""
+    global _read_rss
+    if _read_rss is None:
+        _read_rss = _rss_reader() or (lambda: None)
+    try:
+        return _read_rss()
+    except Exception:
+        return None
+
+
+class MemoryWindow:
+    """ช่วงที่วัด: ค่าสูงสุดของ RSS และของ tracemalloc ระหว่างเปิด (ไบต์)"""
+    __slots__ = ("peak_rss", "peak_py")
+
+    def __init__(self, rss):
+        self.peak_rss = rss
+        self.peak_py = None
+
+    @property
+    def peak_rss_mb(self):
+        return None if self.peak_rss is None else round(self.peak_rss / MB, 1)
+
+    @property
+    def peak_py_mb(self):
+        return None if self.peak_py is None else round(self.peak_py / MB, 1)
+
+
+class MemoryMonitor:
+    """
+    อ่าน RSS ทุก interval วินาที ปรับค่าสูงสุดของทุกหน้าต่างที่เปิดอยู่ และเช็คงบ
+
+    Parameters
+    ----------
+    interval : float
+        ระยะห่างการอ่าน RSS (วินาที)
+    budget : int | None
+        งบ RSS (ไบต์) None = ไม่ตรวจงบ
+    on_over_budget : callable | None
+        เรียกครั้งเดียวเมื่อ RSS เกินงบครั้งแรก รับ RSS (ไบต์) (ทำงานใน thread ของ monitor)
+    trace : bool
+        เปิด tracemalloc ด้วย (Peak_Py_MB และ write_snapshot) ช้าลงพอสมควร
+    """
+
+    def __init__(self, interval=0.05, budget=None, on_over_budget=None, trace=False):
+        self.interval = interval
+        self.budget = budget
+        self.on_over_budget = on_over_budget
+        self.over_budget = False
+        self.trace = trace
+        self.windows = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._started_tracing = False
+
+    def start(self):
+        if self.trace:
+            import tracemalloc
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracing = True
+        self._thread = threading.Thread(target=self._run, name="gdb-memory-monitor", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        if self._started_tracing:
+            import tracemalloc
+            tracemalloc.stop()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def sample(self):
+        """อ่าน RSS 1 ครั้ง ปรับค่าสูงสุดของหน้าต่างที่เปิดอยู่ คืน RSS"""
+        rss = current_rss()
+        if rss is None:
+            return None
+        with self._lock:
+            for window in self.windows:
+                if window.peak_rss is None or rss > window.peak_rss:
+                    window.peak_rss = rss
+        if self.budget is not None and rss > self.budget and not self.over_budget:
+            self.over_budget = True
+            if self.on_over_budget is not None:
+                try:
+                    self.on_over_budget(rss)
+                except Exception as e:
+                    print(f"  !! on_over_budget ล้มเหลว: {e}")
+        return rss
+
+    def _traced_peak(self, reset):
+        """ค่าสูงสุดของ tracemalloc ตั้งแต่ reset ครั้งก่อน ส่งต่อให้ทุกหน้าต่างที่เปิดอยู่ แล้ว reset ใหม่"""
+        import tracemalloc
+        if not tracemalloc.is_tracing():
+            return
+        peak = tracemalloc.get_traced_memory()[1]
+        for window in self.windows:
+            if window.peak_py is None or peak > window.peak_py:
+                window.peak_py = peak
+        if reset and hasattr(tracemalloc, "reset_peak"):  # Python 3.9+
+            tracemalloc.reset_peak()
+
+    def open(self):
+        window = MemoryWindow(None)
+        with self._lock:
+            if self.trace:
+                self._traced_peak(reset=True)
+            self.windows.append(window)
+        self.sample()
+        return window
+
+    def close(self, window):
+        self.sample()
+        with self._lock:
+            if self.trace:
+                self._traced_peak(reset=True)
+            self.windows.remove(window)
+        return window
+
+
+def start_monitor(interval=0.05, budget=None, on_over_budget=None, trace=False):
+    global _monitor
+    if _monitor is not None:
+        _monitor.stop()
+    _monitor = MemoryMonitor(interval, budget, on_over_budget, trace)
+    _monitor.start()
+    return _monitor
+
+def stop_monitor():
+    global _monitor
+    monitor, _monitor = _monitor, None
+    if monitor is not None:
+        monitor.stop()
+
+def open_window():
+    """เริ่มวัดช่วงใหม่ (None ถ้าไม่ได้เริ่ม monitor)"""
+    return _monitor.open() if _monitor is not None else None
+
+def close_window(window):
+    """จบช่วงที่วัด คืน window (ค่าสูงสุดอยู่ใน peak_rss / peak_py)"""
+    if window is not None and _monitor is not None and window in _monitor.windows:
+        _monitor.close(window)
+    return window
+
+def memory_pressure():
+    """True ถ้า RSS เคยเกินงบระหว่างตรวจ GDB นี้ (โค้ดที่ใช้หน่วยความจำมากควรสลับไปโหมดประหยัด)"""
+    return _monitor is not None and _monitor.over_budget
+
+def write_snapshot(path, limit=30):
+    """
+    เขียนรายการจุดที่ Python จองหน่วยความจำมากที่สุด (tracemalloc) เป็นไฟล์ข้อความ
+    คืน path หรือ None ถ้าไม่ได้เปิด tracemalloc
+    """
+    import tracemalloc
+    if not tracemalloc.is_tracing():
+        return None
+    snapshot = tracemalloc.take_snapshot()
+    stats = snapshot.statistics("lineno")
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        current, peak = tracemalloc.get_traced_memory()
+        f.write(f"traced {current / MB:.1f} MB, peak {peak / MB:.1f} MB, RSS {(current_rss() or 0) / MB:.1f} MB\n")
+        for stat in stats[:limit]:
+            f.write(f"{stat.size / MB:10.2f} MB {stat.count:10d} blocks  {stat.traceback}\n")
+    return path
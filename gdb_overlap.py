@@ -0,0 +1,428 @@
+# =============================================================================
+# - ตรวจโพลีกอน / เส้น ที่ทับกันสนิท (exact overlap) โดยไม่ใช้ geoprocessing
+#   อ่าน OID + WKB รอบเดียว แปลง WKB เป็นรูปแบบมาตรฐาน (canonical) แล้ว hash
+# - รูปแบบมาตรฐาน: ตัดจุดปิด ring, เริ่ม ring ที่จุดน้อยสุด, เลือกทิศทางที่ได้ค่าน้อยกว่า,
+#   เรียง hole / part, ตัดค่า M, แปลง -0.0 เป็น 0.0
+#   => รูปเดียวกันที่เริ่มจุดต่างกันหรือวนคนละทิศ ถือว่าซ้ำ (เหมือน FindIdentical xy_tolerance 0)
+# - รอบแรกเก็บแค่ digest 16 ไบต์ + OID ใน array (ไม่เก็บ geometry) หน่วยความจำคงที่ต่อฟีเจอร์
+#   รอบสองอ่านเฉพาะฟีเจอร์ที่ digest ชนกัน (ตาม OID) แล้วยืนยันด้วยการเทียบไบต์จริง
+# - GeometryHasher รับ WKB ไปพร้อมกับ cursor ของการตรวจข้อมูล ชั้นข้อมูลจึงถูกอ่านเต็มแค่รอบเดียว
+# - โหมดเกือบซ้ำ (tolerance > 0): รูปที่ digitize ใหม่ต่างกันไม่กี่มิลลิเมตรถือว่าซ้ำ (จำนวนจุดยอดต่างกันได้)
+#   รอบแรกเก็บเลขช่อง grid ของจุดกึ่งกลางกรอบ (envelope) ขนาดช่อง tolerance x CELL_FACTOR แทน digest
+#   รูปที่ Hausdorff ของจุดยอด <= tolerance มีกรอบขยับได้ไม่เกิน tolerance ต่อแกน จุดกึ่งกลางจึงอยู่ช่องเดียวกันหรือช่องติดกัน
+#   => ฟีเจอร์ที่มีฟีเจอร์อื่นอยู่ใน 3 x 3 ช่องรอบตัวเป็นผู้สมัคร ไม่ตกหล่นไม่ว่ารูปจะมีจุดยอดกี่จุด (ยังเป็นงานเชิงเส้น)
+#   คู่ผู้สมัครยืนยันด้วย Hausdorff distance ของจุดยอด <= tolerance และพื้นที่ต่างกันไม่เกิน tolerance x เส้นรอบรูป
+# =============================================================================
+
+import math
+import struct
+import hashlib
+from array import array
+from collections import defaultdict
+
+DIGEST_SIZE = 16  # blake2b 128 bit
+_DIGEST = struct.Struct("<QQ")
+CELL_FACTOR = 2  # ขนาดช่อง grid ของโหมดเกือบซ้ำ = tolerance x ค่านี้ (ต้อง >= 1 จึงไม่ตกหล่น ใหญ่ = ต้องยืนยันคู่มากขึ้น)
+
+_POINT, _LINESTRING, _POLYGON = 1, 2, 3
+_MULTIPOINT, _MULTILINESTRING, _MULTIPOLYGON, _COLLECTION = 4, 5, 6, 7
+_NEIGHBOURS = [(dx, dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1)]  # ช่องตัวเอง + 8 ช่องรอบ
+
+
+def _read_header(buf, offset):
+    """อ่าน byte order + geometry type (รองรับ ISO WKB และ EWKB) คืน (endian, base_type, has_z, has_m, offset)"""
+    endian = "<" if buf[offset] == 1 else ">"
+    (gtype,) = struct.unpack_from(endian + "I", buf, offset + 1)
+    offset += 5
+    has_z = bool(gtype & 0x80000000)
+    has_m = bool(gtype & 0x40000000)
+    if gtype & 0x20000000:  # EWKB มี SRID ต่อท้าย
+        offset += 4
+    gtype &= 0x0FFFFFFF
+    dims_code, base = divmod(gtype, 1000)
+    has_z = has_z or dims_code in (1, 3)
+    has_m = has_m or dims_code in (2, 3)
+    return endian, base, has_z, has_m, offset
+
+def _read_points(buf, offset, endian, n, has_z, has_m):
+    """อ่านจุด n จุด คืน (list ของ tuple (x, y[, z]), offset) ตัด M และแปลง -0.0 เป็น 0.0"""
+    dims = 2 + has_z + has_m
+    values = struct.unpack_from(f"{endian}{n * dims}d", buf, offset)
+    keep = 2 + has_z
+    points = [tuple(v + 0.0 for v in values[i:i + keep]) for i in range(0, n * dims, dims)]
+    return points, offset + n * dims * 8
+
+def _canonical_ring(points, closed):
+    """ring: ตัดจุดปิด เริ่มที่จุดน้อยสุด และเลือกทิศที่ได้ลำดับน้อยกว่า / เส้น: เลือกทิศที่น้อยกว่า"""
+    if not closed:
+        backward = points[::-1]
+        return tuple(min(points, backward))
+    if len(points) > 1 and points[0] == points[-1]:
+        points = points[:-1]
+    if not points:
+        return ()
+    start = min(points)
+    n = len(points)
+    backward = points[::-1]
+    best = None
+    for s in [i for i, p in enumerate(points) if p == start]:
+        r = n - 1 - s
+        candidate = min(points[s:] + points[:s], backward[r:] + backward[:r])
+        if best is None or candidate < best:
+            best = candidate
+    return tuple(best)
+
+def _pack_points(points):
+    flat = [v for p in points for v in p]
+    return struct.pack(f"<I{len(flat)}d", len(points), *flat)
+
+def _read_geometry(buf, offset, parts):
+    """
+    อ่าน geometry 1 ก้อนจาก WKB เพิ่มแต่ละ part ลงใน parts[ชนิด] (ไบต์แบบ canonical)
+    ชนิด: "A" = พื้นที่ (polygon), "L" = เส้น, "P" = จุด ; คืน offset ถัดไป
+    """
+    endian, base, has_z, has_m, offset = _read_header(buf, offset)
+    dims_tag = b"Z" if has_z else b"2"
+    if base == _POINT:
+        points, offset = _read_points(buf, offset, endian, 1, has_z, has_m)
+        if not all(v != v for v in points[0]):  # POINT EMPTY = NaN ทุกแกน
+            parts["P"].append(dims_tag + _pack_points(points))
+    elif base == _LINESTRING:
+        (n,) = struct.unpack_from(endian + "I", buf, offset)
+        points, offset = _read_points(buf, offset + 4, endian, n, has_z, has_m)
+        if points:
+            closed = len(points) > 2 and points[0] == points[-1]
+            parts["L"].append(dims_tag + _pack_points(_canonical_ring(points, closed)))
+    elif base == _POLYGON:
+        (n_rings,) = struct.unpack_from(endian + "I", buf, offset)
+        offset += 4
+        rings = []
+        for _ in range(n_rings):
+            (n,) = struct.unpack_from(endian + "I", buf, offset)
+            points, offset = _read_points(buf, offset + 4, endian, n, has_z, has_m)
+            rings.append(_pack_points(_canonical_ring(points, True)))
+        if rings:
+            parts["A"].append(dims_tag + rings[0] + b"".join(sorted(rings[1:])))
+    elif base in (_MULTIPOINT, _MULTILINESTRING, _MULTIPOLYGON, _COLLECTION):
+        (n_parts,) = struct.unpack_from(endian + "I", buf, offset)
+        offset += 4
+        for _ in range(n_parts):
+            offset = _read_geometry(buf, offset, parts)
+    else:
+        raise ValueError(f"ไม่รองรับ WKB geometry type {base}")
+    return offset
+
+def canonical_geometry(wkb):
+    """
+    แปลง WKB เป็นไบต์รูปแบบมาตรฐาน (รูปเดียวกัน -> ไบต์เดียวกัน)
+    ถ้าอ่าน WKB ไม่ได้ ใช้ไบต์ดิบแทน (ซ้ำเฉพาะกรณีไบต์ตรงกันทุกตัว)
+    """
+    buf = bytes(wkb)
+    parts = {"A": [], "L": [], "P": []}
+    try:
+        _read_geometry(buf, 0, parts)
+    except (struct.error, ValueError, IndexError):
+        return b"RAW" + buf
+    out = []
+    for kind in ("A", "L", "P"):
+        if parts[kind]:
+            items = sorted(parts[kind])
+            out.append(kind.encode() + struct.pack("<I", len(items)) + b"".join(items))
+    return b"".join(out)
+
+def geometry_digest(canonical):
+    return hashlib.blake2b(canonical, digest_size=DIGEST_SIZE).digest()
+
+def _envelope_points(buf, offset, endian, n, dims, box):
+    """ขยายกรอบ box = [xmin, ymin, xmax, ymax] ด้วยจุด n จุด (ข้ามค่า NaN ของ POINT EMPTY) คืน offset ถัดไป"""
+    values = struct.unpack_from(f"{endian}{n * dims}d", buf, offset)
+    xs = [x for x in values[0::dims] if x == x]
+    ys = [y for y in values[1::dims] if y == y]
+    if xs and ys:
+        box[0], box[1] = min(box[0], min(xs)), min(box[1], min(ys))
+        box[2], box[3] = max(box[2], max(xs)), max(box[3], max(ys))
+    return offset + n * dims * 8
+
+def _read_envelope(buf, offset, box):
+    """อ่าน geometry จาก WKB ขยายกรอบ box ด้วยจุดยอดทุกจุด คืน offset ถัดไป"""
+    endian, base, has_z, has_m, offset = _read_header(buf, offset)
+    dims = 2 + has_z + has_m
+    if base == _POINT:
+        offset = _envelope_points(buf, offset, endian, 1, dims, box)
+    elif base == _LINESTRING:
+        (n,) = struct.unpack_from(endian + "I", buf, offset)
+        offset = _envelope_points(buf, offset + 4, endian, n, dims, box)
+    elif base == _POLYGON:
+        (n_rings,) = struct.unpack_from(endian + "I", buf, offset)
+        offset += 4
+        for _ in range(n_rings):
+            (n,) = struct.unpack_from(endian + "I", buf, offset)
+            offset = _envelope_points(buf, offset + 4, endian, n, dims, box)
+    elif base in (_MULTIPOINT, _MULTILINESTRING, _MULTIPOLYGON, _COLLECTION):
+        (n_parts,) = struct.unpack_from(endian + "I", buf, offset)
+        offset += 4
+        for _ in range(n_parts):
+            offset = _read_envelope(buf, offset, box)
+    else:
+        raise ValueError(f"ไม่รองรับ WKB geometry type {base}")
+    return offset
+
+def envelope_cell(wkb, size):
+    """
+    เลขช่อง grid (ขนาด size) ของจุดกึ่งกลางกรอบของ geometry คืน (ช่อง x, ช่อง y)
+    หรือ None ถ้าไม่มีจุดยอด / อ่าน WKB ไม่ได้
+    """
+    box = [math.inf, math.inf, -math.inf, -math.inf]
+    try:
+        _read_envelope(bytes(wkb), 0, box)
+    except (struct.error, ValueError, IndexError):
+        return None
+    if not box[0] <= box[2] < math.inf:  # ไม่มีจุดยอด หรือพิกัดเป็นอนันต์
+        return None
+    return math.floor((box[0] + box[2]) / 2 / size), math.floor((box[1] + box[3]) / 2 / size)
+
+
+def _ring_area(points):
+    """พื้นที่ของ ring แบบ shoelace (ไม่สนทิศ)"""
+    total = 0.0
+    for (x0, y0, *_), (x1, y1, *_) in zip(points, points[1:] + points[:1]):
+        total += x0 * y1 - x1 * y0
+    return abs(total) / 2
+
+def _path_length(points):
+    return sum(math.hypot(x1 - x0, y1 - y0) for (x0, y0, *_), (x1, y1, *_) in zip(points, points[1:]))
+
+def _measure_geometry(buf, offset, measures):
+    """อ่าน geometry จาก WKB เพิ่มจุดยอด (x, y), พื้นที่ และความยาวเส้นรอบรูป/เส้น ลงใน measures คืน offset ถัดไป"""
+    endian, base, has_z, has_m, offset = _read_header(buf, offset)
+    if base == _POINT:
+        points, offset = _read_points(buf, offset, endian, 1, has_z, has_m)
+        measures["points"].extend(p[:2] for p in points if p[0] == p[0])
+    elif base == _LINESTRING:
+        (n,) = struct.unpack_from(endian + "I", buf, offset)
+        points, offset = _read_points(buf, offset + 4, endian, n, has_z, has_m)
+        measures["points"].extend(p[:2] for p in points)
+        measures["length"] += _path_length(points)
+    elif base == _POLYGON:
+        (n_rings,) = struct.unpack_from(endian + "I", buf, offset)
+        offset += 4
+        for ring in range(n_rings):
+            (n,) = struct.unpack_from(endian + "I", buf, offset)
+            points, offset = _read_points(buf, offset + 4, endian, n, has_z, has_m)
+            measures["points"].extend(p[:2] for p in points)
+            measures["area"] += _ring_area(points) * (1 if ring == 0 else -1)  # ring แรก = ขอบนอก ที่เหลือ = รู
+            measures["length"] += _path_length(points)
+    elif base in (_MULTIPOINT, _MULTILINESTRING, _MULTIPOLYGON, _COLLECTION):
+        (n_parts,) = struct.unpack_from(endian + "I", buf, offset)
+        offset += 4
+        for _ in range(n_parts):
+            offset = _measure_geometry(buf, offset, measures)
+    else:
+        raise ValueError(f"ไม่รองรับ WKB geometry type {base}")
+    return offset
+
+def _directed_hausdorff(a, b):
+    """ระยะไกลสุดจากจุดใน a ไปยังจุดที่ใกล้ที่สุดใน b (numpy array N x 2) คำนวณทีละช่วงคุมหน่วยความจำ"""
+    worst = 0.0
+    chunk = max(1, 1000000 // len(b))
+    for start in range(0, len(a), chunk):
+        diff = a[start:start + chunk, None, :] - b[None, :, :]
+        worst = max(worst, float((diff * diff).sum(axis=2).min(axis=1).max()))
+    return math.sqrt(worst)
+
+def near_equal(wkb_a, wkb_b, tolerance):
+    """
+    ยืนยันว่า 2 รูปเกือบซ้ำกัน (ใช้กับคู่ผู้สมัครที่จุดกึ่งกลางกรอบอยู่ช่องติดกัน)
+    - พื้นที่ต่างกันไม่เกิน tolerance x เส้นรอบรูป (จุดยอดขยับไม่เกิน tolerance พื้นที่เปลี่ยนได้ไม่เกินนี้)
+    - Hausdorff distance ของจุดยอดทั้งสองทาง <= tolerance
+    """
+    import numpy as np
+    try:
+        a = {"points": [], "area": 0.0, "length": 0.0}
+        b = {"points": [], "area": 0.0, "length": 0.0}
+        _measure_geometry(bytes(wkb_a), 0, a)
+        _measure_geometry(bytes(wkb_b), 0, b)
+    except (struct.error, ValueError, IndexError):
+        return bytes(wkb_a) == bytes(wkb_b)
+    if not a["points"] or not b["points"]:
+        return False
+    if abs(a["area"] - b["area"]) > tolerance * max(a["length"], b["length"]):
+        return False
+    pa, pb = np.array(a["points"], dtype=np.float64), np.array(b["points"], dtype=np.float64)
+    return _directed_hausdorff(pa, pb) <= tolerance and _directed_hausdorff(pb, pa) <= tolerance
+
+def near_duplicate_groups(wkbs, tolerance):
+    """
+    กลุ่ม OID ที่เกือบซ้ำกันจาก {OID: WKB} (เฉพาะฟีเจอร์ผู้สมัคร)
+    จัดฟีเจอร์ลงช่องตาม envelope_cell แล้วยืนยันด้วย near_equal เฉพาะคู่ที่อยู่ใน 3 x 3 ช่องรอบกัน
+    คู่ที่ยืนยันแล้วรวมกลุ่มแบบ union-find (A ~ B และ B ~ C -> กลุ่มเดียวกัน)
+    """
+    parent = {oid: oid for oid in wkbs}
+
+    def find(oid):
+        while parent[oid] != oid:
+            parent[oid] = parent[parent[oid]]
+            oid = parent[oid]
+        return oid
+
+    size = tolerance * CELL_FACTOR
+    cells = defaultdict(list)
+    for oid in sorted(wkbs):
+        cell = envelope_cell(wkbs[oid], size)
+        if cell is not None:
+            cells[cell].append(oid)
+    for (cx, cy), oids in cells.items():
+        for a in oids:
+            for dx, dy in _NEIGHBOURS:
+                for b in cells.get((cx + dx, cy + dy), ()):
+                    if b > a and find(a) != find(b) and near_equal(wkbs[a], wkbs[b], tolerance):
+                        parent[find(b)] = find(a)
+
+    groups = defaultdict(list)
+    for oid in wkbs:
+        groups[find(oid)].append(oid)
+    return sorted(sorted(group) for group in groups.values() if len(group) > 1)
+
+def _crowded_cells(cells_x, cells_y):
+    """
+    mask ของฟีเจอร์ที่มีฟีเจอร์อื่นอยู่ในช่องเดียวกันหรือ 8 ช่องรอบ (numpy array ของเลขช่อง x, y)
+    รวมเลขช่องเป็น key 64 บิตเดียว (key ชนกันโดยบังเอิญแค่ทำให้มีผู้สมัครเกิน ไม่ทำให้ตกหล่น)
+    """
+    import numpy as np
+
+    def key(x, y):
+        return (x.astype(np.uint64) << np.uint64(32)) ^ (y.astype(np.uint64) & np.uint64(0xFFFFFFFF))
+
+    keys, counts = np.unique(key(cells_x, cells_y), return_counts=True)
+    around = np.zeros(len(cells_x), dtype=np.int64)
+    for dx, dy in _NEIGHBOURS:
+        shifted = key(cells_x + dx, cells_y + dy)
+        index = np.minimum(np.searchsorted(keys, shifted), len(keys) - 1)
+        around += np.where(keys[index] == shifted, counts[index], 0)
+    return around > 1  # นับตัวเองด้วย 1
+
+
+class GeometryHasher:
+    """
+    รอบแรกของการหาโพลีกอนทับสนิทแบบ streaming: รับ (OID, WKB) ทีละแถวหรือทีละ batch
+    ใช้อ่าน geometry ไปพร้อมกับการตรวจข้อมูล (cursor เดียว) ไม่ต้องอ่าน layer ซ้ำอีกรอบ
+    complete = True เมื่ออ่านครบทั้ง layer แล้ว (ตั้งโดยผู้อ่าน) จึงใช้ groups() ได้
+    fields / feed() / add_batch() / complete ใช้แบบเดียวกับตัวเก็บ key ของ gdb_refs
+    tolerance : ระยะคลาดเคลื่อนของโหมดเกือบซ้ำ (None / 0 = ต้องตรงกันทุกจุด)
+                โหมดเกือบซ้ำเก็บเลขช่อง grid ของจุดกึ่งกลางกรอบ (envelope_cell) แทน digest
+    """
+    fields = ("OID@", "SHAPE@WKB")
+
+    def __init__(self, tolerance=None):
+        self.tolerance = tolerance or None
+        self.cell_size = self.tolerance * CELL_FACTOR if self.tolerance else None
+        self.oids, self.high, self.low = array("q"), array("Q"), array("Q")
+        self.cells_x, self.cells_y = array("q"), array("q")
+        self.rows = 0
+        self.complete = False
+
+    def add(self, oid, wkb):
+        self.rows += 1
+        if not wkb:
+            return
+        if self.cell_size is not None:
+            cell = envelope_cell(wkb, self.cell_size)
+            if cell is not None:
+                self.oids.append(oid)
+                self.cells_x.append(cell[0])
+                self.cells_y.append(cell[1])
+            return
+        h, l = _DIGEST.unpack(geometry_digest(canonical_geometry(wkb)))
+        self.oids.append(oid)
+        self.high.append(h)
+        self.low.append(l)
+
+    def add_batch(self, batch):
+        """batch : dict {"OID@": [...], "SHAPE@WKB": [...]} (เช่นจาก read_columns(on_batch=...))"""
+        for oid, wkb in zip(batch["OID@"], batch["SHAPE@WKB"]):
+            self.add(oid, wkb)
+
+    def feed(self, rows, positions):
+        """ส่งแถวต่อไปตามเดิม (generator) พร้อมเก็บ digest; positions = ตำแหน่งของ fields ในแถว"""
+        add = self.add
+        oid_index, wkb_index = positions
+        for row in rows:
+            add(row[oid_index], row[wkb_index])
+            yield row
+
+    def candidates(self):
+        """OID ที่ digest ชนกับฟีเจอร์อื่น / โหมดเกือบซ้ำ: มีฟีเจอร์อื่นใน 3 x 3 ช่องรอบตัว (คืน set และคืนหน่วยความจำของ array)"""
+        oids, high, low = self.oids, self.high, self.low
+        cells_x, cells_y = self.cells_x, self.cells_y
+        self.oids, self.high, self.low = array("q"), array("Q"), array("Q")
+        self.cells_x, self.cells_y = array("q"), array("q")
+        if len(oids) < 2:
+            return set()
+        import numpy as np
+        oid_a = np.frombuffer(oids, dtype=np.int64)
+        if self.cell_size is not None:
+            return set(oid_a[_crowded_cells(np.frombuffer(cells_x, dtype=np.int64),
+                                            np.frombuffer(cells_y, dtype=np.int64))].tolist())
+        high_a = np.frombuffer(high, dtype=np.uint64)
+        low_a = np.frombuffer(low, dtype=np.uint64)
+        order = np.lexsort((low_a, high_a))
+        same = (high_a[order][1:] == high_a[order][:-1]) & (low_a[order][1:] == low_a[order][:-1])
+        in_group = np.zeros(len(order), dtype=bool)
+        in_group[1:] |= same
+        in_group[:-1] |= same
+        return set(oid_a[order[in_group]].tolist())
+
+    def groups(self, open_cursor, fc_path, stats=None):
+        """
+        รอบที่ 2: ยืนยันด้วยการเทียบไบต์ (โหมดเกือบซ้ำ: near_duplicate_groups) อ่านเฉพาะฟีเจอร์ผู้สมัครจาก candidates()
+        (open_cursor ต้องรับ oids=... ได้ เช่น validate_gdb.open_cursor) คืนค่าแบบ find_identical_groups
+        """
+        candidates = self.candidates()
+        if stats is not None:
+            stats["rows"] = self.rows
+            stats["candidates"] = len(candidates)
+        if not candidates:
+            return []
+        if self.tolerance:
+            wkbs = {}
+            with open_cursor(fc_path, ["OID@", "SHAPE@WKB"], oids=candidates) as cur:
+                for oid, wkb in cur:
+                    if oid in candidates and wkb:
+                        wkbs[oid] = bytes(wkb)
+            return near_duplicate_groups(wkbs, self.tolerance)
+        exact = defaultdict(list)
+        with open_cursor(fc_path, ["OID@", "SHAPE@WKB"], oids=candidates) as cur:
+            for oid, wkb in cur:
+                if oid in candidates and wkb:
+                    exact[canonical_geometry(wkb)].append(oid)
+        return sorted(sorted(group) for group in exact.values() if len(group) > 1)
+
+
+def find_identical_groups(open_cursor, fc_path, stats=None, tolerance=None):
+    """
+    หากลุ่ม OID ที่ geometry เหมือนกันทุกประการ (ไม่นับ geometry ว่าง)
+    หรือเกือบซ้ำภายในระยะ tolerance ถ้าระบุ
+
+    Parameters
+    ----------
+    open_cursor : callable
+        open_cursor(fc_path, fields, oids=None) แบบเดียวกับ validate_gdb.open_cursor (รองรับ "OID@", "SHAPE@WKB")
+    fc_path : str
+        Full path ของ feature class
+    stats : dict | None
+        ถ้าส่งมา จะใส่ rows (จำนวนฟีเจอร์ที่อ่านรอบแรก) และ candidates (จำนวนฟีเจอร์ที่ต้องยืนยันรอบสอง)
+    tolerance : float | None
+        ระยะคลาดเคลื่อน (หน่วยพิกัด) ที่ยังถือว่าซ้ำ None / 0 = ต้องตรงกันทุกจุด
+
+    Returns
+    -------
+    list of list
+        กลุ่ม OID ที่ซ้ำกัน (แต่ละกลุ่มเรียง OID, เรียงกลุ่มตาม OID แรก)
+    """
+    # รอบที่ 1: digest ของทุกฟีเจอร์ เก็บใน array แบบ compact
+    hasher = GeometryHasher(tolerance)
+    with open_cursor(fc_path, ["OID@", "SHAPE@WKB"]) as cur:
+        for oid, wkb in cur:
+            hasher.add(oid, wkb)
+    hasher.complete = True
+    return hasher.groups(open_cursor, fc_path, stats)
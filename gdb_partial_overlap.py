@@ -0,0 +1,249 @@
+# =============================================================================
+# - ตรวจโพลีกอนที่ทับกันบางส่วน (partial overlap / sliver) เช่น แปลงข้างเคียงที่ขอบเกยกัน
+#   นับเป็น error เมื่อพื้นที่ส่วนที่ทับกันมากกว่า min_area (คู่ที่แค่ขอบชนกันไม่นับ)
+#   คู่ที่ทับสนิท (รายงานแล้วใน Duplicated Polygon ของ gdb_overlap.py) ไม่นับซ้ำ
+# - รอบแรก EnvelopeCollector เก็บแค่ OID + กรอบสี่เหลี่ยม (envelope) ของทุกฟีเจอร์ใน array
+#   รับ WKB ไปพร้อมกับ cursor ของการตรวจข้อมูล (แบบเดียวกับ GeometryHasher) ไม่ต้องอ่าน layer ซ้ำ
+# - แบ่งฟีเจอร์เป็น tile แบบ STR (Sort-Tile-Recursive) ตามจุดกลางของ envelope: เรียงแกน X แบ่งเป็นแถบ
+#   แล้วเรียงแกน Y ในแต่ละแถบ tile ละไม่เกิน tile_features ฟีเจอร์ ("เจ้าของ" tile)
+#   + ฟีเจอร์ของ tile อื่นที่ envelope เกยเข้ามาในกรอบของ tile
+# - ทีละ tile: อ่าน geometry เฉพาะ OID ของ tile สร้าง STRtree (shapely) หาคู่ที่ intersects
+#   แล้วคำนวณพื้นที่ทับเฉพาะคู่ที่ภายในทับกันจริง แต่ละคู่นับใน tile ที่เป็นเจ้าของฟีเจอร์ OID น้อยกว่าเท่านั้น
+#   หน่วยความจำต่อรอบ = geometry ของ 1 tile ไม่ขึ้นกับขนาด layer
+# - ต้องมี numpy และ shapely 2.x (import เมื่อใช้)
+# =============================================================================
+
+import math
+import importlib.util
+import importlib.metadata
+from array import array
+from gdb_overlap import canonical_geometry
+
+DEFAULT_TILE_FEATURES = 50000  # จำนวนฟีเจอร์เจ้าของต่อ tile
+ENVELOPE_BATCH = 10000  # จำนวน WKB ที่แปลงเป็น envelope ต่อครั้ง
+
+
+def partial_overlap_available():
+    """True ถ้ามี numpy และ shapely 2.x (ไม่ import)"""
+    if importlib.util.find_spec("numpy") is None or importlib.util.find_spec("shapely") is None:
+        return False
+    try:
+        return int(importlib.metadata.version("shapely").split(".")[0]) >= 2
+    except (importlib.metadata.PackageNotFoundError, ValueError):
+        return False
+
+
+class EnvelopeCollector:
+    """
+    รอบแรกของการหาโพลีกอนทับกันบางส่วน: รับ (OID, WKB) ทีละแถวหรือทีละ batch เก็บ envelope
+    complete = True เมื่ออ่านครบทั้ง layer แล้ว (ตั้งโดยผู้อ่าน) จึงใช้กับ find_partial_overlaps() ได้
+    fields / feed() / add_batch() / complete ใช้แบบเดียวกับ GeometryHasher
+    """
+    fields = ("OID@", "SHAPE@WKB")
+
+    def __init__(self):
+        self.oids = array("q")
+        self.bounds = array("d")  # xmin, ymin, xmax, ymax ต่อฟีเจอร์
+        self.rows = 0
+        self.complete = False
+        self._pending_oids, self._pending_wkbs = [], []
+
+    def add(self, oid, wkb):
+        self.rows += 1
+        if not wkb:
+            return
+        self._pending_oids.append(oid)
+        self._pending_wkbs.append(bytes(wkb))
+        if len(self._pending_wkbs) >= ENVELOPE_BATCH:
+            self._flush()
+
+    def _flush(self):
+        """แปลง WKB ที่ค้างอยู่เป็น envelope ทั้งชุด (geometry ว่าง / อ่านไม่ได้ถูกข้าม)"""
+        if not self._pending_wkbs:
+            return
+        import numpy as np
+        import shapely
+        bounds = shapely.bounds(shapely.from_wkb(self._pending_wkbs, on_invalid="ignore"))
+        valid = ~np.isnan(bounds).any(axis=1)
+        self.oids.frombytes(np.asarray(self._pending_oids, dtype=np.int64)[valid].tobytes())
+        self.bounds.frombytes(np.ascontiguousarray(bounds[valid], dtype=np.float64).tobytes())
+        self._pending_oids, self._pending_wkbs = [], []
+
+    def add_batch(self, batch):
+        """batch : dict {"OID@": [...], "SHAPE@WKB": [...]} (เช่นจาก read_columns(on_batch=...))"""
+        for oid, wkb in zip(batch["OID@"], batch["SHAPE@WKB"]):
+            self.add(oid, wkb)
+
+    def feed(self, rows, positions):
+        """ส่งแถวต่อไปตามเดิม (generator) พร้อมเก็บ envelope; positions = ตำแหน่งของ fields ในแถว"""
+        add = self.add
+        oid_index, wkb_index = positions
+        for row in rows:
+            add(row[oid_index], row[wkb_index])
+            yield row
+
+    def envelopes(self):
+        """คืน (numpy array ของ OID, array N x 4 ของ envelope) และคืนหน่วยความจำของ array"""
+        import numpy as np
+        self._flush()
+        oids = np.frombuffer(self.oids, dtype=np.int64).copy()
+        bounds = np.frombuffer(self.bounds, dtype=np.float64).reshape(-1, 4).copy()
+        self.oids, self.bounds = array("q"), array("d")
+        return oids, bounds
+
+
+def str_tiles(bounds, tile_features=DEFAULT_TILE_FEATURES):
+    """
+    แบ่งฟีเจอร์เป็น tile แบบ STR ตามจุดกลางของ envelope
+    คืน list ของแถบ (แกน X) แต่ละแถบเป็น list ของ tile (numpy array ของ index ฟีเจอร์เจ้าของ tile)
+    """
+    import numpy as np
+    n = len(bounds)
+    if n == 0:
+        return []
+    n_slices = max(1, math.ceil(math.sqrt(math.ceil(n / tile_features))))
+    slice_size = math.ceil(n / n_slices)
+    cx = (bounds[:, 0] + bounds[:, 2]) / 2
+    cy = (bounds[:, 1] + bounds[:, 3]) / 2
+    order = np.argsort(cx, kind="stable")
+    slices = []
+    for start in range(0, n, slice_size):
+        members = order[start:start + slice_size]
+        members = members[np.argsort(cy[members], kind="stable")]
+        slices.append([members[i:i + tile_features] for i in range(0, len(members), tile_features)])
+    return slices
+
+def _near(bounds, index, region):
+    """index (จาก index) ของฟีเจอร์ที่ envelope เกยกับกรอบ region (xmin, ymin, xmax, ymax)"""
+    b = bounds[index]
+    keep = (b[:, 0] <= region[2]) & (b[:, 2] >= region[0]) & (b[:, 1] <= region[3]) & (b[:, 3] >= region[1])
+    return index[keep]
+
+def _region(bounds, index):
+    b = bounds[index]
+    return b[:, 0].min(), b[:, 1].min(), b[:, 2].max(), b[:, 3].max()
+
+def _polygonal(geometries):
+    """ส่วนที่เป็นพื้นที่ของผล intersection (GeometryCollection ตัดเส้น / จุดที่ขอบชนกันออก)"""
+    import numpy as np
+    import shapely
+    result = np.array(geometries, dtype=object)
+    for i in np.nonzero(shapely.get_type_id(result) == 7)[0]:
+        parts = shapely.get_parts(result[i])
+        result[i] = shapely.union_all(parts[np.isin(shapely.get_type_id(parts), (3, 6))])
+    return result
+
+def _overlaps(left, right):
+    """(พื้นที่ทับ, geometry ส่วนที่ทับ) ของแต่ละคู่ geometry ที่ไม่ valid ซ่อมด้วย make_valid ก่อน"""
+    import shapely
+    try:
+        intersection = shapely.intersection(left, right)
+    except shapely.errors.GEOSException:
+        intersection = shapely.intersection(shapely.make_valid(left), shapely.make_valid(right))
+    return shapely.area(intersection), intersection
+
+def _tile_pairs(oids, wkbs, home, min_area):
+    """
+    คู่ที่ทับกันบางส่วนใน tile 1 tile
+    oids / wkbs = ฟีเจอร์ทั้งหมดของ tile, home = True ถ้าเป็นเจ้าของ tile
+    คืน list ของ (OID น้อย, OID มาก, พื้นที่ทับ, WKB ส่วนที่ทับ) เรียงตาม OID
+    """
+    import numpy as np
+    import shapely
+
+    geoms = shapely.from_wkb(wkbs, on_invalid="ignore")
+    geoms[shapely.is_empty(geoms)] = None
+    tree = shapely.STRtree(geoms)
+    home_index = np.nonzero(home & ~shapely.is_missing(geoms))[0]
+    try:
+        left, right = tree.query(geoms[home_index], predicate="intersects")
+    except shapely.errors.GEOSException:
+        left, right = tree.query(shapely.make_valid(geoms[home_index]), predicate="intersects")
+    left = home_index[left]
+    keep = oids[left] < oids[right]  # คู่เดียวกันนับครั้งเดียว (ฝั่ง OID น้อยต้องเป็นเจ้าของ tile)
+    left, right = left[keep], right[keep]
+    if not len(left):
+        return []
+
+    # ภายในทับกัน (ไม่ใช่แค่ขอบชน) แล้วจึงคำนวณพื้นที่
+    try:
+        interior = shapely.relate_pattern(geoms[left], geoms[right], "T********")
+    except shapely.errors.GEOSException:
+        interior = np.ones(len(left), dtype=bool)
+    left, right = left[interior], right[interior]
+    area, intersection = _overlaps(geoms[left], geoms[right])
+    keep = area > min_area
+    left, right, area, intersection = left[keep], right[keep], area[keep], intersection[keep]
+
+    # คู่ที่ทับสนิท (พื้นที่ทับ = พื้นที่ทั้งสองรูป และ geometry เหมือนกันทุกจุด) ไม่นับ
+    same = np.isclose(area, shapely.area(geoms[left])) & np.isclose(area, shapely.area(geoms[right]))
+    for i in np.nonzero(same)[0]:
+        same[i] = canonical_geometry(wkbs[left[i]]) == canonical_geometry(wkbs[right[i]])
+    keep = ~same
+    left, right, area, intersection = left[keep], right[keep], area[keep], intersection[keep]
+
+    out = shapely.to_wkb(_polygonal(intersection))
+    pairs = [(int(oids[a]), int(oids[b]), float(s), g) for a, b, s, g in zip(left, right, area, out)]
+    pairs.sort(key=lambda pair: pair[:2])
+    return pairs
+
+
+def find_partial_overlaps(open_cursor, fc_path, collector=None, min_area=0.0,
+                          tile_features=DEFAULT_TILE_FEATURES, stats=None):
+    """
+    หาคู่โพลีกอนที่ทับกันบางส่วน ทีละ tile (generator คืน list ของคู่ทีละ tile)
+
+    Parameters
+    ----------
+    open_cursor : callable
+        open_cursor(fc_path, fields, oids=None) แบบเดียวกับ validate_gdb.open_cursor (รองรับ "OID@", "SHAPE@WKB")
+    fc_path : str
+        Full path ของ feature class
+    collector : EnvelopeCollector | None
+        envelope ที่เก็บไว้แล้วระหว่างตรวจข้อมูล (complete) ไม่ต้องอ่าน geometry ทั้ง layer อีกรอบ
+    min_area : float
+        พื้นที่ทับขั้นต่ำ (หน่วยพิกัดยกกำลังสอง) คู่ที่ทับน้อยกว่าหรือเท่ากับนี้ไม่นับ
+    tile_features : int
+        จำนวนฟีเจอร์เจ้าของต่อ tile
+    stats : dict | None
+        ถ้าส่งมา จะใส่ rows (จำนวนฟีเจอร์) tiles (จำนวน tile) และ read (จำนวนฟีเจอร์ที่อ่านรวมทุก tile)
+
+    Yields
+    ------
+    list of tuple
+        (OID น้อย, OID มาก, พื้นที่ทับ, WKB ส่วนที่ทับ) ของ tile นั้น
+    """
+    import numpy as np
+
+    if collector is None or not collector.complete:
+        collector = EnvelopeCollector()
+        with open_cursor(fc_path, ["OID@", "SHAPE@WKB"]) as cur:
+            for oid, wkb in cur:
+                collector.add(oid, wkb)
+        collector.complete = True
+    rows = collector.rows
+    oids, bounds = collector.envelopes()
+    slices = str_tiles(bounds, tile_features)
+    if stats is not None:
+        stats.update(rows=rows, tiles=sum(len(tiles) for tiles in slices), read=0)
+
+    all_index = np.arange(len(oids))
+    for tiles in slices:
+        near_slice = _near(bounds, all_index, _region(bounds, np.concatenate(tiles)))
+        for tile in tiles:
+            members = _near(bounds, near_slice, _region(bounds, tile))
+            if len(members) < 2:
+                continue
+            home_oids = set(oids[tile].tolist())
+            tile_oids, wkbs = [], []
+            with open_cursor(fc_path, ["OID@", "SHAPE@WKB"], oids=set(oids[members].tolist())) as cur:
+                for oid, wkb in cur:
+                    if wkb:
+                        tile_oids.append(oid)
+                        wkbs.append(bytes(wkb))
+            if stats is not None:
+                stats["read"] += len(tile_oids)
+            home = np.fromiter((oid in home_oids for oid in tile_oids), dtype=bool, count=len(tile_oids))
+            pairs = _tile_pairs(np.asarray(tile_oids, dtype=np.int64), wkbs, home, min_area)
+            if pairs:
+                yield pairs
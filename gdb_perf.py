@@ -0,0 +1,116 @@
+# =============================================================================
+# - วัดเวลา/ปริมาณงานของการตรวจ (wall time, CPU time, จำนวนแถว, แถว/วินาที, จำนวน error)
+#   และหน่วยความจำสูงสุดระหว่างวัด (RSS / tracemalloc จาก gdb_memory ถ้าเริ่ม monitor ไว้)
+#   ระดับ: gdb / featureclass / phase (ขั้นตอนของ validator) / rule (กฎแต่ละข้อ)
+# - process_gdb เริ่มบันทึกด้วย start_recording(gdb) แล้วเก็บผลด้วย stop_recording()
+#   ระหว่างนั้นฟังก์ชันตรวจเรียก measure(...) / add_record(...) ได้เลยโดยไม่ต้องส่ง recorder ต่อกันไป
+#   (ไม่ได้เริ่มบันทึก = measure() ไม่ทำอะไร)
+# - ผลรวมทุก GDB เขียนเป็น Sheet 'Perf' ใน Summary_Report.xlsx และไฟล์ JSON ข้างกัน
+# =============================================================================
+
+import json
+import time
+from contextlib import contextmanager
+from gdb_memory import open_window, close_window
+
+PERF_HEADERS = ['GDB_Path', 'Featureclass', 'Level', 'Phase', 'Rule', 'Wall_s', 'CPU_s', 'Rows', 'Rows_per_s', 'Errors',
+                'Peak_RSS_MB', 'Peak_Py_MB']
+
+_recorder = None  # recorder ของ GDB ที่กำลังตรวจใน process นี้
+
+
+class PerfRecorder:
+    """
+    เก็บผลการวัดของ GDB 1 ก้อน (list ของ dict ตาม PERF_HEADERS)
+    """
+
+    def __init__(self, gdb):
+        self.gdb = gdb
+        self.records = []
+
+    def add(self, level, featureclass="", phase="", rule="", wall=None, cpu=None, rows=None, errors=None, slot=None,
+            memory=None):
+        """เพิ่มผลการวัด (slot = ตำแหน่งที่จองไว้ด้วย reserve(), memory = MemoryWindow ของช่วงที่วัด)"""
+        record = {
+            "GDB_Path": self.gdb,
+            "Featureclass": featureclass,
+            "Level": level,
+            "Phase": phase,
+            "Rule": rule,
+            "Wall_s": None if wall is None else round(wall, 6),
+            "CPU_s": None if cpu is None else round(cpu, 6),
+            "Rows": rows,
+            "Rows_per_s": round(rows / wall, 1) if rows and wall else None,
+            "Errors": errors,
+            "Peak_RSS_MB": memory.peak_rss_mb if memory is not None else None,
+            "Peak_Py_MB": memory.peak_py_mb if memory is not None else None,
+        }
+        if slot is None:
+            self.records.append(record)
+        else:
+            self.records[slot] = record
+
+    def reserve(self):
+        """จองตำแหน่งไว้ก่อน ผลของระดับนอก (เช่น featureclass) จะอยู่ก่อนขั้นตอนย่อยข้างใน"""
+        self.records.append(None)
+        return len(self.records) - 1
+
+
+class PerfTimer:
+    """ค่าที่ measure() ให้มา ตั้ง .rows / .errors ระหว่างวัดได้"""
+    __slots__ = ("rows", "errors")
+
+    def __init__(self):
+        self.rows = None
+        self.errors = None
+
+
+def start_recording(gdb):
+    global _recorder
+    _recorder = PerfRecorder(gdb)
+    return _recorder
+
+def stop_recording():
+    """หยุดบันทึก คืน list ของผลการวัด"""
+    global _recorder
+    recorder, _recorder = _recorder, None
+    return recorder.records if recorder is not None else []
+
+def is_recording():
+    return _recorder is not None
+
+def add_record(level, featureclass="", phase="", rule="", wall=None, cpu=None, rows=None, errors=None):
+    if _recorder is not None:
+        _recorder.add(level, featureclass, phase, rule, wall, cpu, rows, errors)
+
+@contextmanager
+def measure(level, featureclass="", phase="", rule="", error_list=None):
+    """
+    วัด wall/CPU time (และหน่วยความจำสูงสุด) ของโค้ดใน with
+    error_list : ถ้าส่งมา จะนับ error ที่เพิ่มขึ้นระหว่างวัด (len ก่อน/หลัง)
+    """
+    timer = PerfTimer()
+    if _recorder is None:
+        yield timer
+        return
+    recorder = _recorder
+    slot = recorder.reserve()
+    errors_before = len(error_list) if error_list is not None else None
+    window = open_window()
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    try:
+        yield timer
+    finally:
+        wall = time.perf_counter() - wall_start
+        cpu = time.process_time() - cpu_start
+        errors = timer.errors
+        if errors is None and errors_before is not None:
+            errors = len(error_list) - errors_before
+        recorder.add(level, featureclass, phase, rule, wall, cpu, timer.rows, errors, slot, close_window(window))
+
+
+def write_perf_json(path, run_timestamp, records):
+    """เขียนผลการวัดทั้งรอบเป็น JSON (ใช้เทียบจุดที่ช้าข้ามรอบ)"""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"run_timestamp": run_timestamp, "headers": PERF_HEADERS, "records": records},
+                  f, ensure_ascii=False, indent=1)
@@ -0,0 +1,276 @@
+# =============================================================================
+# - คิวงานบน shared filesystem สำหรับตรวจ GDB หลายเครื่องพร้อมกัน (validate_gdb.py --coordinate / --work)
+#   ไม่ต้องมี server กลาง ทุกเครื่องเห็นโฟลเดอร์คิวเดียวกัน (เช่น share บน SMB) และ path ของ GDB เหมือนกัน
+# - โครงสร้าง: queue_dir/run.json = รอบที่กำลังรัน (run_id, run_timestamp, ... , closed)
+#              queue_dir/<run_id>/tasks/<task>.json   = งาน 1 ชิ้น (รายชื่อ GDB)
+#              queue_dir/<run_id>/leases/<task>.json  = เครื่องที่รับงานไป + เวลาหมดอายุ (heartbeat ต่ออายุ)
+#              queue_dir/<run_id>/results/<task>.json = ผลตรวจของงาน (มีไฟล์นี้ = งานเสร็จ)
+#              queue_dir/<run_id>/attempts/<task>.json = จำนวนครั้งที่งานถูกรับไป (ไม่หายเมื่อคืนงาน)
+# - รับงาน (lease) = สร้างไฟล์ lease แบบ O_EXCL (สำเร็จได้เครื่องเดียว)
+#   lease ที่หมดอายุ (เครื่องดับ / ค้าง) ถูกเครื่องอื่นยึดต่อ: rename ไฟล์ออกแล้วอ่านไฟล์ที่ rename มาเทียบกับที่อ่านไว้
+#   ถ้าไม่ใช่ lease เดิม (อีกเครื่องยึดและสร้าง lease ใหม่ไปก่อน ไฟล์ที่ rename มาคือ lease ใหม่นั้น) คืนไฟล์กลับแล้วข้าม
+#   งานที่ถูกรับไปครบ max_attempts ครั้งแล้วยังไม่เสร็จ (เครื่องล้ม / ตรวจล้มเหลวแล้วคืนงาน) ถือว่าล้มเหลว (ไม่วนตรวจไม่จบ)
+# - เขียนไฟล์ทุกไฟล์แบบไฟล์ชั่วคราวแล้ว os.replace คนอ่านไม่เห็นไฟล์ที่เขียนไม่ครบ
+# - เวลาหมดอายุเป็นเวลาจริง (time.time) นาฬิกาของทุกเครื่องต้องตรงกัน (NTP) ต่างกันได้ไม่เกินช่วงต่ออายุ
+# =============================================================================
+
+import os
+import json
+import time
+import uuid
+import shutil
+import threading
+
+QUEUE_VERSION = 2
+
+
+def _write_json(path, data):
+    tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp, path)
+
+def _read_json(path):
+    """อ่านไฟล์ JSON คืน None ถ้าไม่มีไฟล์หรืออ่านไม่ได้ (เช่น กำลังถูกสร้าง)"""
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+class WorkQueue:
+    """
+    คิวงานของรอบที่กำลังรัน (สร้างด้วย create, เปิดด้วย open)
+
+    Attributes
+    ----------
+    header : dict
+        ข้อมูลของรอบใน run.json (run_id, run_timestamp, gdb_report_dir, gdb_paths, signature, closed)
+    """
+
+    def __init__(self, queue_dir, header):
+        self.queue_dir = queue_dir
+        self.header = header
+        self.run_dir = os.path.join(queue_dir, header["run_id"])
+        self.tasks_dir = os.path.join(self.run_dir, "tasks")
+        self.leases_dir = os.path.join(self.run_dir, "leases")
+        self.results_dir = os.path.join(self.run_dir, "results")
+        self.attempts_dir = os.path.join(self.run_dir, "attempts")
+
+    @property
+    def run_id(self):
+        return self.header["run_id"]
+
+    @property
+    def closed(self):
+        return bool(self.header.get("closed"))
+
+    @classmethod
+    def create(cls, queue_dir, header, tasks):
+        """
+        สร้างรอบใหม่ (ลบรอบเก่าในโฟลเดอร์คิว) tasks = list ของ list GDB เรียงตามลำดับที่ควรรับไปตรวจ
+        เขียน run.json เป็นไฟล์สุดท้าย worker จึงเห็นรอบเมื่อมีงานครบแล้ว
+        """
+        header = dict(header, version=QUEUE_VERSION, run_id=uuid.uuid4().hex, closed=False)
+        os.makedirs(queue_dir, exist_ok=True)
+        for name in os.listdir(queue_dir):
+            path = os.path.join(queue_dir, name)
+            if os.path.isdir(path):
+                shutil.rmtree(path, ignore_errors=True)
+        queue = cls(queue_dir, header)
+        for folder in (queue.tasks_dir, queue.leases_dir, queue.results_dir, queue.attempts_dir):
+            os.makedirs(folder)
+        for i, gdbs in enumerate(tasks):
+            _write_json(os.path.join(queue.tasks_dir, f"{i:05d}.json"), {"gdbs": list(gdbs)})
+        _write_json(os.path.join(queue_dir, "run.json"), header)
+        return queue
+
+    @classmethod
+    def open(cls, queue_dir):
+        """เปิดรอบล่าสุดในโฟลเดอร์คิว คืน None ถ้ายังไม่มี"""
+        header = _read_json(os.path.join(queue_dir, "run.json"))
+        if header is None or header.get("version") != QUEUE_VERSION:
+            return None
+        return cls(queue_dir, header)
+
+    def refresh(self):
+        """อ่าน run.json ใหม่ (เช่น ดูว่า coordinator ปิดรอบแล้วหรือยัง) คืน False ถ้ารอบนี้ถูกแทนที่แล้ว"""
+        header = _read_json(os.path.join(self.queue_dir, "run.json"))
+        if header is None or header.get("run_id") != self.run_id:
+            return False
+        self.header = header
+        return True
+
+    def close(self):
+        """ปิดรอบ (worker ที่ยังรออยู่จะเลิก)"""
+        self.header["closed"] = True
+        _write_json(os.path.join(self.queue_dir, "run.json"), self.header)
+
+    def task_ids(self):
+        return sorted(name[:-5] for name in os.listdir(self.tasks_dir) if name.endswith(".json"))
+
+    def task(self, task_id):
+        return _read_json(os.path.join(self.tasks_dir, f"{task_id}.json"))
+
+    def add_task(self, task_id, gdbs, results=None):
+        """เพิ่มงาน (results ไม่ใช่ None = งานที่เสร็จแล้ว เช่น ผลจาก cache)"""
+        _write_json(os.path.join(self.tasks_dir, f"{task_id}.json"), {"gdbs": list(gdbs)})
+        if results is not None:
+            self.complete(task_id, None, results)
+
+    def _lease_path(self, task_id):
+        return os.path.join(self.leases_dir, f"{task_id}.json")
+
+    def _result_path(self, task_id):
+        return os.path.join(self.results_dir, f"{task_id}.json")
+
+    def is_done(self, task_id):
+        return os.path.exists(self._result_path(task_id))
+
+    def attempts(self, task_id):
+        """จำนวนครั้งที่งานถูกรับไปแล้ว (นับรวมครั้งที่คืนงานและครั้งที่ lease หมดอายุ)"""
+        data = _read_json(os.path.join(self.attempts_dir, f"{task_id}.json"))
+        return data["attempts"] if data else 0
+
+    def _try_lease(self, task_id, worker, lease_seconds, max_attempts):
+        """สร้าง lease แบบ O_EXCL คืน attempt (ครั้งที่รับงานนี้) หรือ None ถ้ามีเครื่องอื่นถือ lease อยู่"""
+        try:
+            fd = os.open(self._lease_path(task_id), os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            return None
+        attempt = self.attempts(task_id) + 1  # ถือ lease อยู่เครื่องเดียว จึงนับต่อได้ไม่ชนกัน
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"worker": worker, "expires": time.time() + lease_seconds, "attempt": attempt}, f)
+        _write_json(os.path.join(self.attempts_dir, f"{task_id}.json"), {"attempts": attempt})
+        if attempt > max_attempts:
+            print(f"  !! งาน {task_id} ถูกรับไปแล้ว {attempt - 1} ครั้งแต่ไม่เสร็จ ถือว่าล้มเหลว")
+            self.complete(task_id, worker, [], failed=True)
+            return None
+        return attempt
+
+    def _take_over(self, task_id, current):
+        """
+        ยึด lease ที่หมดอายุ (current = ที่อ่านไว้) คืน True ถ้าไฟล์ที่ rename ออกมาคือ lease เดิมจริง
+        ถ้าเป็น lease ใหม่ของเครื่องอื่น (ยึดไปก่อนระหว่างที่อ่าน) คืนไฟล์กลับแล้วคืน False
+        """
+        lease_path = self._lease_path(task_id)
+        expired_path = f"{lease_path}.{uuid.uuid4().hex}.expired"
+        try:
+            os.rename(lease_path, expired_path)
+        except OSError:
+            return False
+        renamed = _read_json(expired_path)
+        keys = ("worker", "expires", "attempt")
+        if renamed is not None and all(renamed.get(k) == current.get(k) for k in keys):
+            return True
+        try:  # link ไม่ทับไฟล์ที่มีอยู่ (ถ้ามีเครื่องที่สาม สร้าง lease ใหม่ไปแล้ว lease ที่ rename มาถือว่าหลุด)
+            os.link(expired_path, lease_path)
+            os.remove(expired_path)
+        except FileExistsError:
+            pass
+        except OSError:  # filesystem ที่ไม่รองรับ hard link
+            try:
+                os.rename(expired_path, lease_path)
+            except OSError:
+                pass
+        return False
+
+    def lease(self, worker, lease_seconds, max_attempts=3):
+        """
+        รับงานชิ้นแรกที่ยังไม่เสร็จและไม่มีใครรับ (หรือ lease หมดอายุแล้ว)
+        งานที่ถูกรับไปแล้ว max_attempts ครั้งยังไม่เสร็จ ถูกบันทึกว่าล้มเหลวแทนการรับ
+        คืน (task_id, task) หรือ None ถ้าไม่มีงานให้รับตอนนี้
+        """
+        for task_id in self.task_ids():
+            if self.is_done(task_id):
+                continue
+            if self._try_lease(task_id, worker, lease_seconds, max_attempts) is not None:
+                return task_id, self.task(task_id)
+            if self.is_done(task_id):  # เพิ่งถูกบันทึกว่าล้มเหลว
+                continue
+            current = _read_json(self._lease_path(task_id))
+            if current is None or current["expires"] > time.time():
+                continue  # มีเครื่องอื่นรับอยู่ (None = กำลังสร้างไฟล์)
+            if not self._take_over(task_id, current):
+                continue
+            attempt = self._try_lease(task_id, worker, lease_seconds, max_attempts)
+            if attempt is not None:
+                print(f"  lease ของงาน {task_id} ({current['worker']}) หมดอายุ รับต่อเป็นครั้งที่ {attempt}")
+                return task_id, self.task(task_id)
+        return None
+
+    def renew(self, task_id, worker, lease_seconds):
+        """ต่ออายุ lease คืน False ถ้า lease ไม่ใช่ของ worker แล้ว (หมดอายุและถูกเครื่องอื่นยึด)"""
+        current = _read_json(self._lease_path(task_id))
+        if current is None or current["worker"] != worker:
+            return False
+        current["expires"] = time.time() + lease_seconds
+        _write_json(self._lease_path(task_id), current)
+        return True
+
+    def release(self, task_id, worker):
+        """คืนงานที่ตรวจไม่สำเร็จให้เครื่องอื่นรับได้ทันที (จำนวนครั้งที่รับงานยังนับต่อ ดู attempts)"""
+        current = _read_json(self._lease_path(task_id))
+        if current is not None and current["worker"] == worker:
+            try:
+                os.remove(self._lease_path(task_id))
+            except OSError:
+                pass
+
+    def complete(self, task_id, worker, results, failed=False):
+        """
+        บันทึกผลของงาน (ถ้า lease เคยถูกยึด อาจมีผลจาก 2 เครื่อง ผลที่เขียนทีหลังชนะ ซึ่งครบทั้งคู่)
+        """
+        _write_json(self._result_path(task_id), {"worker": worker, "failed": failed, "results": results})
+        self.release(task_id, worker)
+
+    def results(self):
+        """{task_id: {"worker", "failed", "results"}} ของงานที่เสร็จแล้ว"""
+        done = {}
+        for name in os.listdir(self.results_dir):
+            if name.endswith(".json"):
+                data = _read_json(os.path.join(self.results_dir, name))
+                if data is not None:
+                    done[name[:-5]] = data
+        return done
+
+    def progress(self):
+        """(งานที่เสร็จ, งานที่มีเครื่องรับอยู่, งานทั้งหมด)"""
+        task_ids = self.task_ids()
+        done = sum(1 for t in task_ids if self.is_done(t))
+        leased = sum(1 for t in task_ids if not self.is_done(t) and os.path.exists(self._lease_path(t)))
+        return done, leased, len(task_ids)
+
+
+class Heartbeat:
+    """ต่ออายุ lease ทุก lease_seconds / 3 วินาทีด้วย thread เบื้องหลัง ระหว่างที่ worker ตรวจงานอยู่"""
+
+    def __init__(self, queue, task_id, worker, lease_seconds):
+        self.queue = queue
+        self.task_id = task_id
+        self.worker = worker
+        self.lease_seconds = lease_seconds
+        self.lost = False
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="gdb-queue-heartbeat", daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.lease_seconds / 3):
+            try:
+                renewed = self.queue.renew(self.task_id, self.worker, self.lease_seconds)
+            except OSError as e:  # share หลุดชั่วคราว ลองใหม่รอบหน้า
+                print(f"  !! ต่ออายุ lease ของงาน {self.task_id} ไม่ได้: {e}")
+                continue
+            if not renewed and not self.lost:
+                self.lost = True
+                print(f"  !! lease ของงาน {self.task_id} ถูกเครื่องอื่นรับต่อแล้ว (ตรวจต่อให้จบ ผลที่เขียนทีหลังชนะ)")
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        return False
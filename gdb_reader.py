@@ -0,0 +1,608 @@
+# =============================================================================
+# - ตัวอ่านข้อมูลจาก GDB (row source) ที่สลับ backend ได้
+#   - "arcpy"       : arcpy.ListFields + arcpy.da.SearchCursor (ต้องรันบน ArcGIS Pro)
+#   - "openfilegdb" : อ่านโฟลเดอร์ .gdb ผ่าน GDAL OpenFileGDB driver (pyogrio)
+#                     ไม่ต้องมี arcpy รันบน Linux ได้ อ่านทีละ batch จาก layer ที่เปิดครั้งเดียว (open_arrow เมื่อมี pyarrow)
+# - validator ทุกตัวเรียกผ่าน list_fields() / open_cursor() เท่านั้น
+#   จึงใช้กฎตรวจชุดเดียวกันได้ทั้งสอง backend
+# - open_feature_writer() เขียนผลที่เป็น polygon (เช่น ส่วนที่ทับซ้อน) ออกเป็นไฟล์ใหม่ทีละแถว
+# - prefetch: thread เบื้องหลังอ่าน batch ถัดไปจาก cursor ระหว่างที่กฎตรวจ batch ก่อนหน้า (PrefetchCursor,
+#   read_columns(prefetch_depth=...)) cursor ถูกเปิด อ่าน และปิดใน thread เบื้องหลังเดียวกัน
+#   PrefetchStats แยกเวลาอ่าน (read) / เวลาที่ผู้ตรวจรอข้อมูล (wait) / เวลาตรวจ (compute)
+# =============================================================================
+
+import os
+import time
+import importlib.util
+import queue
+import threading
+from itertools import islice
+
+DEFAULT_BATCH_SIZE = 50000  # จำนวนแถวที่อ่านต่อครั้งของ backend openfilegdb
+OID_CHUNK_SIZE = 1000  # จำนวน OID ต่อครั้งเมื่ออ่านเฉพาะ OID ที่กำหนด (ความยาว where clause)
+PREFETCH_BATCH_SIZE = 5000  # จำนวนแถวต่อ batch ของ PrefetchCursor
+PREFETCH_DEPTH = 4  # จำนวน batch สูงสุดที่อ่านเก็บไว้ล่วงหน้า
+
+# ประเภทฟิลด์ของ OGR -> ชื่อประเภทแบบเดียวกับที่ arcpy.ListFields คืนมา
+# (key = (ogr_type, ogr_subtype))
+_OGR_TO_ARCPY_TYPES = {
+    ("OFTInteger", "OFSTInt16"): "SmallInteger",
+    ("OFTInteger", "OFSTBoolean"): "SmallInteger",
+    ("OFTInteger", None): "Integer",
+    ("OFTInteger64", None): "BigInteger",
+    ("OFTReal", "OFSTFloat32"): "Single",
+    ("OFTReal", None): "Double",
+    ("OFTString", "OFSTUUID"): "GUID",
+    ("OFTString", None): "String",
+    ("OFTDate", None): "DateOnly",
+    ("OFTTime", None): "TimeOnly",
+    ("OFTDateTime", None): "Date",
+    ("OFTBinary", None): "Blob",
+}
+
+
+def _arcpy_type_name(ogr_type, ogr_subtype):
+    return _OGR_TO_ARCPY_TYPES.get((ogr_type, ogr_subtype)) or _OGR_TO_ARCPY_TYPES.get((ogr_type, None), ogr_type)
+
+
+def _collect_columns(batches, fields, on_batch=None, drop=()):
+    """
+    ต่อคอลัมน์ของทุก batch เป็น dict {ชื่อฟิลด์ตัวพิมพ์ใหญ่: list ของค่า}
+    on_batch : เรียก on_batch({ชื่อฟิลด์: ค่าของ batch นั้น}) ทุก batch (เช่น hash geometry ไปพร้อมกัน)
+    drop     : ฟิลด์ที่ส่งให้ on_batch อย่างเดียว ไม่เก็บไว้ในผลลัพธ์ (เช่น SHAPE@WKB)
+    """
+    names = [f.upper() for f in fields]
+    dropped = {f.upper() for f in drop}
+    columns = {name: [] for name in names if name not in dropped}
+    for batch in batches:
+        batch = dict(zip(names, batch))
+        if on_batch is not None:
+            on_batch(batch)
+        for name, col in columns.items():
+            col.extend(batch[name])
+    return columns
+
+
+class PrefetchStats:
+    """
+    เวลาของการอ่านแบบ prefetch (วินาที)
+    read_wall    : เวลาที่ thread เบื้องหลังใช้อ่าน cursor (I/O + แปลงค่า)
+    wait_wall    : เวลาที่ผู้ตรวจรอ batch ถัดไป (I/O-wait ที่ซ่อนไม่ได้)
+    compute_wall : เวลาที่ผู้ตรวจใช้กับ batch ที่ได้ไปแล้ว (กฎ, hash ฯลฯ)
+    """
+    __slots__ = ("read_wall", "wait_wall", "compute_wall", "batches")
+
+    def __init__(self):
+        self.read_wall = 0.0
+        self.wait_wall = 0.0
+        self.compute_wall = 0.0
+        self.batches = 0
+
+
+_END = object()
+
+
+class _Failure:
+    __slots__ = ("error",)
+
+    def __init__(self, error):
+        self.error = error
+
+
+def _next_item(items, thread):
+    """รอ batch ถัดไปจากคิว ถ้า thread เบื้องหลังจบไปแล้วโดยไม่ส่งผลมา raise แทนการรอไม่จบ"""
+    while True:
+        try:
+            return items.get(timeout=0.1)
+        except queue.Empty:
+            if thread.is_alive():
+                continue
+        try:
+            return items.get_nowait()
+        except queue.Empty:
+            raise RuntimeError(f"thread อ่านล่วงหน้า ({thread.name}) หยุดทำงานโดยไม่ส่งผลกลับมา") from None
+
+
+def prefetch(batches, depth=PREFETCH_DEPTH, stats=None):
+    """
+    อ่าน batches (iterator) ด้วย thread เบื้องหลัง เก็บล่วงหน้าในคิวไม่เกิน depth batch แล้วคืนทีละ batch
+    batches ควรเป็น generator ที่เปิด cursor ข้างในเอง (cursor จะถูกเปิด อ่าน และปิดใน thread เบื้องหลัง)
+    error ระหว่างอ่าน/ปิด batches ถูกส่งต่อมา raise ที่ผู้เรียก เลิกอ่านกลางทาง (close / break) thread จะหยุดและปิด batches
+    """
+    items = queue.Queue(maxsize=max(1, depth))
+    stop = threading.Event()
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                items.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        last = _END
+        try:
+            it = iter(batches)
+            while not stop.is_set():
+                start = time.perf_counter()
+                batch = next(it, _END)
+                if stats is not None:
+                    stats.read_wall += time.perf_counter() - start
+                if batch is _END or not put(batch):
+                    break
+        except BaseException as e:
+            last = _Failure(e)
+        finally:
+            try:
+                close = getattr(batches, "close", None)
+                if close is not None:
+                    close()
+            except BaseException as e:  # ปิด cursor ไม่ได้ ต้องส่งผลให้ผู้ตรวจเสมอ ไม่อย่างนั้นผู้ตรวจรอไม่จบ
+                if last is _END:
+                    last = _Failure(e)
+            put(last)
+
+    thread = threading.Thread(target=produce, name="gdb-prefetch", daemon=True)
+    thread.start()
+    try:
+        received = None
+        while True:
+            start = time.perf_counter()
+            item = _next_item(items, thread)
+            now = time.perf_counter()
+            if stats is not None:
+                if received is not None:
+                    stats.compute_wall += start - received
+                stats.wait_wall += now - start
+            received = now
+            if item is _END:
+                return
+            if isinstance(item, _Failure):
+                raise item.error
+            if stats is not None:
+                stats.batches += 1
+            yield item
+    finally:
+        stop.set()
+        thread.join()
+
+
+class PrefetchCursor:
+    """
+    cursor ที่ให้ thread เบื้องหลังอ่านล่วงหน้าทีละ batch_size แถว (คิวไม่เกิน depth batch)
+    แล้วปล่อยออกมาทีละแถวเหมือน cursor เดิม ใช้กับ with ... as cur: for row in cur: ได้
+    open_cursor : callable คืน cursor ของ backend (ถูกเรียกใน thread เบื้องหลังตอนเริ่มอ่าน)
+    """
+
+    def __init__(self, open_cursor, batch_size=PREFETCH_BATCH_SIZE, depth=PREFETCH_DEPTH, stats=None):
+        self.open_cursor = open_cursor
+        self.batch_size = batch_size
+        self.depth = depth
+        self.stats = stats
+        self._batches = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def _read_batches(self):
+        with self.open_cursor() as cur:
+            rows = iter(cur)
+            while True:
+                batch = list(islice(rows, self.batch_size))
+                if not batch:
+                    return
+                yield batch
+
+    def __iter__(self):
+        self._batches = prefetch(self._read_batches(), self.depth, self.stats)
+        for batch in self._batches:
+            yield from batch
+
+    def close(self):
+        if self._batches is not None:
+            self._batches.close()
+            self._batches = None
+
+
+def _prefetched(batches, depth, stats):
+    return prefetch(batches, depth, stats) if depth > 0 else batches
+
+
+class _OidChunkCursor:
+    """
+    cursor ที่อ่านเฉพาะ OID ที่กำหนด ทีละ OID_CHUNK_SIZE รายการ
+    open_chunk(list ของ OID) ต้องคืน cursor ของ OID ชุดนั้น (ใช้กับ with ได้)
+    """
+
+    def __init__(self, open_chunk, oids):
+        self.open_chunk = open_chunk
+        self.oids = sorted(oids)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def __iter__(self):
+        for start in range(0, len(self.oids), OID_CHUNK_SIZE):
+            with self.open_chunk(self.oids[start:start + OID_CHUNK_SIZE]) as cur:
+                yield from cur
+
+
+################################################
+#----------------- backend: arcpy
+################################################
+
+class _ArcpyFeatureWriter:
+    """
+    เขียน polygon ทีละแถวด้วย arcpy.da.InsertCursor (ระบบพิกัดเดียวกับ template_fc)
+    fields : list ของ (ชื่อฟิลด์, ประเภทแบบ AddField เช่น "LONG", "DOUBLE")
+    """
+
+    def __init__(self, arcpy, output_path, template_fc, fields):
+        self.arcpy = arcpy
+        self.spatial_reference = arcpy.Describe(template_fc).spatialReference
+        if arcpy.Exists(output_path):
+            arcpy.management.Delete(output_path)
+        folder, name = os.path.split(output_path)
+        arcpy.management.CreateFeatureclass(folder, name, "POLYGON", spatial_reference=self.spatial_reference)
+        for field, field_type in fields:
+            arcpy.management.AddField(output_path, field, field_type)
+        self.cursor = arcpy.da.InsertCursor(output_path, ["SHAPE@"] + [field for field, _ in fields])
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def append(self, wkb, values):
+        self.cursor.insertRow([self.arcpy.FromWKB(bytearray(wkb), self.spatial_reference)] + list(values))
+
+    def close(self):
+        if self.cursor is not None:
+            del self.cursor
+            self.cursor = None
+
+
+class ArcpyRowSource:
+    """
+    อ่านข้อมูลด้วย arcpy (พฤติกรรมเดิมของสคริปต์)
+    """
+    name = "arcpy"
+
+    def __init__(self):
+        import arcpy
+        self.arcpy = arcpy
+
+    def list_layers(self, gdb_path):
+        """คืนชื่อ featureclass ตามด้วย table ใน GDB (ลำดับเดียวกับ ListFeatureClasses + ListTables)"""
+        self.arcpy.env.workspace = gdb_path
+        return (self.arcpy.ListFeatureClasses() or []) + (self.arcpy.ListTables() or [])
+
+    def list_feature_classes(self, gdb_path):
+        """คืนชื่อ featureclass ใน GDB (ไม่รวม table)"""
+        self.arcpy.env.workspace = gdb_path
+        return self.arcpy.ListFeatureClasses() or []
+
+    def list_fields(self, fc_path):
+        """คืน dict {ชื่อฟิลด์ตัวพิมพ์ใหญ่: ประเภทฟิลด์}"""
+        return {f.name.upper(): f.type for f in self.arcpy.ListFields(fc_path)}
+
+    def get_count(self, fc_path):
+        return int(self.arcpy.management.GetCount(fc_path)[0])
+
+    def open_cursor(self, fc_path, fields, oids=None):
+        """
+        เปิด cursor อ่านทีละแถว รองรับ token "OID@" และ "SHAPE@WKB"
+        ใช้กับ with ... as cur: for row in cur: ได้เหมือน arcpy.da.SearchCursor
+        oids : ถ้าระบุ จะอ่านเฉพาะ OID เหล่านี้ (where clause ทีละชุด ลำดับแถวตาม OID)
+        """
+        if oids is None:
+            return self.arcpy.da.SearchCursor(fc_path, fields)
+        oid_field = self.arcpy.Describe(fc_path).OIDFieldName
+        return _OidChunkCursor(
+            lambda chunk: self.arcpy.da.SearchCursor(fc_path, fields, f"{oid_field} IN ({','.join(map(str, chunk))})"),
+            oids)
+
+    def read_columns(self, fc_path, fields, on_batch=None, drop=(), prefetch_depth=0, stats=None):
+        """
+        อ่านทั้ง layer แบบ column คืน dict {ชื่อฟิลด์ตัวพิมพ์ใหญ่: list ของค่า}
+        (ค่าเหมือนที่ cursor คืนมาทุกประการ) on_batch / drop ดู _collect_columns
+        prefetch_depth > 0 : อ่าน batch ถัดไปด้วย thread เบื้องหลังระหว่าง on_batch (stats = PrefetchStats)
+        """
+        def batches():
+            with self.arcpy.da.SearchCursor(fc_path, fields) as cur:
+                rows_iter = iter(cur)
+                while True:
+                    rows = list(islice(rows_iter, DEFAULT_BATCH_SIZE))
+                    if not rows:
+                        return
+                    yield list(zip(*rows))
+
+        return _collect_columns(_prefetched(batches(), prefetch_depth, stats), fields, on_batch, drop)
+
+    def export_features(self, fc_path, oids, output_path):
+        """คัดลอกฟีเจอร์ตาม OID ออกเป็นไฟล์ใหม่ (เช่น .shp) ด้วย MakeFeatureLayer + CopyFeatures"""
+        oid_field = self.arcpy.Describe(fc_path).OIDFieldName
+        temp_layer = f"export_lyr_{os.getpid()}_{len(oids)}"
+        where_clause = f"{oid_field} IN ({','.join(map(str, oids))})"
+        try:
+            self.arcpy.management.MakeFeatureLayer(fc_path, temp_layer, where_clause)
+            self.arcpy.management.CopyFeatures(temp_layer, output_path)
+        finally:
+            try:
+                if self.arcpy.Exists(temp_layer):
+                    self.arcpy.management.Delete(temp_layer)
+            except Exception:
+                pass
+
+    def open_feature_writer(self, output_path, template_fc, fields):
+        """ตัวเขียน polygon ทีละแถว (append(wkb, ค่าฟิลด์)) ใช้กับ with ... as writer: ได้"""
+        return _ArcpyFeatureWriter(self.arcpy, output_path, template_fc, fields)
+
+
+################################################
+#----------------- backend: OpenFileGDB (pyogrio)
+################################################
+
+_NUMPY_FIELD_TYPES = {"LONG": "int64", "SHORT": "int32", "DOUBLE": "float64", "FLOAT": "float32", "TEXT": "object"}
+
+
+class _PyogrioFeatureWriter:
+    """
+    เขียน polygon ผ่าน pyogrio (driver ตามนามสกุล เช่น .shp) เก็บทีละ batch_size แถวแล้วเขียนต่อท้ายไฟล์
+    fields : list ของ (ชื่อฟิลด์, ประเภทแบบ AddField เช่น "LONG", "DOUBLE")
+    """
+
+    def __init__(self, source, output_path, template_fc, fields):
+        gdb_path, layer = os.path.split(template_fc)
+        self.raw = source.pyogrio.raw
+        self.output_path = output_path
+        self.crs = source._layer_info(gdb_path, layer).get("crs")
+        self.names = [field for field, _ in fields]
+        self.dtypes = [_NUMPY_FIELD_TYPES.get(field_type.upper(), "object") for _, field_type in fields]
+        self.batch_size = source.batch_size
+        self._geometry, self._rows = [], []
+        self._written = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def append(self, wkb, values):
+        self._geometry.append(bytes(wkb))
+        self._rows.append(list(values))
+        if len(self._rows) >= self.batch_size:
+            self._write()
+
+    def _write(self):
+        import numpy as np
+        if not self._rows and self._written:
+            return
+        columns = list(zip(*self._rows)) or [()] * len(self.names)
+        field_data = [np.array(col, dtype=dtype) for col, dtype in zip(columns, self.dtypes)]
+        self.raw.write(self.output_path, np.array(self._geometry, dtype=object), field_data, self.names,
+                       geometry_type="MultiPolygon", promote_to_multi=True, crs=self.crs, encoding="UTF-8",
+                       append=self._written)
+        self._written = True
+        self._geometry, self._rows = [], []
+
+    def close(self):
+        self._write()
+
+
+class _BatchCursor:
+    """
+    cursor ที่อ่านข้อมูลเป็น batch ผ่าน pyogrio แล้วปล่อยออกมาทีละแถว (tuple)
+    ตามลำดับฟิลด์ที่ขอ เหมือน arcpy.da.SearchCursor
+    """
+
+    def __init__(self, source, fc_path, fields, fids=None):
+        self.source = source
+        self.gdb_path, self.layer = os.path.split(fc_path)
+        self.fields = list(fields)
+        self.fids = sorted(fids) if fids is not None else None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def __iter__(self):
+        for columns in self.iter_batches():
+            yield from zip(*columns)
+
+    def iter_batches(self):
+        """
+        อ่านทีละ batch คืน list ของคอลัมน์ (list ของค่า Python) ตามลำดับฟิลด์ที่ขอ
+        """
+        raw = self.source.pyogrio.raw
+        info = self.source._layer_info(self.gdb_path, self.layer)
+        real_names = {name.upper(): name for name in info["fields"]}
+        int_fields = {name.upper() for name, ogr_type in zip(info["fields"], info["ogr_types"])
+                      if ogr_type in ("OFTInteger", "OFTInteger64")}
+        oid_name = (info.get("fid_column") or "OBJECTID").upper()
+
+        columns = []
+        for f in self.fields:
+            fu = f.upper()
+            if fu in ("OID@", "SHAPE@WKB", oid_name):
+                continue
+            if fu not in real_names:
+                raise RuntimeError(f"ไม่พบฟิลด์ {f} ใน {self.layer}")
+            if real_names[fu] not in columns:
+                columns.append(real_names[fu])
+        read_geometry = any(f.upper() == "SHAPE@WKB" for f in self.fields)
+
+        for meta, fids, geometry, field_data in self._read_batches(raw, columns, read_geometry):
+            # pyogrio คืนคอลัมน์ตามลำดับใน layer (ไม่ใช่ลำดับที่ขอ) จึงจับคู่ด้วย meta["fields"]
+            by_name = {str(name).upper(): self._to_python(arr, str(name).upper() in int_fields)
+                       for name, arr in zip(meta["fields"], field_data)}
+            fid_list = fids.tolist()
+
+            out_columns = []
+            for f in self.fields:
+                fu = f.upper()
+                if fu in ("OID@", oid_name):
+                    out_columns.append(fid_list)
+                elif fu == "SHAPE@WKB":
+                    out_columns.append([None if g is None else bytes(g) for g in geometry])
+                else:
+                    out_columns.append(by_name[fu])
+            yield out_columns
+
+    def _read_batches(self, raw, columns, read_geometry):
+        """
+        อ่านทั้ง layer ทีละ batch_size แถว หรือเฉพาะ fids ทีละ OID_CHUNK_SIZE รายการ
+        ทั้ง layer อ่านต่อเนื่องจาก layer ที่เปิดครั้งเดียว (open_arrow) ไม่แบ่งหน้าด้วย skip_features
+        (GDAL ต้องเดินแถวที่ข้ามใหม่ทุก batch และนับแถวที่ถูกลบใน GDB ที่แก้ไขแล้วผิด)
+        ไม่มี pyarrow = อ่านทั้ง layer ครั้งเดียวแล้วแบ่งเป็น batch
+        """
+        options = dict(layer=self.layer, columns=columns, read_geometry=read_geometry, return_fids=True)
+        if self.fids is not None:
+            for start in range(0, len(self.fids), OID_CHUNK_SIZE):
+                yield raw.read(self.gdb_path, fids=self.fids[start:start + OID_CHUNK_SIZE], **options)
+            return
+        batch_size = self.source.batch_size
+        if not self.source.arrow:
+            meta, fids, geometry, field_data = raw.read(self.gdb_path, **options)
+            for start in range(0, len(fids), batch_size):
+                end = start + batch_size
+                yield (meta, fids[start:end], None if geometry is None else geometry[start:end],
+                       [arr[start:end] for arr in field_data])
+            return
+        with raw.open_arrow(self.gdb_path, batch_size=batch_size, use_pyarrow=True, **options) as (meta, reader):
+            with_geometry = read_geometry and bool(meta.get("geometry_type"))
+            for batch in reader:
+                if not batch.num_rows:
+                    continue
+                # คอลัมน์แรก = FID, คอลัมน์สุดท้าย = geometry (WKB) แปลงเป็น numpy แบบเดียวกับ raw.read
+                fids = batch.column(0).to_numpy(zero_copy_only=False)
+                geometry = batch.column(batch.num_columns - 1).to_numpy(zero_copy_only=False) if with_geometry else None
+                field_data = [batch.column(str(name)).to_numpy(zero_copy_only=False) for name in meta["fields"]]
+                yield meta, fids, geometry, field_data
+
+    @staticmethod
+    def _to_python(arr, is_int_field):
+        """
+        แปลง numpy array เป็น list ของค่า Python แบบที่ arcpy คืนมา
+        (NULL -> None, ฟิลด์ Integer ที่มี NULL ไม่กลายเป็น float)
+        """
+        values = arr.tolist()
+        if arr.dtype.kind == "f":
+            if is_int_field:
+                return [None if v != v else int(v) for v in values]
+            return [None if v != v else v for v in values]
+        return values
+
+
+class OpenFileGDBRowSource:
+    """
+    อ่านโฟลเดอร์ .gdb ผ่าน GDAL OpenFileGDB driver ด้วย pyogrio (ไม่ต้องใช้ arcpy)
+    """
+    name = "openfilegdb"
+
+    def __init__(self, batch_size=DEFAULT_BATCH_SIZE):
+        import pyogrio
+        import pyogrio.raw
+        self.pyogrio = pyogrio
+        self.batch_size = batch_size
+        self.arrow = importlib.util.find_spec("pyarrow") is not None  # อ่านต่อเนื่องทีละ batch ด้วย open_arrow
+        self._info_cache = {}
+
+    def _layer_info(self, gdb_path, layer):
+        key = (gdb_path, layer.upper())
+        if key not in self._info_cache:
+            self._info_cache[key] = self.pyogrio.read_info(gdb_path, layer=layer)
+        return self._info_cache[key]
+
+    def list_layers(self, gdb_path):
+        """คืนชื่อ featureclass ตามด้วย table ใน GDB (ลำดับเดียวกับ backend arcpy)"""
+        # เริ่ม GDB ใหม่ทุกครั้ง ให้อ่านโครงสร้างฟิลด์ใหม่ (ไฟล์อาจถูกแก้ไขระหว่างรอบ)
+        self._info_cache = {k: v for k, v in self._info_cache.items() if k[0] != gdb_path}
+        layers = self.pyogrio.list_layers(gdb_path)
+        feature_classes = [str(name) for name, geom_type in layers if geom_type is not None]
+        tables = [str(name) for name, geom_type in layers if geom_type is None]
+        return feature_classes + tables
+
+    def list_feature_classes(self, gdb_path):
+        """คืนชื่อ featureclass ใน GDB (ไม่รวม table)"""
+        return [str(name) for name, geom_type in self.pyogrio.list_layers(gdb_path) if geom_type is not None]
+
+    def list_fields(self, fc_path):
+        """คืน dict {ชื่อฟิลด์ตัวพิมพ์ใหญ่: ประเภทฟิลด์} โดยใช้ชื่อประเภทแบบ arcpy"""
+        gdb_path, layer = os.path.split(fc_path)
+        info = self._layer_info(gdb_path, layer)
+        fields = {(info.get("fid_column") or "OBJECTID").upper(): "OID"}
+        for name, ogr_type, ogr_subtype in zip(info["fields"], info["ogr_types"], info["ogr_subtypes"]):
+            fields[name.upper()] = _arcpy_type_name(ogr_type, ogr_subtype)
+        if info.get("geometry_type"):
+            fields[(info.get("geometry_name") or "SHAPE").upper()] = "Geometry"
+        return fields
+
+    def get_count(self, fc_path):
+        gdb_path, layer = os.path.split(fc_path)
+        info = self.pyogrio.read_info(gdb_path, layer=layer, force_feature_count=True)
+        return int(info["features"])
+
+    def open_cursor(self, fc_path, fields, oids=None):
+        """oids : ถ้าระบุ จะอ่านเฉพาะ OID (FID) เหล่านี้"""
+        return _BatchCursor(self, fc_path, fields, oids)
+
+    def read_columns(self, fc_path, fields, on_batch=None, drop=(), prefetch_depth=0, stats=None):
+        """
+        อ่านทั้ง layer แบบ column คืน dict {ชื่อฟิลด์ตัวพิมพ์ใหญ่: list ของค่า}
+        ต่อ batch เข้าด้วยกันโดยไม่ต้องสร้าง tuple ทีละแถว (on_batch / drop ดู _collect_columns)
+        prefetch_depth > 0 : อ่าน batch ถัดไปด้วย thread เบื้องหลังระหว่าง on_batch (stats = PrefetchStats)
+        """
+        batches = _BatchCursor(self, fc_path, fields).iter_batches()
+        return _collect_columns(_prefetched(batches, prefetch_depth, stats), fields, on_batch, drop)
+
+    def export_features(self, fc_path, oids, output_path):
+        """คัดลอกฟีเจอร์ตาม OID ออกเป็นไฟล์ใหม่ (driver ตามนามสกุล เช่น .shp -> ESRI Shapefile)"""
+        gdb_path, layer = os.path.split(fc_path)
+        meta, _, geometry, field_data = self.pyogrio.raw.read(
+            gdb_path, layer=layer, fids=list(oids), return_fids=True)
+        self.pyogrio.raw.write(
+            output_path, geometry, field_data, meta["fields"],
+            crs=meta.get("crs"), geometry_type=meta.get("geometry_type"), encoding="UTF-8")
+
+    def open_feature_writer(self, output_path, template_fc, fields):
+        """ตัวเขียน polygon ทีละแถว (append(wkb, ค่าฟิลด์)) ใช้กับ with ... as writer: ได้"""
+        return _PyogrioFeatureWriter(self, output_path, template_fc, fields)
+
+
+################################################
+#----------------- เลือก backend
+################################################
+
+ROW_SOURCES = {
+    "arcpy": ArcpyRowSource,
+    "openfilegdb": OpenFileGDBRowSource,
+}
+
+_active_sources = {}
+
+def get_row_source(backend="arcpy"):
+    """
+    คืน row source ของ backend ที่เลือก (สร้างครั้งเดียวต่อ process)
+    """
+    key = backend.lower()
+    if key not in ROW_SOURCES:
+        raise ValueError(f"ไม่รู้จัก reader backend '{backend}' (ใช้ได้: {', '.join(ROW_SOURCES)})")
+    if key not in _active_sources:
+        _active_sources[key] = ROW_SOURCES[key]()
+    return _active_sources[key]
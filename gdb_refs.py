@@ -0,0 +1,257 @@
+# =============================================================================
+# - ตรวจการอ้างอิงข้ามชั้นข้อมูล (referential integrity) ของ PARCEL_REL / NS3K_REL
+#   RN ที่ตาราง REL อ้างถึง (PARCEL_RN, NS3K_RN, STREET_RN, BLOCK_*_RN) ต้องมีอยู่จริง
+#   ในชั้นข้อมูลต้นทางที่อยู่โซนเดียวกัน (PARCEL_47_xx, ROAD_47, BLOCK_FIX_47 ... กับ PARCEL_REL_47)
+#   และ BRANCH_CODE เดียวกัน
+# - ไม่อ่านข้อมูลซ้ำ: ระหว่างที่ validator อ่าน cursor ของชั้นต้นทาง จะเก็บ (BRANCH_CODE, RN)
+#   ไว้ใน index ต่อ GDB (array ของเลข RN ที่เรียงแล้ว แยกตาม BRANCH_CODE)
+#   ส่วนตาราง REL เก็บ OID + BRANCH_CODE + RN ระหว่างตรวจ แล้วค่อยเทียบทีเดียวตอนจบ GDB (np.searchsorted)
+# - numpy / pandas import เมื่อมีข้อมูลเข้ามาครั้งแรก (import โมดูลนี้อย่างเดียวไม่โหลด)
+# - process_gdb เริ่ม index ด้วย start_indexing() แล้วเลิกด้วย stop_indexing()
+#   (ไม่ได้เริ่ม = ไม่เก็บ ไม่ตรวจ เหมือน gdb_perf)
+# =============================================================================
+
+import re
+from array import array
+
+TAP_BATCH_SIZE = 50000  # จำนวนแถวที่พักไว้ก่อนแปลงเป็น array (อ่านแบบทีละแถว)
+EMPTY_REFERENCES = (0,)  # ค่า RN ที่หมายถึง "ไม่ได้อ้างถึง" ไม่ต้องตรวจ (NULL ไม่ตรวจอยู่แล้ว)
+
+# ชั้นข้อมูลต้นทาง: ฟิลด์ RN ที่เป็น key
+KEY_FIELDS = {
+    "PARCEL": "PARCEL_RN",
+    "PARCEL_NS3K": "NS3K_RN",
+    "ROAD": "STREET_RN",
+    "BLOCK_FIX": "BLOCK_FIX_RN",
+    "BLOCK_PRICE": "BLOCK_PRICE_RN",
+    "BLOCK_BLUE": "BLOCK_BLUE_RN",
+}
+
+# ตาราง REL: (ฟิลด์ที่อ้างถึง, ชั้นข้อมูลต้นทาง) เรียงตามลำดับที่รายงาน
+REL_REFERENCES = {
+    "PARCEL_REL": [("PARCEL_RN", "PARCEL"), ("STREET_RN", "ROAD"), ("BLOCK_FIX_RN", "BLOCK_FIX"),
+                   ("BLOCK_BLUE_RN", "BLOCK_BLUE"), ("BLOCK_PRICE_RN", "BLOCK_PRICE")],
+    "NS3K_REL": [("NS3K_RN", "PARCEL_NS3K"), ("STREET_RN", "ROAD"), ("BLOCK_FIX_RN", "BLOCK_FIX"),
+                 ("BLOCK_BLUE_RN", "BLOCK_BLUE"), ("BLOCK_PRICE_RN", "BLOCK_PRICE")],
+}
+
+_PARCEL_ZONE = re.compile(r"^PARCEL_(\d+)_", re.IGNORECASE)
+
+_index = None  # index ของ GDB ที่กำลังตรวจใน process นี้
+
+
+def layer_zone(layer_key, fc_name):
+    """โซนของชั้นข้อมูลจากชื่อ: PARCEL_47_50 / PARCEL_47_NS3K_50 -> 47, ROAD_47 / PARCEL_REL_47 -> 47"""
+    if layer_key in ("PARCEL", "PARCEL_NS3K"):
+        m = _PARCEL_ZONE.match(fc_name)
+        return m.group(1) if m else ""
+    return fc_name.rsplit("_", 1)[-1].upper()
+
+def _branch_values(values):
+    """BRANCH_CODE -> key (ตัดช่องว่าง, ค่าว่าง = "NULL") แบบเดียวกับการตรวจค่าซ้ำ"""
+    return ["NULL" if v is None or v == "" else (v.strip() if isinstance(v, str) else str(v)) for v in values]
+
+def _rn_values(values):
+    """RN -> float (int(float(ค่า)) ถ้าเป็นตัวเลข, ไม่ใช่ตัวเลข/NULL -> NaN)"""
+    import numpy as np
+    import pandas as pd
+    return np.trunc(pd.to_numeric(pd.Series(values, dtype=object), errors="coerce").astype(float).to_numpy())
+
+
+class _ColumnTap:
+    """
+    ตัวรับข้อมูลจาก cursor ของ validator (ไม่ต้องอ่านชั้นข้อมูลซ้ำ)
+    - fields   : ฟิลด์ที่ต้องการใน cursor
+    - feed()   : สำหรับ cursor ทีละแถว ส่งแถวต่อไปตามเดิม และพักแถวไว้แปลงเป็น batch
+    - add_batch(): สำหรับอ่านแบบ columnar รับ dict {ฟิลด์: list ของค่า}
+    - complete : ผู้อ่านตั้งเป็น True เมื่ออ่านครบทั้งชั้น (อ่านไม่ครบ = ไม่ใช้ผล)
+    """
+    fields = ()
+
+    def __init__(self):
+        self.complete = False
+
+    def feed(self, rows, positions):
+        pending = []
+        for row in rows:
+            pending.append(row)
+            if len(pending) >= TAP_BATCH_SIZE:
+                self._flush(pending, positions)
+                pending = []
+            yield row
+        self._flush(pending, positions)
+
+    def _flush(self, rows, positions):
+        if rows:
+            columns = list(zip(*rows))
+            self.add_batch({f: columns[i] for f, i in zip(self.fields, positions)})
+
+    def add_batch(self, batch):
+        raise NotImplementedError
+
+
+class KeyCollector(_ColumnTap):
+    """เก็บ RN ของชั้นข้อมูลต้นทาง แยกตาม BRANCH_CODE"""
+
+    def __init__(self, rn_field):
+        super().__init__()
+        self.fields = ["BRANCH_CODE", rn_field]
+        self.rn_field = rn_field
+        self.parts = {}  # branch -> list ของ array
+
+    def add_batch(self, batch):
+        import numpy as np
+        import pandas as pd
+        branches = pd.Series(_branch_values(batch["BRANCH_CODE"]), dtype=object)
+        rn = _rn_values(batch[self.rn_field])
+        valid = np.isfinite(rn)
+        codes, uniques = pd.factorize(branches)
+        for code, branch in enumerate(uniques):
+            keys = rn[valid & (codes == code)].astype(np.int64)
+            if len(keys):
+                self.parts.setdefault(branch, []).append(keys)
+
+
+class RelCollector(_ColumnTap):
+    """เก็บ OID + BRANCH_CODE + RN ที่อ้างถึงของตาราง REL (array แบบ compact) ไว้เทียบตอนจบ GDB"""
+
+    def __init__(self, layer_key, fc_name, zone, references):
+        super().__init__()
+        self.layer_key = layer_key
+        self.fc_name = fc_name
+        self.zone = zone
+        self.references = references  # [(ฟิลด์, ชั้นต้นทาง)] เฉพาะฟิลด์ที่มีในตาราง
+        self.fields = ["OID@", "BRANCH_CODE"] + [f for f, _ in references]
+        self.oids = array("q")
+        self.branch_codes = array("l")
+        self.branch_names = {}  # branch -> code
+        self.values = [array("d") for _ in references]
+
+    def add_batch(self, batch):
+        self.oids.extend(int(v) for v in batch["OID@"])
+        names = self.branch_names
+        for branch in _branch_values(batch["BRANCH_CODE"]):
+            code = names.get(branch)
+            if code is None:
+                code = names[branch] = len(names)
+            self.branch_codes.append(code)
+        for (field, _), values in zip(self.references, self.values):
+            values.extend(_rn_values(batch[field]).tolist())
+
+    @property
+    def rows(self):
+        return len(self.oids)
+
+
+class ReferenceIndex:
+    """
+    index ของ GDB 1 ก้อน
+    keys    : {(ชั้นต้นทาง, โซน): {"layers": [ชื่อ fc], "collectors": [KeyCollector]}}
+    pending : ตาราง REL ที่รอเทียบตอนจบ GDB
+    """
+
+    def __init__(self):
+        self.keys = {}
+        self.pending = []
+        self._sorted = {}
+
+    def tap(self, layer_key, fc_name, fields):
+        """
+        คืนตัวรับข้อมูลของชั้นนี้ (KeyCollector / RelCollector) หรือ None ถ้าไม่เกี่ยวข้อง
+        fields : dict ฟิลด์ของชั้น (จาก list_fields) ใช้ดูว่ามีฟิลด์ที่ต้องใช้หรือไม่
+        """
+        zone = layer_zone(layer_key, fc_name)
+        if layer_key in KEY_FIELDS:
+            entry = self.keys.setdefault((layer_key, zone), {"layers": [], "collectors": []})
+            entry["layers"].append(fc_name)
+            if "BRANCH_CODE" not in fields or KEY_FIELDS[layer_key] not in fields:
+                entry["collectors"].append(None)  # เก็บ key ไม่ได้ -> ไม่ตรวจการอ้างอิงไปที่ชั้นนี้
+                return None
+            collector = KeyCollector(KEY_FIELDS[layer_key])
+            entry["collectors"].append(collector)
+            return collector
+        if layer_key in REL_REFERENCES:
+            references = [(f, target) for f, target in REL_REFERENCES[layer_key] if f in fields]
+            if "BRANCH_CODE" not in fields or not references:
+                return None
+            collector = RelCollector(layer_key, fc_name, zone, references)
+            self.pending.append(collector)
+            return collector
+        return None
+
+    def _keys_for(self, target, zone):
+        """{branch: array RN ที่เรียงแล้ว} ของชั้นต้นทาง หรือ None ถ้าไม่มีชั้นนั้น / อ่านไม่ครบ"""
+        import numpy as np
+        key = (target, zone)
+        if key not in self._sorted:
+            entry = self.keys.get(key)
+            if entry is None or not all(c is not None and c.complete for c in entry["collectors"]):
+                self._sorted[key] = None
+            else:
+                branches = {}
+                for collector in entry["collectors"]:
+                    for branch, parts in collector.parts.items():
+                        branches.setdefault(branch, []).extend(parts)
+                    collector.parts = {}
+                self._sorted[key] = {b: np.unique(np.concatenate(parts)) for b, parts in branches.items()}
+        return self._sorted[key]
+
+    def dangling(self, rel):
+        """
+        เทียบ RN ทุกแถวของตาราง REL กับ index (ทีละฟิลด์ ทีละ BRANCH_CODE แบบ bulk)
+        คืน list ของ (oid, ฟิลด์, ค่า RN, branch, ชื่อชั้นต้นทาง) เรียงตามแถว แล้วตามลำดับฟิลด์
+        และ list ของฟิลด์ที่ข้ามไป (ไม่มีชั้นต้นทางในโซนนี้ / อ่านชั้นต้นทางไม่ครบ)
+        """
+        if not rel.complete or not rel.rows:
+            return [], []
+        import numpy as np
+        oids = np.frombuffer(rel.oids, dtype=np.int64)
+        branch_codes = np.frombuffer(rel.branch_codes, dtype=rel.branch_codes.typecode)
+        branch_names = list(rel.branch_names)
+        hit_rows, hit_refs, skipped = [], [], []
+        for j, ((field, target), values) in enumerate(zip(rel.references, rel.values)):
+            keys = self._keys_for(target, rel.zone)
+            if keys is None:
+                skipped.append(field)
+                continue
+            rn = np.frombuffer(values, dtype=np.float64)
+            checked = np.isfinite(rn) & ~np.isin(rn, EMPTY_REFERENCES)
+            missing = np.zeros(len(rn), dtype=bool)
+            for code, branch in enumerate(branch_names):
+                rows = np.flatnonzero(checked & (branch_codes == code))
+                if not len(rows):
+                    continue
+                branch_keys = keys.get(branch)
+                if branch_keys is None:
+                    missing[rows] = True
+                    continue
+                probe = rn[rows].astype(np.int64)
+                pos = np.minimum(np.searchsorted(branch_keys, probe), len(branch_keys) - 1)
+                missing[rows] = branch_keys[pos] != probe
+            rows = np.flatnonzero(missing)
+            hit_rows.append(rows)
+            hit_refs.append(np.full(len(rows), j))
+        if not hit_rows:
+            return [], skipped
+        hit_rows, hit_refs = np.concatenate(hit_rows), np.concatenate(hit_refs)
+        results = []
+        for idx in np.lexsort((hit_refs, hit_rows)).tolist():
+            r, j = int(hit_rows[idx]), int(hit_refs[idx])
+            field, target = rel.references[j]
+            layers = self.keys[(target, rel.zone)]["layers"]
+            results.append((int(oids[r]), field, int(rel.values[j][r]), branch_names[branch_codes[r]], layers))
+        return results, skipped
+
+
+def start_indexing():
+    global _index
+    _index = ReferenceIndex()
+    return _index
+
+def stop_indexing():
+    global _index
+    index, _index = _index, None
+    return index
+
+def current_index():
+    return _index
@@ -0,0 +1,454 @@
+# =============================================================================
+# - เขียนรายงาน Excel แบบ streaming (openpyxl write-only workbook)
+#   เขียนทีละแถวลงไฟล์ชั่วคราวทันที ไม่ต้องเก็บ error ทั้งหมดใน list / DataFrame
+#   หน่วยความจำคงที่ไม่ว่าจะมี error กี่ล้านแถว
+# - sheet เต็มที่ 1,048,576 แถว (ขีดจำกัด Excel) จะแยกไป sheet ใหม่อัตโนมัติ
+#   เช่น Errors, Errors_2, Errors_3 ... (ทุก sheet มีหัวคอลัมน์)
+# - ค่าในเซลล์แปลงแบบเดียวกับ pandas.to_excel ไฟล์ที่ได้จึงอ่านค่าได้เหมือนเดิม
+# - save_workbook(..., timestamp) ใส่เวลาเดียวกันทั้งใน zip และ document properties
+#   ข้อมูลเหมือนเดิม -> ไฟล์ .xlsx เหมือนเดิมทุกไบต์ (ใช้กับ --resume)
+# - ErrorStore: เก็บ error ไว้ในหน่วยความจำแบบ compact (แทน list ของ list)
+#   ข้อความที่ซ้ำกัน (GDB, featureclass, check type, field, message, ค่า) เก็บครั้งเดียวแล้วอ้างด้วยเลขรหัส
+#   Timestamp ใส่ตอน export เป็นเวลาของรอบ ไม่เก็บต่อ error
+#   โหมดประหยัดหน่วยความจำ (limit_rows): ครบจำนวนแถวแล้วส่งออก (เช่น เขียนเป็น row group ของ Parquet) แล้วล้าง
+# - ErrorReportWriter จำกัดจำนวนแถวรายละเอียดต่อ (Featureclass, Check_Type, Field_Name) ได้ (cap)
+#   จำนวน error รวมยังนับครบทุกแถว ส่วนที่ไม่ได้เขียนสรุปไว้ใน sheet 'Capped'
+# - SummaryCounts: รวมจำนวน error ของทุก GDB (Error SUM / Report_by_Province) ทีละกลุ่ม ไม่ต้องใช้ pandas
+# =============================================================================
+
+import shutil
+import datetime
+from array import array
+from numbers import Integral
+from decimal import Decimal
+from collections import Counter
+from zipfile import ZipFile, ZipInfo, ZIP_DEFLATED
+
+EXCEL_MAX_ROWS = 1048576  # จำนวนแถวสูงสุดต่อ sheet ของ Excel (รวมหัวคอลัมน์)
+EXCEL_MAX_CELL_CHARS = 32767  # จำนวนตัวอักษรสูงสุดต่อเซลล์
+
+ERROR_REPORT_HEADERS = ['Timestamp', 'GDB_Path', 'Featureclass', 'Check_Type', 'Object_ID(s)', 'Field_Name', 'Invalid_Value', 'Message']
+CAPPED_HEADERS = ['Featureclass', 'Check_Type', 'Field_Name', 'Total_Errors', 'Rows_Written']
+
+
+def excel_value(value):
+    """
+    แปลงค่าให้ openpyxl เขียนได้ (แบบเดียวกับ pandas.to_excel)
+    None / NaN -> เซลล์ว่าง, ตัวเลข numpy -> int/float, ชนิดอื่น ๆ -> str
+    """
+    if value is None or isinstance(value, (str, bool, int, Decimal, datetime.date, datetime.time)):
+        return value
+    if isinstance(value, float):
+        return None if value != value else value
+    if isinstance(value, datetime.timedelta):
+        return value.total_seconds() / 86400
+    if hasattr(value, "item") and getattr(value, "ndim", None) == 0:  # numpy scalar
+        return excel_value(value.item())
+    value = str(value)
+    return value[:EXCEL_MAX_CELL_CHARS]
+
+
+def new_workbook():
+    """สร้าง workbook แบบ write-only (ยังไม่มี sheet)"""
+    from openpyxl import Workbook  # import เมื่อเขียนรายงานจริง (process ที่ไม่เขียน Excel ไม่ต้องโหลด)
+    return Workbook(write_only=True)
+
+
+class _FixedTimeZipFile(ZipFile):
+    """
+    ZipFile ที่ทุกไฟล์ข้างในใช้เวลาเดียวกัน (ปกติ zip จะใส่เวลาที่เขียนจริง ทำให้ไฟล์ต่างกันทุกครั้ง)
+    """
+
+    def __init__(self, filename, date_time):
+        super().__init__(filename, "w", ZIP_DEFLATED, allowZip64=True)
+        self.date_time = date_time
+
+    def _zinfo(self, arcname):
+        zinfo = ZipInfo(arcname, self.date_time)
+        zinfo.compress_type = ZIP_DEFLATED
+        zinfo.external_attr = 0o600 << 16
+        return zinfo
+
+    def writestr(self, zinfo_or_arcname, data, *args, **kwargs):
+        if not isinstance(zinfo_or_arcname, ZipInfo):
+            zinfo_or_arcname = self._zinfo(zinfo_or_arcname)
+        super().writestr(zinfo_or_arcname, data, *args, **kwargs)
+
+    def write(self, filename, arcname=None, *args, **kwargs):
+        # sheet แบบ write-only อยู่ในไฟล์ชั่วคราว คัดลอกแบบ stream ไม่โหลดทั้งไฟล์เข้าหน่วยความจำ
+        with open(filename, "rb") as src, self.open(self._zinfo(arcname or filename), "w", force_zip64=True) as dst:
+            shutil.copyfileobj(src, dst)
+
+
+def save_workbook(workbook, path, timestamp=None):
+    """
+    บันทึก workbook
+    timestamp (datetime) : ถ้าระบุ จะใช้เป็นเวลาสร้าง/แก้ไขไฟล์และเวลาใน zip
+    ข้อมูลชุดเดิม + timestamp เดิม จะได้ไฟล์เหมือนเดิมทุกไบต์
+    """
+    if timestamp is None:
+        workbook.save(path)
+        return
+    if workbook.write_only and not workbook.worksheets:
+        workbook.create_sheet()
+    workbook.properties.created = timestamp
+    workbook.properties.modified = timestamp
+    from openpyxl.writer.excel import ExcelWriter
+    ExcelWriter(workbook, _FixedTimeZipFile(path, timestamp.timetuple()[:6])).save()
+
+
+class ExcelSheetStream:
+    """
+    เขียนแถวลง sheet ของ write-only workbook ทีละแถว
+    เมื่อครบ max_rows แถวจะเปิด sheet ใหม่ชื่อ {title}_2, {title}_3 ... พร้อมหัวคอลัมน์
+    """
+
+    def __init__(self, workbook, title, headers, max_rows=EXCEL_MAX_ROWS):
+        self.workbook = workbook
+        self.title = title
+        self.headers = list(headers)
+        self.max_rows = max_rows
+        self.sheet_count = 0
+        self.row_count = 0  # จำนวนแถวข้อมูลทั้งหมด (ไม่รวมหัวคอลัมน์)
+        self._sheet = None
+        self._sheet_rows = 0
+
+    def _next_sheet(self):
+        self.sheet_count += 1
+        title = self.title if self.sheet_count == 1 else f"{self.title}_{self.sheet_count}"
+        self._sheet = self.workbook.create_sheet(title)
+        self._sheet.append(self.headers)
+        self._sheet_rows = 1
+
+    def append(self, row):
+        if self._sheet is None or self._sheet_rows >= self.max_rows:
+            self._next_sheet()
+        self._sheet.append([excel_value(v) for v in row])
+        self._sheet_rows += 1
+        self.row_count += 1
+
+
+def detail_cap(check_type, field, cap=None, caps=None):
+    """
+    เพดานจำนวนแถวรายละเอียดของกฎ (Check_Type, Field_Name)
+    caps : {(Check_Type, Field_Name): N} หรือ {Check_Type: N} ใช้ก่อน cap (N = None คือไม่จำกัด)
+    """
+    if caps:
+        if (check_type, field) in caps:
+            return caps[(check_type, field)]
+        if check_type in caps:
+            return caps[check_type]
+    return cap
+
+
+def _timestamp_text(timestamp):
+    if timestamp is None:
+        timestamp = datetime.datetime.now()
+    if isinstance(timestamp, datetime.datetime):
+        timestamp = timestamp.strftime('%Y-%m-%d %H:%M:%S')
+    return timestamp
+
+
+class _Dictionary:
+    """ค่า -> เลขรหัส (ค่าเดียวกันเก็บครั้งเดียว)"""
+    __slots__ = ("codes", "values")
+
+    def __init__(self):
+        self.codes = {}
+        self.values = []
+
+    def encode(self, value):
+        # แยก 1 / 1.0 / True / "1" ออกจากกัน (dict ปกติถือว่า 1 == 1.0 == True)
+        key = (value.__class__, value)
+        code = self.codes.get(key)
+        if code is None:
+            code = self.codes[key] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+class ErrorStore:
+    """
+    ที่เก็บ error แบบ compact ใช้แทน list ที่ส่งให้ write_error_report() ได้ทันที (มี add / append / len)
+    - GDB_Path, Featureclass, Check_Type, Field_Name, Invalid_Value, Message เก็บเป็นเลขรหัส (dictionary encoding)
+    - Object_ID ที่เป็นเลขเก็บใน array ของ int64 ที่เหลือ (เช่น "[1, 2]", "N/A") เก็บแยกเป็นรายแถว
+    - ไม่เก็บ Timestamp ต่อ error ใส่เวลาของรอบตอน export (rows() / to_dataframe())
+    - Invalid_Value แปลงด้วย excel_value() ตอนเก็บ (ค่าในรายงานเหมือนเดิม)
+    - limit_rows(): เก็บไม่เกินจำนวนแถวที่กำหนด ครบแล้วส่งให้ on_flush แล้วล้าง
+      len() นับทุกแถว แต่ rows() / encoded_columns() / summary_counts() มีเฉพาะแถวที่ยังไม่ถูกส่งออก
+    """
+
+    _COLUMNS = ("GDB_Path", "Featureclass", "Check_Type", "Field_Name", "Invalid_Value", "Message")
+
+    def __init__(self):
+        self._dictionaries = [_Dictionary() for _ in self._COLUMNS]
+        self._codes = [array("i") for _ in self._COLUMNS]
+        self._oids = array("q")
+        self._other_oids = {}  # แถว -> Object_ID ที่ไม่ใช่เลข
+        self.flushed = 0  # จำนวนแถวที่ส่งออกไปแล้ว
+        self.flush_rows = None
+        self.on_flush = None
+
+    def __len__(self):
+        return self.flushed + len(self._oids)
+
+    def __bool__(self):
+        return len(self) > 0
+
+    def limit_rows(self, rows, on_flush):
+        """
+        เก็บในหน่วยความจำไม่เกิน rows แถว ครบแล้วเรียก on_flush(store) แล้วล้าง
+        เรียกจาก thread อื่นได้ (เช่น monitor หน่วยความจำ) on_flush ถูกเรียกใน add() ของ thread ที่เพิ่ม error
+        """
+        self.on_flush = on_flush
+        self.flush_rows = rows
+
+    def flush(self):
+        """ส่งแถวที่เก็บอยู่ให้ on_flush แล้วล้าง (รวมตารางรหัส)"""
+        if self._oids and self.on_flush is not None:
+            self.on_flush(self)
+            self.flushed += len(self._oids)
+            self._dictionaries = [_Dictionary() for _ in self._COLUMNS]
+            self._codes = [array("i") for _ in self._COLUMNS]
+            self._oids = array("q")
+            self._other_oids = {}
+
+    def add(self, gdb_path, fc_name, check_type, oid, field, value, message):
+        value = excel_value(value)
+        try:
+            value_code = self._dictionaries[4].encode(value)
+        except TypeError:  # ค่าที่ hash ไม่ได้
+            value_code = self._dictionaries[4].encode(str(value))
+        for column, item in ((0, gdb_path), (1, fc_name), (2, check_type), (3, field), (5, message)):
+            self._codes[column].append(self._dictionaries[column].encode(item))
+        self._codes[4].append(value_code)
+        if isinstance(oid, Integral) and not isinstance(oid, bool):
+            self._oids.append(int(oid))
+        else:
+            self._other_oids[len(self._oids)] = oid
+            self._oids.append(0)
+        if self.flush_rows is not None and len(self._oids) >= self.flush_rows:
+            self.flush()
+
+    def append(self, row):
+        """รับแถวแบบเดิม [Timestamp, GDB_Path, ...] (Timestamp ในแถวไม่ถูกเก็บ)"""
+        self.add(*row[1:8])
+
+    def rows(self, timestamp=None):
+        """แถวตาม ERROR_REPORT_HEADERS ทีละแถว (generator) Timestamp = timestamp ของรอบ"""
+        timestamp = _timestamp_text(timestamp)
+        values = [d.values for d in self._dictionaries]
+        gdb, fc, check, field, invalid, message = self._codes
+        other = self._other_oids
+        for i, oid in enumerate(self._oids):
+            yield [timestamp, values[0][gdb[i]], values[1][fc[i]], values[2][check[i]],
+                   other[i] if i in other else oid, values[3][field[i]], values[4][invalid[i]], values[5][message[i]]]
+
+    def to_dataframe(self, timestamp=None):
+        """DataFrame คอลัมน์ตาม ERROR_REPORT_HEADERS (ต้องมี pandas)"""
+        import pandas as pd
+        return pd.DataFrame(list(self.rows(timestamp)), columns=ERROR_REPORT_HEADERS)
+
+    def encoded_columns(self):
+        """
+        คอลัมน์แบบ dictionary encoding (ไม่ต้องแปลงเป็นแถว ใช้กับ gdb_store)
+        คืน ({ชื่อคอลัมน์: (array เลขรหัส, list ค่า)}, array Object_ID, {แถว: Object_ID ที่ไม่ใช่เลข})
+        """
+        columns = {name: (codes, d.values) for name, codes, d in zip(self._COLUMNS, self._codes, self._dictionaries)}
+        return columns, self._oids, self._other_oids
+
+    def summary_counts(self):
+        """คืน list ของ (GDB_Path, Featureclass, Check_Type, จำนวน) เรียงตามคีย์ (เหมือน groupby().size())"""
+        counts = Counter(zip(*self._codes[:3]))
+        values = [d.values for d in self._dictionaries[:3]]
+        return sorted((values[0][g], values[1][f], values[2][c], n) for (g, f, c), n in counts.items())
+
+
+class ErrorReportWriter:
+    """
+    sink สำหรับ error ของ GDB 1 ก้อน ใช้แทน list ที่ส่งให้ write_error_report() ได้ทันที (มี add / append / len)
+    - เปิดไฟล์เมื่อมี error แรกเท่านั้น (GDB ที่ไม่มี error จะไม่มีไฟล์รายงาน)
+    - นับจำนวน error ตาม (GDB_Path, Featureclass, Check_Type) ไว้ทำ Sheet 'Error SUM'
+    - ต้องเรียก save() เมื่อตรวจเสร็จ
+
+    Parameters
+    ----------
+    report_path : str
+        path ของไฟล์ .xlsx ที่จะบันทึก
+    path_formatter : callable | None
+        ฟังก์ชันแปลง GDB_Path ก่อนเขียนลงไฟล์ (เช่น get_short_gdb_path)
+    timestamp : str | datetime | None
+        Timestamp ของรอบ ใส่ให้ทุกแถวที่มาทาง add() (None = เวลาที่สร้าง writer)
+    cap, caps : int | None, dict | None
+        จำนวนแถวรายละเอียดสูงสุดต่อ (Featureclass, Check_Type, Field_Name) ดู detail_cap()
+        len() และ summary_counts() ยังนับทุก error
+    store : ErrorStore | None
+        ถ้าระบุ จะเก็บ error ทุกแถว (รวมแถวที่เกิน cap) ไว้ด้วย สำหรับเขียน Parquet (gdb_store)
+    """
+
+    def __init__(self, report_path, sheet_name="Errors", path_formatter=None, max_rows=EXCEL_MAX_ROWS, timestamp=None,
+                 cap=None, caps=None, store=None):
+        self.report_path = report_path
+        self.store = store
+        self.sheet_name = sheet_name
+        self.path_formatter = path_formatter
+        self.max_rows = max_rows
+        self.timestamp = _timestamp_text(timestamp)
+        self.cap = cap
+        self.caps = caps
+        self.counts = Counter()
+        self.detail_counts = Counter()  # (Featureclass, Check_Type, Field_Name) -> จำนวน error
+        self.detail_written = Counter()  # (Featureclass, Check_Type, Field_Name) -> จำนวนแถวที่เขียนลงรายงาน
+        self._limits = {}
+        self._pending_cap = None  # เพดานที่ thread อื่นขอลด append() เป็นคนเปลี่ยน
+        self._workbook = None
+        self._stream = None
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    @property
+    def rows_written(self):
+        return self._stream.row_count if self._stream is not None else 0
+
+    def capped(self):
+        """list ของ (Featureclass, Check_Type, Field_Name, จำนวนทั้งหมด, จำนวนที่เขียน) ของกฎที่ถูกตัด"""
+        result = []
+        for key, total in sorted(self.detail_counts.items(), key=lambda item: tuple(map(str, item[0]))):
+            written = self.detail_written[key]
+            if total > written:
+                result.append(key + (total, written))
+        return result
+
+    def __bool__(self):
+        return self._count > 0
+
+    def add(self, gdb_path, fc_name, check_type, oid, field, value, message):
+        self.append([self.timestamp, gdb_path, fc_name, check_type, oid, field, value, message])
+
+    def append(self, row):
+        if self._stream is None:
+            self._workbook = new_workbook()
+            self._stream = ExcelSheetStream(self._workbook, self.sheet_name, ERROR_REPORT_HEADERS, self.max_rows)
+        gdb_path, fc_name, check_type = row[1], row[2], row[3]
+        self.counts[(gdb_path, fc_name, check_type)] += 1
+        self._count += 1
+        if self.store is not None:
+            self.store.append(row)
+        key = (fc_name, check_type, row[5])
+        self.detail_counts[key] += 1
+        if self._pending_cap is not None:
+            self._apply_pending_cap()
+        if self.cap is not None or self.caps:
+            limit = self._limits.get(key, False)
+            if limit is False:
+                limit = self._limits[key] = detail_cap(check_type, row[5], self.cap, self.caps)
+            if limit is not None and self.detail_written[key] >= limit:
+                return
+        self.detail_written[key] += 1
+        if self.path_formatter is not None:
+            row = [row[0], self.path_formatter(gdb_path)] + list(row[2:])
+        self._stream.append(row)
+
+    def tighten_cap(self, cap):
+        """
+        ลดเพดานแถวรายละเอียดลงเหลือ cap (ไม่เพิ่มถ้าเดิมต่ำกว่า) ใช้กับ error ที่เข้ามาหลังจากนี้
+        เรียกจาก thread อื่นได้ (เช่น monitor หน่วยความจำของ gdb_memory): แค่ตั้งค่ารอไว้
+        append() ของ thread ที่เขียนเป็นคนเปลี่ยน cap / _limits จึงไม่แก้ dict พร้อมกันสอง thread
+        """
+        self._pending_cap = cap
+
+    def _apply_pending_cap(self):
+        cap, self._pending_cap = self._pending_cap, None
+        if self.cap is None or cap < self.cap:
+            self.cap = cap
+            self._limits = {}
+
+    def summary_counts(self):
+        """คืน list ของ (GDB_Path, Featureclass, Check_Type, จำนวน) เรียงตามคีย์ (เหมือน groupby().size())"""
+        return [key + (count,) for key, count in sorted(self.counts.items())]
+
+    @property
+    def sheet_count(self):
+        return self._stream.sheet_count if self._stream is not None else 0
+
+    def save(self):
+        """บันทึกไฟล์ (ถ้ามี error) คืน True ถ้าบันทึก"""
+        if self._workbook is None:
+            return False
+        workbook, self._workbook = self._workbook, None
+        capped = self.capped()
+        if capped:
+            sheet = ExcelSheetStream(workbook, "Capped", CAPPED_HEADERS, self.max_rows)
+            for row in capped:
+                sheet.append(row)
+        workbook.save(self.report_path)
+        return True
+
+
+class SummaryCounts:
+    """
+    รวมจำนวน error ของทุก GDB สำหรับ Sheet 'Error SUM' และ 'Report_by_Province' ทีละกลุ่ม
+    รับแถว [Timestamp, GDB_Path, Featureclass, Check_Type, จำนวน] (จาก summary_counts() ของแต่ละ GDB)
+    งานต่อแถวเป็นแค่ค้น dict จำนวนงานจึงตามจำนวนกลุ่ม ไม่ใช่จำนวน error
+
+    Parameters
+    ----------
+    path_formatter : callable | None
+        แปลง GDB_Path เป็นค่าที่เขียนลง Sheet (เช่น get_short_gdb_path) เรียกครั้งเดียวต่อ GDB
+    province_of : callable | None
+        GDB_Path (หลังแปลง) -> จังหวัด เรียกครั้งเดียวต่อ GDB
+    category_of : callable | None
+        Featureclass -> Category (None = ไม่นับใน Report_by_Province) เรียกครั้งเดียวต่อ Featureclass
+    """
+
+    def __init__(self, path_formatter=None, province_of=None, category_of=None):
+        self.path_formatter = path_formatter
+        self.province_of = province_of
+        self.category_of = category_of
+        self.records = []  # แถว Error SUM ตามลำดับที่เพิ่ม (GDB_Path แปลงแล้ว)
+        self.province_counts = Counter()  # (จังหวัด, Category) -> จำนวน error
+        self._gdbs = {}  # GDB_Path -> (GDB_Path ที่แปลงแล้ว, จังหวัด)
+        self._categories = {}  # Featureclass -> Category
+
+    def __len__(self):
+        return len(self.records)
+
+    def __bool__(self):
+        return len(self.records) > 0
+
+    def _gdb(self, gdb_path):
+        gdb = self._gdbs.get(gdb_path)
+        if gdb is None:
+            short_path = self.path_formatter(gdb_path) if self.path_formatter else gdb_path
+            province = self.province_of(short_path) if self.province_of else None
+            gdb = self._gdbs[gdb_path] = (short_path, province)
+        return gdb
+
+    def _category(self, fc_name):
+        if fc_name not in self._categories:
+            self._categories[fc_name] = self.category_of(fc_name) if self.category_of else None
+        return self._categories[fc_name]
+
+    def add(self, timestamp, gdb_path, fc_name, check_type, count):
+        short_path, province = self._gdb(gdb_path)
+        self.records.append([timestamp, short_path, fc_name, check_type, count])
+        category = self._category(fc_name)
+        if category is not None:
+            self.province_counts[(province, category)] += count
+
+    def extend(self, records):
+        for record in records:
+            self.add(*record)
+
+    def by_province(self):
+        """
+        ตาราง Report_by_Province คืน (Categories เรียงตามชื่อ, แถว [จังหวัด, จำนวนของแต่ละ Category])
+        แถวเรียงตามจังหวัด ช่องที่ไม่มี error = 0
+        """
+        provinces = sorted({province for province, _ in self.province_counts})
+        categories = sorted({category for _, category in self.province_counts})
+        rows = [[province] + [self.province_counts.get((province, category), 0) for category in categories]
+                for province in provinces]
+        return categories, rows
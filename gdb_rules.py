@@ -0,0 +1,836 @@
+# =============================================================================
+# - ตารางกฎตรวจข้อมูล (declarative) ของแต่ละชั้นข้อมูล + ตัว engine ที่ตรวจทุกกฎ
+#   ในการอ่าน cursor รอบเดียว
+# - กฎแต่ละข้อเป็น dict {"rule": ชนิดกฎ, "field": ..., ...} เรียงตามลำดับการตรวจในแต่ละแถว
+#   ข้อความ / Check_Type ตรงกับที่ validator เดิมเขียนทุกตัวอักษร
+# - ชุดกฎ (RULE_SETS): "v1" = validate_gdb.py, "v15" = check_required_featureclass.py
+#   กฎที่ต่างกันระหว่างสองสคริปต์ระบุ "rule_set" ไว้ในตาราง
+# - ตารางถูก compile ครั้งเดียวตอน import (หาชนิดกฎ, รวบรวมฟิลด์ที่ต้องอ่าน)
+#   แล้วผูกกับตำแหน่งคอลัมน์ของ cursor ต่อ layer: อ่านค่าด้วย row[i] ไม่ต้องสร้าง dict ทีละแถว
+# - กฎที่ต้องรอดูทั้ง layer (ค่าซ้ำ, 1 ต่อ 1) เก็บค่าระหว่างอ่าน แล้วเขียน error ตอนจบ
+#   ตามลำดับในตาราง (หรือ report_order)
+#   กฎค่าซ้ำเก็บ key ใน KeyGroups (gdb_dupkeys) เกินงบหน่วยความจำแล้วเขียนลงดิสก์ได้
+# =============================================================================
+
+import time
+from collections import defaultdict
+from gdb_dupkeys import KeyGroups
+
+# --------------------------------------------
+#   โดเมนค่าและฟังก์ชันที่ใช้ร่วมกัน
+# --------------------------------------------
+NUMERIC_TYPES = {"SmallInteger", "Integer", "Single", "Double", "Float", "DoubleFloat", "SingleFloat", "OID"}
+
+
+ROAD_LAND_USE_DOMAIN = {
+    "พาณิชยกรรม", "อุตสาหกรรม", "พาณิชยกรรมและที่อยู่อาศัย", "ที่อยู่อาศัย",
+    "ที่อยู่อาศัยและเกษตรกรรม", "ส่วนราชการ", "เกษตรกรรม", "พื้นที่ป่าสงวน", "พื้นที่อุทยาน"
+}
+ROAD_STREET_TYPE_DOMAIN = {
+    "คอนกรีต", "ลาดยาง", "หินคลุก", "ลูกรัง", "ดิน", "น้ำ", "ไม้", "ทางไม่มีสภาพ"
+}
+ROAD_REQ_NAME_TD_CODES = {1, 2, 3, 4, 5, 6, 8}
+REL_TABLE_NO_DOMAIN = {1, 2, 3, 41, 42, 5, 6, 7}
+REL_SUB_TABLE_NO_RANGE = range(0, 7) # 0-6
+
+
+def is_numeric_field_type(field_type):
+    if not field_type:
+        return False
+    return field_type in NUMERIC_TYPES or field_type.lower() in {"double","single","float","integer","smallinteger","short","long"}
+
+def can_be_number(val):
+    if val is None:
+        return False
+    if isinstance(val, (int, float)):
+        return True
+    try:
+        float(val)
+        return True
+    except Exception:
+        return False
+
+def safe_value_is_int_like(val):
+    if val is None: return False
+    try:
+        if isinstance(val, (int, float)):
+            return float(val).is_integer()
+        if isinstance(val, str) and val.isdigit():
+            return True
+        return False
+    except Exception:
+        return False
+
+def _digits_ok(val, length, strip=False):
+    """ค่าเป็น String ตัวเลขล้วน ยาว length หลัก (strip=True ตัดช่องว่างหัวท้ายก่อน)"""
+    if not isinstance(val, str):
+        return False
+    if strip:
+        val = val.strip()
+    return len(val) == length and val.isdigit()
+
+def _is_blank(val):
+    """None หรือ String ที่มีแต่ช่องว่าง"""
+    return val is None or (isinstance(val, str) and val.strip() == "")
+
+
+################################################
+#----------------- ชนิดกฎ (rule kinds)
+################################################
+# ฟังก์ชันแต่ละตัวรับ (rule, col) คืน (check, finalize)
+#   col(ชื่อฟิลด์)  -> ตำแหน่งของฟิลด์ใน row (row[0] = OID@)
+#   check(row)     -> None หรือ (check_type, field, ค่าที่รายงาน, ข้อความ)
+#   finalize(emit) -> เขียน error ที่ต้องรอจบ layer (หรือ None ถ้าไม่มี)
+# state ของกฎ (เช่น dict เก็บค่าซ้ำ) สร้างใหม่ทุกครั้งที่ผูกกับ layer
+
+def _rule_digits(rule, col):
+    """String ตัวเลข N หลัก (ตรวจเฉพาะแถวที่ฟิลด์ใน requires มีค่า)"""
+    i = col(rule["field"])
+    length, strip = rule["length"], rule.get("strip", False)
+    requires = [col(f) for f in rule.get("requires", ())]
+    check_type, field, message = rule["check_type"], rule["field"], rule["message"]
+
+    def check(row):
+        for j in requires:
+            if not row[j]:
+                return None
+        val = row[i]
+        if isinstance(val, str):
+            digits = val.strip() if strip else val
+            if len(digits) == length and digits.isdigit():
+                return None
+        return (check_type, field, val, message)
+    return check, None
+
+def _rule_prefix(rule, col):
+    """ค่าต้องขึ้นต้นด้วยค่าของ prefix_field (ข้อความใช้ {prefix})"""
+    i, p = col(rule["field"]), col(rule["prefix_field"])
+    valid_length = rule.get("valid_length")
+    requires = [col(f) for f in rule.get("requires", ())]
+    check_type, field, message = rule["check_type"], rule["field"], rule["message"]
+
+    def check(row):
+        for j in requires:
+            if not row[j]:
+                return None
+        val, prefix = row[i], row[p]
+        if valid_length and not _digits_ok(val, valid_length, True):
+            return None
+        if isinstance(val, str) and isinstance(prefix, str) and not val.startswith(prefix):
+            return (check_type, field, val, message.format(prefix=prefix))
+    return check, None
+
+def _rule_typed_domain(rule, col):
+    """ต้องเป็นตัวเลข (ไม่ใช่แจ้ง type_message) และ int(ค่า) อยู่ใน allowed"""
+    i = col(rule["field"])
+    allowed = rule["allowed"]
+    type_error = (rule["type_check_type"], rule["field"], rule["type_message"])
+    check_type, field, message = rule["check_type"], rule["field"], rule["message"]
+
+    def check(row):
+        val = row[i]
+        if not (isinstance(val, (int, float)) or (isinstance(val, str) and val.isdigit())):
+            return (type_error[0], type_error[1], val, type_error[2])
+        try:
+            if int(float(val)) not in allowed:
+                return (check_type, field, val, message)
+        except Exception:
+            pass
+    return check, None
+
+def _rule_int_domain(rule, col):
+    """ต้องไม่ว่าง และ int(float(ค่า)) อยู่ใน allowed (แปลงไม่ได้ = Cursor Error แบบเดิม)"""
+    i = col(rule["field"])
+    allowed = rule["allowed"]
+    check_type, field, message = rule["check_type"], rule["field"], rule["message"]
+
+    def check(row):
+        val = row[i]
+        if val is None or int(float(val)) not in allowed:
+            return (check_type, field, val, message)
+    return check, None
+
+def _rule_number_domain(rule, col):
+    """ต้องเป็นตัวเลข และ int(ค่า) อยู่ใน allowed (allow_null=True ยอมให้ว่าง)"""
+    i = col(rule["field"])
+    allowed, allow_null = rule["allowed"], rule.get("allow_null", False)
+    check_type, field, message = rule["check_type"], rule["field"], rule["message"]
+
+    def check(row):
+        val = row[i]
+        if val is None and allow_null:
+            return None
+        if not can_be_number(val) or int(float(val)) not in allowed:
+            return (check_type, field, val, message)
+    return check, None
+
+def _rule_value_domain(rule, col):
+    """ค่าดิบต้องอยู่ใน allowed"""
+    i = col(rule["field"])
+    allowed = rule["allowed"]
+    check_type, field, message = rule["check_type"], rule["field"], rule["message"]
+
+    def check(row):
+        val = row[i]
+        if val not in allowed:
+            return (check_type, field, val, message)
+    return check, None
+
+def _rule_text_domain(rule, col):
+    """ข้อความ (ตัดช่องว่าง) ต้องอยู่ใน allowed ตรวจเฉพาะเมื่อ when_filled มีค่า"""
+    i, w = col(rule["field"]), col(rule["when_filled"])
+    allowed = rule["allowed"]
+    check_type, field, message = rule["check_type"], rule["field"], rule["message"]
+
+    def check(row):
+        if _is_blank(row[w]):
+            return None
+        val = row[i]
+        if val is None or str(val).strip() not in allowed:
+            return (check_type, field, val, message)
+    return check, None
+
+def _rule_number(rule, col):
+    """ต้องเป็นตัวเลขและไม่ว่าง"""
+    i = col(rule["field"])
+    check_type, field, message = rule["check_type"], rule["field"], rule["message"]
+
+    def check(row):
+        val = row[i]
+        if val is None or not can_be_number(val):
+            return (check_type, field, val, message)
+    return check, None
+
+def _rule_nonzero(rule, col):
+    """ต้องไม่ว่างและไม่ใช่ 0"""
+    i = col(rule["field"])
+    check_type, field, message = rule["check_type"], rule["field"], rule["message"]
+
+    def check(row):
+        val = row[i]
+        if val is None or (can_be_number(val) and float(val) == 0.0):
+            return (check_type, field, val, message)
+    return check, None
+
+def _rule_not_blank(rule, col):
+    """ต้องไม่ว่าง ไม่ใช่ช่องว่าง และไม่ใช่ '-'"""
+    i = col(rule["field"])
+    check_type, field, message = rule["check_type"], rule["field"], rule["message"]
+
+    def check(row):
+        val = row[i]
+        if not val or (isinstance(val, str) and (val.strip() == "" or val.strip() == "-")):
+            return (check_type, field, val, message)
+    return check, None
+
+def _branch_key(branch, str_only):
+    if str_only:
+        return branch.strip() if isinstance(branch, str) else "NULL"
+    return branch.strip() if branch else "NULL"
+
+def _rule_unique_within(rule, col, new_groups=KeyGroups):
+    """
+    ค่าตัวเลขต้องไม่ซ้ำภายในกลุ่ม within (เช่น BRANCH_CODE)
+    report_value: "key" รายงาน (กลุ่ม, ค่า) / "value" รายงานเฉพาะค่า ; ข้อความใช้ {branch}
+    """
+    i, g = col(rule["field"]), col(rule["within"])
+    str_only = rule.get("str_only", False)
+    report_key = rule.get("report_value", "value") == "key"
+    check_type, field, message = rule["check_type"], rule["field"], rule["message"]
+    groups = new_groups()
+
+    def check(row):
+        val = row[i]
+        if val is not None and can_be_number(val):
+            groups.add((_branch_key(row[g], str_only), int(float(val))), row[0])
+
+    def finalize(emit):
+        for key, oids in groups.duplicates():
+            emit(check_type, str(oids), field, key if report_key else key[1], message.format(branch=key[0]))
+    return check, finalize
+
+def _rule_unique_key(rule, col, new_groups=KeyGroups):
+    """
+    กลุ่ม + ฟิลด์ใน fields ต้องไม่ซ้ำกัน ตรวจเฉพาะแถวที่ when_nonzero ไม่ว่างและไม่ใช่ 0
+    ฟิลด์ใน int_fields แปลงเป็น int ก่อนเทียบ (ถ้าเป็นตัวเลข)
+    """
+    g, z = col(rule["within"]), col(rule["when_nonzero"])
+    positions = [col(f) for f in rule["fields"]]
+    int_slots = [k for k, f in enumerate(rule["fields"]) if f in rule.get("int_fields", ())]
+    check_type, field, message = rule["check_type"], rule["report_field"], rule["message"]
+    groups = new_groups()
+
+    def check(row):
+        gate = row[z]
+        if gate is None or not can_be_number(gate) or int(float(gate)) == 0:
+            return None
+        values = [row[j] for j in positions]
+        for k in int_slots:
+            if can_be_number(values[k]):
+                values[k] = int(float(values[k]))
+        branch = row[g]
+        groups.add((branch.strip() if branch else "NULL", *values), row[0])
+
+    def finalize(emit):
+        for key, oids in groups.duplicates():
+            emit(check_type, str(oids), field, key, message)
+    return check, finalize
+
+def _rule_one_to_one(rule, col):
+    """
+    name_field กับ code_field ต้องจับคู่กันแบบ 1 ต่อ 1 (ตรวจเฉพาะแถวที่มีค่าทั้งคู่)
+    within : ถ้าระบุ (เช่น BRANCH_CODE) จับคู่แยกตามกลุ่ม ชื่อเดียวกันใช้ต่างรหัสในต่างกลุ่มได้
+    ข้อความใช้ {name} {code} {other} {branch}
+    """
+    n, c = col(rule["field"]), col(rule["code_field"])
+    w = col(rule["within"]) if "within" in rule else None
+    name_field, code_field = rule["field"], rule["code_field"]
+    name_message, code_message = rule["message"], rule["code_message"]
+    check_type = rule["check_type"]
+    pairs = []
+
+    def check(row):
+        name, code = row[n], row[c]
+        if name and code:
+            pairs.append((None if w is None else _branch_key(row[w], False), name, code))
+
+    def finalize(emit):
+        name_to_code = defaultdict(dict)
+        code_to_name = defaultdict(dict)
+        for branch, name, code in pairs:
+            names, codes = name_to_code[branch], code_to_name[branch]
+            if name in names and names[name] != code:
+                emit(check_type, "N/A", name_field, name, name_message.format(name=name, code=code, other=names[name], branch=branch))
+            if code in codes and codes[code] != name:
+                emit(check_type, "N/A", code_field, code, code_message.format(name=name, code=code, other=codes[code], branch=branch))
+            names[name] = code
+            codes[code] = name
+    return check, finalize
+
+def _rule_utmmap4_scale(rule, col):
+    """UTMMAP4 (ที่เป็น 2 หลักแล้ว) ต้องสอดคล้องกับ UTMSCALE"""
+    i, s = col(rule["field"]), col(rule["scale_field"])
+    ranges = rule["ranges"]
+    check_type, field = rule["check_type"], rule["field"]
+
+    def check(row):
+        utm4 = row[i]
+        if not _digits_ok(utm4, 2):
+            return None
+        scale = row[s]
+        try:
+            scale_i = int(float(scale)) if scale is not None else None
+        except Exception:
+            scale_i = None
+        if scale_i == 4000 and utm4 != '00':
+            return (check_type, field, utm4, "UTMMAP4 ต้องเป็น '00' เนื่องจาก UTMSCALE=4000")
+        if scale_i in ranges:
+            upper = ranges[scale_i]
+            try:
+                if not (1 <= int(utm4) <= upper):
+                    return (check_type, field, utm4, f"UTMMAP4 ต้องอยู่ระหว่าง '01'-'{upper:02d}' เนื่องจาก UTMSCALE={scale_i}")
+            except Exception:
+                pass
+    return check, None
+
+def _rule_td_code(rule, col):
+    """
+    TD_RP3_TYPE_CODE ต้องเป็นตัวเลข ถ้า name_field มีค่าต้องอยู่ใน codes
+    ถ้า name_field ว่างต้องเป็น 0, ว่าง หรืออยู่ใน codes
+    """
+    i, n = col(rule["field"]), col(rule["name_field"])
+    codes = rule["codes"]
+    allowed_when_empty = {0, None} | set(codes)
+    field = rule["field"]
+
+    def check(row):
+        td = row[i]
+        if td is None:
+            td_int = None
+        elif can_be_number(td):
+            td_int = int(float(td))
+        else:
+            return ("Data Format", field, td, rule["format_message"])
+        if not _is_blank(row[n]):
+            if td_int not in codes:
+                return ("Data Specified", field, td, rule["filled_message"])
+        elif td_int not in allowed_when_empty:
+            return ("Data Specified", field, td, rule["empty_message"])
+    return check, None
+
+def _rule_required_by_code(rule, col):
+    """field ต้องไม่ว่าง เมื่อ int(code_field) อยู่ใน codes (ข้อความใช้ {code})"""
+    i, t = col(rule["field"]), col(rule["code_field"])
+    codes = rule["codes"]
+    check_type, field, message = rule["check_type"], rule["field"], rule["message"]
+
+    def check(row):
+        td = row[t]
+        td_int = int(float(td)) if td is not None and can_be_number(td) else None
+        if td_int in codes and _is_blank(row[i]):
+            return (check_type, field, row[i], message.format(code=td_int))
+    return check, None
+
+RULE_KINDS = {
+    "digits": _rule_digits,
+    "prefix": _rule_prefix,
+    "typed_domain": _rule_typed_domain,
+    "int_domain": _rule_int_domain,
+    "number_domain": _rule_number_domain,
+    "value_domain": _rule_value_domain,
+    "text_domain": _rule_text_domain,
+    "number": _rule_number,
+    "nonzero": _rule_nonzero,
+    "not_blank": _rule_not_blank,
+    "unique_within": _rule_unique_within,
+    "unique_key": _rule_unique_key,
+    "one_to_one": _rule_one_to_one,
+    "utmmap4_scale": _rule_utmmap4_scale,
+    "td_code": _rule_td_code,
+    "required_by_code": _rule_required_by_code,
+}
+
+# ชนิดกฎที่เก็บ key ทั้ง layer (รับตัวสร้าง KeyGroups จาก bind)
+_KEY_GROUP_KINDS = (_rule_unique_within, _rule_unique_key)
+
+# ฟิลด์ใน dict ของกฎที่เป็นชื่อฟิลด์ (ใช้รวบรวมรายการฟิลด์ที่ต้องอ่าน)
+_FIELD_KEYS = ("field", "prefix_field", "when_filled", "within", "when_nonzero", "code_field", "scale_field", "name_field", "requires", "fields")
+
+
+################################################
+#----------------- ตารางกฎของแต่ละชั้นข้อมูล
+################################################
+# required         : ฟิลด์ที่ต้องมี (Field Check)
+# required_message : ข้อความเมื่อไม่พบฟิลด์
+# field_types      : ลำดับการตรวจ Field Type [(ฟิลด์, "String"/"Number"), ...]
+# rules            : กฎระดับแถว เรียงตามลำดับการตรวจ
+#                    กฎค่าซ้ำ / 1 ต่อ 1 เขียน error ตอนจบตามลำดับนี้ ยกเว้นกำหนด "report_order" ไว้
+#                    กฎที่ระบุ "rule_set" ใช้เฉพาะในชุดกฎนั้น (ดู RULE_SETS) ไม่ระบุ = ใช้ทุกชุด
+
+# ชุดกฎ (ทั้งสองชุดใช้ตารางเดียวกัน ต่างกันเฉพาะกฎที่ระบุ "rule_set")
+#   "v1"  : validate_gdb.py
+#   "v15" : check_required_featureclass.py (Script v15)
+#           - 1 ต่อ 1 ของ STREET_NAME/STREET_CODE (ROAD, BLOCK_FIX) แยกตาม BRANCH_CODE
+#           - ไม่ตรวจ BLOCK_FIX_RN ซ้ำ
+#           - ข้อความ Duplicate UTM ของ PARCEL_NS3K "มีค่าซ้ำ"
+RULE_SETS = ("v1", "v15")
+
+_PARCEL_FIELD_TYPES = [
+    ("UTMMAP1", "String"), ("UTMMAP2", "Number"), ("UTMMAP3", "String"), ("UTMMAP4", "String"),
+    ("UTMSCALE", "Number"), ("LAND_NO", "Number"), ("PARCEL_TYPE", "Number"),
+    ("CHANGWAT_CODE", "String"), ("BRANCH_CODE", "String"),
+]
+_UTM_KEY_FIELDS = ["UTMMAP1", "UTMMAP2", "UTMMAP3", "UTMMAP4", "UTMSCALE", "LAND_NO"]
+_REL_NONZERO_FIELDS = ("DEPTH_R", "START_X", "START_Y", "END_X", "END_Y")
+_REL_NUMBER_FIELDS = ["STREET_RN", "BLOCK_FIX_RN", "BLOCK_BLUE_RN", "BLOCK_PRICE_RN", "TABLE_NO", "SUB_TABLE_NO", "DEPTH_R", "DEPTH_GROUP", "START_X", "START_Y", "END_X", "END_Y"]
+
+LAYER_RULES = {
+    # 1) PARCEL
+    "PARCEL": {
+        "required": ["UTMMAP1","UTMMAP2","UTMMAP3","UTMMAP4","UTMSCALE","LAND_NO","PARCEL_TYPE","CHANGWAT_CODE","BRANCH_CODE","PARCEL_RN"],
+        "required_message": "ไม่พบฟิลด์นี้",
+        "field_types": _PARCEL_FIELD_TYPES,
+        "rules": [
+            # 1.1.1. UTMMAP1 ต้องเป็น String และเป็น 4 หลักเท่านั้น เช่น "5042"
+            {"rule": "digits", "field": "UTMMAP1", "length": 4, "check_type": "Data Format", "message": "UTMMAP1 ต้องเป็น 4 หลัก"},
+            # 1.1.2. UTMMAP2 ต้องเป็น Number และต้องเป็น 1 หรือ 2 หรือ 3 หรือ 4 เท่านั้น
+            {"rule": "typed_domain", "field": "UTMMAP2", "allowed": (1,2,3,4),
+             "type_check_type": "Field Type", "type_message": "ประเภทข้อมูลต้องเป็น Number และไม่ควรว่าง",
+             "check_type": "Data Format", "message": "UTMMAP2 ต้องเป็น 1 - 4 "},
+            # 1.1.3. UTMMAP3 ต้องเป็น String และเป็น 4 หลักเท่านั้น เช่น "0016"
+            {"rule": "digits", "field": "UTMMAP3", "length": 4, "check_type": "Data Format", "message": "UTMMAP3 ต้องเป็น 4 หลัก"},
+            # 1.1.4. UTMMAP4 ต้องเป็น String และเป็น 2 หลักเท่านั้น เช่น "02" และสอดคล้องกับ UTMSCALE
+            {"rule": "digits", "field": "UTMMAP4", "length": 2, "check_type": "Data Format", "message": "UTMMAP4 ของชั้น PARCEL ต้องเป็น 2 หลัก"},
+            {"rule": "utmmap4_scale", "field": "UTMMAP4", "scale_field": "UTMSCALE", "ranges": {2000: 4, 1000: 16, 500: 64}, "check_type": "Conditional Rule"},
+            # 1.1.5. UTMSCALE ต้องเป็น Number และเป็น 4000 หรือ 2000 หรือ 1000 หรือ 500 เท่านั้น
+            {"rule": "int_domain", "field": "UTMSCALE", "allowed": (4000,2000,1000,500), "check_type": "Conditional Rule", "message": "UTMSCALE ของฟีเจอร์คลาส PARCEL จะต้องเป็น 4000,2000,1000 หรือ 500"},
+            # 1.1.8. CHANGWAT_CODE ต้องเป็น String และเป็น 2 หลัก เช่น "66"
+            {"rule": "digits", "field": "CHANGWAT_CODE", "length": 2, "check_type": "Data Format", "message": "CHANGWAT_CODE ต้องเป็น 2 หลัก"},
+            # 1.1.9. BRANCH_CODE ต้องเป็น String 8 หลัก และสองหลักแรกตรงกับ CHANGWAT_CODE
+            {"rule": "digits", "field": "BRANCH_CODE", "length": 8, "strip": True, "check_type": "Data Format", "message": "BRANCH_CODE ต้องเป็น 8 หลัก"},
+            {"rule": "prefix", "field": "BRANCH_CODE", "prefix_field": "CHANGWAT_CODE", "valid_length": 8, "check_type": "Conditional Rule", "message": "2 หลักแรกของ BRANCH_CODE ไม่ตรงกับ CHANGWAT_CODE {prefix}"},
+            # 1.1.10. PARCEL_RN ต้องเป็น Number
+            {"rule": "number", "field": "PARCEL_RN", "check_type": "Field Type", "message": "ต้องเป็น Number และไม่ควรว่าง"},
+            # 1.1.10. PARCEL_RN ใน BRANCH_CODE เดียวกัน จะต้องไม่มีค่าซ้ำ
+            {"rule": "unique_within", "field": "PARCEL_RN", "within": "BRANCH_CODE", "report_value": "key",
+             "check_type": "Duplicate Value", "message": "PARCEL_RN มีค่าซ้ำภายใน BRANCH_CODE เดียวกัน"},
+            # 1.2. ถ้า LAND_NO ไม่ใช่ค่าว่าง หรือ 0 : BRANCH_CODE+UTMMAP1-4+UTMSCALE+LAND_NO ต้องไม่ซ้ำกัน
+            {"rule": "unique_key", "within": "BRANCH_CODE", "fields": _UTM_KEY_FIELDS, "int_fields": ["UTMSCALE"], "when_nonzero": "LAND_NO", "report_order": 0,
+             "check_type": "Duplicate UTM", "report_field": "PRIMERY_KEY", "message": "BRANCH_CODE+UTMMAP1+UTMMAP2+UTMMAP3+UTMMAP4+UTMSCALE+LAND_NO มีค่าซ้ำ"},
+        ],
+    },
+    # 2) PARCEL_NS3K
+    "PARCEL_NS3K": {
+        "required": ["UTMMAP1","UTMMAP2","UTMMAP3","UTMMAP4","UTMSCALE","LAND_NO","PARCEL_TYPE","CHANGWAT_CODE","BRANCH_CODE","NS3K_RN"],
+        "required_message": "ไม่พบฟิลด์นี้",
+        "field_types": _PARCEL_FIELD_TYPES,
+        "rules": [
+            # 2.1.1. UTMMAP1 ต้องเป็น String และเป็น 4 หลักเท่านั้น
+            {"rule": "digits", "field": "UTMMAP1", "length": 4, "check_type": "Data Format", "message": "UTMMAP1 ต้องมี 4 หลัก"},
+            # 2.1.2. UTMMAP2 ต้องเป็น Number และต้องเป็น 1 หรือ 2 หรือ 3 หรือ 4 เท่านั้น
+            {"rule": "typed_domain", "field": "UTMMAP2", "allowed": (1,2,3,4),
+             "type_check_type": "Data Format", "type_message": "รูปแบบข้อมูลต้องเป็น Number",
+             "check_type": "Data Format", "message": "UTMMAP2 ต้องอยู่ระหว่าง 1-4"},
+            # 2.1.3. UTMMAP3 ต้องเป็น String และต้องเป็น '0000' เท่านั้น
+            {"rule": "value_domain", "field": "UTMMAP3", "allowed": ("0000",), "check_type": "Conditional Rule", "message": "UTMMAP3 ของ NS3K ต้องเป็น '0000'"},
+            # 2.1.4. UTMMAP4 ต้องเป็น String และเป็น 3 หลักเท่านั้น เช่น "002"
+            {"rule": "digits", "field": "UTMMAP4", "length": 3, "check_type": "Data Format", "message": "ต้องเป็น 3 หลัก"},
+            # 2.1.5. UTMSCALE ต้องเป็น Number และต้องเป็น 5000 เท่านั้น
+            {"rule": "int_domain", "field": "UTMSCALE", "allowed": (5000,), "check_type": "Conditional Rule", "message": "UTMSCALE ของ NS3K ต้องเป็น 5000"},
+            # 2.1.7. PARCEL_TYPE ต้องเป็น Number และต้องเป็น 3 เท่านั้น
+            {"rule": "value_domain", "field": "PARCEL_TYPE", "allowed": (3,), "check_type": "Conditional Rule", "message": "PARCEL_TYPE ของ NS3K ต้องเป็น 3"},
+            # 2.1.8. CHANGWAT_CODE ต้องเป็น String และเป็น 2 หลัก
+            {"rule": "digits", "field": "CHANGWAT_CODE", "length": 2, "check_type": "Data Format", "message": "ต้องเป็น 2 หลัก"},
+            # 2.1.9. BRANCH_CODE ต้องเป็น String 8 หลัก และสองหลักแรกตรงกับ CHANGWAT_CODE
+            {"rule": "digits", "field": "BRANCH_CODE", "length": 8, "strip": True, "check_type": "Data Format", "message": "ต้องเป็น 8 หลัก"},
+            {"rule": "prefix", "field": "BRANCH_CODE", "prefix_field": "CHANGWAT_CODE", "valid_length": 8, "check_type": "Conditional Rule", "message": "2 หลักแรกของ BRANCH_CODE ไม่ตรงกับ CHANGWAT_CODE {prefix}"},
+            # 2.1.10. NS3K_RN ต้องเป็น Number
+            {"rule": "number", "field": "NS3K_RN", "check_type": "Field Type", "message": "ต้องเป็น Number"},
+            # 2.1.10. NS3K_RN ใน BRANCH_CODE เดียวกัน จะต้องไม่มีค่าซ้ำ
+            {"rule": "unique_within", "field": "NS3K_RN", "within": "BRANCH_CODE", "report_value": "key",
+             "check_type": "Duplicate Value", "message": "NS3K_RN ซ้ำภายใน BRANCH_CODE เดียวกัน"},
+            # 2.2. ถ้า LAND_NO ไม่ใช่ค่าว่าง หรือ 0 : BRANCH_CODE+UTMMAP1-4+UTMSCALE+LAND_NO ต้องไม่ซ้ำกัน
+            {"rule": "unique_key", "within": "BRANCH_CODE", "fields": _UTM_KEY_FIELDS, "int_fields": ["UTMSCALE"], "when_nonzero": "LAND_NO", "report_order": 0,
+             "check_type": "Duplicate UTM", "report_field": "PRIMERY_KEY", "rule_set": "v1",
+             "message": "BRANCH_CODE+UTMMAP1+UTMMAP2+UTMMAP3+UTMMAP4+UTMSCALE+LAND_NO not unique"},
+            {"rule": "unique_key", "within": "BRANCH_CODE", "fields": _UTM_KEY_FIELDS, "int_fields": ["UTMSCALE"], "when_nonzero": "LAND_NO", "report_order": 0,
+             "check_type": "Duplicate UTM", "report_field": "PRIMERY_KEY", "rule_set": "v15",
+             "message": "BRANCH_CODE+UTMMAP1+UTMMAP2+UTMMAP3+UTMMAP4+UTMSCALE+LAND_NO มีค่าซ้ำ"},
+        ],
+    },
+    # 3) ROAD
+    "ROAD": {
+        "required": ["STREET_NAME","STREET_CODE","STREET_DEPTH","LAND_USE","STREET_TYPE","STREET_WIDTH","STREET_AREA","BRANCH_CODE","PARCEL_TYPE","TD_RP3_TYPE_CODE","STREET_RN","CHANGWAT_CODE","STREET_SMG"],
+        "required_message": "ไม่พบฟิลด์นี้",
+        "field_types": [
+            ("STREET_NAME", "String"), ("STREET_CODE", "String"), ("STREET_DEPTH", "Number"), ("LAND_USE", "String"),
+            ("STREET_TYPE", "String"), ("STREET_WIDTH", "Number"), ("STREET_AREA", "Number"), ("BRANCH_CODE", "String"),
+            ("PARCEL_TYPE", "Number"), ("TD_RP3_TYPE_CODE", "Number"), ("STREET_RN", "Number"), ("CHANGWAT_CODE", "String"),
+            ("STREET_SMG", "String"),
+        ],
+        "rules": [
+            # 3.1.4. LAND_USE ต้องอยู่ในโดเมน (ตรวจเฉพาะเมื่อ STREET_NAME ไม่ว่าง)
+            {"rule": "text_domain", "field": "LAND_USE", "when_filled": "STREET_NAME", "allowed": ROAD_LAND_USE_DOMAIN,
+             "check_type": "Data Specified", "message": f"LAND_USE จะต้องมีค่าดังต่อไปนี้ {ROAD_LAND_USE_DOMAIN} (เมื่อ STREET_NAME มีค่า)"},
+            # 3.1.5. STREET_TYPE ต้องอยู่ในโดเมน (ตรวจเฉพาะเมื่อ STREET_NAME ไม่ว่าง)
+            {"rule": "text_domain", "field": "STREET_TYPE", "when_filled": "STREET_NAME", "allowed": ROAD_STREET_TYPE_DOMAIN,
+             "check_type": "Data Specified", "message": f"STREET_TYPE จะต้องมีค่าดังต่อไปนี้ {ROAD_STREET_TYPE_DOMAIN} (เมื่อ STREET_NAME มีค่า)"},
+            # 3.1.8. CHANGWAT_CODE ต้องเป็น String และเป็น 2 หลัก
+            {"rule": "digits", "field": "CHANGWAT_CODE", "length": 2, "check_type": "Data Format", "message": "ต้องเป็น 2 หลัก"},
+            # 3.1.9. BRANCH_CODE ต้องเป็น 8 หลัก และสองหลักแรกตรงกับ CHANGWAT_CODE (เมื่อมีค่าทั้งคู่)
+            {"rule": "digits", "field": "BRANCH_CODE", "length": 8, "strip": True, "requires": ["BRANCH_CODE", "CHANGWAT_CODE"],
+             "check_type": "Data Format", "message": "BRANCH_CODE ต้องเป็น 8 หลัก"},
+            {"rule": "prefix", "field": "BRANCH_CODE", "prefix_field": "CHANGWAT_CODE", "requires": ["BRANCH_CODE", "CHANGWAT_CODE"],
+             "check_type": "Conditional Rule", "message": "2 หลักแรกของ BRANCH_CODE ไม่ตรงกับ CHANGWAT_CODE {prefix}"},
+            # 3.1.11. TD_RP3_TYPE_CODE ต้องเป็น Number และเป็น 1,2,3,4,5,6,8 (เมื่อ STREET_NAME มีค่า)
+            {"rule": "td_code", "field": "TD_RP3_TYPE_CODE", "name_field": "STREET_NAME", "codes": ROAD_REQ_NAME_TD_CODES,
+             "format_message": "TD_RP3_TYPE_CODE ต้องเป็นตัวเลขเท่านั้น",
+             "filled_message": f"TD_RP3_TYPE_CODE ต้องมีค่าเป็น {sorted(ROAD_REQ_NAME_TD_CODES)} (เนื่องจาก STREET_NAME มีค่า)",
+             "empty_message": "TD_RP3_TYPE_CODE ต้องเป็น {0, None} หรือ " + str(sorted(ROAD_REQ_NAME_TD_CODES)) + " (เนื่องจาก STREET_NAME ว่างเปล่า)"},
+            # 3.1.1. ถ้า TD_RP3_TYPE_CODE เป็น 1,2,3,4,5,6,8 STREET_NAME จะต้องไม่ใช่ค่าว่าง
+            {"rule": "required_by_code", "field": "STREET_NAME", "code_field": "TD_RP3_TYPE_CODE", "codes": ROAD_REQ_NAME_TD_CODES,
+             "check_type": "Data Required", "message": "STREET_NAME ต้องไม่เป็นค่าว่าง เนื่องจาก TD_RP3_TYPE_CODE คือ {code}"},
+            # 3.1.12. STREET_RN ต้องเป็น Number
+            {"rule": "number", "field": "STREET_RN", "check_type": "Data Format", "message": "STREET_RN ต้องเป็น Number"},
+            # 3.1.12. STREET_RN ใน BRANCH_CODE เดียวกัน จะต้องไม่มีค่าซ้ำ
+            {"rule": "unique_within", "field": "STREET_RN", "within": "BRANCH_CODE", "str_only": True,
+             "check_type": "Duplicate Value", "message": "STREET_RN ซ้ำ ภายใน BRANCH_CODE '{branch}'"},
+            # STREET_NAME และ STREET_CODE ต้องจับคู่กันแบบ 1 ต่อ 1 (v15: ภายใน BRANCH_CODE เดียวกัน)
+            {"rule": "one_to_one", "field": "STREET_NAME", "code_field": "STREET_CODE", "check_type": "OneToOne", "report_order": 0, "rule_set": "v1",
+             "message": "{name} ตรวจพบว่าเชื่อมต่อกับ STREET_CODE มากกว่า 1  ({other} vs {code})",
+             "code_message": "{code} ตรวจพบว่าเชื่อมต่อกับ STREET_NAME มากกว่า 1 ({other} vs {name})"},
+            {"rule": "one_to_one", "field": "STREET_NAME", "code_field": "STREET_CODE", "within": "BRANCH_CODE", "check_type": "OneToOne", "report_order": 0, "rule_set": "v15",
+             "message": "{name} เชื่อมต่อกับ STREET_CODE มากกว่า 1 ค่า (ภายใน BRANCH_CODE '{branch}')",
+             "code_message": "{code} เชื่อมต่อกับ STREET_NAME มากกว่า 1 ค่า (ภายใน BRANCH_CODE '{branch}')"},
+        ],
+    },
+    # 4) BLOCK_FIX
+    "BLOCK_FIX": {
+        "required": ["STREET_NAME", "STREET_CODE", "BRANCH_CODE", "BLOCK_FIX_RN"],
+        "required_message": "ไม่พบฟิลด์นี้",
+        "field_types": [("STREET_NAME", "String"), ("STREET_CODE", "String"), ("BRANCH_CODE", "String"), ("BLOCK_FIX_RN", "Number")],
+        "rules": [
+            # 4.1.1. STREET_NAME ต้องไม่ใช่ค่าว่าง (NULL) หรือ " " หรือขีดกลาง (-)
+            {"rule": "not_blank", "field": "STREET_NAME", "check_type": "Data Required", "message": "STREET_NAME ต้องไม่เป็นค่าว่าง, ช่องว่าง หรือ '-'"},
+            # 4.1.3. BRANCH_CODE ต้องเป็น String และมี 8 หลักเท่านั้น
+            {"rule": "digits", "field": "BRANCH_CODE", "length": 8, "strip": True, "check_type": "Data Format", "message": "BRANCH_CODE ต้องเป็น 8 หลัก"},
+            # BLOCK_FIX_RN ต้องเป็น Number และใน BRANCH_CODE เดียวกัน ต้องไม่ซ้ำ (v15 ไม่ตรวจค่าซ้ำ)
+            {"rule": "number", "field": "BLOCK_FIX_RN", "check_type": "Data Format", "message": "ต้องเป็น Number"},
+            {"rule": "unique_within", "field": "BLOCK_FIX_RN", "within": "BRANCH_CODE", "rule_set": "v1",
+             "check_type": "Duplicate Value", "message": "BLOCK_FIX_RN ซ้ำใน BRANCH_CODE '{branch}'"},
+            # 4.2. STREET_NAME กับ STREET_CODE ต้องจับคู่กันแบบ 1 ต่อ 1 (v15: ภายใน BRANCH_CODE เดียวกัน)
+            {"rule": "one_to_one", "field": "STREET_NAME", "code_field": "STREET_CODE", "check_type": "OneToOne", "rule_set": "v1",
+             "message": "{name} มี STREET_CODE มากกว่า 1", "code_message": "{code} มี STREET_NAME มากกว่า 1"},
+            {"rule": "one_to_one", "field": "STREET_NAME", "code_field": "STREET_CODE", "within": "BRANCH_CODE", "check_type": "OneToOne", "rule_set": "v15",
+             "message": "{name} เชื่อมต่อกับ STREET_CODE มากกว่า 1 ค่า (ภายใน BRANCH_CODE '{branch}')",
+             "code_message": "{code} เชื่อมต่อกับ STREET_NAME มากกว่า 1 ค่า (ภายใน BRANCH_CODE '{branch}')"},
+        ],
+    },
+    # 5) BLOCK_PRICE
+    "BLOCK_PRICE": {
+        "required": ["STREET_NAME", "STREET_CODE", "BRANCH_CODE", "BLOCK_PRICE_RN"],
+        "required_message": "ไม่พบฟิลด์นี้",
+        "field_types": [("STREET_NAME", "String"), ("STREET_CODE", "String"), ("BRANCH_CODE", "String"), ("BLOCK_PRICE_RN", "Number")],
+        "rules": [
+            # 5.1.1. STREET_NAME ต้องไม่ใช่ค่าว่าง (NULL) หรือ " " หรือขีดกลาง (-)
+            {"rule": "not_blank", "field": "STREET_NAME", "check_type": "Data Required", "message": "STREET_NAME ต้องไม่เป็นค่าว่าง, ช่องว่าง หรือ '-'"},
+            # 5.1.3. BRANCH_CODE ต้องเป็น String และมี 8 หลักเท่านั้น
+            {"rule": "digits", "field": "BRANCH_CODE", "length": 8, "strip": True, "check_type": "Data Format", "message": "BRANCH_CODE ต้องเป็น 8 หลัก"},
+            # 5.1.4. BLOCK_PRICE_RN ต้องเป็น Number และใน BRANCH_CODE เดียวกัน ต้องไม่ซ้ำกัน
+            {"rule": "number", "field": "BLOCK_PRICE_RN", "check_type": "Data Format", "message": "ต้องเป็น Number"},
+            {"rule": "unique_within", "field": "BLOCK_PRICE_RN", "within": "BRANCH_CODE",
+             "check_type": "Duplicate Value", "message": "BLOCK_PRICE_RN ซ้ำใน BRANCH_CODE '{branch}'"},
+        ],
+    },
+    # 6) BLOCK_BLUE
+    "BLOCK_BLUE": {
+        "required": ["BRANCH_CODE","BLOCK_BLUE_RN","BLOCK_TYPE_ID"],
+        "required_message": "ไม่พบฟิลด์นี้",
+        "field_types": [],
+        "rules": [
+            # 6.1.1. BRANCH_CODE ต้องเป็น String และมี 8 หลักเท่านั้น
+            {"rule": "digits", "field": "BRANCH_CODE", "length": 8, "strip": True, "check_type": "Data Format", "message": "BRANCH_CODE ต้องเป็น 8 หลัก"},
+            # BLOCK_BLUE_RN ต้องเป็น Number และใน BRANCH_CODE เดียวกัน ต้องไม่ซ้ำกัน
+            {"rule": "number", "field": "BLOCK_BLUE_RN", "check_type": "Data Format", "message": "ต้องเป็น Number"},
+            {"rule": "unique_within", "field": "BLOCK_BLUE_RN", "within": "BRANCH_CODE",
+             "check_type": "Duplicate Value", "message": "พบค่าซ้ำใน BRANCH_CODE '{branch}'"},
+            # 6.1.3. BLOCK_TYPE_ID ต้องเป็น Number และต้องเป็น 1 หรือ 2 หรือ 3 เท่านั้น
+            {"rule": "value_domain", "field": "BLOCK_TYPE_ID", "allowed": (1,2,3), "check_type": "Data Specified", "message": "BLOCK_TYPE_ID ต้องเป็น 1 หรือ 2 หรือ 3"},
+        ],
+    },
+    # 7) PARCEL_REL
+    "PARCEL_REL": {
+        "required": ["BRANCH_CODE","REL_RN","PARCEL_RN","STREET_RN","BLOCK_FIX_RN","BLOCK_BLUE_RN","BLOCK_PRICE_RN","TABLE_NO","SUB_TABLE_NO","DEPTH_R","DEPTH_GROUP","START_X","START_Y","END_X","END_Y"],
+        "required_message": "ไม่พบฟิลด์",
+        "field_types": [(f, "Number") for f in ["REL_RN", "PARCEL_RN"] + _REL_NUMBER_FIELDS],
+        "rules": [
+            # 7.1.1. BRANCH_CODE ต้องเป็น String และมี 8 หลักเท่านั้น
+            {"rule": "digits", "field": "BRANCH_CODE", "length": 8, "strip": True, "check_type": "Data Format", "message": "BRANCH_CODE ต้องเป็น 8 หลัก"},
+            # 7.1.2. REL_RN ต้องเป็น Number และใน BRANCH_CODE เดียวกันจะต้องไม่ซ้ำกัน
+            {"rule": "number", "field": "REL_RN", "check_type": "Data Format", "message": "REL_RN ต้องเป็น Number"},
+            {"rule": "unique_within", "field": "REL_RN", "within": "BRANCH_CODE",
+             "check_type": "Duplicate Value", "message": "ซ้ำภายใน BRANCH_CODE '{branch}'"},
+            # 7.1.8. TABLE_NO ต้องเป็น 1 หรือ 2 หรือ 3 หรือ 41 หรือ 42 หรือ 5 หรือ 6 หรือ 7 เท่านั้น
+            {"rule": "number_domain", "field": "TABLE_NO", "allowed": REL_TABLE_NO_DOMAIN, "check_type": "Data Specified", "message": f"ต้องเป็น {sorted(REL_TABLE_NO_DOMAIN)}"},
+            # 7.1.9. SUB_TABLE_NO ต้องมีค่าระหว่าง 0 - 6 หรือค่าว่าง เท่านั้น
+            {"rule": "number_domain", "field": "SUB_TABLE_NO", "allowed": REL_SUB_TABLE_NO_RANGE, "allow_null": True, "check_type": "Data Specified", "message": "ต้องเป็น 0-6 "},
+            # 7.1.10 - 7.1.15. DEPTH_R, START_X, START_Y, END_X, END_Y ต้องไม่ใช่ 0 หรือว่าง
+            *[{"rule": "nonzero", "field": f, "check_type": "Data Required", "message": f"{f} ต้องไม่ใช่ 0 หรือค่าว่าง"} for f in _REL_NONZERO_FIELDS],
+        ],
+    },
+    # 8) NS3K_REL
+    "NS3K_REL": {
+        "required": ["BRANCH_CODE","REL_RN","NS3K_RN","STREET_RN","BLOCK_FIX_RN","BLOCK_BLUE_RN","BLOCK_PRICE_RN","TABLE_NO","SUB_TABLE_NO","DEPTH_R","DEPTH_GROUP","START_X","START_Y","END_X","END_Y"],
+        "required_message": "ไม่พบ field",
+        "field_types": [(f, "Number") for f in ["REL_RN", "NS3K_RN"] + _REL_NUMBER_FIELDS],
+        "rules": [
+            # 8.1.1. BRANCH_CODE ต้องเป็น String และมี 8 หลักเท่านั้น
+            {"rule": "digits", "field": "BRANCH_CODE", "length": 8, "strip": True, "check_type": "Data Format", "message": "BRANCH_CODE ต้องเป็น 8 หลัก"},
+            # 8.1.2. REL_RN ต้องเป็น Number และภายใน BRANCH_CODE เดียวกันจะต้องไม่ซ้ำกัน
+            {"rule": "number", "field": "REL_RN", "check_type": "Data Format", "message": "ต้องเป็น Number"},
+            {"rule": "unique_within", "field": "REL_RN", "within": "BRANCH_CODE",
+             "check_type": "Duplicate Value", "message": "REL_RN ซ้ำภายใน BRANCH_CODE '{branch}'"},
+            # 8.1.3. NS3K_RN ต้องเป็น Number
+            {"rule": "number", "field": "NS3K_RN", "check_type": "Data Format", "message": "NS3K_RN ต้องเป็น Number"},
+            # 8.1.8. TABLE_NO ต้องเป็น 1 หรือ 2 หรือ 3 หรือ 41 หรือ 42 หรือ 5 หรือ 6 หรือ 7 เท่านั้น
+            {"rule": "number_domain", "field": "TABLE_NO", "allowed": REL_TABLE_NO_DOMAIN, "check_type": "Data Specified", "message": f"ต้องเป็น {sorted(REL_TABLE_NO_DOMAIN)} "},
+            # SUB_TABLE_NO ต้องมีค่าระหว่าง 0 – 6 หรือค่าว่าง เท่านั้น
+            {"rule": "number_domain", "field": "SUB_TABLE_NO", "allowed": REL_SUB_TABLE_NO_RANGE, "allow_null": True, "check_type": "Data Specified", "message": "ต้องเป็น 0 หรือ 1-6 "},
+            # 8.1.10 - 8.1.15. DEPTH_R, START_X, START_Y, END_X, END_Y ต้องไม่ใช่ 0 หรือว่าง
+            *[{"rule": "nonzero", "field": f, "check_type": "Data Required", "message": f"{f} จะต้องไม่ใช่ 0 หรือค่าว่าง"} for f in _REL_NONZERO_FIELDS],
+        ],
+    },
+}
+
+
+################################################
+#----------------- compile / ตรวจ layer
+################################################
+
+class LayerRules:
+    """
+    ตารางกฎของชั้นข้อมูลหนึ่งที่ compile แล้ว
+    - check_fields(fields, emit)             : Field Check / Field Type
+    - cursor_fields(fields)                  : ฟิลด์ที่ต้องเปิด cursor ("OID@" + ฟิลด์ที่มีอยู่จริง)
+    - message(kind)                          : ข้อความของกฎชนิด kind (ให้ตัวตรวจแบบ columnar)
+    - scan(cursor, cursor_fields, emit)      : ตรวจทุกกฎในการอ่าน cursor รอบเดียว
+    emit(check_type, oid, field, value, message) คือฟังก์ชันเขียน error ของผู้เรียก
+    labels : ชื่อกฎแต่ละข้อ (ชนิดกฎ:ฟิลด์) ใช้ในรายงาน Perf
+    """
+
+    def __init__(self, name, spec, rule_set="v1"):
+        self.name = name
+        self.required = list(spec["required"])
+        self.required_message = spec["required_message"]
+        self.field_types = list(spec["field_types"])
+        self.rules = []
+        self.labels = []
+        self.fields = []
+        for rule in spec["rules"]:
+            if rule.get("rule_set", rule_set) != rule_set:
+                continue
+            if rule["rule"] not in RULE_KINDS:
+                raise ValueError(f"{name}: ไม่รู้จักชนิดกฎ '{rule['rule']}'")
+            self.rules.append((RULE_KINDS[rule["rule"]], rule))
+            self.labels.append(_rule_label(rule))
+            for key in _FIELD_KEYS:
+                names = rule.get(key)
+                if names is None:
+                    continue
+                for f in ([names] if isinstance(names, str) else names):
+                    if f not in self.fields:
+                        self.fields.append(f)
+
+    def check_fields(self, fields, emit):
+        for f in self.required:
+            if f.upper() not in fields:
+                emit("Field Check", -1, f, "", self.required_message)
+        for f, kind in self.field_types:
+            if f not in fields:
+                continue
+            if kind == "String" and fields[f] != "String":
+                emit("Field Type", -1, f, fields[f], "ต้องเป็น String")
+            elif kind == "Number" and not is_numeric_field_type(fields[f]):
+                emit("Field Type", -1, f, fields[f], "ต้องเป็น Number")
+
+    def message(self, kind):
+        """ข้อความของกฎชนิด kind ข้อแรก (ตัวตรวจแบบ columnar ใช้ข้อความเดียวกับตาราง)"""
+        for _, rule in self.rules:
+            if rule["rule"] == kind:
+                return rule["message"]
+        raise KeyError(f"{self.name}: ไม่มีกฎชนิด '{kind}'")
+
+    def cursor_fields(self, fields):
+        return ["OID@"] + [f for f in self.fields if f.upper() in fields]
+
+    def bind(self, cursor_fields, with_positions=False, new_groups=None, opened=None):
+        """
+        ผูกกฎกับตำแหน่งคอลัมน์ คืน (checks, finalizers, pad)
+        ฟิลด์ที่ไม่มีใน layer ชี้ไปที่ช่อง None ต่อท้าย row (pad)
+        with_positions=True : finalizers เป็น (ลำดับกฎ, finalize)
+        new_groups : ตัวสร้าง KeyGroups ของกฎค่าซ้ำ (None = KeyGroups ในหน่วยความจำทั้งหมด)
+        opened : list ที่จะเก็บ KeyGroups ทุกตัวที่สร้าง ผู้เรียกต้อง close() เอง (ลบไฟล์ชั่วคราวแม้ตรวจไม่จบ)
+        """
+        index = {f.upper(): i for i, f in enumerate(cursor_fields)}
+        missing = [f for f in self.fields if f.upper() not in index]
+        for f in missing:
+            index[f.upper()] = len(index)
+        col = lambda name: index[name.upper()]
+        make_groups = new_groups or KeyGroups
+        if opened is not None:
+            def make_groups(factory=make_groups):
+                groups = factory()
+                opened.append(groups)
+                return groups
+        checks, finalizers = [], []
+        for position, (kind, rule) in enumerate(self.rules):
+            if kind in _KEY_GROUP_KINDS:
+                check, finalize = kind(rule, col, make_groups)
+            else:
+                check, finalize = kind(rule, col)
+            checks.append(check)
+            if finalize is not None:
+                finalizers.append((rule.get("report_order", position), position, finalize))
+        finalizers.sort(key=lambda item: item[0])
+        if with_positions:
+            return checks, [(position, finalize) for _, position, finalize in finalizers], (None,) * len(missing)
+        return checks, [finalize for _, _, finalize in finalizers], (None,) * len(missing)
+
+    def scan(self, cursor, cursor_fields, emit, stats=None, new_groups=None):
+        """
+        new_groups : ตัวสร้าง KeyGroups ของกฎค่าซ้ำ (ส่งต่อให้ bind)
+        stats : ถ้าส่ง dict มา จะนับผลระหว่างตรวจแล้วใส่ค่า
+                rows, cursor_wall (เวลาอ่าน cursor), rules = list ของ (ชื่อกฎ, wall, errors)
+                จับเวลารายกฎเฉพาะเมื่อ stats["timed"] เป็น True (ช้าลงราว 20-30%)
+                ไม่งั้น cursor_wall และ wall ของกฎเป็น None
+        """
+        opened = []  # KeyGroups ของรอบนี้ ปิดเสมอ (cursor error / ถูกหยุดกลางทาง ไม่ทิ้งโฟลเดอร์ spill ไว้)
+        try:
+            if stats is not None:
+                return self._scan_measured(cursor, cursor_fields, emit, stats, new_groups, opened)
+            checks, finalizers, pad = self.bind(cursor_fields, new_groups=new_groups, opened=opened)
+            for row in cursor:
+                if pad:
+                    row = tuple(row) + pad
+                for check in checks:
+                    err = check(row)
+                    if err is not None:
+                        emit(err[0], row[0], err[1], err[2], err[3])
+            for finalize in finalizers:
+                finalize(emit)
+        finally:
+            for groups in opened:
+                groups.close()
+
+    def _scan_measured(self, cursor, cursor_fields, emit, stats, new_groups=None, opened=None):
+        """scan() ที่นับจำนวน error (และจับเวลา ถ้า stats["timed"]) ของกฎแต่ละข้อ ลำดับ error เหมือน scan()"""
+        checks, finalizers, pad = self.bind(cursor_fields, with_positions=True, new_groups=new_groups, opened=opened)
+        timed = stats.get("timed", False)
+        clock = time.perf_counter
+        walls = [0.0] * len(self.rules)
+        errors = [0] * len(self.rules)
+        indexed_checks = list(enumerate(checks))
+        rows = 0
+        cursor_wall = 0.0
+        if timed:
+            it = iter(cursor)
+            while True:
+                t0 = clock()
+                row = next(it, None)
+                t1 = clock()
+                cursor_wall += t1 - t0
+                if row is None:
+                    break
+                rows += 1
+                if pad:
+                    row = tuple(row) + pad
+                for i, check in indexed_checks:
+                    err = check(row)
+                    if err is not None:
+                        errors[i] += 1
+                        emit(err[0], row[0], err[1], err[2], err[3])
+                    t2 = clock()
+                    walls[i] += t2 - t1
+                    t1 = t2
+        else:
+            for row in cursor:
+                rows += 1
+                if pad:
+                    row = tuple(row) + pad
+                for i, check in indexed_checks:
+                    err = check(row)
+                    if err is not None:
+                        errors[i] += 1
+                        emit(err[0], row[0], err[1], err[2], err[3])
+        for i, finalize in finalizers:
+            count = [0]
+            def counting_emit(*args):
+                count[0] += 1
+                emit(*args)
+            t0 = clock()
+            finalize(counting_emit)
+            walls[i] += clock() - t0
+            errors[i] += count[0]
+        stats["rows"] = rows
+        stats["cursor_wall"] = cursor_wall if timed else None
+        stats["rules"] = list(zip(self.labels, walls if timed else [None] * len(walls), errors))
+
+
+def _rule_label(rule):
+    """ชื่อกฎสำหรับรายงาน เช่น digits:UTMMAP1, unique_key:BRANCH_CODE+UTMMAP1+..."""
+    for key in ("field", "fields"):
+        names = rule.get(key)
+        if names:
+            return f"{rule['rule']}:{names if isinstance(names, str) else '+'.join(names)}"
+    return rule["rule"]
+
+
+def compile_rules(table=None, rule_set="v1"):
+    """compile ตารางกฎทั้งหมดของชุดกฎ rule_set คืน dict {ชื่อชั้นข้อมูล: LayerRules}"""
+    if rule_set not in RULE_SETS:
+        raise ValueError(f"ไม่รู้จักชุดกฎ '{rule_set}' (มี {', '.join(RULE_SETS)})")
+    table = LAYER_RULES if table is None else table
+    return {name: LayerRules(name, spec, rule_set) for name, spec in table.items()}
+
+COMPILED_RULE_SETS = {name: compile_rules(rule_set=name) for name in RULE_SETS}
+COMPILED_RULES = COMPILED_RULE_SETS["v1"]
@@ -0,0 +1,253 @@
+# =============================================================================
+# - เก็บผลตรวจแบบ columnar (Parquet) คู่กับรายงาน Excel สำหรับค้นย้อนหลังข้าม GDB / ข้ามรอบ
+#   PARQUET_ROOT/errors/run_date=YYYY-MM-DD/province=<จังหวัด>/<GDB>.parquet     error ทุกแถว (รวมแถวที่เกิน cap)
+#   PARQUET_ROOT/inventory/run_date=YYYY-MM-DD/province=<จังหวัด>/<GDB>.parquet  จำนวนแถวของแต่ละชั้น (Sheet All_DATA)
+#   partition แบบ hive อ่านได้ทันทีด้วย pyarrow.dataset / pandas.read_parquet / DuckDB
+# - 1 ไฟล์ต่อ GDB ต่อวัน รันซ้ำในวันเดียวกันเขียนทับไฟล์ของ GDB นั้น (GDB ที่ไม่มี error ได้ไฟล์ว่าง)
+#   GDB ที่ใช้ผลจาก cache คัดลอกไฟล์เดิมมาใส่ partition ของรอบนี้ (restamp_gdb_results)
+# - ErrorFileWriter: โหมดประหยัดหน่วยความจำเขียน error ลงไฟล์ทีละ row group ระหว่างตรวจ (ไม่ต้องเก็บทุกแถวจนจบ GDB)
+# - read_summary() สร้างข้อมูล Sheet All_DATA / Error SUM จาก store (group by แบบ columnar ไม่ต้องเปิด Excel)
+# - ต้องมี pyarrow (import เมื่อเขียน/อ่านเท่านั้น)
+# =============================================================================
+
+import os
+import datetime
+import importlib.util
+
+ERRORS_DATASET = "errors"
+INVENTORY_DATASET = "inventory"
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# คอลัมน์ของ errors (ตามลำดับในไฟล์)
+# object_id = Object_ID ที่เป็นเลข, object_ids = ค่าที่ไม่ใช่เลข (เช่น "[1, 2]" ของ Duplicate, -1 ไม่อยู่ในนี้)
+ERROR_COLUMNS = ("timestamp", "gdb", "gdb_path", "featureclass", "layer", "zone", "check_type",
+                 "object_id", "object_ids", "field_name", "invalid_value", "message")
+INVENTORY_COLUMNS = ("timestamp", "gdb", "gdb_path", "featureclass", "layer", "zone", "count")
+
+
+def store_available():
+    """True ถ้ามี pyarrow (ไม่ import)"""
+    return importlib.util.find_spec("pyarrow") is not None
+
+def _partition_value(value):
+    """ค่าที่ใช้เป็นชื่อโฟลเดอร์ partition ได้ (ไม่มีตัวคั่น path หรือ '=')"""
+    text = str(value) if value else "Unknown"
+    for ch in '\\/:*?"<>|=':
+        text = text.replace(ch, "_")
+    return text
+
+def partition_path(root, dataset, run_timestamp, province, name):
+    """path ของไฟล์ GDB 1 ก้อนใน dataset (run_date = 10 ตัวแรกของ Timestamp)"""
+    return os.path.join(root, dataset, f"run_date={str(run_timestamp)[:10]}",
+                        f"province={_partition_value(province)}", f"{name}.parquet")
+
+def _timestamps(pa, run_timestamp, n):
+    ts = datetime.datetime.strptime(run_timestamp, TIMESTAMP_FORMAT)
+    return pa.repeat(pa.scalar(ts, type=pa.timestamp("s")), n)
+
+def _text(value):
+    return None if value is None else str(value)
+
+def _dictionary(pa, codes, values):
+    """DictionaryArray จาก array('i') ของเลขรหัส (ไม่ต้องแปลงทีละแถว) ค่า None -> null"""
+    import pyarrow.compute as pc
+    indices = pa.Array.from_buffers(pa.int32(), len(codes), [None, pa.py_buffer(codes)])
+    texts = [_text(v) for v in values]
+    null_codes = [i for i, text in enumerate(texts) if text is None]
+    if null_codes:  # Parquet ไม่รับ null ใน dictionary ให้ index เป็น null แทน
+        indices = pc.if_else(pc.is_in(indices, pa.array(null_codes, type=pa.int32())), pa.scalar(None, pa.int32()), indices)
+        texts = ["" if text is None else text for text in texts]
+    return pa.DictionaryArray.from_arrays(indices, pa.array(texts, type=pa.string()))
+
+def _write_table(table, path):
+    import pyarrow.parquet as pq
+    folder, name = os.path.split(path)
+    os.makedirs(folder, exist_ok=True)
+    tmp_path = os.path.join(folder, f".{name}.tmp")  # ขึ้นต้นด้วย "." dataset reader จะไม่อ่านไฟล์ที่เขียนไม่เสร็จ
+    pq.write_table(table, tmp_path)
+    os.replace(tmp_path, path)
+
+
+def error_table(run_timestamp, error_store, path_formatter=str, layer_of=None):
+    """
+    pyarrow Table ของ error ใน ErrorStore (คอลัมน์ตาม ERROR_COLUMNS)
+    path_formatter : แปลง GDB path เป็นแบบย่อ (คอลัมน์ gdb_path)
+    layer_of       : ฟังก์ชัน featureclass -> (ชั้นข้อมูล, โซน)
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    columns, oids, other = error_store.encoded_columns()
+    n = len(oids)
+    gdb_codes, gdbs = columns["GDB_Path"]
+    fc_codes, fcs = columns["Featureclass"]
+    layers = [layer_of(fc) if layer_of else (None, None) for fc in fcs]
+
+    object_id = pa.Array.from_buffers(pa.int64(), n, [None, pa.py_buffer(oids)])
+    object_ids = pa.nulls(n, pa.string())
+    if other:
+        mask = [False] * n
+        texts = [None] * n
+        for row, value in other.items():
+            mask[row] = True
+            texts[row] = _text(value)
+        object_id = pc.if_else(pa.array(mask), pa.scalar(None, pa.int64()), object_id)
+        object_ids = pa.array(texts, type=pa.string())
+
+    arrays = [
+        _timestamps(pa, run_timestamp, n),
+        _dictionary(pa, gdb_codes, gdbs),
+        _dictionary(pa, gdb_codes, [path_formatter(g) for g in gdbs]),
+        _dictionary(pa, fc_codes, fcs),
+        _dictionary(pa, fc_codes, [layer for layer, _ in layers]),
+        _dictionary(pa, fc_codes, [zone for _, zone in layers]),
+        _dictionary(pa, *columns["Check_Type"]),
+        object_id,
+        object_ids,
+        _dictionary(pa, *columns["Field_Name"]),
+        _dictionary(pa, *columns["Invalid_Value"]),
+        _dictionary(pa, *columns["Message"]),
+    ]
+    return pa.Table.from_arrays(arrays, names=list(ERROR_COLUMNS))
+
+def inventory_table(data_records, path_formatter=str, layer_of=None):
+    """pyarrow Table ของแถว All_DATA [Timestamp, GDB_Path, Featureclass, จำนวน] (นับไม่ได้ = null)"""
+    import pyarrow as pa
+
+    layers = [layer_of(r[2]) if layer_of else (None, None) for r in data_records]
+    arrays = [
+        pa.array([datetime.datetime.strptime(r[0], TIMESTAMP_FORMAT) for r in data_records], type=pa.timestamp("s")),
+        pa.array([r[1] for r in data_records], type=pa.string()),
+        pa.array([path_formatter(r[1]) for r in data_records], type=pa.string()),
+        pa.array([r[2] for r in data_records], type=pa.string()),
+        pa.array([layer for layer, _ in layers], type=pa.string()),
+        pa.array([zone for _, zone in layers], type=pa.string()),
+        pa.array([r[3] if isinstance(r[3], int) else None for r in data_records], type=pa.int64()),
+    ]
+    return pa.Table.from_arrays(arrays, names=list(INVENTORY_COLUMNS))
+
+
+class ErrorFileWriter:
+    """
+    เขียน errors ของ GDB 1 ก้อนทีละ row group (ใช้เป็น on_flush ของ ErrorStore.limit_rows)
+    เปิดไฟล์ชั่วคราวเมื่อเขียนครั้งแรก close() จึงย้ายไปแทนไฟล์จริง (ตรวจล้มกลางทาง -> abort() ลบทิ้ง)
+    """
+
+    def __init__(self, root, run_timestamp, province, name, path_formatter=str, layer_of=None):
+        self.path = partition_path(root, ERRORS_DATASET, run_timestamp, province, name)
+        self.run_timestamp = run_timestamp
+        self.path_formatter = path_formatter
+        self.layer_of = layer_of
+        self.row_groups = 0
+        self._tmp_path = None
+        self._writer = None
+
+    def write(self, error_store):
+        import pyarrow.parquet as pq
+        table = error_table(self.run_timestamp, error_store, self.path_formatter, self.layer_of)
+        if self._writer is None:
+            folder, name = os.path.split(self.path)
+            os.makedirs(folder, exist_ok=True)
+            self._tmp_path = os.path.join(folder, f".{name}.tmp")
+            self._writer = pq.ParquetWriter(self._tmp_path, table.schema)
+        self._writer.write_table(table)
+        self.row_groups += 1
+
+    def close(self):
+        writer, self._writer = self._writer, None
+        if writer is not None:
+            writer.close()
+            os.replace(self._tmp_path, self.path)
+
+    def abort(self):
+        writer, self._writer = self._writer, None
+        if writer is not None:
+            writer.close()
+            try:
+                os.remove(self._tmp_path)
+            except OSError:
+                pass
+
+
+def write_gdb_results(root, run_timestamp, province, name, error_store, data_records, path_formatter=str, layer_of=None,
+                      error_file=None):
+    """
+    เขียน errors + inventory ของ GDB 1 ก้อน คืน {dataset: path ของไฟล์}
+    name : ชื่อไฟล์ (ไม่รวม .parquet) เช่น basename ของ GDB
+    error_file : ErrorFileWriter ที่เขียน error บางส่วนไปแล้ว (โหมดประหยัด) แถวที่เหลือเขียนต่อท้ายไฟล์เดียวกัน
+    """
+    paths = {
+        ERRORS_DATASET: partition_path(root, ERRORS_DATASET, run_timestamp, province, name),
+        INVENTORY_DATASET: partition_path(root, INVENTORY_DATASET, run_timestamp, province, name),
+    }
+    if error_file is not None and error_file.row_groups:
+        error_store.flush()  # แถวที่เหลือ -> on_flush (= error_file.write) row group สุดท้าย
+        error_file.close()
+    else:
+        _write_table(error_table(run_timestamp, error_store, path_formatter, layer_of), paths[ERRORS_DATASET])
+    _write_table(inventory_table(data_records, path_formatter, layer_of), paths[INVENTORY_DATASET])
+    return paths
+
+def restamp_gdb_results(files, root, run_timestamp, province, name):
+    """
+    คัดลอกไฟล์ของ GDB จากรอบก่อน (files จาก write_gdb_results) มาไว้ที่ partition ของรอบนี้
+    เปลี่ยน timestamp เป็นของรอบนี้ คืน {dataset: path ใหม่}
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    paths = {}
+    for dataset, src in files.items():
+        table = pq.read_table(src)
+        column = table.schema.get_field_index("timestamp")
+        table = table.set_column(column, "timestamp", _timestamps(pa, run_timestamp, table.num_rows))
+        paths[dataset] = partition_path(root, dataset, run_timestamp, province, name)
+        _write_table(table, paths[dataset])
+    return paths
+
+
+def _read_dataset(root, dataset, run_date, columns):
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    path = os.path.join(root, dataset)
+    if not os.path.isdir(path):
+        return None
+    partitioning = ds.partitioning(pa.schema([("run_date", pa.string()), ("province", pa.string())]), flavor="hive")
+    data = ds.dataset(path, format="parquet", partitioning=partitioning)
+    return data.to_table(columns=columns, filter=ds.field("run_date") == run_date)
+
+def _decoded(table):
+    """แปลงคอลัมน์ dictionary กลับเป็นค่าปกติ (สำหรับ group by)"""
+    import pyarrow as pa
+    columns = [col.cast(col.type.value_type) if pa.types.is_dictionary(col.type) else col for col in table.columns]
+    return pa.Table.from_arrays(columns, names=table.column_names)
+
+def read_summary(root, run_date):
+    """
+    ข้อมูลรายงานสรุปของวันที่ run_date (YYYY-MM-DD) จาก store
+    คืน (all_data_records, error_summary_records) รูปแบบเดียวกับที่ส่งให้ write_summary_report
+    เรียงตาม GDB (All_DATA คงลำดับชั้นข้อมูลเดิมภายใน GDB)
+    """
+    import pyarrow.compute as pc
+
+    def text(ts):
+        return ts.strftime(TIMESTAMP_FORMAT)
+
+    all_data_records, error_summary_records = [], []
+    inventory = _read_dataset(root, INVENTORY_DATASET, run_date, ["timestamp", "gdb", "featureclass", "count"])
+    if inventory is not None and inventory.num_rows:
+        inventory = inventory.take(pc.sort_indices(inventory, sort_keys=[("gdb", "ascending")]))
+        for ts, gdb, fc, count in zip(*(inventory.column(c).to_pylist() for c in inventory.column_names)):
+            all_data_records.append([text(ts), gdb, fc, "Error" if count is None else count])
+
+    errors = _read_dataset(root, ERRORS_DATASET, run_date, ["timestamp", "gdb", "featureclass", "check_type"])
+    if errors is not None and errors.num_rows:
+        errors = _decoded(errors)
+        keys = ["gdb", "featureclass", "check_type"]
+        counts = errors.group_by(["timestamp"] + keys).aggregate([([], "count_all")])
+        counts = counts.take(pc.sort_indices(counts, sort_keys=[(k, "ascending") for k in keys]))
+        for ts, gdb, fc, check_type, n in zip(*(counts.column(c).to_pylist()
+                                                for c in ["timestamp"] + keys + ["count_all"])):
+            error_summary_records.append([text(ts), gdb, fc, check_type, n])
+    return all_data_records, error_summary_records
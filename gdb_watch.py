@@ -0,0 +1,250 @@
+# =============================================================================
+# - เฝ้าโฟลเดอร์ ROOT_DIR หา .gdb ที่เพิ่มเข้ามาใหม่หรือถูกแก้ไข (ใช้กับ validate_gdb.py --watch)
+# - สถานะของ GDB = fingerprint จากชื่อไฟล์ + ขนาด + mtime ของทุกไฟล์ในโฟลเดอร์ .gdb (gdb_cache)
+#   ไม่นับไฟล์ .lock จึงไม่เห็นการเปิดอ่านของ worker ที่ตรวจอยู่เป็นการแก้ไข
+# - รอให้ "นิ่ง" ก่อนส่งตรวจ (debounce): สถานะไม่เปลี่ยนติดต่อกัน quiet_seconds วินาที
+#   จังหวัดยัง upload ไม่เสร็จ = ไฟล์ยังเปลี่ยนอยู่ จะยังไม่ถูกตรวจ
+# - Linux ใช้ inotify (ctypes ไม่ต้องมีไลบรารีเพิ่ม) รู้ทันทีว่า GDB ไหนมีไฟล์เปลี่ยน
+#   ระบบอื่น (Windows) หรือ inotify ใช้ไม่ได้ (เช่น watch เกิน fs.inotify.max_user_watches, share บน SMB)
+#   สแกนทุก poll_seconds แทน ทั้งสองแบบสแกนรายการ .gdb ทั้งหมดซ้ำทุก poll_seconds ด้วย (ใช้ catalogue ของ gdb_discovery)
+# - GDB ที่กำลังรอให้นิ่งจะถูกเช็คสถานะทุกครั้งที่ poll() (อ่านรายการไฟล์ในโฟลเดอร์ .gdb เดียว)
+# =============================================================================
+
+import os
+import sys
+import time
+import select
+import struct
+
+from gdb_cache import gdb_fingerprint
+from gdb_discovery import DISCOVERY_WORKERS, GdbCatalogue
+
+TICK_SECONDS = 5  # ระยะรอสูงสุดของ poll() แต่ละครั้ง (วินาที)
+
+# inotify (linux/inotify.h)
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+_WATCH_MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+               | IN_DELETE_SELF)
+_EVENT = struct.Struct("iIII")  # wd, mask, cookie, len
+
+
+def _is_gdb(path):
+    return path.lower().endswith(".gdb")
+
+def gdb_state(gdb_path):
+    """สถานะปัจจุบันของโฟลเดอร์ .gdb (None = อ่านไม่ได้ เช่น ถูกลบ/ย้ายไปแล้ว)"""
+    try:
+        return gdb_fingerprint(gdb_path)
+    except OSError:
+        return None
+
+
+class _Inotify:
+    """inotify ผ่าน ctypes: เฝ้าทุกโฟลเดอร์ใต้ root (inotify ไม่เฝ้าโฟลเดอร์ย่อยให้เอง)"""
+
+    def __init__(self):
+        import ctypes
+        import ctypes.util
+        self._ctypes = ctypes
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self.fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            self._raise("inotify_init1")
+        self.dirs = {}  # watch descriptor -> path โฟลเดอร์
+
+    def _raise(self, what):
+        errno = self._ctypes.get_errno()
+        raise OSError(errno, f"{what}: {os.strerror(errno)}")
+
+    def add(self, path):
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), _WATCH_MASK)
+        if wd < 0:
+            self._raise(f"inotify_add_watch {path}")
+        self.dirs[wd] = path
+
+    def add_tree(self, root_dir):
+        for dirpath, _, _ in os.walk(root_dir):
+            self.add(dirpath)
+
+    def read(self, timeout):
+        """รอ event ไม่เกิน timeout วินาที คืน list ของ (path โฟลเดอร์, ชื่อรายการ, mask)"""
+        if not select.select([self.fd], [], [], timeout)[0]:
+            return []
+        events = []
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = _EVENT.unpack_from(data, offset)
+                offset += _EVENT.size
+                name = os.fsdecode(data[offset:offset + length].rstrip(b"\0"))
+                offset += length
+                if mask & IN_IGNORED:  # โฟลเดอร์ถูกลบ watch หายไปเอง
+                    self.dirs.pop(wd, None)
+                    continue
+                events.append((self.dirs.get(wd), name, mask))
+        return events
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+class GdbWatcher:
+    """
+    หา .gdb ใต้ root_dir ที่เพิ่มเข้ามาใหม่หรือเปลี่ยนแปลง และนิ่งแล้ว (poll)
+
+    Parameters
+    ----------
+    root_dir : str
+        โฟลเดอร์ที่รวม GDB ของทุกจังหวัด
+    catalogue_path : str | None
+        catalogue ของ gdb_discovery (ใช้ร่วมกับ validate_gdb.py) None = อ่านทุกโฟลเดอร์ใหม่ทุกรอบ
+    quiet_seconds : float
+        สถานะต้องไม่เปลี่ยนกี่วินาทีจึงถือว่า upload เสร็จ
+    poll_seconds : float
+        สแกนรายการ .gdb ทั้งหมดซ้ำทุกกี่วินาที
+    use_inotify : bool
+        False = สแกนเป็นระยะอย่างเดียว
+    """
+
+    def __init__(self, root_dir, catalogue_path=None, quiet_seconds=120, poll_seconds=60, use_inotify=True):
+        self.root_dir = root_dir
+        self.quiet_seconds = quiet_seconds
+        self.poll_seconds = poll_seconds
+        self.use_inotify = use_inotify
+        self.catalogue = GdbCatalogue(catalogue_path)
+        self.states = {}    # gdb -> สถานะล่าสุด (ลำดับแบบ os.walk)
+        self.changed = {}   # gdb -> เวลา (time.monotonic) ที่เห็นสถานะเปลี่ยนครั้งล่าสุด ยังไม่นิ่ง
+        self.reported = {}  # gdb -> สถานะที่ส่งตรวจไปแล้ว
+        self._inotify = None
+        self._next_scan = 0
+
+    @property
+    def mode(self):
+        return "inotify" if self._inotify is not None else "polling"
+
+    def start(self):
+        """
+        เริ่มเฝ้า และจำสถานะของ GDB ที่มีอยู่แล้ว (ไม่ถือเป็นการเปลี่ยนแปลง)
+        คืน list ของ GDB ที่มีอยู่
+        """
+        if self.use_inotify and sys.platform.startswith("linux"):
+            try:
+                self._inotify = _Inotify()
+                self._inotify.add_tree(self.root_dir)
+            except (OSError, AttributeError) as e:  # AttributeError = libc ไม่มี inotify
+                print(f"  inotify ใช้ไม่ได้ ({e}) สแกนทุก {self.poll_seconds} วินาทีแทน")
+                self.close()
+        self.states = self._scan()
+        self.reported = dict(self.states)
+        self._next_scan = time.monotonic() + self.poll_seconds
+        return list(self.states)
+
+    def close(self):
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
+
+    def gdb_paths(self):
+        """GDB ทั้งหมดที่เห็นล่าสุด (ลำดับแบบ os.walk)"""
+        return list(self.states)
+
+    def _scan(self):
+        scanned, _ = self.catalogue.refresh(self.root_dir, DISCOVERY_WORKERS)
+        if scanned:
+            try:
+                self.catalogue.save()
+            except OSError as e:
+                print(f"  !! ไม่สามารถบันทึก catalogue {self.catalogue.path}: {e}")
+        paths = self.catalogue.gdb_paths(self.root_dir)
+        abs_root = os.path.abspath(self.root_dir)
+        if self.root_dir != abs_root:  # path ในรูปเดียวกับ root_dir (แบบ discover_gdbs) ให้ตรงกับ path จาก inotify
+            paths = [os.path.join(self.root_dir, os.path.relpath(p, abs_root)) for p in paths]
+        states = {}
+        for gdb in paths:
+            state = gdb_state(gdb)
+            if state is not None:
+                states[gdb] = state
+        return states
+
+    def _wait(self, timeout):
+        """รอการเปลี่ยนแปลง คืน (GDB ที่มีไฟล์เปลี่ยน, ต้องสแกนรายการ .gdb ใหม่หรือไม่)"""
+        if self._inotify is None:
+            time.sleep(timeout)
+            return set(), False
+        touched, rescan = set(), False
+        for folder, name, mask in self._inotify.read(timeout):
+            if mask & IN_Q_OVERFLOW or folder is None:  # event ล้นคิว ไม่รู้ว่าอะไรเปลี่ยน
+                rescan = True
+                continue
+            path = os.path.join(folder, name) if name else folder
+            if _is_gdb(folder):
+                touched.add(folder)
+                continue
+            if not mask & IN_ISDIR:
+                continue
+            rescan = True  # มีโฟลเดอร์ (หรือ .gdb) เพิ่ม/ลบ/ย้าย
+            if mask & (IN_CREATE | IN_MOVED_TO):
+                try:
+                    self._inotify.add_tree(path)
+                except OSError as e:
+                    print(f"  !! inotify เฝ้า {path} ไม่ได้ ({e}) สแกนทุก {self.poll_seconds} วินาทีแทน")
+                    self.close()
+                    break
+        return touched, rescan
+
+    def poll(self, timeout=TICK_SECONDS):
+        """
+        รอการเปลี่ยนแปลงไม่เกิน timeout วินาที แล้วคืน (ready, removed)
+        ready   : GDB ที่สถานะต่างจากที่ส่งตรวจครั้งก่อน และนิ่งครบ quiet_seconds แล้ว (ส่งตรวจได้)
+        removed : GDB ที่หายไปจาก root_dir
+        """
+        touched, rescan = self._wait(timeout)
+        now = time.monotonic()
+        if rescan or now >= self._next_scan:
+            states = self._scan()
+            self._next_scan = now + self.poll_seconds
+        else:
+            states = dict(self.states)
+            for gdb in touched.union(self.changed):
+                if gdb not in states:
+                    continue
+                state = gdb_state(gdb)
+                if state is None:
+                    del states[gdb]
+                else:
+                    states[gdb] = state
+
+        for gdb, state in states.items():
+            if state != self.states.get(gdb):
+                self.changed[gdb] = now
+        removed = [gdb for gdb in self.states if gdb not in states]
+        for gdb in removed:
+            self.changed.pop(gdb, None)
+            self.reported.pop(gdb, None)
+        self.states = states
+
+        ready = []
+        for gdb, since in list(self.changed.items()):
+            if now - since < self.quiet_seconds:
+                continue
+            del self.changed[gdb]
+            if self.states[gdb] != self.reported.get(gdb):
+                self.reported[gdb] = self.states[gdb]
+                ready.append(gdb)
+        return ready, removed
@@ -0,0 +1,411 @@
+# =============================================================================
+# - สร้าง GDB ตัวอย่าง (ข้อมูลสังเคราะห์) สำหรับทดสอบและวัดความเร็วของ validate_gdb.py
+#   ไม่ต้องมี ArcGIS: เขียนโฟลเดอร์ .gdb ด้วย GDAL OpenFileGDB driver (pyogrio)
+#   อ่านได้ทั้ง ArcGIS Pro และ READER_BACKEND = "openfilegdb"
+# - ชั้นข้อมูล: PARCEL_xx_xx, PARCEL_xx_NS3K_xx, ROAD_xx, BLOCK_FIX/PRICE/BLUE_xx,
+#   PARCEL_REL_xx, NS3K_REL_xx ฟิลด์และค่าตามกฎใน gdb_rules.py
+# - ขนาดปรับได้ตั้งแต่หลักหมื่นถึงหลายล้านแถว (--rows) เขียนทีละ batch หน่วยความจำคงที่
+# - ใส่ error แต่ละชนิดตามอัตราที่กำหนด (--error-rate / --rate ชนิด=อัตรา)
+#   จำนวนที่ใส่จริงบันทึกไว้ใน synthetic_manifest.json (แถวที่สุ่มได้หลายชนิดอาจนับซ้ำ)
+# - seed เดียวกัน + ค่าตั้งค่าเดียวกัน = ข้อมูลเหมือนเดิมทุกครั้ง
+# =============================================================================
+
+import os
+import sys
+import json
+import time
+import argparse
+from collections import Counter
+import numpy as np
+from gdb_rules import ROAD_LAND_USE_DOMAIN, ROAD_STREET_TYPE_DOMAIN, ROAD_REQ_NAME_TD_CODES, REL_TABLE_NO_DOMAIN
+
+
+###############################################
+#----------------- ค่าตั้งต้น
+###############################################
+OUTPUT_ROOT = os.path.join(os.getcwd(), "synthetic_gdb")  # ที่สร้าง GDB (โครงสร้างเดียวกับ ROOT_DIR)
+PROVINCES = ["50:เชียงใหม่", "49:มุกดาหาร"]  # จังหวัดที่สร้าง "รหัส:ชื่อ" -> โฟลเดอร์ 50_เชียงใหม่
+GDBS_PER_PROVINCE = 1  # จำนวน GDB ต่อจังหวัด (GDB_50_1, GDB_50_2, ...)
+ROWS = 10000  # จำนวนแถวของ PARCEL ต่อ GDB (ชั้นอื่นคิดเป็นสัดส่วนตาม LAYER_SPECS)
+UTM_ZONE = "47"  # โซน UTM ในชื่อ PARCEL_47_50
+ERROR_RATE = 0.01  # อัตรา error ตั้งต้นของทุกชนิด (0.01 = 1% ของแถว)
+BATCH_ROWS = 100000  # จำนวนแถวที่เขียนต่อครั้ง
+SEED = 1
+CRS = "EPSG:32647"
+MANIFEST_NAME = "synthetic_manifest.json"
+
+# ชนิด error ที่ใส่ได้ (ชื่อชนิด: คำอธิบาย) ชนิดเดียวกันใช้อัตราเดียวกันทุกชั้นข้อมูล
+ERROR_KINDS = {
+    "utmmap1_format": "UTMMAP1 มี 3 หลัก",
+    "utmmap2_domain": "UTMMAP2 = 5",
+    "utmmap3_domain": "UTMMAP3 ของ NS3K ไม่ใช่ '0000'",
+    "utmmap4_format": "UTMMAP4 จำนวนหลักผิด",
+    "utmmap4_scale": "UTMMAP4 ไม่สอดคล้องกับ UTMSCALE",
+    "scale_domain": "UTMSCALE นอกโดเมน",
+    "parcel_type_domain": "PARCEL_TYPE ของ NS3K ไม่ใช่ 3",
+    "branch_format": "BRANCH_CODE ไม่ครบ 8 หลัก",
+    "branch_prefix": "2 หลักแรกของ BRANCH_CODE ไม่ตรงกับ CHANGWAT_CODE",
+    "duplicate_rn": "เลข RN ซ้ำกับแถวก่อนหน้า",
+    "duplicate_utm": "UTMMAP1-4 + UTMSCALE + LAND_NO ซ้ำกับแถวก่อนหน้า",
+    "duplicate_geometry": "รูปแปลงทับสนิทกับแถวก่อนหน้า",
+    "partial_overlap": "รูปแปลงเลื่อนไปทับแปลงข้างเคียงบางส่วน (ครึ่งช่อง grid)",
+    "land_use_domain": "LAND_USE นอกโดเมน",
+    "street_type_domain": "STREET_TYPE นอกโดเมน",
+    "td_code": "TD_RP3_TYPE_CODE = 7 ทั้งที่มี STREET_NAME",
+    "name_required": "STREET_NAME ว่างทั้งที่ TD_RP3_TYPE_CODE ต้องมีชื่อ",
+    "one_to_one": "STREET_CODE เดียวกันมี STREET_NAME มากกว่า 1",
+    "blank_name": "STREET_NAME ว่าง",
+    "block_type_domain": "BLOCK_TYPE_ID นอกโดเมน",
+    "table_no_domain": "TABLE_NO นอกโดเมน",
+    "sub_table_domain": "SUB_TABLE_NO นอกช่วง 0-6",
+    "zero_depth": "DEPTH_R = 0",
+    "zero_coord": "START_X = 0",
+    "dangling_ref": "RN ของแปลงที่อ้างถึงไม่มีอยู่จริง",
+}
+_COPY_KINDS = {"duplicate_rn", "duplicate_utm", "duplicate_geometry"}  # คัดลอกค่าจากแถวก่อนหน้า (แถวแรกใส่ไม่ได้)
+
+_LAND_USES = sorted(ROAD_LAND_USE_DOMAIN)
+_STREET_TYPES = sorted(ROAD_STREET_TYPE_DOMAIN)
+_TD_CODES = sorted(ROAD_REQ_NAME_TD_CODES)
+_TABLE_NOS = sorted(REL_TABLE_NO_DOMAIN)
+_PARCEL_SCALES = np.array([4000, 2000, 1000, 500], dtype=np.int32)
+_UTMMAP4_UPPER = np.array([0, 4, 16, 64], dtype=np.int32)  # จำนวนระวางย่อยตาม _PARCEL_SCALES
+
+
+################################################
+#----------------- ตัวช่วยสร้างคอลัมน์
+################################################
+
+class _Batch:
+    """
+    แถวชุดหนึ่งของ layer (idx = เลขลำดับแถวทั้ง layer เริ่มที่ 0)
+    pick(kind) สุ่มแถวที่จะใส่ error ตามอัตราของชนิดนั้น และนับจำนวนไว้ใน counts
+    """
+
+    def __init__(self, idx, rng, rates, counts, context):
+        self.idx = idx
+        self.rng = rng
+        self.rates = rates
+        self.counts = counts
+        self.ctx = context
+
+    def pick(self, kind):
+        rate = self.rates.get(kind, 0.0)
+        if rate <= 0:
+            return np.zeros(len(self.idx), dtype=bool)
+        mask = self.rng.random(len(self.idx)) < rate
+        if kind in _COPY_KINDS:
+            mask &= self.idx > 0
+        self.counts[kind] += int(mask.sum())
+        return mask
+
+
+def _text(fmt, values):
+    return np.array([fmt % v for v in values.tolist()], dtype=object)
+
+def _repeat(value, n):
+    col = np.empty(n, dtype=object)
+    col[:] = value
+    return col
+
+def _box_wkb(cells, size, origin_x, origin_y, columns=1000, shift=0.0):
+    """
+    WKB ของสี่เหลี่ยมตาม grid (cell ที่ i อยู่แถว i // columns คอลัมน์ i % columns)
+    shift = ระยะเลื่อนตามแกน X ของแต่ละรูป (ใช้ทำรูปที่ทับแปลงข้างเคียงบางส่วน)
+    สร้างด้วย numpy ทั้ง batch ไม่ต้องสร้าง geometry ทีละรูป
+    """
+    dtype = np.dtype([("order", "u1"), ("type", "<u4"), ("rings", "<u4"), ("points", "<u4"), ("xy", "<f8", (5, 2))])
+    x0 = origin_x + (cells % columns) * size + shift
+    y0 = origin_y + (cells // columns) * size
+    x1, y1 = x0 + size * 0.9, y0 + size * 0.9
+    buf = np.empty(len(cells), dtype=dtype)
+    buf["order"], buf["type"], buf["rings"], buf["points"] = 1, 3, 1, 5
+    buf["xy"] = np.stack([np.stack([x0, y0], 1), np.stack([x1, y0], 1), np.stack([x1, y1], 1),
+                          np.stack([x0, y1], 1), np.stack([x0, y0], 1)], 1)
+    raw, width = buf.tobytes(), dtype.itemsize
+    return np.array([raw[i:i + width] for i in range(0, len(raw), width)], dtype=object)
+
+def _branch_columns(batch, prefix_error=True):
+    """CHANGWAT_CODE + BRANCH_CODE (1 สาขาต่อ GDB) พร้อม error branch_format / branch_prefix"""
+    n, cwt = len(batch.idx), batch.ctx["changwat"]
+    branch = _repeat(batch.ctx["branch"], n)
+    branch[batch.pick("branch_format")] = batch.ctx["branch"][:4]
+    if prefix_error:
+        other = "98" if cwt == "99" else "99"
+        branch[batch.pick("branch_prefix")] = other + batch.ctx["branch"][2:]
+    return _repeat(cwt, n), branch
+
+def _previous(batch, kind):
+    """idx ที่แถวที่สุ่มได้ถูกแทนด้วยแถวก่อนหน้า (ใช้ทำค่าซ้ำ)"""
+    return batch.idx - batch.pick(kind)
+
+
+################################################
+#----------------- ชั้นข้อมูลแต่ละประเภท
+################################################
+
+def _parcel_columns(batch):
+    idx = batch.idx
+    key = _previous(batch, "duplicate_utm")
+    n = len(idx)
+    scale_pos = (key // 64) % 4
+    scale = _PARCEL_SCALES[scale_pos]
+    upper = _UTMMAP4_UPPER[scale_pos]
+    utm4_num = np.where(upper > 0, 1 + key % np.maximum(upper, 1), 0)
+
+    utm1 = _text("%04d", 5000 + (key // 4096) % 1000)
+    utm1[batch.pick("utmmap1_format")] = "504"
+    utm2 = (1 + (key // 1024) % 4).astype(np.int32)
+    utm2[batch.pick("utmmap2_domain")] = 5
+    utm4_mask = batch.pick("utmmap4_scale")
+    utm4_num = np.where(utm4_mask, np.where(upper > 0, upper + 1, 1), utm4_num)
+    scale = scale.copy()
+    scale[batch.pick("scale_domain")] = 300
+    cwt, branch = _branch_columns(batch)
+    rn = (_previous(batch, "duplicate_rn") + 1).astype(np.int32)
+    return {
+        "UTMMAP1": utm1,
+        "UTMMAP2": utm2,
+        "UTMMAP3": _text("%04d", (key // 256) % 10000),
+        "UTMMAP4": _text("%02d", utm4_num),
+        "UTMSCALE": scale,
+        "LAND_NO": (key + 1).astype(np.int32),
+        "PARCEL_TYPE": np.ones(n, dtype=np.int32),
+        "CHANGWAT_CODE": cwt,
+        "BRANCH_CODE": branch,
+        "PARCEL_RN": rn,
+    }
+
+def _ns3k_columns(batch):
+    idx = batch.idx
+    key = _previous(batch, "duplicate_utm")
+    n = len(idx)
+    utm1 = _text("%04d", 5000 + (key // 4096) % 1000)
+    utm1[batch.pick("utmmap1_format")] = "504"
+    utm2 = (1 + (key // 1024) % 4).astype(np.int32)
+    utm2[batch.pick("utmmap2_domain")] = 5
+    utm3 = _repeat("0000", n)
+    utm3[batch.pick("utmmap3_domain")] = "0001"
+    utm4 = _text("%03d", 1 + (key // 4) % 999)
+    utm4[batch.pick("utmmap4_format")] = "01"
+    scale = np.full(n, 5000, dtype=np.int32)
+    scale[batch.pick("scale_domain")] = 4000
+    parcel_type = np.full(n, 3, dtype=np.int32)
+    parcel_type[batch.pick("parcel_type_domain")] = 1
+    cwt, branch = _branch_columns(batch)
+    return {
+        "UTMMAP1": utm1,
+        "UTMMAP2": utm2,
+        "UTMMAP3": utm3,
+        "UTMMAP4": utm4,
+        "UTMSCALE": scale,
+        "LAND_NO": (key + 1).astype(np.int32),
+        "PARCEL_TYPE": parcel_type,
+        "CHANGWAT_CODE": cwt,
+        "BRANCH_CODE": branch,
+        "NS3K_RN": (_previous(batch, "duplicate_rn") + 1).astype(np.int32),
+    }
+
+def _street_columns(batch, segments):
+    """STREET_NAME / STREET_CODE (ถนน 1 สายมี segments แถว) พร้อม error one_to_one"""
+    street = batch.idx // segments
+    name = _text("ถนนสาย %d", street)
+    name[batch.pick("one_to_one")] = "ถนนสายใหม่"
+    return name, _text("R%06d", street), street
+
+def _road_columns(batch):
+    n = len(batch.idx)
+    name, code, street = _street_columns(batch, 4)
+    td_code = np.array(_TD_CODES, dtype=np.int32)[street % len(_TD_CODES)]
+    td_code[batch.pick("td_code")] = 7
+    name[batch.pick("name_required")] = None
+    land_use = np.array(_LAND_USES, dtype=object)[street % len(_LAND_USES)]
+    land_use[batch.pick("land_use_domain")] = "ป่าไม้"
+    street_type = np.array(_STREET_TYPES, dtype=object)[street % len(_STREET_TYPES)]
+    street_type[batch.pick("street_type_domain")] = "กรวด"
+    cwt, branch = _branch_columns(batch)
+    return {
+        "STREET_NAME": name,
+        "STREET_CODE": code,
+        "STREET_DEPTH": np.full(n, 40.0),
+        "LAND_USE": land_use,
+        "STREET_TYPE": street_type,
+        "STREET_WIDTH": np.full(n, 6.0),
+        "STREET_AREA": np.full(n, 240.0),
+        "BRANCH_CODE": branch,
+        "PARCEL_TYPE": np.ones(n, dtype=np.int32),
+        "TD_RP3_TYPE_CODE": td_code,
+        "STREET_RN": (_previous(batch, "duplicate_rn") + 1).astype(np.int32),
+        "CHANGWAT_CODE": cwt,
+        "STREET_SMG": _text("%03d", street % 1000),
+    }
+
+def _block_columns(rn_field):
+    def build(batch):
+        name, code, _ = _street_columns(batch, 2)
+        name[batch.pick("blank_name")] = None
+        _, branch = _branch_columns(batch, prefix_error=False)
+        return {
+            "STREET_NAME": name,
+            "STREET_CODE": code,
+            "BRANCH_CODE": branch,
+            rn_field: (_previous(batch, "duplicate_rn") + 1).astype(np.int32),
+        }
+    return build
+
+def _block_blue_columns(batch):
+    _, branch = _branch_columns(batch, prefix_error=False)
+    block_type = (1 + batch.idx % 3).astype(np.int32)
+    block_type[batch.pick("block_type_domain")] = 4
+    return {
+        "BRANCH_CODE": branch,
+        "BLOCK_BLUE_RN": (_previous(batch, "duplicate_rn") + 1).astype(np.int32),
+        "BLOCK_TYPE_ID": block_type,
+    }
+
+def _rel_columns(parcel_key, rn_field):
+    def build(batch):
+        idx, sizes = batch.idx, batch.ctx["sizes"]
+        parcel_rn = (idx % max(sizes.get(parcel_key, 1), 1) + 1).astype(np.int32)
+        dangling = batch.pick("dangling_ref")
+        parcel_rn[dangling] = sizes.get(parcel_key, 0) + 1 + idx[dangling]
+        table_no = np.array(_TABLE_NOS, dtype=np.int32)[idx % len(_TABLE_NOS)]
+        table_no[batch.pick("table_no_domain")] = 9
+        sub_table = (idx % 7).astype(np.int32)
+        sub_table[batch.pick("sub_table_domain")] = 8
+        depth = 10.0 + idx % 30
+        depth[batch.pick("zero_depth")] = 0.0
+        start_x = 500000.0 + idx % 1000
+        start_x[batch.pick("zero_coord")] = 0.0
+        _, branch = _branch_columns(batch, prefix_error=False)
+        return {
+            "BRANCH_CODE": branch,
+            "REL_RN": (_previous(batch, "duplicate_rn") + 1).astype(np.int32),
+            rn_field: parcel_rn,
+            "STREET_RN": (idx % max(sizes.get("ROAD", 1), 1) + 1).astype(np.int32),
+            "BLOCK_FIX_RN": (idx % max(sizes.get("BLOCK_FIX", 1), 1) + 1).astype(np.int32),
+            "BLOCK_BLUE_RN": (idx % max(sizes.get("BLOCK_BLUE", 1), 1) + 1).astype(np.int32),
+            "BLOCK_PRICE_RN": (idx % max(sizes.get("BLOCK_PRICE", 1), 1) + 1).astype(np.int32),
+            "TABLE_NO": table_no,
+            "SUB_TABLE_NO": sub_table,
+            "DEPTH_R": depth,
+            "DEPTH_GROUP": (1 + idx % 4).astype(np.int32),
+            "START_X": start_x,
+            "START_Y": 1500000.0 + idx % 1000,
+            "END_X": 500010.0 + idx % 1000,
+            "END_Y": 1500010.0 + idx % 1000,
+        }
+    return build
+
+# ชั้นข้อมูลที่สร้าง: ชื่อ, สัดส่วนจำนวนแถวเทียบ PARCEL, ขนาดช่อง grid (None = ตาราง ไม่มี geometry), ฟังก์ชันสร้างคอลัมน์
+LAYER_SPECS = {
+    "PARCEL": {"name": "PARCEL_{zone}_{cwt}", "ratio": 1.0, "cell": 20.0, "build": _parcel_columns},
+    "PARCEL_NS3K": {"name": "PARCEL_{zone}_NS3K_{cwt}", "ratio": 0.1, "cell": 40.0, "build": _ns3k_columns},
+    "ROAD": {"name": "ROAD_{zone}", "ratio": 0.05, "cell": 30.0, "build": _road_columns},
+    "BLOCK_FIX": {"name": "BLOCK_FIX_{zone}", "ratio": 0.02, "cell": 100.0, "build": _block_columns("BLOCK_FIX_RN")},
+    "BLOCK_PRICE": {"name": "BLOCK_PRICE_{zone}", "ratio": 0.02, "cell": 100.0, "build": _block_columns("BLOCK_PRICE_RN")},
+    "BLOCK_BLUE": {"name": "BLOCK_BLUE_{zone}", "ratio": 0.02, "cell": 100.0, "build": _block_blue_columns},
+    "PARCEL_REL": {"name": "PARCEL_REL_{zone}", "ratio": 1.0, "cell": None, "build": _rel_columns("PARCEL", "PARCEL_RN")},
+    "NS3K_REL": {"name": "NS3K_REL_{zone}", "ratio": 0.1, "cell": None, "build": _rel_columns("PARCEL_NS3K", "NS3K_RN")},
+}
+
+
+################################################
+#----------------- เขียน GDB
+################################################
+
+def write_layer(gdb_path, layer_key, layer_name, rows, context, rates, seed, batch_rows=BATCH_ROWS, origin_y=0.0):
+    """สร้าง layer 1 ชั้นทีละ batch คืน Counter ของ error ที่ใส่"""
+    from pyogrio import raw
+
+    spec = LAYER_SPECS[layer_key]
+    counts = Counter()
+    layer_no = list(LAYER_SPECS).index(layer_key)
+    for batch_no, start in enumerate(range(0, rows, batch_rows)):
+        idx = np.arange(start, min(start + batch_rows, rows), dtype=np.int64)
+        rng = np.random.default_rng([seed, context["gdb_no"], layer_no, batch_no])
+        batch = _Batch(idx, rng, rates, counts, context)
+        columns = spec["build"](batch)
+        geometry = None
+        if spec["cell"] is not None:
+            cells = _previous(batch, "duplicate_geometry")
+            shift = batch.pick("partial_overlap") * (spec["cell"] * 0.5)
+            geometry = _box_wkb(cells, spec["cell"], 500000.0, 1500000.0 + origin_y, shift=shift)
+        raw.write(
+            gdb_path, geometry, list(columns.values()), field_mask=None, fields=list(columns),
+            layer=layer_name, driver="OpenFileGDB",
+            geometry_type="Polygon" if geometry is not None else None,
+            crs=CRS if geometry is not None else None,
+            append=os.path.exists(gdb_path),
+        )
+    return counts
+
+def make_gdb(gdb_path, changwat, gdb_no, rows, rates, seed, layers=None, zone=UTM_ZONE, batch_rows=BATCH_ROWS):
+    """สร้าง GDB 1 ก้อน คืน {ชื่อ layer: {"rows": ..., "errors": {...}}}"""
+    layers = list(layers or LAYER_SPECS)
+    sizes = {key: max(1, int(rows * LAYER_SPECS[key]["ratio"])) for key in LAYER_SPECS}
+    context = {
+        "changwat": changwat,
+        "branch": f"{changwat}{gdb_no:02d}0000",
+        "gdb_no": gdb_no,
+        "sizes": sizes,
+    }
+    os.makedirs(os.path.dirname(gdb_path), exist_ok=True)
+    result = {}
+    origin_y = 0.0
+    for key in layers:
+        spec = LAYER_SPECS[key]
+        name = spec["name"].format(zone=zone, cwt=changwat)
+        started = time.perf_counter()
+        counts = write_layer(gdb_path, key, name, sizes[key], context, rates, seed, batch_rows, origin_y)
+        if spec["cell"] is not None:  # แต่ละชั้นอยู่คนละแถบ ไม่ทับกัน
+            origin_y += (sizes[key] // 1000 + 2) * spec["cell"]
+        result[name] = {"layer": key, "rows": sizes[key], "errors": dict(sorted(counts.items()))}
+        print(f"    {name}: {sizes[key]:,} แถว error {sum(counts.values()):,} ({time.perf_counter() - started:.1f} วินาที)")
+    return result
+
+def parse_rates(default_rate, overrides):
+    """อัตรา error ของทุกชนิด ('ชนิด=อัตรา' ใน overrides ใช้แทนค่าตั้งต้น)"""
+    rates = {kind: default_rate for kind in ERROR_KINDS}
+    for item in overrides or []:
+        kind, _, value = item.partition("=")
+        if kind not in ERROR_KINDS:
+            raise SystemExit(f"ไม่รู้จักชนิด error: {kind} (มี: {', '.join(ERROR_KINDS)})")
+        rates[kind] = float(value)
+    return rates
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="สร้าง GDB ข้อมูลสังเคราะห์สำหรับทดสอบ/วัดความเร็ว validate_gdb.py")
+    parser.add_argument("--out", default=OUTPUT_ROOT, help="โฟลเดอร์ที่สร้าง (ใช้เป็น ROOT_DIR)")
+    parser.add_argument("--rows", type=int, default=ROWS, help="จำนวนแถวของ PARCEL ต่อ GDB")
+    parser.add_argument("--provinces", nargs="+", default=PROVINCES, help="จังหวัด 'รหัส:ชื่อ'")
+    parser.add_argument("--gdbs", type=int, default=GDBS_PER_PROVINCE, help="จำนวน GDB ต่อจังหวัด")
+    parser.add_argument("--layers", nargs="+", choices=list(LAYER_SPECS), help="สร้างเฉพาะชั้นข้อมูลเหล่านี้")
+    parser.add_argument("--error-rate", type=float, default=ERROR_RATE, help="อัตรา error ตั้งต้นของทุกชนิด")
+    parser.add_argument("--rate", action="append", metavar="KIND=RATE", help="อัตรา error รายชนิด (ใส่ได้หลายครั้ง)")
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--batch", type=int, default=BATCH_ROWS, help="จำนวนแถวที่เขียนต่อครั้ง")
+    args = parser.parse_args(argv)
+
+    rates = parse_rates(args.error_rate, args.rate)
+    manifest = {"seed": args.seed, "rows": args.rows, "rates": rates, "gdbs": {}}
+    started = time.perf_counter()
+    for province in args.provinces:
+        changwat, _, province_name = province.partition(":")
+        for gdb_no in range(1, args.gdbs + 1):
+            gdb_name = f"GDB_{changwat}_{gdb_no}"
+            gdb_path = os.path.join(args.out, f"{changwat}_{province_name or changwat}", gdb_name, f"{gdb_name}.gdb")
+            if os.path.exists(gdb_path):
+                print(f"!! มี {gdb_path} อยู่แล้ว (ลบก่อนสร้างใหม่)")
+                return 1
+            print(f"-> สร้าง {gdb_path}")
+            manifest["gdbs"][gdb_path] = make_gdb(gdb_path, changwat, gdb_no, args.rows, rates, args.seed,
+                                                  args.layers, batch_rows=args.batch)
+
+    with open(os.path.join(args.out, MANIFEST_NAME), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1)
+    print(f"\nเสร็จแล้ว {len(manifest['gdbs'])} GDB ({time.perf_counter() - started:.1f} วินาที)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
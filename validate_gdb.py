@@ -3,16 +3,40 @@
 # - Script เผยแพร่ v1 
 # - date: 2025-10-29)
 # - ตรวจสอบความถูกต้องของข้อมูล GIS ใน GDB ตามมาตรฐานที่กำหนด
+# - เป็น core ที่ check_required_featureclass.py, check_featureclass_in_gdb.py, benchmark_gdb.py
+#   และ worker process import ไปใช้ (validator, VALIDATION_MAP, validate_layers, write_summary_report)
+#   import แล้วไม่โหลด arcpy / numpy / pandas / openpyxl จนกว่าจะถึงขั้นตอนที่ใช้
 # =============================================================================
 
-import arcpy
 import os
 import re
+import sys
+import time
 import datetime
+import argparse
 import uuid
+import socket
+import importlib.util
+import tempfile
+import multiprocessing
 from collections import defaultdict
-import pandas as pd
-from openpyxl import load_workbook
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from gdb_reader import PrefetchCursor, PrefetchStats, get_row_source
+from gdb_overlap import GeometryHasher, find_identical_groups
+from gdb_dupkeys import KeyGroups
+from gdb_partial_overlap import EnvelopeCollector, find_partial_overlaps, partial_overlap_available
+from gdb_report import ErrorReportWriter, ErrorStore, ExcelSheetStream, SummaryCounts, new_workbook, save_workbook
+from gdb_store import ErrorFileWriter, store_available, write_gdb_results, restamp_gdb_results, read_summary
+from gdb_journal import RunJournal
+from gdb_perf import PERF_HEADERS, measure, add_record, start_recording, stop_recording, is_recording, write_perf_json
+from gdb_memory import MB, start_monitor, stop_monitor, open_window, close_window, memory_pressure, write_snapshot
+from gdb_cache import ResultCache, gdb_fingerprint, source_signature
+from gdb_refs import start_indexing, stop_indexing, current_index, layer_zone
+from gdb_discovery import DISCOVERY_WORKERS, discover_gdbs
+from gdb_watch import GdbWatcher
+from gdb_queue import WorkQueue, Heartbeat
+from gdb_rules import COMPILED_RULE_SETS, is_numeric_field_type
 
 
 ###############################################
@@ -22,28 +46,83 @@ ROOT_DIR = r"D:\A02-Projects\WarRoom\GDB"  # ที่รวมไฟล์ GDB
 REPORT_ROOT = r"D:\A02-Projects\WarRoom\Reportalt"  # ที่เก็บรายงานผล
 OVERLAP_ROOT = r"D:\A02-Projects\WarRoom\Overlapingalt"  # ที่เก็บไฟล์ผลการตรวจสอบทับซ้อน
 SUMMARY_SUMMARY_EXCEL_PATH = os.path.join(REPORT_ROOT,"Summary_Report.xlsx") # ไฟล์สรุปรายงานรวม
+GDB_CATALOGUE_PATH = os.path.join(os.path.dirname(REPORT_ROOT), "_gdb_catalogue.json")  # รายการ .gdb ที่ค้นพบ (ใช้ร่วมกับ check_featureclass_in_gdb.py, None = ค้นใหม่ทุกครั้ง)
+MAX_WORKERS = 1  # จำนวน process ที่ตรวจ GDB พร้อมกัน (1 = ตรวจทีละ GDB แบบเดิม)
+READER_BACKEND = "arcpy"  # วิธีอ่านข้อมูล: "arcpy" หรือ "openfilegdb" (อ่าน .gdb ด้วย GDAL ไม่ต้องมี arcpy)
+PREFETCH_DEPTH = 0  # จำนวน batch ที่ thread เบื้องหลังอ่านจาก cursor เก็บไว้ล่วงหน้าระหว่างที่กฎตรวจ batch ก่อนหน้า (0 = ไม่ prefetch อ่านและตรวจสลับกันแบบเดิม, แนะนำ 4 เมื่ออ่าน GDB จาก share/ดิสก์ที่ช้า ดู <io_wait> ในชีต Perf ก่อนเปิด)
+PREFETCH_BATCH_SIZE = 5000  # จำนวนแถวต่อ batch ของ prefetch (การอ่านแบบ columnar ใช้ batch ของ reader)
+RULE_SET = "v1"  # ชุดกฎใน gdb_rules.RULE_SETS: "v1" = กฎของสคริปต์นี้, "v15" = กฎของ check_required_featureclass.py (สคริปต์นั้นตั้งเอง)
+PARCEL_COLUMNAR = True  # ตรวจ PARCEL / PARCEL_NS3K แบบ columnar (numpy/pandas) ผลลัพธ์เหมือนแบบทีละแถว
+OVERLAP_ENGINE = "hash"  # วิธีตรวจทับซ้อนสนิท: "hash" (อ่าน WKB รอบเดียว ไม่ต้องมี arcpy) หรือ "findidentical" (arcpy FindIdentical แบบเดิม)
+OVERLAP_TOLERANCES = {}  # ระยะคลาดเคลื่อนของการตรวจซ้ำแบบเกือบซ้ำ แยกตามชั้นข้อมูล (หน่วยพิกัด เช่น {"PARCEL": 0.01, "BLOCK_FIX": 0.05, "ROAD": 0.05}) ชั้นที่ไม่ระบุ = ต้องตรงกันทุกจุด
+PARTIAL_OVERLAP_CHECK = True  # ตรวจ PARCEL / PARCEL_NS3K ที่ทับกันบางส่วน (sliver) ด้วย STR-tree ทีละ tile (ต้องมี shapely 2.x ไม่มีจะข้าม)
+PARTIAL_OVERLAP_MIN_AREA = 0.1  # พื้นที่ทับขั้นต่ำที่นับเป็น error (หน่วยพิกัดยกกำลังสอง เช่น ตร.ม. ใน UTM)
+PARTIAL_OVERLAP_TILE_FEATURES = 50000  # จำนวนฟีเจอร์ต่อ tile ของการตรวจทับกันบางส่วน (คุมหน่วยความจำ)
+SINGLE_SCAN = True  # อ่านแต่ละชั้นรอบเดียว: นับแถว + ตรวจข้อมูล + hash geometry (OVERLAP_ENGINE "hash") จาก cursor เดียวกัน
+DUPLICATE_KEY_BUDGET_MB = 128  # หน่วยความจำ (MB) ที่ให้กฎตรวจค่าซ้ำแต่ละข้อเก็บ key เกินแล้วเขียนลงดิสก์เป็นชุดที่เรียงแล้ว รวมตอนจบ (None = เก็บในหน่วยความจำทั้งหมด)
+DUPLICATE_SPILL_DIR = None  # โฟลเดอร์ไฟล์ชั่วคราวของการตรวจค่าซ้ำที่เกินงบ (None = temp ของระบบ)
+REFERENCE_CHECK = True  # ตรวจว่า RN ใน PARCEL_REL / NS3K_REL มีอยู่จริงในชั้นต้นทางโซนและ BRANCH_CODE เดียวกัน (เก็บ key ระหว่างอ่านชั้นต้นทาง)
+USE_CACHE = True  # ข้าม GDB ที่ไฟล์ไม่เปลี่ยนจากรอบก่อน ใช้ผลตรวจเดิมจาก cache (--full เพื่อตรวจใหม่ทั้งหมด)
+CACHE_DIR = os.path.join(REPORT_ROOT, "_cache")  # ที่เก็บ cache ผลตรวจของแต่ละ GDB
+CACHE_HASH_CONTENTS = False  # True = hash เนื้อไฟล์ใน .gdb ด้วย (ช้ากว่า ไม่พึ่งเวลาแก้ไขไฟล์)
+JOURNAL_PATH = os.path.join(REPORT_ROOT, "_run_journal.jsonl")  # บันทึกผลทีละ GDB ระหว่างรัน สำหรับ --resume
+PERF_ENABLED = True  # วัดเวลา/จำนวนแถว/error ราย GDB, featureclass, ขั้นตอน และกฎ (Sheet 'Perf' + PERF_JSON_PATH)
+PERF_RULE_TIMING = False  # จับเวลารายกฎและเวลาอ่าน cursor ด้วย (ละเอียดขึ้น แต่ตรวจช้าลงราว 20-30%)
+PERF_JSON_PATH = os.path.join(REPORT_ROOT, "Perf_Report.json")  # ผลการวัดของรอบล่าสุดแบบ JSON
+ERROR_DETAIL_CAP = None  # แถวรายละเอียดสูงสุดต่อ (featureclass, Check_Type, Field_Name) ในรายงานของแต่ละ GDB (None = เขียนทุกแถว) Error SUM ยังนับครบ
+ERROR_DETAIL_CAPS = {}  # เพดานเฉพาะกฎ ใช้แทน ERROR_DETAIL_CAP เช่น {("Data Format", "UTMMAP3"): 1000, "Duplicate UTM": None}
+MEMORY_TRACKING = True  # วัด RSS สูงสุดราย GDB / featureclass / ขั้นตอน (คอลัมน์ Peak_RSS_MB ใน Sheet 'Perf')
+MEMORY_TRACEMALLOC = False  # วัดหน่วยความจำที่ Python จอง (Peak_Py_MB) และเขียน snapshot เมื่อเกินงบ (ตรวจช้าลงมาก ใช้ตอนหาสาเหตุ)
+MEMORY_BUDGET_MB = None  # งบ RSS (MB) ของ process ระหว่างตรวจ 1 GDB เกินแล้วสลับเป็นโหมดประหยัดแทนการรันต่อจนล้ม (None = ไม่ตรวจงบ)
+MEMORY_DEGRADED_ERROR_CAP = 1000  # โหมดประหยัด: แถวรายละเอียดสูงสุดต่อ (featureclass, Check_Type, Field_Name) ของ error ที่พบหลังเกินงบ
+MEMORY_DEGRADED_KEY_BUDGET_MB = 8  # โหมดประหยัด: งบของการตรวจค่าซ้ำต่อกฎ (แทน DUPLICATE_KEY_BUDGET_MB)
+MEMORY_DEGRADED_STORE_ROWS = 100000  # โหมดประหยัด: error สำหรับ Parquet เก็บในหน่วยความจำได้ไม่เกินกี่แถว ครบแล้วเขียนลงไฟล์ทีละ row group
+MEMORY_SNAPSHOT_DIR = os.path.join(REPORT_ROOT, "_memory")  # ที่เก็บ snapshot ของ tracemalloc (เมื่อเปิด MEMORY_TRACEMALLOC และเกินงบ)
+WATCH_QUIET_SECONDS = 120  # โหมด --watch: GDB ต้องไม่มีไฟล์เปลี่ยนติดต่อกันกี่วินาทีจึงถือว่า upload เสร็จและส่งตรวจ
+WATCH_POLL_SECONDS = 60  # โหมด --watch: สแกนหา .gdb ใหม่ทุกกี่วินาที (Linux ใช้ inotify รู้ทันที ระบบอื่นใช้การสแกนนี้อย่างเดียว)
+WATCH_MAX_RETRIES = 2  # โหมด --watch: GDB ที่ตรวจล้มเหลว (worker ตาย / ตรวจไม่ครบ) ส่งตรวจซ้ำได้อีกกี่ครั้ง เกินแล้วรอจนไฟล์เปลี่ยน
+WATCH_SUMMARY_SECONDS = 300  # โหมด --watch: ระหว่างที่ยังมี GDB รอตรวจ เขียนรายงานสรุปใหม่อย่างน้อยทุกกี่วินาที (ตรวจครบคิวแล้วเขียนทันที)
+QUEUE_DIR = os.path.join(REPORT_ROOT, "_queue")  # โหมดหลายเครื่อง (--coordinate / --work): โฟลเดอร์คิวงานที่ทุกเครื่องเห็น (share เดียวกัน)
+QUEUE_SHARD = "province"  # แบ่งงาน: "province" (1 งานต่อจังหวัด) หรือ "size" (1 งานต่อ GDB) งานใหญ่ถูกรับไปก่อน
+QUEUE_LEASE_SECONDS = 300  # อายุ lease ของงาน เครื่องที่ไม่ต่ออายุ (heartbeat ทุก 1/3 ของค่านี้) เกินเวลานี้ งานถูกเครื่องอื่นรับต่อ
+QUEUE_POLL_SECONDS = 10  # ระยะรอระหว่างเช็คคิว (วินาที)
+QUEUE_MAX_ATTEMPTS = 3  # งานที่ถูกรับไปกี่ครั้งแล้วยังไม่เสร็จ (เครื่องล้ม / lease หมดอายุ / ตรวจล้มเหลว) ถือว่าล้มเหลว (กัน GDB ที่ทำเครื่องล้มวนไม่จบ)
+PARQUET_STORE = True  # เขียน error ทุกแถว + All_DATA เป็น Parquet แบ่งตามวันที่รัน/จังหวัดด้วย (ต้องมี pyarrow ไม่มีจะข้าม)
+PARQUET_ROOT = os.path.join(REPORT_ROOT, "_store")  # ที่เก็บ Parquet (errors/ และ inventory/)
 # --------------------------------------------
 #   จัดการค่าต่าง ๆ รวมทั้งฟังก์ชัน ตัวแปร ที่ใช้ร่วมกัน
 # --------------------------------------------
-NUMERIC_TYPES = {"SmallInteger", "Integer", "Single", "Double", "Float", "DoubleFloat", "SingleFloat", "OID"}
+# โดเมนค่า (ROAD_LAND_USE_DOMAIN, REL_TABLE_NO_DOMAIN ฯลฯ) และตารางกฎอยู่ใน gdb_rules.py
+# arcpy / numpy / pandas / openpyxl import เมื่อถึงขั้นตอนที่ใช้ (worker และ check_featureclass_in_gdb.py เริ่มได้เร็ว)
 
 
-ROAD_LAND_USE_DOMAIN = {
-    "พาณิชยกรรม", "อุตสาหกรรม", "พาณิชยกรรมและที่อยู่อาศัย", "ที่อยู่อาศัย",
-    "ที่อยู่อาศัยและเกษตรกรรม", "ส่วนราชการ", "เกษตรกรรม", "พื้นที่ป่าสงวน", "พื้นที่อุทยาน"
-}
-ROAD_STREET_TYPE_DOMAIN = {
-    "คอนกรีต", "ลาดยาง", "หินคลุก", "ลูกรัง", "ดิน", "น้ำ", "ไม้", "ทางไม่มีสภาพ"
-}
-ROAD_REQ_NAME_TD_CODES = {1, 2, 3, 4, 5, 6, 8}
-REL_TABLE_NO_DOMAIN = {1, 2, 3, 41, 42, 5, 6, 7}
-REL_SUB_TABLE_NO_RANGE = range(0, 7) # 0-6
+def _arcpy():
+    """arcpy (import ครั้งแรกเมื่อเรียก) หรือ None ถ้าไม่มี arcpy (backend openfilegdb รันได้โดยไม่ต้องมี arcpy)"""
+    try:
+        import arcpy
+    except ImportError:
+        return None
+    return arcpy
 
+def clear_in_memory():
+    """ล้าง in_memory ของ arcpy (เฉพาะเมื่อ process นี้ import arcpy ไปแล้ว ไม่ต้องโหลด arcpy เพื่อล้าง)"""
+    arcpy = sys.modules.get("arcpy")
+    if arcpy is not None:
+        try:
+            arcpy.management.Delete("in_memory")
+        except Exception:
+            pass
 
 def write_error_report(error_list, gdb_path, fc_name, check_type, oid, field, value, message):
     """
-    รวบรวมข้อผิดพลาดลงใน List
+    รวบรวมข้อผิดพลาดลงใน error_list
+    - ErrorStore / ErrorReportWriter (มี add): Timestamp ของรอบใส่ตอนเขียนรายงาน ไม่ต้องอ่านเวลาทุก error
+    - list ธรรมดา: เก็บทั้งแถวพร้อม Timestamp แบบเดิม
     """
+    add = getattr(error_list, "add", None)
+    if add is not None:
+        add(gdb_path, fc_name, check_type, oid, field, value, message)
+        return
     error_list.append([
         datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
         gdb_path,
@@ -56,25 +135,13 @@ def write_error_report(error_list, gdb_path, fc_name, check_type, oid, field, va
     ])
 
 # ค้นหา GDBs
-def find_gdb_paths(root_dir):
-    gdb_paths = []
-    for root, dirs, _ in os.walk(root_dir):
-        
-        # 1. ค้นหา GDB ใน Dirs ปัจจุบัน
-        found_gdbs = []
-        for d in dirs:
-            if d.lower().endswith(".gdb"):
-                gdb_paths.append(os.path.join(root, d))
-                found_gdbs.append(d)
-
-        # 2. (สำคัญ) ลบ GDB ที่พบออกจาก Dirs
-        # เพื่อ os.walk จะได้ไม่ค้นหา *ข้างใน* GDB นั้นอีก (เจอบางจังหวัดที่มี GDB ซ้อนกัน)
-        # # (ต้องทำใน loop ย้อนกลับ หรือสร้าง list ใหม่ แต่ .remove() ก็ใช้ได้)
-        for gdb_dir in found_gdbs:
-            try:
-                dirs.remove(gdb_dir)
-            except ValueError:
-                pass # ไม่ควรเกิดขึ้น        
+def find_gdb_paths(root_dir, rescan=False):
+    """
+    ค้นหา .gdb ทั้งหมดใต้ root_dir (ไม่ค้นหาข้างใน .gdb เพราะเจอบางจังหวัดที่มี GDB ซ้อนกัน)
+    อ่านหลายโฟลเดอร์พร้อมกันและใช้รายการเดิมจาก GDB_CATALOGUE_PATH กับโฟลเดอร์ที่ไม่เปลี่ยน (gdb_discovery.py)
+    rescan=True อ่านรายการใหม่ทุกโฟลเดอร์
+    """
+    gdb_paths = discover_gdbs(root_dir, GDB_CATALOGUE_PATH, DISCOVERY_WORKERS, rescan)
     if not gdb_paths:        
         print(f"คำเตือน: ไม่พบ .gdb ใน {root_dir}")
     else:
@@ -140,46 +207,102 @@ def categorize_featureclass(fc_name_str):
 # ฟังก์ชันช่วยอ่านฟิลด์อย่างปลอดภัย
 def safe_list_fields(fc_path):
     try:
-        return {f.name.upper(): f.type for f in arcpy.ListFields(fc_path)}
+        with measure("phase", os.path.basename(fc_path), "list_fields"):
+            return get_row_source(READER_BACKEND).list_fields(fc_path)
     except Exception:
         return {}
 
-def is_numeric_field_type(field_type):
-    if not field_type:
-        return False
-    return field_type in NUMERIC_TYPES or field_type.lower() in {"double","single","float","integer","smallinteger","short","long"}
+def open_cursor(fc_path, fields, oids=None, stats=None):
+    """
+    เปิด cursor อ่านข้อมูลตาม READER_BACKEND (ใช้แทน arcpy.da.SearchCursor)
+    oids : ถ้าระบุ จะอ่านเฉพาะ OID เหล่านี้
+    PREFETCH_DEPTH > 0 อ่านล่วงหน้าด้วย thread เบื้องหลัง (stats = PrefetchStats สำหรับ Sheet 'Perf')
+    """
+    source = get_row_source(READER_BACKEND)
+    if PREFETCH_DEPTH <= 0:
+        return source.open_cursor(fc_path, fields, oids)
+    return PrefetchCursor(lambda: source.open_cursor(fc_path, fields, oids), PREFETCH_BATCH_SIZE, PREFETCH_DEPTH, stats)
+
+def record_prefetch(fc_name, phase, stats, rows):
+    """
+    เวลาของการอ่านแบบ prefetch ลง Sheet 'Perf' (Level 'rule'):
+    <read> = เวลาอ่าน cursor (thread เบื้องหลัง), <io_wait> = เวลาที่กฎรอข้อมูล, <compute> = เวลาตรวจ
+    """
+    if PREFETCH_DEPTH <= 0 or not stats.batches:
+        return
+    add_record("rule", fc_name, phase, "<read>", wall=stats.read_wall, rows=rows)
+    add_record("rule", fc_name, phase, "<io_wait>", wall=stats.wait_wall, rows=rows)
+    add_record("rule", fc_name, phase, "<compute>", wall=stats.compute_wall, rows=rows)
+
+def new_key_groups():
+    """
+    KeyGroups สำหรับกฎตรวจค่าซ้ำ ตาม DUPLICATE_KEY_BUDGET_MB / DUPLICATE_SPILL_DIR
+    เมื่อหน่วยความจำเกิน MEMORY_BUDGET_MB ใช้งบ MEMORY_DEGRADED_KEY_BUDGET_MB แทน
+    """
+    budget = None if DUPLICATE_KEY_BUDGET_MB is None else int(DUPLICATE_KEY_BUDGET_MB * MB)
+    return KeyGroups(budget, DUPLICATE_SPILL_DIR, memory_pressure, int(MEMORY_DEGRADED_KEY_BUDGET_MB * MB))
+
+def overlap_tolerance(layer_key):
+    """ระยะคลาดเคลื่อนของการตรวจซ้ำของชั้นข้อมูล (OVERLAP_TOLERANCES) None = ต้องตรงกันทุกจุด"""
+    return OVERLAP_TOLERANCES.get(layer_key) or None
+
+def new_geometry_hasher(fields, layer_key=None):
+    """
+    GeometryHasher สำหรับ hash geometry ไปพร้อมกับ cursor ของการตรวจข้อมูล (SINGLE_SCAN)
+    คืน None ถ้าไม่ต้องใช้ (ตาราง / ไม่ใช้ OVERLAP_ENGINE "hash") -> check_for_exact_overlaps อ่านเอง
+    """
+    if not SINGLE_SCAN or OVERLAP_ENGINE != "hash" or "Geometry" not in fields.values():
+        return None
+    return GeometryHasher(overlap_tolerance(layer_key))
+
+def use_partial_overlap():
+    return PARTIAL_OVERLAP_CHECK and partial_overlap_available()
+
+def new_envelope_collector(fields):
+    """
+    EnvelopeCollector สำหรับเก็บ envelope ไปพร้อมกับ cursor ของการตรวจข้อมูล (SINGLE_SCAN)
+    คืน None ถ้าไม่ต้องใช้ -> check_for_partial_overlaps อ่านเอง (หรือข้ามถ้าไม่ได้เปิด PARTIAL_OVERLAP_CHECK)
+    """
+    if not SINGLE_SCAN or not use_partial_overlap() or "Geometry" not in fields.values():
+        return None
+    return EnvelopeCollector()
+
+def reference_taps(layer_key, fc_path, fields):
+    """
+    ตัวเก็บ key สำหรับตรวจการอ้างอิงข้ามชั้น (gdb_refs) ของชั้นนี้ เป็น list (ว่าง = ไม่ต้องเก็บ)
+    ใช้ได้เฉพาะระหว่าง process_gdb ที่เปิด REFERENCE_CHECK
+    """
+    index = current_index()
+    if index is None:
+        return []
+    tap = index.tap(layer_key, os.path.basename(fc_path), fields)
+    return [tap] if tap is not None else []
+
+def _tap_fields(cursor_fields, taps):
+    """เพิ่มฟิลด์ที่ taps ต้องใช้ต่อท้าย cursor_fields คืน (cursor_fields, [ตำแหน่งฟิลด์ของแต่ละ tap])"""
+    cursor_fields = list(cursor_fields)
+    positions = []
+    for tap in taps:
+        for f in tap.fields:
+            if f not in cursor_fields:
+                cursor_fields.append(f)
+        positions.append([cursor_fields.index(f) for f in tap.fields])
+    return cursor_fields, positions
 
-def can_be_number(val):
-    if val is None:
-        return False
-    if isinstance(val, (int, float)):
-        return True
-    try:
-        float(val)
-        return True
-    except Exception:
-        return False
-        
-def safe_value_is_int_like(val):
-    if val is None: return False
-    try:
-        if isinstance(val, (int, float)):
-            return float(val).is_integer()
-        if isinstance(val, str) and val.isdigit():
-            return True
-        return False
-    except Exception:
-        return False
 
 ########################################
 # ฟังก์ชันตรวจสอบทับซ้อน (ทับสนิท)
 ########################################
 
-def check_for_exact_overlaps(fc_path, error_list, output_dir, output_basename, return_layer_path=False, verbose=True):
+def check_for_exact_overlaps(fc_path, error_list, output_dir, output_basename, return_layer_path=False, verbose=True, hasher=None,
+                             layer_key=None):
     """
-    ตรวจสอบโพลีกอนที่ทับกันสนิท (exact overlap) โดยใช้ arcpy.management.FindIdentical
-    ทำงานได้ทั้ง ArcGIS Pro และ ArcMap (รองรับกรณีไม่มี FEAT_SEQ หรือ GROUPID)
-    
+    ตรวจสอบโพลีกอนที่ทับกันสนิท (exact overlap) ตาม OVERLAP_ENGINE
+    - "hash"          : อ่าน WKB รอบเดียว hash รูปแบบมาตรฐาน แล้วยืนยันด้วยการเทียบไบต์ (gdb_overlap.py)
+                        ชั้นที่มีใน OVERLAP_TOLERANCES: จับคู่ตามช่อง grid ของจุดกึ่งกลางกรอบ แล้วยืนยันด้วย Hausdorff / ผลต่างพื้นที่
+    - "findidentical" : arcpy.management.FindIdentical แบบเดิม (ต้องมี arcpy) ใช้ xy_tolerance ตาม OVERLAP_TOLERANCES
+    พบซ้ำแล้วบันทึกฟีเจอร์ที่ซ้ำเป็น shapefile
+
     Parameters
     ----------
     fc_path : str
@@ -194,6 +317,10 @@ def check_for_exact_overlaps(fc_path, error_list, output_dir, output_basename, r
         ถ้า True จะคืน path ของ shapefile ที่สร้างขึ้น
     verbose : bool
         ถ้า True จะแสดง log ระหว่างการทำงาน
+    hasher : GeometryHasher | None
+        digest ที่เก็บไว้แล้วระหว่างตรวจข้อมูล (อ่านครบ layer) ไม่ต้องอ่าน geometry ทั้ง layer อีกรอบ
+    layer_key : str | None
+        ชั้นข้อมูลใน VALIDATION_MAP สำหรับเลือกระยะคลาดเคลื่อนจาก OVERLAP_TOLERANCES
 
     Returns
     -------
@@ -202,6 +329,88 @@ def check_for_exact_overlaps(fc_path, error_list, output_dir, output_basename, r
         ถ้าไม่พบซ้ำหรือเกิด error จะคืน None
     """
 
+    gdb_path, fc_name = os.path.split(fc_path)
+    use_hash = OVERLAP_ENGINE == "hash"
+    tolerance = overlap_tolerance(layer_key)
+
+    if not use_hash and _arcpy() is None:
+        if verbose: print(f"    ▶ ข้ามการตรวจสอบการซ้อนทับ (ไม่มี arcpy): {fc_name}")
+        return None
+
+    # ใช้ output_basename (ชื่อเดิมที่มีภาษาไทย) สำหรับ .shp
+    output_shp = os.path.join(output_dir, f"{output_basename}_{fc_name}_duplicates.shp")
+
+    # --------------------------
+    # เริ่มตรวจสอบทับซ้อน
+    # --------------------------
+    if verbose:
+        print(f"    ▶ ตรวจสอบการซ้อนทับ (Exact Overlap): {fc_name}")
+
+    try:
+        with measure("phase", fc_name, "overlap", error_list=error_list) as timer:
+            if use_hash:
+                stats = {}
+                if hasher is not None and hasher.complete and hasher.tolerance == tolerance:
+                    groups = hasher.groups(open_cursor, fc_path, stats)
+                else:
+                    groups = find_identical_groups(open_cursor, fc_path, stats, tolerance)
+                dup_fids = sorted({fid for group in groups for fid in group})
+                timer.rows = stats.get("rows")
+            else:
+                dup_fids = find_identical_fids_arcpy(fc_path, error_list, output_basename, verbose, tolerance)
+            if dup_fids is None:
+                return None
+
+            # --------------------------
+            # วิเคราะห์ผลลัพธ์
+            # --------------------------
+            if not dup_fids:
+                if verbose: print("      ✓ ไม่พบ Duplicated Polygon")
+                return None
+
+            count = len(dup_fids)
+            msg = f"พบโพลีกอนทับกันสนิท {count} รูปแปลง (OIDs: {dup_fids[:20]}{'...' if count > 20 else ''})"
+            if tolerance:
+                msg += f" ระยะคลาดเคลื่อน {tolerance}"
+            if verbose: print(f"      ⚠ {msg}")
+
+            write_error_report(
+                error_list,
+                gdb_path,
+                fc_name,
+                "Duplicated Polygon",
+                str(dup_fids),
+                "Shape",
+                count,
+                msg
+            )
+
+        # --------------------------
+        # สร้าง Shapefile Output
+        # --------------------------
+        os.makedirs(output_dir, exist_ok=True)
+        with measure("phase", fc_name, "overlap_export") as timer:
+            timer.rows = len(dup_fids)
+            get_row_source(READER_BACKEND).export_features(fc_path, dup_fids, output_shp)
+
+        if verbose: print(f"      → บันทึก shapefile: {output_shp}")
+        return output_shp if return_layer_path else None
+
+    except Exception as e:
+        msg = f"เกิดข้อผิดพลาด: {e}"
+        if verbose: print(f"      ❌ {msg}")
+        write_error_report(error_list, gdb_path, fc_name, "Geometry Error", -1, "Shape", "", msg)
+        return None
+
+
+def find_identical_fids_arcpy(fc_path, error_list, output_basename, verbose=True, tolerance=None):
+    """
+    หา OID ที่ทับกันสนิทด้วย arcpy.management.FindIdentical (วิธีเดิม)
+    ทำงานได้ทั้ง ArcGIS Pro และ ArcMap (รองรับกรณีไม่มี FEAT_SEQ หรือ GROUPID)
+    tolerance : ระยะคลาดเคลื่อน (เมตร) ส่งเป็น xy_tolerance (None = "0 Meters")
+    คืน list ของ OID ที่ซ้ำ (เรียงแล้ว) หรือ None ถ้าเกิด error (เขียน Geometry Error แล้ว)
+    """
+    arcpy = _arcpy()
     gdb_path, fc_name = os.path.split(fc_path)
     uid = uuid.uuid4().hex[:8]
 
@@ -215,13 +424,6 @@ def check_for_exact_overlaps(fc_path, error_list, output_dir, output_basename, r
         
     # 3. ใช้ชื่อที่ปลอดภัย (safe_basename_for_mem) สำหรับ in_memory
     out_table = os.path.join("in_memory", f"ident_{safe_basename_for_mem}_{uid}")
-    temp_layer = f"in_memory_dup_lyr_{safe_basename_for_mem}_{uid}"
-    
-    # 4. (สำคัญ) ยังคงใช้ output_basename (ชื่อเดิมที่มีภาษาไทย) สำหรับ .shp
-    output_shp = os.path.join(output_dir, f"{output_basename}_{fc_name}_duplicates.shp")
-    # ----------------------------------------------------
-
-    # ----------------------------------------------------
 
     # --------------------------
     # ฟังก์ชันช่วยลบข้อมูลอย่างปลอดภัย
@@ -233,19 +435,12 @@ def check_for_exact_overlaps(fc_path, error_list, output_dir, output_basename, r
         except Exception:
             pass
 
-    # --------------------------
-    # เริ่มตรวจสอบทับซ้อน
-    # --------------------------
-    if verbose:
-        print(f"    ▶ ตรวจสอบการซ้อนทับ (Exact Overlap): {fc_name}")
-
     safe_delete(out_table)
-    safe_delete(temp_layer)
 
     try:
         # ตรวจสอบว่า FeatureClass มี OID Field หรือไม่
         try:
-            oid_field = arcpy.Describe(fc_path).OIDFieldName
+            arcpy.Describe(fc_path).OIDFieldName
         except Exception as e:
             msg = f"ไม่สามารถอ่าน OID Field ของ {fc_name}: {e}"
             if verbose: print(f"      ⚠ {msg}")
@@ -259,7 +454,7 @@ def check_for_exact_overlaps(fc_path, error_list, output_dir, output_basename, r
             in_dataset=fc_path,
             out_dataset=out_table,
             fields=["Shape"],
-            xy_tolerance="0 Meters",
+            xy_tolerance=f"{tolerance or 0} Meters",
             z_tolerance="0"
         )
 
@@ -297,55 +492,152 @@ def check_for_exact_overlaps(fc_path, error_list, output_dir, output_basename, r
                 for fid, in cur:
                     groups[fid].append(fid)
 
-        # --------------------------
-        # วิเคราะห์ผลลัพธ์
-        # --------------------------
-        dup_fids = sorted({fid for seq, fids in groups.items() if len(fids) > 1 for fid in fids})
-        if not dup_fids:
-            if verbose: print("      ✓ ไม่พบ Duplicated Polygon")
-            return None
+        return sorted({fid for seq, fids in groups.items() if len(fids) > 1 for fid in fids})
 
-        count = len(dup_fids)
-        msg = f"พบโพลีกอนทับกันสนิท {count} รูปแปลง (OIDs: {dup_fids[:20]}{'...' if count > 20 else ''})"
-        if verbose: print(f"      ⚠ {msg}")
-
-        write_error_report(
-            error_list,
-            gdb_path,
-            fc_name,
-            "Duplicated Polygon",
-            str(dup_fids),
-            "Shape",
-            count,
-            msg
-        )
+    finally:
+        # Cleanup
+        safe_delete(out_table)
+        if verbose: print("      • Cleanup in_memory เสร็จสิ้น\n")
 
-        # --------------------------
-        # สร้าง Shapefile Output
-        # --------------------------
-        os.makedirs(output_dir, exist_ok=True)
-        where_clause = f"{oid_field} IN ({','.join(map(str, dup_fids))})"
-        arcpy.management.MakeFeatureLayer(fc_path, temp_layer, where_clause)
-        arcpy.management.CopyFeatures(temp_layer, output_shp)
 
-        if verbose: print(f"      → บันทึก shapefile: {output_shp}")
-        return output_shp if return_layer_path else None
+########################################
+# ฟังก์ชันตรวจสอบทับซ้อน (ทับกันบางส่วน)
+########################################
+
+# ฟิลด์ของไฟล์ส่วนที่ทับกัน (ชื่อไม่เกิน 10 ตัวอักษรตามข้อจำกัดของ shapefile)
+PARTIAL_OVERLAP_FIELDS = [("OID_A", "LONG"), ("OID_B", "LONG"), ("OVL_AREA", "DOUBLE")]
+
+def check_for_partial_overlaps(fc_path, error_list, output_dir, output_basename, verbose=True, collector=None):
+    """
+    ตรวจสอบโพลีกอนที่ทับกันบางส่วน (พื้นที่ทับ > PARTIAL_OVERLAP_MIN_AREA) ด้วย gdb_partial_overlap.py
+    1 คู่ = 1 error (Check_Type "Partial Overlap") และบันทึกส่วนที่ทับกันเป็น shapefile (OID_A, OID_B, OVL_AREA)
+
+    Parameters
+    ----------
+    fc_path : str
+        Full path ของ feature class ที่ต้องการตรวจสอบ
+    error_list : list
+        รายการ error ที่จะถูกเขียนเพิ่มผ่าน write_error_report()
+    output_dir : str
+        โฟลเดอร์สำหรับเก็บ shapefile ที่เป็นผลลัพธ์
+    output_basename : str
+        ชื่อ prefix สำหรับไฟล์ผลลัพธ์
+    verbose : bool
+        ถ้า True จะแสดง log ระหว่างการทำงาน
+    collector : EnvelopeCollector | None
+        envelope ที่เก็บไว้แล้วระหว่างตรวจข้อมูล (อ่านครบ layer) ไม่ต้องอ่าน geometry ทั้ง layer อีกรอบ
+
+    Returns
+    -------
+    int | None
+        จำนวนคู่ที่พบ หรือ None ถ้าไม่ได้ตรวจ / เกิด error
+    """
+    if not PARTIAL_OVERLAP_CHECK:
+        return None
+    gdb_path, fc_name = os.path.split(fc_path)
+    if not partial_overlap_available():
+        if verbose: print(f"    ▶ ข้ามการตรวจสอบการทับกันบางส่วน (ไม่มี shapely 2.x): {fc_name}")
+        return None
+
+    output_shp = os.path.join(output_dir, f"{output_basename}_{fc_name}_partial_overlaps.shp")
+    if verbose:
+        print(f"    ▶ ตรวจสอบการทับกันบางส่วน (Partial Overlap): {fc_name}")
+
+    pairs = []
+    writer = None
+    try:
+        with measure("phase", fc_name, "partial_overlap", error_list=error_list) as timer:
+            stats = {}
+            try:
+                for tile_pairs in find_partial_overlaps(open_cursor, fc_path, collector, PARTIAL_OVERLAP_MIN_AREA,
+                                                        PARTIAL_OVERLAP_TILE_FEATURES, stats):
+                    if writer is None:  # สร้างไฟล์เมื่อพบคู่แรก
+                        os.makedirs(output_dir, exist_ok=True)
+                        writer = get_row_source(READER_BACKEND).open_feature_writer(output_shp, fc_path, PARTIAL_OVERLAP_FIELDS)
+                    for oid_a, oid_b, area, wkb in tile_pairs:
+                        writer.append(wkb, (oid_a, oid_b, area))
+                        pairs.append((oid_a, oid_b, area))
+            finally:
+                if writer is not None:
+                    writer.close()
+            timer.rows = stats.get("rows")
+
+            if not pairs:
+                if verbose: print("      ✓ ไม่พบโพลีกอนที่ทับกันบางส่วน")
+                return 0
+
+            pairs.sort()
+            for oid_a, oid_b, area in pairs:
+                write_error_report(
+                    error_list, gdb_path, fc_name, "Partial Overlap", str([oid_a, oid_b]), "Shape", round(area, 4),
+                    f"โพลีกอน OID {oid_a} ทับกับ OID {oid_b} บางส่วน พื้นที่ทับ {area:,.2f} ตร.ม."
+                )
+        if verbose:
+            print(f"      ⚠ พบโพลีกอนทับกันบางส่วน {len(pairs)} คู่ ({stats.get('tiles', 0)} tiles)")
+            print(f"      → บันทึกส่วนที่ทับกัน: {output_shp}")
+        return len(pairs)
 
     except Exception as e:
-        msg = f"เกิดข้อผิดพลาด: {e}"
+        msg = f"เกิดข้อผิดพลาดในการตรวจทับกันบางส่วน: {e}"
         if verbose: print(f"      ❌ {msg}")
         write_error_report(error_list, gdb_path, fc_name, "Geometry Error", -1, "Shape", "", msg)
         return None
 
-    finally:
-        # Cleanup
-        safe_delete(out_table)
-        safe_delete(temp_layer)
-        if verbose: print("      • Cleanup in_memory เสร็จสิ้น\n")
-
 # ----------------------------------------
 # ตรวจสอบประเภทข้อมูลและค่าต่าง ๆ ตามที่กำหนดไว้
 # ----------------------------------------
+# กฎของแต่ละชั้นข้อมูลอยู่ในตาราง LAYER_RULES (gdb_rules.py)
+# validator แต่ละตัวตรวจฟิลด์ แล้วอ่าน cursor รอบเดียวให้ engine ตรวจทุกกฎ
+
+def layer_rules(layer_key):
+    """กฎของชั้นข้อมูล layer_key ในชุดกฎ RULE_SET"""
+    return COMPILED_RULE_SETS[RULE_SET][layer_key]
+
+def check_layer_fields(layer_key, fc_path, fields, error_list):
+    """
+    ตรวจฟิลด์ที่ต้องมี (Field Check) และประเภทฟิลด์ (Field Type) ตามตารางกฎ
+    """
+    gdb_path, fc_name = os.path.split(fc_path)
+    def emit(check_type, oid, field, value, message):
+        write_error_report(error_list, gdb_path, fc_name, check_type, oid, field, value, message)
+    with measure("phase", fc_name, "fields", error_list=error_list):
+        layer_rules(layer_key).check_fields(fields, emit)
+
+def scan_layer_rules(layer_key, fc_path, fields, error_list, taps=()):
+    """
+    อ่าน cursor รอบเดียว ตรวจกฎระดับแถว ค่าซ้ำ และ 1 ต่อ 1 ของชั้นข้อมูล layer_key
+    taps : ตัวรับข้อมูลจาก cursor เดียวกัน (GeometryHasher ให้ check_for_exact_overlaps,
+           ตัวเก็บ key ของ gdb_refs) ค่า None ในนี้ถูกข้าม
+    คืนจำนวนแถวที่อ่าน (None ถ้าอ่านไม่ครบ)
+    """
+    gdb_path, fc_name = os.path.split(fc_path)
+    def emit(check_type, oid, field, value, message):
+        write_error_report(error_list, gdb_path, fc_name, check_type, oid, field, value, message)
+    rules = layer_rules(layer_key)
+    taps = [tap for tap in taps if tap is not None]
+    cursor_fields, positions = _tap_fields(rules.cursor_fields(fields), taps)
+    stats = {"timed": PERF_RULE_TIMING and is_recording()}
+    prefetch_stats = PrefetchStats()
+    with measure("phase", fc_name, "scan", error_list=error_list) as timer:
+        try:
+            with open_cursor(fc_path, cursor_fields, stats=prefetch_stats) as cur:
+                rows = cur
+                for tap, tap_positions in zip(taps, positions):
+                    rows = tap.feed(rows, tap_positions)
+                rules.scan(rows, cursor_fields, emit, stats, new_key_groups)
+            for tap in taps:
+                tap.complete = True
+        except Exception as ex:
+            write_error_report(error_list, gdb_path, fc_name, "Cursor Error", -1, "", "", str(ex))
+        if "rows" in stats:
+            timer.rows = stats["rows"]
+            # เวลาอ่าน cursor แยกจากเวลาของกฎแต่ละข้อ
+            if stats["cursor_wall"] is not None:
+                add_record("rule", fc_name, "scan", "<cursor>", wall=stats["cursor_wall"], rows=stats["rows"])
+            for label, wall, errors in stats["rules"]:
+                add_record("rule", fc_name, "scan", label, wall=wall, rows=stats["rows"], errors=errors)
+        record_prefetch(fc_name, "scan", prefetch_stats, stats.get("rows"))
+    return stats.get("rows")
 
 ################################################
 #--------------------- 1) PARCEL
@@ -357,149 +649,22 @@ def validate_parcel(fc_path, error_list, basename=None):
     print(f"  กำลังตรวจสอบ PARCEL: {fc_name}")
     fields = safe_list_fields(fc_path)
 
-    required = ["UTMMAP1","UTMMAP2","UTMMAP3","UTMMAP4","UTMSCALE","LAND_NO","PARCEL_TYPE","CHANGWAT_CODE","BRANCH_CODE","PARCEL_RN"]
-    for f in required:
-        if f.upper() not in fields:
-            write_error_report(error_list, gdb_path, fc_name, "Field Check", -1, f, "", "ไม่พบฟิลด์นี้")
-# ----------------------------------------    
-    # ตรวจสอบประเภทข้อมูล
-# ----------------------------------------
-    if "UTMMAP1" in fields and fields["UTMMAP1"] != "String":
-        write_error_report(error_list, gdb_path, fc_name, "Field Type", -1, "UTMMAP1", fields["UTMMAP1"], "ต้องเป็น String")
-    if "UTMMAP2" in fields and not is_numeric_field_type(fields["UTMMAP2"]):
-        write_error_report(error_list, gdb_path, fc_name, "Field Type", -1, "UTMMAP2", fields["UTMMAP2"], "ต้องเป็น Number")
-    if "UTMMAP3" in fields and fields["UTMMAP3"] != "String":
-        write_error_report(error_list, gdb_path, fc_name, "Field Type", -1, "UTMMAP3", fields["UTMMAP3"], "ต้องเป็น String")
-    if "UTMMAP4" in fields and fields["UTMMAP4"] != "String":
-        write_error_report(error_list, gdb_path, fc_name, "Field Type", -1, "UTMMAP4", fields["UTMMAP4"], "ต้องเป็น String")
-    if "UTMSCALE" in fields and not is_numeric_field_type(fields["UTMSCALE"]):
-        write_error_report(error_list, gdb_path, fc_name, "Field Type", -1, "UTMSCALE", fields["UTMSCALE"], "ต้องเป็น Number")
-    if "LAND_NO" in fields and not is_numeric_field_type(fields["LAND_NO"]):
-        write_error_report(error_list, gdb_path, fc_name, "Field Type", -1, "LAND_NO", fields["LAND_NO"], "ต้องเป็น Number") 
-    if "PARCEL_TYPE" in fields and not is_numeric_field_type(fields["PARCEL_TYPE"]):
-        write_error_report(error_list, gdb_path, fc_name, "Field Type", -1, "PARCEL_TYPE", fields["PARCEL_TYPE"], "ต้องเป็น Number")       
-    if "CHANGWAT_CODE" in fields and fields["CHANGWAT_CODE"] != "String":
-        write_error_report(error_list, gdb_path, fc_name, "Field Type", -1, "CHANGWAT_CODE", fields["CHANGWAT_CODE"], "ต้องเป็น String")
-    if "BRANCH_CODE" in fields and fields["BRANCH_CODE"] != "String":
-        write_error_report(error_list, gdb_path, fc_name, "Field Type", -1, "BRANCH_CODE", fields["BRANCH_CODE"], "ต้องเป็น String")
- 
-    # ----------------------------------------
-    # ตรวจสอบ ความถูกต้องของข้อมูล
-    # ----------------------------------------
-
-    utm_key = defaultdict(list)
-    branch_parcel_rn = defaultdict(list)
-
-    cursor_fields = [f for f in ["OID@","UTMMAP1","UTMMAP2","UTMMAP3","UTMMAP4","UTMSCALE","LAND_NO","PARCEL_TYPE","CHANGWAT_CODE","BRANCH_CODE","PARCEL_RN"] if f == "OID@" or f.upper() in fields]
-    try:
-        with arcpy.da.SearchCursor(fc_path, cursor_fields) as cur:
-            for row in cur:
-                rec = dict(zip([f.upper() for f in cursor_fields], row))
-                oid = rec.get("OID@",-1)
-                utm1 = rec.get("UTMMAP1"); utm2 = rec.get("UTMMAP2"); utm3=rec.get("UTMMAP3"); utm4=rec.get("UTMMAP4")
-                scale = rec.get("UTMSCALE"); land_no=rec.get("LAND_NO"); parcel_type=rec.get("PARCEL_TYPE")
-                cwt = rec.get("CHANGWAT_CODE"); branch = rec.get("BRANCH_CODE"); parcel_rn = rec.get("PARCEL_RN")
-
-                # 1.1.1. UTMMAP1 ต้องเป็น String และเป็น 4 หลักเท่านั้น เช่น "5042"
-                if not (isinstance(utm1, str) and utm1.isdigit() and len(utm1)==4):
-                    write_error_report(error_list, gdb_path, fc_name, "Data Format", oid, "UTMMAP1", utm1, "UTMMAP1 ต้องเป็น 4 หลัก")
-                
-                # 1.1.2.UTMMAP2	ต้องเป็น  Number  และต้องเป็น 1 หรือ 2 หรือ 3 หรือ 4 เท่านั้น 
-                if not (isinstance(utm2,(int,float)) or (isinstance(utm2,str) and utm2.isdigit())):
-                    write_error_report(error_list, gdb_path, fc_name, "Field Type", oid, "UTMMAP2", utm2, "ประเภทข้อมูลต้องเป็น Number และไม่ควรว่าง")
-                else:
-                    try:
-                        if int(float(utm2)) not in (1,2,3,4):
-                            write_error_report(error_list, gdb_path, fc_name, "Data Format", oid, "UTMMAP2", utm2, "UTMMAP2 ต้องเป็น 1 - 4 ")
-                    except:
-                        pass
-               
-                # 1.1.3.UTMMAP3	ต้องเป็น String  และเป็น 4 หลักเท่านั้น เช่น "0016"
-                if not (isinstance(utm3,str) and utm3.isdigit() and len(utm3)==4):
-                    write_error_report(error_list, gdb_path, fc_name, "Data Format", oid, "UTMMAP3", utm3, "UTMMAP3 ต้องเป็น 4 หลัก")
-                
-                # 1.1.4.UTMMAP4	ต้องเป็น String  และเป็น 2 หลักเท่านั้น เช่น "02"
-                if not (isinstance(utm4,str) and utm4.isdigit() and len(utm4)==2):
-                    write_error_report(error_list, gdb_path, fc_name, "Data Format", oid, "UTMMAP4", utm4, "UTMMAP4 ของชั้น PARCEL ต้องเป็น 2 หลัก")
-                else:
+    # 1.1. ตรวจสอบฟิลด์ ประเภทข้อมูล และความถูกต้องของข้อมูล / 1.2. ค่าซ้ำ
+    check_layer_fields("PARCEL", fc_path, fields, error_list)
+    hasher = new_geometry_hasher(fields, "PARCEL")
+    collector = new_envelope_collector(fields)
+    taps = [hasher, collector] + reference_taps("PARCEL", fc_path, fields)
+    if PARCEL_COLUMNAR and parcel_columnar_supported(fields, "PARCEL_RN"):
+        count = check_parcel_columnar(fc_path, layer_rules("PARCEL").cursor_fields(fields), error_list, "PARCEL", taps)
+    else:
+        count = scan_layer_rules("PARCEL", fc_path, fields, error_list, taps)
 
-                    # ตรวจสอบความสอดคล้องกับ UTMSCALE
-                    try:
-                        scale_i = int(float(scale)) if scale is not None else None
-                    except:
-                        scale_i = None
-                    if scale_i == 4000 and utm4 != '00':
-                        write_error_report(error_list, gdb_path, fc_name, "Conditional Rule", oid, "UTMMAP4", utm4, "UTMMAP4 ต้องเป็น '00' เนื่องจาก UTMSCALE=4000")
-                    elif scale_i == 2000:
-                        try:
-                            if not (1 <= int(utm4) <= 4):
-                                write_error_report(error_list, gdb_path, fc_name, "Conditional Rule", oid, "UTMMAP4", utm4, "UTMMAP4 ต้องอยู่ระหว่าง '01'-'04' เนื่องจาก UTMSCALE=2000")
-                        except:
-                            pass
-                    elif scale_i == 1000:
-                        try:
-                            if not (1 <= int(utm4) <= 16):
-                                write_error_report(error_list, gdb_path, fc_name, "Conditional Rule", oid, "UTMMAP4", utm4, "UTMMAP4 ต้องอยู่ระหว่าง '01'-'16' เนื่องจาก UTMSCALE=1000")
-                        except:
-                            pass
-                    elif scale_i == 500:
-                        try:
-                            if not (1 <= int(utm4) <= 64):
-                                write_error_report(error_list, gdb_path, fc_name, "Conditional Rule", oid, "UTMMAP4", utm4, "UTMMAP4 ต้องอยู่ระหว่าง '01'-'64' เนื่องจาก UTMSCALE=500")
-                        except:
-                            pass
-
-                # 1.1.5.UTMSCALE  ต้องเป็น Number และเป็น  4000 หรือ 2000 หรือ 1000 หรือ 500 เท่านั้น
-                if scale is None or int(float(scale)) not in (4000,2000,1000,500):
-                    write_error_report(error_list, gdb_path, fc_name, "Conditional Rule", oid, "UTMSCALE", scale, "UTMSCALE ของฟีเจอร์คลาส PARCEL จะต้องเป็น 4000,2000,1000 หรือ 500")
-
-                # 1.1.6.LAND_NO  ต้องเป็น Number (เช็คจากประเภทข้อมูลแล้ว)
-	            # 1.1.7.PARCEL_TYPE ต้องเป็น Number (เช็คจากประเภทข้อมูลแล้ว)
-	            # 1.1.8.CHANGWAT_CODE ต้องเป็น String และเป็น 2 หลัก เช่น "66"
-                if not (isinstance(cwt,str) and len(cwt)==2 and cwt.isdigit()):
-                    write_error_report(error_list, gdb_path, fc_name, "Data Format", oid, "CHANGWAT_CODE", cwt, "CHANGWAT_CODE ต้องเป็น 2 หลัก")
-
-                # 1.1.9.BRANCH_CODE ต้องเป็น String และเป็น 8 หลัก และสองหลักแรก จะต้องตรงกับ CHANGWAT_CODE
-                # เช่น CHANGWAT_CODE  เป็น "66" BRANCHCODE จะต้องขึ้นต้นด้วยเลข 66 เช่น "66000000"
-                if not (isinstance(branch,str) and len(branch.strip())==8 and branch.strip().isdigit()):
-                    write_error_report(error_list, gdb_path, fc_name, "Data Format", oid, "BRANCH_CODE", branch, "BRANCH_CODE ต้องเป็น 8 หลัก")
-                else:
-                    if isinstance(cwt,str) and not branch.startswith(cwt):
-                        write_error_report(error_list, gdb_path, fc_name, "Conditional Rule", oid, "BRANCH_CODE", branch, f"2 หลักแรกของ BRANCH_CODE ไม่ตรงกับ CHANGWAT_CODE {cwt}")
-                
-                # 1.1.10.PARCEL_RN ต้องเป็น Number  และใน BRANCH_CODE เดียวกัน จะต้องไม่มีค่าซ้ำ
-                if parcel_rn is None or not can_be_number(parcel_rn):
-                    write_error_report(error_list, gdb_path, fc_name, "Field Type", oid, "PARCEL_RN", parcel_rn, "ต้องเป็น Number และไม่ควรว่าง")
-                else:
-                    branch_parcel_rn[(branch.strip() if branch else "NULL", int(float(parcel_rn)))].append(oid)
-
-                # 1.2. ถ้า LAND_NO ไม่ใช่ค่าว่าง หรือ 0 
-                # ให้ตรวจสอบ BRANCH_CODE, UTMMAP1, UTMMAP2, UTMMAP3, UTMMAP4, UTMSCALE และ LAND_NO จะต้องไม่ซ้ำกัน
-                is_land_no_valid = False
-                if land_no is not None and can_be_number(land_no):
-                    if int(float(land_no)) != 0:
-                        is_land_no_valid = True
-
-                if is_land_no_valid:
-                    # ถ้า LAND_NO ไม่ใช่ 0 หรือ ว่าง จึงจะเพิ่มเข้า utm_key เพื่อตรวจสอบค่าซ้ำ
-                    scale_i = int(float(scale)) if can_be_number(scale) else scale
-                    check_key = (branch.strip() if branch else "NULL", utm1, utm2, utm3, utm4, scale_i, land_no)
-                    utm_key[check_key].append(oid)
-                # (else: ถ้า LAND_NO เป็น 0 หรือ ว่าง, ก็ไม่ต้อง add เข้า utm_key)
-
-
-            for primery_key, oids in utm_key.items():
-                if len(oids) > 1:
-                    write_error_report(error_list, gdb_path, fc_name, "Duplicate UTM", str(oids), "PRIMERY_KEY", primery_key, "BRANCH_CODE+UTMMAP1+UTMMAP2+UTMMAP3+UTMMAP4+UTMSCALE+LAND_NO มีค่าซ้ำ")
-
-            for k, oids in branch_parcel_rn.items():
-                if len(oids) > 1:
-                    write_error_report(error_list, gdb_path, fc_name, "Duplicate Value", str(oids), "PARCEL_RN", k, "PARCEL_RN มีค่าซ้ำภายใน BRANCH_CODE เดียวกัน")
-    except Exception as ex:
-        write_error_report(error_list, gdb_path, fc_name, "Cursor Error", -1, "", "", str(ex))
-    
     # 1.3. ตรวจสอบโพลีกอนที่ซ้อนทับกันสนิท
-    check_for_exact_overlaps(fc_path, error_list, os.path.join(OVERLAP_ROOT,"PARCEL"), basename or "PARCEL")
+    check_for_exact_overlaps(fc_path, error_list, os.path.join(OVERLAP_ROOT,"PARCEL"), basename or "PARCEL", hasher=hasher, layer_key="PARCEL")
+
+    # 1.4. ตรวจสอบโพลีกอนที่ทับกันบางส่วน
+    check_for_partial_overlaps(fc_path, error_list, os.path.join(OVERLAP_ROOT,"PARCEL"), basename or "PARCEL", collector=collector)
+    return count
 
 
 ################################################
@@ -509,123 +674,184 @@ def validate_parcel(fc_path, error_list, basename=None):
 def validate_parcel_ns3k(fc_path, error_list, basename=None):
     gdb_path, fc_name = os.path.split(fc_path)
     print(f"  ตรวจสอบ PARCEL_NS3K: {fc_name}")
-
     fields = safe_list_fields(fc_path)
-    required = ["UTMMAP1","UTMMAP2","UTMMAP3","UTMMAP4","UTMSCALE","LAND_NO","PARCEL_TYPE","CHANGWAT_CODE","BRANCH_CODE","NS3K_RN"]
-    for f in required:
-        if f.upper() not in fields:
-            write_error_report(error_list, gdb_path, fc_name, "Field Check", -1, f, "", "ไม่พบฟิลด์นี้")
-    
-    # ตรวจสอบประเภทข้อมูล
-    if "UTMMAP1" in fields and fields["UTMMAP1"] != "String":
-        write_error_report(error_list, gdb_path, fc_name, "Field Type", -1, "UTMMAP1", fields["UTMMAP1"], "ต้องเป็น String")
-    if "UTMMAP2" in fields and not is_numeric_field_type(fields["UTMMAP2"]):
-        write_error_report(error_list, gdb_path, fc_name, "Field Type", -1, "UTMMAP2", fields["UTMMAP2"], "ต้องเป็น Number")
-    if "UTMMAP3" in fields and fields["UTMMAP3"] != "String":
-        write_error_report(error_list, gdb_path, fc_name, "Field Type", -1, "UTMMAP3", fields["UTMMAP3"], "ต้องเป็น String")
-    if "UTMMAP4" in fields and fields["UTMMAP4"] != "String":
-        write_error_report(error_list, gdb_path, fc_name, "Field Type", -1, "UTMMAP4", fields["UTMMAP4"], "ต้องเป็น String")
-    if "UTMSCALE" in fields and not is_numeric_field_type(fields["UTMSCALE"]):
-        write_error_report(error_list, gdb_path, fc_name, "Field Type", -1, "UTMSCALE", fields["UTMSCALE"], "ต้องเป็น Number")
-    if "LAND_NO" in fields and not is_numeric_field_type(fields["LAND_NO"]):
-        write_error_report(error_list, gdb_path, fc_name, "Field Type", -1, "LAND_NO", fields["LAND_NO"], "ต้องเป็น Number")
-    if "PARCEL_TYPE" in fields and not is_numeric_field_type(fields["PARCEL_TYPE"]):
-        write_error_report(error_list, gdb_path, fc_name, "Field Type", -1, "PARCEL_TYPE", fields["PARCEL_TYPE"], "ต้องเป็น Number")
-    if "CHANGWAT_CODE" in fields and fields["CHANGWAT_CODE"] != "String":
-        write_error_report(error_list, gdb_path, fc_name, "Field Type", -1, "CHANGWAT_CODE", fields["CHANGWAT_CODE"], "ต้องเป็น String")
-    if "BRANCH_CODE" in fields and fields["BRANCH_CODE"] != "String":
-        write_error_report(error_list, gdb_path, fc_name, "Field Type", -1, "BRANCH_CODE", fields["BRANCH_CODE"], "ต้องเป็น String")
-    
-    # ----------------------------------------
-    # ตรวจสอบ ความถูกต้องของข้อมูล
-    # ----------------------------------------
-    utm_key = defaultdict(list)
-    branch_ns3k = defaultdict(list)
 
-    cursor_fields = [f for f in ["OID@","UTMMAP1","UTMMAP2","UTMMAP3","UTMMAP4","UTMSCALE","LAND_NO","PARCEL_TYPE","CHANGWAT_CODE","BRANCH_CODE","NS3K_RN"] if f == "OID@" or f.upper() in fields]
-    try:
-        with arcpy.da.SearchCursor(fc_path, cursor_fields) as cur:
-            for row in cur:
-                rec = dict(zip([f.upper() for f in cursor_fields],row))
-                oid = rec.get("OID@", -1)
-                utm1 = rec.get("UTMMAP1"); utm2=rec.get("UTMMAP2"); utm3=rec.get("UTMMAP3"); utm4=rec.get("UTMMAP4")
-                scale = rec.get("UTMSCALE"); land_no = rec.get("LAND_NO"); parcel_type = rec.get("PARCEL_TYPE")
-                cwt = rec.get("CHANGWAT_CODE"); branch = rec.get("BRANCH_CODE"); ns3k_rn = rec.get("NS3K_RN")
-                
-                # 2.1.1. UTMMAP1 ต้องเป็น String และเป็น 4 หลักเท่านั้น เช่น "5042"
-                if not (isinstance(utm1,str) and utm1.isdigit() and len(utm1)==4):
-                    write_error_report(error_list, gdb_path, fc_name, "Data Format", oid, "UTMMAP1", utm1, "UTMMAP1 ต้องมี 4 หลัก")
-                
-                # 2.1.2. UTMMAP2 ต้องเป็น  Number  และต้องเป็น 1 หรือ 2 หรือ 3 หรือ 4 เท่านั้น
-                if not (isinstance(utm2,(int,float)) or (isinstance(utm2,str) and utm2.isdigit())):
-                    write_error_report(error_list, gdb_path, fc_name, "Data Format", oid, "UTMMAP2", utm2, "รูปแบบข้อมูลต้องเป็น Number")
-                else:
-                    try:
-                        if int(float(utm2)) not in (1,2,3,4):
-                            write_error_report(error_list, gdb_path, fc_name, "Data Format", oid, "UTMMAP2", utm2, "UTMMAP2 ต้องอยู่ระหว่าง 1-4")
-                    except:
-                        pass
-                
-                # 2.1.3. UTMMAP3 ต้องเป็น String และต้องเป็น '0000' เท่านั้น
-                if not (isinstance(utm3,str) and utm3 == "0000"):
-                    write_error_report(error_list, gdb_path, fc_name, "Conditional Rule", oid, "UTMMAP3", utm3, "UTMMAP3 ของ NS3K ต้องเป็น '0000'")
-                
-                # 2.1.4. UTMMAP4  ต้องเป็น String และเป็น 3 หลักเท่านั้น เช่น "002"
-                if not (isinstance(utm4,str) and utm4.isdigit() and len(utm4)==3):
-                    write_error_report(error_list, gdb_path, fc_name, "Data Format", oid, "UTMMAP4", utm4, "ต้องเป็น 3 หลัก")
-                
-                # 2.1.5. UTMSCALE  ต้องเป็น Number และต้องเป็น 5000 เท่านั้น
-                if scale is None or int(float(scale)) != 5000:
-                    write_error_report(error_list, gdb_path, fc_name, "Conditional Rule", oid, "UTMSCALE", scale, "UTMSCALE ของ NS3K ต้องเป็น 5000")
-                
-                # 2.1.6. LAND_NO  ต้องเป็น Number (เช็คจากประเภทข้อมูลแล้ว)
-                # 2.1.7. PARCEL_TYPE  ต้องเป็น Number และต้องเป็น 3 เท่านั้น
-                if parcel_type != 3:
-                    write_error_report(error_list, gdb_path, fc_name, "Conditional Rule", oid, "PARCEL_TYPE", parcel_type, "PARCEL_TYPE ของ NS3K ต้องเป็น 3")
-                
-                # 2.1.8. CHANGWAT_CODE ต้องเป็น String และเป็น 2 หลัก เช่น "66"
-                if not (isinstance(cwt,str) and len(cwt)==2 and cwt.isdigit()):
-                    write_error_report(error_list, gdb_path, fc_name, "Data Format", oid, "CHANGWAT_CODE", cwt, "ต้องเป็น 2 หลัก")
-                
-                # 2.1.9. BRANCH_CODE  ต้องเป็น String และเป็น 8 หลัก และสองหลักแรก จะต้องตรงกับ CHANGWAT_CODE
-                # เช่น CHANGWAT_CODE  เป็น "66" BRANCHCODE จะต้องขึ้นต้นด้วยเลข 66 เช่น "66000000"
-                if not (isinstance(branch,str) and len(branch.strip())==8 and branch.strip().isdigit()):
-                    write_error_report(error_list, gdb_path, fc_name, "Data Format", oid, "BRANCH_CODE", branch, "ต้องเป็น 8 หลัก")
-                else:
-                    if isinstance(cwt,str) and not branch.startswith(cwt):
-                        write_error_report(error_list, gdb_path, fc_name, "Conditional Rule", oid, "BRANCH_CODE", branch, f"2 หลักแรกของ BRANCH_CODE ไม่ตรงกับ CHANGWAT_CODE {cwt}")
-                
-                # 2.1.10. NS3K_RN ต้องเป็น Number และใน BRANCH_CODE เดียวกัน จะต้องไม่มีค่าซ้ำ
-                if ns3k_rn is None or not can_be_number(ns3k_rn):
-                    write_error_report(error_list, gdb_path, fc_name, "Field Type", oid, "NS3K_RN", ns3k_rn, "ต้องเป็น Number")
-                else:
-                    branch_ns3k[(branch.strip() if branch else "NULL", int(float(ns3k_rn)))].append(oid)
-                
-                # 2.2. ถ้า LAND_NO ไม่ใช่ค่าว่าง หรือ 0 
-                # ให้ตรวจสอบ BRANCH_CODE, UTMMAP1, UTMMAP2, UTMMAP3, UTMMAP4, UTMSCALE และ LAND_NO จะต้องไม่ซ้ำกัน                
-                is_land_no_valid = False
-                if land_no is not None and can_be_number(land_no):
-                    if int(float(land_no)) != 0:
-                        is_land_no_valid = True
-
-                if is_land_no_valid:
-                    # ถ้า LAND_NO ถูกต้อง, จึงจะเพิ่มเข้า utm_key เพื่อตรวจสอบค่าซ้ำ
-                    scale_i = int(float(scale)) if can_be_number(scale) else scale
-                    check_key = (branch.strip() if branch else "NULL", utm1, utm2, utm3, utm4, scale_i, land_no)
-                    utm_key[check_key].append(oid)
-                # (else: ถ้า LAND_NO เป็น 0 หรือ ว่าง, ก็ไม่ต้อง add เข้า utm_key)
-
-            for primery_key,oids in utm_key.items():
-                if len(oids)>1:
-                    write_error_report(error_list, gdb_path, fc_name, "Duplicate UTM", str(oids), "PRIMERY_KEY", primery_key, "BRANCH_CODE+UTMMAP1+UTMMAP2+UTMMAP3+UTMMAP4+UTMSCALE+LAND_NO not unique")
-            for k,oids in branch_ns3k.items():
-                if len(oids)>1:
-                    write_error_report(error_list, gdb_path, fc_name, "Duplicate Value", str(oids), "NS3K_RN", k, "NS3K_RN ซ้ำภายใน BRANCH_CODE เดียวกัน")
-    except Exception as ex:
-        write_error_report(error_list, gdb_path, fc_name, "Cursor Error", -1, "", "", str(ex))
+    # 2.1. ตรวจสอบฟิลด์ ประเภทข้อมูล และความถูกต้องของข้อมูล / 2.2. ค่าซ้ำ
+    check_layer_fields("PARCEL_NS3K", fc_path, fields, error_list)
+    hasher = new_geometry_hasher(fields, "PARCEL_NS3K")
+    collector = new_envelope_collector(fields)
+    taps = [hasher, collector] + reference_taps("PARCEL_NS3K", fc_path, fields)
+    if PARCEL_COLUMNAR and parcel_columnar_supported(fields, "NS3K_RN"):
+        count = check_parcel_columnar(fc_path, layer_rules("PARCEL_NS3K").cursor_fields(fields), error_list, "PARCEL_NS3K", taps)
+    else:
+        count = scan_layer_rules("PARCEL_NS3K", fc_path, fields, error_list, taps)
 
     # 2.3. ตรวจสอบโพลีกอนที่ซ้อนทับกันสนิท
-    check_for_exact_overlaps(fc_path, error_list, os.path.join(OVERLAP_ROOT,"PARCEL"), basename or "PARCEL_NS3K")
+    check_for_exact_overlaps(fc_path, error_list, os.path.join(OVERLAP_ROOT,"PARCEL"), basename or "PARCEL_NS3K", hasher=hasher, layer_key="PARCEL_NS3K")
+
+    # 2.4. ตรวจสอบโพลีกอนที่ทับกันบางส่วน
+    check_for_partial_overlaps(fc_path, error_list, os.path.join(OVERLAP_ROOT,"PARCEL"), basename or "PARCEL_NS3K", collector=collector)
+    return count
+################################################
+#-------------1-2) PARCEL / PARCEL_NS3K แบบ columnar
+################################################
+# อ่านฟิลด์ทั้ง layer เป็นคอลัมน์ แล้วตรวจแต่ละกฎด้วย boolean mask ทีเดียวทั้งคอลัมน์
+# จากนั้นเขียน error เรียงตาม (แถว, ลำดับกฎ) ให้ได้ผลเหมือนตรวจทีละแถวทุกประการ
+
+PARCEL_COLUMNAR_STRING_FIELDS = ("UTMMAP1", "UTMMAP3", "UTMMAP4", "CHANGWAT_CODE", "BRANCH_CODE")
+PARCEL_COLUMNAR_NUMBER_FIELDS = ("UTMMAP2", "UTMSCALE", "LAND_NO", "PARCEL_TYPE")
+
+def parcel_columnar_supported(fields, rn_field):
+    """
+    ใช้แบบ columnar ได้เมื่อประเภทฟิลด์ตรงตามมาตรฐาน (หรือไม่มีฟิลด์นั้น)
+    ถ้าไม่ตรง (เช่น UTMSCALE เป็น String) ให้ตรวจทีละแถวแบบเดิม
+    """
+    for f in PARCEL_COLUMNAR_STRING_FIELDS:
+        if f in fields and fields[f] != "String":
+            return False
+    for f in PARCEL_COLUMNAR_NUMBER_FIELDS + (rn_field,):
+        if f in fields and not is_numeric_field_type(fields[f]):
+            return False
+    return True
+
+def check_parcel_columnar(fc_path, cursor_fields, error_list, layer_kind, taps=()):
+    """
+    ตรวจข้อ 1.1-1.2 (PARCEL) หรือ 2.1-2.2 (PARCEL_NS3K) แบบ columnar
+    layer_kind : "PARCEL" หรือ "PARCEL_NS3K"
+    taps       : ตัวรับข้อมูลทีละ batch ระหว่างอ่าน (GeometryHasher, ตัวเก็บ key ของ gdb_refs)
+                 ฟิลด์ที่มีแต่ taps ใช้ (เช่น SHAPE@WKB) ไม่เก็บไว้ในคอลัมน์
+    คืนจำนวนแถวที่อ่าน (None ถ้าอ่านไม่สำเร็จ)
+    """
+    gdb_path, fc_name = os.path.split(fc_path)
+    is_ns3k = layer_kind == "PARCEL_NS3K"
+    rn_field = "NS3K_RN" if is_ns3k else "PARCEL_RN"
+
+    import numpy as np
+    import pandas as pd
+    from gdb_columnar import (digit_string_mask, number_column, int_string_column, in_values,
+                              branch_keys, prefix_mismatch_mask, duplicate_groups)
+
+    rows_read = None
+    with measure("phase", fc_name, "scan", error_list=error_list) as timer:
+        try:
+            read_start = time.perf_counter()
+            source = get_row_source(READER_BACKEND)
+            prefetch_stats = PrefetchStats()
+            taps = [tap for tap in taps if tap is not None]
+            if taps:
+                read_fields, _ = _tap_fields(cursor_fields, taps)
+                def on_batch(batch):
+                    for tap in taps:
+                        tap.add_batch(batch)
+                data = source.read_columns(fc_path, read_fields, on_batch=on_batch,
+                                           drop=[f for f in read_fields if f not in cursor_fields],
+                                           prefetch_depth=PREFETCH_DEPTH, stats=prefetch_stats)
+                for tap in taps:
+                    tap.complete = True
+            else:
+                data = source.read_columns(fc_path, cursor_fields, prefetch_depth=PREFETCH_DEPTH, stats=prefetch_stats)
+            n = rows_read = timer.rows = len(data["OID@"])
+            add_record("rule", fc_name, "scan", "<cursor>", wall=time.perf_counter() - read_start, rows=n)
+            record_prefetch(fc_name, "scan", prefetch_stats, n)
+            def column(name):
+                values = data.get(name)
+                return np.array(values if values is not None else [None] * n, dtype=object)
+
+            oid = column("OID@")
+            utm1, utm2, utm3, utm4 = column("UTMMAP1"), column("UTMMAP2"), column("UTMMAP3"), column("UTMMAP4")
+            scale, land_no, parcel_type = column("UTMSCALE"), column("LAND_NO"), column("PARCEL_TYPE")
+            cwt, branch, rn = column("CHANGWAT_CODE"), column("BRANCH_CODE"), column(rn_field)
+
+            utm2_n, scale_n, land_n = number_column(utm2), number_column(scale), number_column(land_no)
+            rn_n, parcel_type_n = number_column(rn), number_column(parcel_type)
+            utm4_s, cwt_s, branch_s = (pd.Series(v, dtype=object) for v in (utm4, cwt, branch))
+
+            # กฎแต่ละข้อ: (mask, check_type, field, ค่าที่รายงาน, ข้อความ หรือ dict {แถว: ข้อความ})
+            # ลำดับใน list = ลำดับการตรวจในแต่ละแถวของแบบเดิม
+            rules = []
+            utm2_missing = pd.isna(utm2_n)
+
+            if not is_ns3k:
+                rules.append((~digit_string_mask(pd.Series(utm1, dtype=object), 4), "Data Format", "UTMMAP1", utm1, "UTMMAP1 ต้องเป็น 4 หลัก"))
+                rules.append((utm2_missing, "Field Type", "UTMMAP2", utm2, "ประเภทข้อมูลต้องเป็น Number และไม่ควรว่าง"))
+                rules.append((~utm2_missing & np.isfinite(utm2_n) & ~in_values(utm2_n, (1,2,3,4)), "Data Format", "UTMMAP2", utm2, "UTMMAP2 ต้องเป็น 1 - 4 "))
+                rules.append((~digit_string_mask(pd.Series(utm3, dtype=object), 4), "Data Format", "UTMMAP3", utm3, "UTMMAP3 ต้องเป็น 4 หลัก"))
+                utm4_ok = digit_string_mask(utm4_s, 2)
+                rules.append((~utm4_ok, "Data Format", "UTMMAP4", utm4, "UTMMAP4 ของชั้น PARCEL ต้องเป็น 2 หลัก"))
+                scale_t = np.trunc(scale_n)
+                utm4_n = int_string_column(utm4, utm4_ok & np.isin(scale_t, (2000, 1000, 500)))
+                has_utm4 = utm4_ok & np.isfinite(utm4_n)
+                rules.append((utm4_ok & (scale_t == 4000) & (utm4_s != "00").to_numpy(), "Conditional Rule", "UTMMAP4", utm4, "UTMMAP4 ต้องเป็น '00' เนื่องจาก UTMSCALE=4000"))
+                for scale_value, upper in ((2000, 4), (1000, 16), (500, 64)):
+                    out_of_range = has_utm4 & (scale_t == scale_value) & ~((utm4_n >= 1) & (utm4_n <= upper))
+                    rules.append((out_of_range, "Conditional Rule", "UTMMAP4", utm4, f"UTMMAP4 ต้องอยู่ระหว่าง '01'-'{upper:02d}' เนื่องจาก UTMSCALE={scale_value}"))
+                rules.append((pd.isna(scale_n) | ~in_values(scale_n, (4000,2000,1000,500)), "Conditional Rule", "UTMSCALE", scale, "UTMSCALE ของฟีเจอร์คลาส PARCEL จะต้องเป็น 4000,2000,1000 หรือ 500"))
+                cwt_msg, branch_msg, rn_check, rn_msg = "CHANGWAT_CODE ต้องเป็น 2 หลัก", "BRANCH_CODE ต้องเป็น 8 หลัก", "Field Type", "ต้องเป็น Number และไม่ควรว่าง"
+            else:
+                rules.append((~digit_string_mask(pd.Series(utm1, dtype=object), 4), "Data Format", "UTMMAP1", utm1, "UTMMAP1 ต้องมี 4 หลัก"))
+                rules.append((utm2_missing, "Data Format", "UTMMAP2", utm2, "รูปแบบข้อมูลต้องเป็น Number"))
+                rules.append((~utm2_missing & np.isfinite(utm2_n) & ~in_values(utm2_n, (1,2,3,4)), "Data Format", "UTMMAP2", utm2, "UTMMAP2 ต้องอยู่ระหว่าง 1-4"))
+                rules.append((~pd.Series(utm3, dtype=object).eq("0000").to_numpy(), "Conditional Rule", "UTMMAP3", utm3, "UTMMAP3 ของ NS3K ต้องเป็น '0000'"))
+                rules.append((~digit_string_mask(utm4_s, 3), "Data Format", "UTMMAP4", utm4, "ต้องเป็น 3 หลัก"))
+                rules.append((pd.isna(scale_n) | (np.trunc(scale_n) != 5000), "Conditional Rule", "UTMSCALE", scale, "UTMSCALE ของ NS3K ต้องเป็น 5000"))
+                rules.append((~(parcel_type_n == 3), "Conditional Rule", "PARCEL_TYPE", parcel_type, "PARCEL_TYPE ของ NS3K ต้องเป็น 3"))
+                cwt_msg, branch_msg, rn_check, rn_msg = "ต้องเป็น 2 หลัก", "ต้องเป็น 8 หลัก", "Field Type", "ต้องเป็น Number"
+
+            # CHANGWAT_CODE 2 หลัก / BRANCH_CODE 8 หลักและขึ้นต้นด้วย CHANGWAT_CODE
+            rules.append((~digit_string_mask(cwt_s, 2), "Data Format", "CHANGWAT_CODE", cwt, cwt_msg))
+            branch_ok = digit_string_mask(branch_s.str.strip() if branch_s.notna().any() else branch_s, 8)
+            rules.append((~branch_ok, "Data Format", "BRANCH_CODE", branch, branch_msg))
+            prefix_bad = prefix_mismatch_mask(branch_s, cwt_s, branch_ok)
+            prefix_msgs = {r: f"2 หลักแรกของ BRANCH_CODE ไม่ตรงกับ CHANGWAT_CODE {cwt[r]}" for r in np.flatnonzero(prefix_bad).tolist()}
+            rules.append((prefix_bad, "Conditional Rule", "BRANCH_CODE", branch, prefix_msgs))
+
+            # PARCEL_RN / NS3K_RN ต้องเป็น Number
+            rn_missing = pd.isna(rn_n)
+            rules.append((rn_missing, rn_check, rn_field, rn, rn_msg))
+
+            # เขียน error เรียงตามแถว แล้วตามลำดับกฎ
+            hit_rows, hit_rules = [], []
+            for i, rule in enumerate(rules):
+                rows = np.flatnonzero(rule[0])
+                hit_rows.append(rows)
+                hit_rules.append(np.full(len(rows), i))
+            hit_rows = np.concatenate(hit_rows)
+            hit_rules = np.concatenate(hit_rules)
+            for idx in np.lexsort((hit_rules, hit_rows)).tolist():
+                r = int(hit_rows[idx])
+                _, check_type, field, values, message = rules[hit_rules[idx]]
+                if isinstance(message, dict):
+                    message = message[r]
+                write_error_report(error_list, gdb_path, fc_name, check_type, oid[r], field, values[r], message)
+
+            # ค่าซ้ำ: BRANCH_CODE+UTMMAP1+UTMMAP2+UTMMAP3+UTMMAP4+UTMSCALE+LAND_NO (เมื่อ LAND_NO ไม่ว่างและไม่ใช่ 0)
+            branch_key = branch_keys(branch_s)
+            scale_key = np.array([None if v is None else int(float(v)) for v in scale.tolist()], dtype=object)
+            land_valid = ~pd.isna(land_n) & (np.trunc(land_n) != 0)
+            utm_groups = duplicate_groups([branch_key, utm1, utm2, utm3, utm4, scale_key, land_no], oid, land_valid, new_key_groups())
+
+            # ค่าซ้ำ: PARCEL_RN / NS3K_RN ภายใน BRANCH_CODE เดียวกัน
+            rn_key = np.array([None if v is None else int(float(v)) for v in rn.tolist()], dtype=object)
+            rn_groups = duplicate_groups([branch_key, rn_key], oid, ~rn_missing, new_key_groups())
+
+            # ข้อความค่าซ้ำตามตารางกฎของชุดกฎที่ใช้
+            utm_msg = layer_rules(layer_kind).message("unique_key")
+            rn_dup_msg = layer_rules(layer_kind).message("unique_within")
+            for primery_key, oids in utm_groups:
+                write_error_report(error_list, gdb_path, fc_name, "Duplicate UTM", str(oids), "PRIMERY_KEY", primery_key, utm_msg)
+            for k, oids in rn_groups:
+                write_error_report(error_list, gdb_path, fc_name, "Duplicate Value", str(oids), rn_field, k, rn_dup_msg)
+
+            # จำนวน error ของกฎแต่ละข้อ (แบบ columnar ตรวจทั้งคอลัมน์พร้อมกัน จึงไม่มีเวลาแยกรายกฎ)
+            rule_errors = np.bincount(hit_rules, minlength=len(rules)).tolist() if len(hit_rules) else [0] * len(rules)
+            for (_, check_type, field, _, _), errors in zip(rules, rule_errors):
+                add_record("rule", fc_name, "scan", f"{check_type}:{field}", rows=n, errors=errors)
+            add_record("rule", fc_name, "scan", "Duplicate UTM:PRIMERY_KEY", rows=n, errors=len(utm_groups))
+            add_record("rule", fc_name, "scan", f"Duplicate Value:{rn_field}", rows=n, errors=len(rn_groups))
+
+        except Exception as ex:
+            write_error_report(error_list, gdb_path, fc_name, "Cursor Error", -1, "", "", str(ex))
+    return rows_read
 
 ################################################
 # ---------------3) ROAD
@@ -635,179 +861,15 @@ def validate_road(fc_path, error_list, basename=None):
     gdb_path, fc_name = os.path.split(fc_path)
     print(f"  กำลังตรวจสอบชั้นข้อมูล ROAD: {fc_name}")
     fields = safe_list_fields(fc_path)
-    
-    VALID_LAND_USE = ROAD_LAND_USE_DOMAIN
-    VALID_STREET_TYPE = ROAD_STREET_TYPE_DOMAIN
-    VALID_TD_RP3 = ROAD_REQ_NAME_TD_CODES
-
-    required = ["STREET_NAME","STREET_CODE","STREET_DEPTH","LAND_USE","STREET_TYPE","STREET_WIDTH","STREET_AREA","BRANCH_CODE","PARCEL_TYPE","TD_RP3_TYPE_CODE","STREET_RN","CHANGWAT_CODE","STREET_SMG"]
-    for f in required:
-        if f.upper() not in fields:
-            write_error_report(error_list, gdb_path, fc_name, "Field Check", -1, f, "", "ไม่พบฟิลด์นี้")
-    
-    # ----------------------------------------
-    # ตรวจสอบประเภทข้อมูล
-    # ----------------------------------------
-    if "STREET_NAME" in fields and fields["STREET_NAME"] != "String":
-        write_error_report(error_list, gdb_path, fc_name, "Field Type", -1, "STREET_NAME", fields["STREET_NAME"], "ต้องเป็น String")
-    if "STREET_CODE" in fields and fields["STREET_CODE"] != "String":
-        write_error_report(error_list, gdb_path, fc_name, "Field Type", -1, "STREET_CODE", fields["STREET_CODE"], "ต้องเป็น String")
-    if "STREET_DEPTH" in fields and not is_numeric_field_type(fields["STREET_DEPTH"]):
-        write_error_report(error_list, gdb_path, fc_name, "Field Type", -1, "STREET_DEPTH", fields["STREET_DEPTH"], "ต้องเป็น Number")
-    if "LAND_USE" in fields and fields["LAND_USE"] != "String":
-        write_error_report(error_list, gdb_path, fc_name, "Field Type", -1, "LAND_USE", fields["LAND_USE"], "ต้องเป็น String")
-    if "STREET_TYPE" in fields and fields["STREET_TYPE"] != "String":
-        write_error_report(error_list, gdb_path, fc_name, "Field Type", -1, "STREET_TYPE", fields["STREET_TYPE"], "ต้องเป็น String")
-    if "STREET_WIDTH" in fields and not is_numeric_field_type(fields["STREET_WIDTH"]):
-        write_error_report(error_list, gdb_path, fc_name, "Field Type", -1, "STREET_WIDTH", fields["STREET_WIDTH"], "ต้องเป็น Number")
-    if "STREET_AREA" in fields and not is_numeric_field_type(fields["STREET_AREA"]):
-        write_error_report(error_list, gdb_path, fc_name, "Field Type", -1, "STREET_AREA", fields["STREET_AREA"], "ต้องเป็น Number")
-    if "BRANCH_CODE" in fields and fields["BRANCH_CODE"] != "String":
-        write_error_report(error_list, gdb_path, fc_name, "Field Type", -1, "BRANCH_CODE", fields["BRANCH_CODE"], "ต้องเป็น String")
-    if "PARCEL_TYPE" in fields and not is_numeric_field_type(fields["PARCEL_TYPE"]):
-        write_error_report(error_list, gdb_path, fc_name, "Field Type", -1, "PARCEL_TYPE", fields["PARCEL_TYPE"], "ต้องเป็น Number")
-    if "TD_RP3_TYPE_CODE" in fields and not is_numeric_field_type(fields["TD_RP3_TYPE_CODE"]):
-        write_error_report(error_list, gdb_path, fc_name, "Field Type", -1, "TD_RP3_TYPE_CODE", fields["TD_RP3_TYPE_CODE"], "ต้องเป็น Number")
-    if "STREET_RN" in fields and not is_numeric_field_type(fields["STREET_RN"]):
-        write_error_report(error_list, gdb_path, fc_name, "Field Type", -1, "STREET_RN", fields["STREET_RN"], "ต้องเป็น Number")
-    if "CHANGWAT_CODE" in fields and fields["CHANGWAT_CODE"] != "String":
-        write_error_report(error_list, gdb_path, fc_name, "Field Type", -1, "CHANGWAT_CODE", fields["CHANGWAT_CODE"], "ต้องเป็น String")
-    if "STREET_SMG" in fields and fields["STREET_SMG"] != "String":
-        write_error_report(error_list, gdb_path, fc_name, "Field Type", -1, "STREET_SMG", fields["STREET_SMG"], "ต้องเป็น String")
-
-    
-    chk_fields = [f for f in ["OID@","BRANCH_CODE","CHANGWAT_CODE","PARCEL_TYPE","TD_RP3_TYPE_CODE","STREET_RN","STREET_NAME","STREET_CODE","STREET_TYPE","STREET_DEPTH","LAND_USE","STREET_WIDTH","STREET_AREA","STREET_SMG"] if f=="OID@" or f.upper() in fields]
-    try:
-        branch_street_rn_seen = defaultdict(list)
-        name_code_pairs = []
-        with arcpy.da.SearchCursor(fc_path, chk_fields) as cur:
-            for row in cur:
-                rec = dict(zip([f.upper() for f in chk_fields],row))
-                oid = rec.get("OID@", -1)
-                branch = rec.get("BRANCH_CODE"); cwt = rec.get("CHANGWAT_CODE")
-                parcel_type = rec.get("PARCEL_TYPE"); td_type = rec.get("TD_RP3_TYPE_CODE")
-                street_rn = rec.get("STREET_RN"); name = rec.get("STREET_NAME"); code = rec.get("STREET_CODE")
-                street_type = rec.get("STREET_TYPE"); land_use = rec.get("LAND_USE")
-
-
-                # 3.1.1. STREET_NAME ต้องเป็น String ถ้า TD_RP3_TYPE_CODE เป็น 1 หรือ 2 หรือ 3 หรือ 4 หรือ 5 หรือ 6 หรือ 8 จะต้องไม่ใช่ค่าว่าง
-                is_street_name_empty = (name is None or (isinstance(name, str) and name.strip() == ""))
-
-                # 3.1.2. STREET_CODE ต้องเป็น String (เช็คจากประเภทข้อมูลแล้ว)
-                # 3.1.3. STREET_DEPTH ต้องเป็น Number (เช็คจากประเภทข้อมูลแล้ว)
-
-                # 3.1.4. LAND_USE ต้องเป็น String มีข้อความในกลุ่มนี้เท่านั้น {VALID_LAND_USE}
-                # ตรวจสอบ LAND_USE เฉพาะเมื่อ STREET_NAME ไม่ว่าง                
-                if (not is_street_name_empty) and (land_use is None or str(land_use).strip() not in VALID_LAND_USE):
-                    write_error_report(error_list, gdb_path, fc_name, "Data Specified", oid, "LAND_USE", land_use, f"LAND_USE จะต้องมีค่าดังต่อไปนี้ {VALID_LAND_USE} (เมื่อ STREET_NAME มีค่า)")
-              
-                # 3.1.5. ตรวจสอบ STREET_TYPE เฉพาะเมื่อ STREET_NAME ไม่ว่าง
-                # STREET_TYPE ต้องเป็น String มีข้อความในกลุ่ม {VALID_STREET_TYPE} เท่านั้น
-                if (not is_street_name_empty) and (street_type is None or str(street_type).strip() not in VALID_STREET_TYPE):
-                    write_error_report(error_list, gdb_path, fc_name, "Data Specified", oid, "STREET_TYPE", street_type, f"STREET_TYPE จะต้องมีค่าดังต่อไปนี้ {VALID_STREET_TYPE} (เมื่อ STREET_NAME มีค่า)")
-
-                # 3.1.6. STREET_WIDTH ต้องเป็น Number (เช็คจากประเภทข้อมูลแล้ว)
-                # 3.1.7. STREET_AREA ต้องเป็น Number (เช็คจากประเภทข้อมูลแล้ว)
-                # 3.1.8. CHANGWAT_CODE ต้องเป็น String และเป็น 2 หลัก เช่น "66"
-                if not (isinstance(cwt,str) and len(cwt)==2 and cwt.isdigit()):
-                    write_error_report(error_list, gdb_path, fc_name, "Data Format", oid, "CHANGWAT_CODE", cwt, "ต้องเป็น 2 หลัก")
-                
-                # 3.1.9. BRANCH_CODE ต้องเป็น String และเป็น 8 หลัก และสองหลักแรก จะต้องตรงกับ CHANGWAT_CODE
-                if branch and cwt and (not (isinstance(branch,str) and len(branch.strip())==8 and branch.strip().isdigit())):
-                    write_error_report(error_list, gdb_path, fc_name, "Data Format", oid, "BRANCH_CODE", branch, "BRANCH_CODE ต้องเป็น 8 หลัก")
-                if branch and cwt and isinstance(branch,str) and isinstance(cwt,str) and not branch.startswith(cwt):
-                    write_error_report(error_list, gdb_path, fc_name, "Conditional Rule", oid, "BRANCH_CODE", branch, f"2 หลักแรกของ BRANCH_CODE ไม่ตรงกับ CHANGWAT_CODE {cwt}")
-
-                # 3.1.10. PARCEL_TYPE ต้องเป็น Number (เช็คจากประเภทข้อมูลแล้ว)
-
-                # 3.1.11. TD_RP3_TYPE_CODE ต้องเป็น Number
-                # และจะต้องเป็น 1 หรือ 2 หรือ 3 หรือ 4 หรือ 5 หรือ 6 หรือ 8 เท่านั้น
-                
-                td_type_int = None
-                is_td_type_valid_number = False
-
-                if td_type is None:
-                    td_type_int = None
-                    is_td_type_valid_number = True # ถือว่า None เป็นค่าที่ถูกต้องสำหรับตรวจสอบ
-                elif can_be_number(td_type):
-                    td_type_int = int(float(td_type))
-                    is_td_type_valid_number = True
-                else:
-                    # กรณีเป็น non-numeric string (เช่น "abc") ซึ่งผิดเสมอ
-                    write_error_report(error_list, gdb_path, fc_name, "Data Format", oid, "TD_RP3_TYPE_CODE", td_type, "TD_RP3_TYPE_CODE ต้องเป็นตัวเลขเท่านั้น")
-                    is_td_type_valid_number = False
-
-                if is_td_type_valid_number:
-                    # ตรวจสอบว่า STREET_NAME ว่างหรือไม่
-                    is_street_name_empty = (name is None or (isinstance(name, str) and name.strip() == ""))
-
-                    if not is_street_name_empty:
-                        # --- ทางเลือก 1: STREET_NAME มีค่า ---
-                        # 3.1.11 TD_RP3_TYPE_CODE ต้องเป็น {1,2,3,4,5,6,8}
-                        if td_type_int not in VALID_TD_RP3:
-                            write_error_report(error_list, gdb_path, fc_name, "Data Specified", oid, "TD_RP3_TYPE_CODE", td_type, f"TD_RP3_TYPE_CODE ต้องมีค่าเป็น {sorted(VALID_TD_RP3)} (เนื่องจาก STREET_NAME มีค่า)")
-                            # (ข้อ 3.1.1 ถูกต้องโดยอัตโนมัติ เพราะ STREET_NAME ไม่ว่าง)
-
-                    else:
-                        # --- ทางเลือก 2: STREET_NAME ว่าง ---
-                        # (ข้อ 3.1.1 ไม่ต้องตรวจสอบ)
-                        # (ข้อ 3.1.11 ใหม่) TD_RP3_TYPE_CODE ต้องเป็น {0, None} หรือ {1-8}
-                        # สร้าง Set ที่อนุญาต (0, None, 1, 2, 3, 4, 5, 6, 8)
-                        ALLOWED_VALUES_WHEN_NAME_IS_EMPTY = {0, None} 
-                        ALLOWED_VALUES_WHEN_NAME_IS_EMPTY.update(VALID_TD_RP3) # เพิ่ม {1,2,3...}
-                        if td_type_int not in ALLOWED_VALUES_WHEN_NAME_IS_EMPTY:
-                            # ถ้า td_type เป็นค่าอื่น (เช่น 7, 9, 99) จะไม่ยอมรับ
-                            allowed_str = "{0, None} หรือ " + str(sorted(VALID_TD_RP3))
-                            write_error_report(error_list, gdb_path, fc_name, "Data Specified", oid, "TD_RP3_TYPE_CODE", td_type, f"TD_RP3_TYPE_CODE ต้องเป็น {allowed_str} (เนื่องจาก STREET_NAME ว่างเปล่า)")
-                
-                # ถ้า TD_RP3_TYPE_CODE เป็น 1 หรือ 2 หรือ 3 หรือ 4 หรือ 5 หรือ 6 หรือ 8 STREET_NAME จะต้องไม่ใช่ค่าว่าง
-                if (td_type_int in VALID_TD_RP3) and is_street_name_empty:
-                    write_error_report(
-                        error_list, 
-                        gdb_path, 
-                        fc_name, 
-                        "Data Required",
-                        oid, 
-                        "STREET_NAME", 
-                        name, 
-                        f"STREET_NAME ต้องไม่เป็นค่าว่าง เนื่องจาก TD_RP3_TYPE_CODE คือ {td_type_int}"
-                    )
-                           
-
-                # 3.1.12. STREET_RN ต้องเป็น Number และใน BRANCH_CODE เดียวกัน จะต้องไม่มีค่าซ้ำ
-                if street_rn is None or not can_be_number(street_rn):
-                     write_error_report(error_list, gdb_path, fc_name, "Data Format", oid, "STREET_RN", street_rn, "STREET_RN ต้องเป็น Number")
-                else:
-                    key = (branch.strip() if isinstance(branch,str) else "NULL", int(float(street_rn)))
-                    branch_street_rn_seen[key].append(oid)
 
-                if name and code:
-                    name_code_pairs.append((name, code))
+    # 3.1. ตรวจสอบฟิลด์ ประเภทข้อมูล และความถูกต้องของข้อมูล / 3.2. STREET_NAME-STREET_CODE 1 ต่อ 1
+    check_layer_fields("ROAD", fc_path, fields, error_list)
+    hasher = new_geometry_hasher(fields, "ROAD")
+    count = scan_layer_rules("ROAD", fc_path, fields, error_list, [hasher] + reference_taps("ROAD", fc_path, fields))
 
-          
-        
-        #  STREET_NAME และ STREET_CODE ต้องจับคู่กันแบบ 1 ต่อ 1
-        name_to_code = {}
-        code_to_name = {}
-        for name, code in name_code_pairs:
-            if name in name_to_code and name_to_code[name] != code:
-                write_error_report(error_list, gdb_path, fc_name, "OneToOne", "N/A", "STREET_NAME", name, f"{name} ตรวจพบว่าเชื่อมต่อกับ STREET_CODE มากกว่า 1  ({name_to_code[name]} vs {code})")
-            if code in code_to_name and code_to_name[code] != name:
-                write_error_report(error_list, gdb_path, fc_name, "OneToOne", "N/A", "STREET_CODE", code, f"{code} ตรวจพบว่าเชื่อมต่อกับ STREET_NAME มากกว่า 1 ({code_to_name[code]} vs {name})")
-            name_to_code[name] = code
-            code_to_name[code] = name
-        
-        # เขียน Error สำหรับ STREET_RN ที่ซ้ำ
-        for key, oids in branch_street_rn_seen.items():
-            if len(oids) > 1:
-                branch_str, rn_str = key
-                write_error_report(error_list, gdb_path, fc_name, "Duplicate Value", str(oids), "STREET_RN", rn_str, f"STREET_RN ซ้ำ ภายใน BRANCH_CODE '{branch_str}'")
-
-    except Exception as ex:
-        write_error_report(error_list, gdb_path, fc_name, "Cursor Error", -1, "", "", str(ex))
-    
     #----- 3.3. ตรวจสอบโพลีกอนที่ซ้อนทับกันสนิท
-    check_for_exact_overlaps(fc_path, error_list, os.path.join(OVERLAP_ROOT,"ROAD"), basename or "ROAD")
+    check_for_exact_overlaps(fc_path, error_list, os.path.join(OVERLAP_ROOT,"ROAD"), basename or "ROAD", hasher=hasher, layer_key="ROAD")
+    return count
 
 ################################################
 # ---------------4) BLOCK_FIX
@@ -817,74 +879,15 @@ def validate_block_fix(fc_path, error_list, basename=None):
     gdb_path, fc_name = os.path.split(fc_path)
     print(f"  กำลังตรวจสอบ BLOCK FIX: {fc_name}")
     fields = safe_list_fields(fc_path)
-    
-    required = ["STREET_NAME", "STREET_CODE", "BRANCH_CODE", "BLOCK_FIX_RN"]
-    for f in required:
-        if f.upper() not in fields:
-            write_error_report(error_list, gdb_path, fc_name, "Field Check", -1, f, "", "ไม่พบฟิลด์นี้")
-    
-    
-    # --- (ตรวจสอบประเภท) ---
-
-    if "STREET_NAME" in fields and fields["STREET_NAME"] != "String":
-        write_error_report(error_list, gdb_path, fc_name, "Field Type", -1, "STREET_NAME", fields["STREET_NAME"], "ต้องเป็น String")
-    if "STREET_CODE" in fields and fields["STREET_CODE"] != "String":
-        write_error_report(error_list, gdb_path, fc_name, "Field Type", -1, "STREET_CODE", fields["STREET_CODE"], "ต้องเป็น String")
-    if "BRANCH_CODE" in fields and fields["BRANCH_CODE"] != "String":
-        write_error_report(error_list, gdb_path, fc_name, "Field Type", -1, "BRANCH_CODE", fields["BRANCH_CODE"], "ต้องเป็น String")
-    if "BLOCK_FIX_RN" in fields and not is_numeric_field_type(fields["BLOCK_FIX_RN"]):
-        write_error_report(error_list, gdb_path, fc_name, "Field Type", -1, "BLOCK_FIX_RN", fields["BLOCK_FIX_RN"], "ต้องเป็น Number")
 
-
-    chk_fields = [f for f in ["OID@","BRANCH_CODE","BLOCK_FIX_RN","STREET_NAME","STREET_CODE"] if f=="OID@" or f.upper() in fields]
-    try:
-        branch_rns = defaultdict(list)
-        name_code_pairs = []
-        with arcpy.da.SearchCursor(fc_path, chk_fields) as cur:
-            for row in cur:
-                rec = dict(zip([f.upper() for f in chk_fields], row))
-                oid = rec.get("OID@", -1)
-                branch = rec.get("BRANCH_CODE")
-                rn = rec.get("BLOCK_FIX_RN")
-                name = rec.get("STREET_NAME")
-                code = rec.get("STREET_CODE")
-
-                # 4.1.1. STREET_NAME ต้องเป็น String  และไม่ใช่ค่าว่าง (NULL) หรือ " " หรือขีดกลาง (-)
-                if not name or (isinstance(name, str) and (name.strip() == "" or name.strip() == "-")):
-                    write_error_report(error_list, gdb_path, fc_name, "Data Required", oid, "STREET_NAME", name, "STREET_NAME ต้องไม่เป็นค่าว่าง, ช่องว่าง หรือ '-'")
-
-                # 4.1.2. STREET_CODE ต้องเป็น String (เช็คจากประเภทข้อมูลแล้ว)
-                # 4.1.3: BRANCH_CODE ต้องเป็น String และมี 8 หลักเท่านั้น
-                if not (branch and isinstance(branch,str) and len(branch.strip())==8 and branch.strip().isdigit()):
-                    write_error_report(error_list, gdb_path, fc_name, "Data Format", oid, "BRANCH_CODE", branch, "BRANCH_CODE ต้องเป็น 8 หลัก")
-                
-                # LOCK_FIX_RN ต้องเป็น Number และใน BRANCH_CODE เดียวกัน ต้องไม่ซ้ำ
-                if rn is None or not can_be_number(rn):
-                    write_error_report(error_list, gdb_path, fc_name, "Data Format", oid, "BLOCK_FIX_RN", rn, "ต้องเป็น Number")
-                else:
-                    branch_rns[(branch.strip() if branch else "NULL", int(float(rn)))].append(oid)
-                
-                # 4.2. STREET_NAME กับ STREET_CODE ต้องจับคู่กันแบบ 1 ต่อ 1
-                if name and code:
-                    name_code_pairs.append((name, code))
-
-        for key, oids in branch_rns.items():
-            if len(oids) > 1:
-                write_error_report(error_list, gdb_path, fc_name, "Duplicate Value", str(oids), "BLOCK_FIX_RN", key[1], f"BLOCK_FIX_RN ซ้ำใน BRANCH_CODE '{key[0]}'")
-
-        name_to_code = {}; code_to_name={}
-        for name,code in name_code_pairs:
-            if name in name_to_code and name_to_code[name] != code:
-                write_error_report(error_list, gdb_path, fc_name, "OneToOne", "N/A", "STREET_NAME", name, f"{name} มี STREET_CODE มากกว่า 1")
-            if code in code_to_name and code_to_name[code] != name:
-                write_error_report(error_list, gdb_path, fc_name, "OneToOne", "N/A", "STREET_CODE", code, f"{code} มี STREET_NAME มากกว่า 1")
-            name_to_code[name]=code; code_to_name[code]=name
-
-    except Exception as ex:
-        write_error_report(error_list, gdb_path, fc_name, "Cursor Error", -1, "", "", str(ex))
+    # 4.1. ตรวจสอบฟิลด์ ประเภทข้อมูล และความถูกต้องของข้อมูล / 4.2. STREET_NAME-STREET_CODE 1 ต่อ 1
+    check_layer_fields("BLOCK_FIX", fc_path, fields, error_list)
+    hasher = new_geometry_hasher(fields, "BLOCK_FIX")
+    count = scan_layer_rules("BLOCK_FIX", fc_path, fields, error_list, [hasher] + reference_taps("BLOCK_FIX", fc_path, fields))
 
     # 4.3. ตรวจสอบโพลีกอนที่ซ้อนทับกันสนิท
-    check_for_exact_overlaps(fc_path, error_list, os.path.join(OVERLAP_ROOT,"BLOCK"), basename or "BLOCK_FIX")
+    check_for_exact_overlaps(fc_path, error_list, os.path.join(OVERLAP_ROOT,"BLOCK"), basename or "BLOCK_FIX", hasher=hasher, layer_key="BLOCK_FIX")
+    return count
 
 ############################################
 ###----- 5) BLOCK_PRICE
@@ -894,59 +897,15 @@ def validate_block_price(fc_path, error_list, basename=None):
     gdb_path, fc_name = os.path.split(fc_path)
     print(f"  Validating BLOCK PRICE: {fc_name}")
     fields = safe_list_fields(fc_path)
-    
-    required = ["STREET_NAME", "STREET_CODE", "BRANCH_CODE", "BLOCK_PRICE_RN"]
-    for f in required:
-        if f.upper() not in fields:
-            write_error_report(error_list, gdb_path, fc_name, "Field Check", -1, f, "", "ไม่พบฟิลด์นี้")
-
-    #----------------------------------------
-    # --- (ตรวจสอบประเภทข้อมูล) ---
-    #----------------------------------------
-    if "STREET_NAME" in fields and fields["STREET_NAME"] != "String":
-        write_error_report(error_list, gdb_path, fc_name, "Field Type", -1, "STREET_NAME", fields["STREET_NAME"], "ต้องเป็น String")
-    if "STREET_CODE" in fields and fields["STREET_CODE"] != "String":
-        write_error_report(error_list, gdb_path, fc_name, "Field Type", -1, "STREET_CODE", fields["STREET_CODE"], "ต้องเป็น String")
-    if "BRANCH_CODE" in fields and fields["BRANCH_CODE"] != "String":
-        write_error_report(error_list, gdb_path, fc_name, "Field Type", -1, "BRANCH_CODE", fields["BRANCH_CODE"], "ต้องเป็น String")
-    if "BLOCK_PRICE_RN" in fields and not is_numeric_field_type(fields["BLOCK_PRICE_RN"]):
-        write_error_report(error_list, gdb_path, fc_name, "Field Type", -1, "BLOCK_PRICE_RN", fields["BLOCK_PRICE_RN"], "ต้องเป็น Number")
-
-    chk_fields = [f for f in ["OID@","BRANCH_CODE","BLOCK_PRICE_RN","STREET_NAME","STREET_CODE"] if f=="OID@" or f.upper() in fields]
-    try:
-        branch_rns = defaultdict(list)
-        with arcpy.da.SearchCursor(fc_path, chk_fields) as cur:
-            for row in cur:
-                rec = dict(zip([f.upper() for f in chk_fields], row))
-                oid = rec.get("OID@", -1)
-                branch = rec.get("BRANCH_CODE")
-                rn = rec.get("BLOCK_PRICE_RN")
-                name = rec.get("STREET_NAME")
-
-                # 5.1.1. STREET_NAME ต้องเป็น String และไม่ใช่ค่าว่าง (NULL) หรือ " " หรือขีดกลาง (-)E
-                if not name or (isinstance(name, str) and (name.strip() == "" or name.strip() == "-")):
-                    write_error_report(error_list, gdb_path, fc_name, "Data Required", oid, "STREET_NAME", name, "STREET_NAME ต้องไม่เป็นค่าว่าง, ช่องว่าง หรือ '-'")
-                
-                # 5.1.2. STREET_CODE ต้องเป็น String (เช็คจากประเภทข้อมูลแล้ว)
-                # 5.1.3. BRANCH_CODE ต้องเป็น String  และมี 8 หลักเท่านั้น
-                if not (branch and isinstance(branch,str) and len(branch.strip())==8 and branch.strip().isdigit()):
-                    write_error_report(error_list, gdb_path, fc_name, "Data Format", oid, "BRANCH_CODE", branch, "BRANCH_CODE ต้องเป็น 8 หลัก")
-                
-                # 5.1.4. BLOCK_PRICE_RN ต้องเป็น Number และใน BRANCH_CODE เดียวกัน ต้องไม่ซ้ำกัน
-                if rn is None or not can_be_number(rn):
-                    write_error_report(error_list, gdb_path, fc_name, "Data Format", oid, "BLOCK_PRICE_RN", rn, "ต้องเป็น Number")
-                else:
-                    branch_rns[(branch.strip() if branch else "NULL", int(float(rn)))].append(oid)
-        
-        for key, oids in branch_rns.items():
-            if len(oids) > 1:
-                write_error_report(error_list, gdb_path, fc_name, "Duplicate Value", str(oids), "BLOCK_PRICE_RN", key[1], f"BLOCK_PRICE_RN ซ้ำใน BRANCH_CODE '{key[0]}'")
 
-    except Exception as ex:
-        write_error_report(error_list, gdb_path, fc_name, "Cursor Error", -1, "", "", str(ex))
-    
+    # 5.1. ตรวจสอบฟิลด์ ประเภทข้อมูล และความถูกต้องของข้อมูล
+    check_layer_fields("BLOCK_PRICE", fc_path, fields, error_list)
+    hasher = new_geometry_hasher(fields, "BLOCK_PRICE")
+    count = scan_layer_rules("BLOCK_PRICE", fc_path, fields, error_list, [hasher] + reference_taps("BLOCK_PRICE", fc_path, fields))
+
     # 5.2. ตรวจสอบโพลีกอนที่ซ้อนทับกันสนิท
-    check_for_exact_overlaps(fc_path, error_list, os.path.join(OVERLAP_ROOT,"BLOCK"), basename or "BLOCK_PRICE")
+    check_for_exact_overlaps(fc_path, error_list, os.path.join(OVERLAP_ROOT,"BLOCK"), basename or "BLOCK_PRICE", hasher=hasher, layer_key="BLOCK_PRICE")
+    return count
 
 ##############################################
 #----------------- 6) BLOCK_BLUE
@@ -956,42 +915,15 @@ def validate_block_blue(fc_path, error_list, basename=None):
     gdb_path, fc_name = os.path.split(fc_path)
     print(f"  กำลังตรวจสอบ BLOCK_BLUE: {fc_name}")
     fields = safe_list_fields(fc_path)
-    required = ["BRANCH_CODE","BLOCK_BLUE_RN","BLOCK_TYPE_ID"]
-    for f in required:
-        if f.upper() not in fields:
-            write_error_report(error_list, gdb_path, fc_name, "Field Check", -1, f, "", "ไม่พบฟิลด์นี้")
-    
-    # type checks
-    try:
-        chk_fields = [f for f in ["OID@","BRANCH_CODE","BLOCK_BLUE_RN","BLOCK_TYPE_ID"] if f=="OID@" or f.upper() in fields]
-        with arcpy.da.SearchCursor(fc_path, chk_fields) as cur:
-            branch_vals = defaultdict(list)
-            for row in cur:
-                rec = dict(zip([f.upper() for f in chk_fields], row))
-                oid = rec.get("OID@", -1); branch = rec.get("BRANCH_CODE"); rn = rec.get("BLOCK_BLUE_RN"); bt = rec.get("BLOCK_TYPE_ID")
-                
-                # 6.1.1. BRANCH_CODE ต้องเป็น String  และมี 8 หลักเท่านั้น
-                if not (branch and isinstance(branch,str) and len(branch.strip())==8 and branch.strip().isdigit()):
-                    write_error_report(error_list, gdb_path, fc_name, "Data Format", oid, "BRANCH_CODE", branch, "BRANCH_CODE ต้องเป็น 8 หลัก")
-                
-                # BLOCK_BLUE_RN  ต้องเป็น Number และใน BRANCH_CODE เดียวกัน ต้องไม่ซ้ำกัน
-                if rn is None or not can_be_number(rn):
-                    write_error_report(error_list, gdb_path, fc_name, "Data Format", oid, "BLOCK_BLUE_RN", rn, "ต้องเป็น Number")
-                else:
-                    branch_vals[(branch.strip() if branch else "NULL", int(float(rn)))].append(oid)
-                
-                # 6.1.3. BLOCK_TYPE_ID ต้องเป็น Number และต้องเป็น 1 หรือ 2 หรือ 3 เท่านั้น
-                if bt not in (1,2,3):
-                    write_error_report(error_list, gdb_path, fc_name, "Data Specified", oid, "BLOCK_TYPE_ID", bt, "BLOCK_TYPE_ID ต้องเป็น 1 หรือ 2 หรือ 3")
-            
-            for k,oids in branch_vals.items():
-                if len(oids)>1:
-                    write_error_report(error_list, gdb_path, fc_name, "Duplicate Value", str(oids), "BLOCK_BLUE_RN", k[1], f"พบค่าซ้ำใน BRANCH_CODE '{k[0]}'")
-    except Exception as ex:
-        write_error_report(error_list, gdb_path, fc_name, "Cursor Error", -1, "", "", str(ex))
-    
+
+    # 6.1. ตรวจสอบฟิลด์ และความถูกต้องของข้อมูล
+    check_layer_fields("BLOCK_BLUE", fc_path, fields, error_list)
+    hasher = new_geometry_hasher(fields, "BLOCK_BLUE")
+    count = scan_layer_rules("BLOCK_BLUE", fc_path, fields, error_list, [hasher] + reference_taps("BLOCK_BLUE", fc_path, fields))
+
     # 6.2. ตรวจสอบโพลีกอนที่ซ้อนทับกันสนิท
-    check_for_exact_overlaps(fc_path, error_list, os.path.join(OVERLAP_ROOT,"BLOCK"), basename or "BLOCK_BLUE")
+    check_for_exact_overlaps(fc_path, error_list, os.path.join(OVERLAP_ROOT,"BLOCK"), basename or "BLOCK_BLUE", hasher=hasher, layer_key="BLOCK_BLUE")
+    return count
 
 ##############################################
 #----------------- 7) PARCEL_REL
@@ -1001,80 +933,12 @@ def validate_parcel_rel(fc_path, error_list, basename=None):
     gdb_path, fc_name = os.path.split(fc_path)
     print(f"  Validating PARCEL_REL: {fc_name}")
     fields = safe_list_fields(fc_path)
-    required = ["BRANCH_CODE","REL_RN","PARCEL_RN","STREET_RN","BLOCK_FIX_RN","BLOCK_BLUE_RN","BLOCK_PRICE_RN","TABLE_NO","SUB_TABLE_NO","DEPTH_R","DEPTH_GROUP","START_X","START_Y","END_X","END_Y"]
-    for f in required:
-        if f.upper() not in fields:
-            write_error_report(error_list, gdb_path, fc_name, "Field Check", -1, f, "", "ไม่พบฟิลด์")
-
-    # ตรงรวจสอบประเภทข้อมูลที่เป็น Number
-    numeric_fields = ["REL_RN","PARCEL_RN","STREET_RN","BLOCK_FIX_RN","BLOCK_BLUE_RN","BLOCK_PRICE_RN","TABLE_NO","SUB_TABLE_NO","DEPTH_R","DEPTH_GROUP","START_X","START_Y","END_X","END_Y"]
-    for nf in numeric_fields:
-        if nf in fields and not is_numeric_field_type(fields[nf]):
-            write_error_report(error_list, gdb_path, fc_name, "Field Type", -1, nf, fields[nf], "ต้องเป็น Number")
-
-
-    chk_fields = [f for f in required if f.upper() in fields]
-    VALID_TABLE_NO = REL_TABLE_NO_DOMAIN
-    VALID_SUB_TABLE_NO = REL_SUB_TABLE_NO_RANGE
-
-    branch_rel_rn = defaultdict(list)
-    try:
-        with arcpy.da.SearchCursor(fc_path, ["OID@"]+chk_fields) as cur:
-            for row in cur:
-                rec = dict(zip(["OID@"]+[f.upper() for f in chk_fields], row))
-                oid = rec.get("OID@", -1)
-                branch = rec.get("BRANCH_CODE"); rel_rn = rec.get("REL_RN")
-
-                # 7.1.1. BRANCH_CODE ต้องเป็น String  และมี 8 หลักเท่านั้น
-                if not (branch and isinstance(branch,str) and len(branch.strip())==8 and branch.strip().isdigit()):
-                    write_error_report(error_list, gdb_path, fc_name, "Data Format", oid, "BRANCH_CODE", branch, "BRANCH_CODE ต้องเป็น 8 หลัก")
-                
-                # 7.1.2. REL_RN ต้องเป็น Number และใน BRANCH_CODE เดียวกันจะต้องไม่ซ้ำกัน
-                if rel_rn is None or not can_be_number(rel_rn):
-                    write_error_report(error_list, gdb_path, fc_name, "Data Format", oid, "REL_RN", rel_rn, "REL_RN ต้องเป็น Number")
-                else:
-                    branch_key = branch.strip() if branch else "NULL"
-                    branch_rel_rn[(branch_key, int(float(rel_rn)))].append(oid)
-
-                # 7.1.3. PARCEL_RN ต้องเป็น Number
-                # 7.1.4. STREET_RN ต้องเป็น Number
-                # 7.1.5. BLOCK_FIX_RN ต้องเป็น Number
-                # 7.1.6. BLOCK_BLUE_RN ต้องเป็น Number
-                # 7.1.7. BLOCK_PRICE_RN ต้องเป็น Number
-                # 7.1.8. TABLE_NO ต้องเป็น Number
-                # และมีค่าเป็น 1 หรือ 2 หรือ 3 หรือ 41 หรือ 42 หรือ 5 หรือ 6 หรือ 7 เท่านั้น
-                table_no = rec.get("TABLE_NO"); sub_no = rec.get("SUB_TABLE_NO")
-                if not can_be_number(table_no) or int(float(table_no)) not in VALID_TABLE_NO:
-                    write_error_report(error_list, gdb_path, fc_name, "Data Specified", oid, "TABLE_NO", table_no, f"ต้องเป็น {sorted(VALID_TABLE_NO)}")
-                
-                # 7.1.9. SUB_TABLE_NO ต้องเป็น Number และต้องมีค่าระหว่าง 0 - 6 หรือค่าว่าง เท่านั้น
-                # อนุญาตให้เป็นค่าว่าง (None) ได้
-                if sub_no is not None:
-                    # ถ้าไม่ว่าง ต้องเป็น 0-6
-                    if not can_be_number(sub_no) or int(float(sub_no)) not in VALID_SUB_TABLE_NO:
-                        write_error_report(error_list, gdb_path, fc_name, "Data Specified", oid, "SUB_TABLE_NO", sub_no, "ต้องเป็น 0-6 ")
-                
-                # 	7.1.10. DEPTH_R ต้องเป็น Number ต้องไม่ใช่ 0 หรือว่าง
-                # 	7.1.11. DEPTH_GROUP ต้องเป็น Number (เช็คจากประเภทข้อมูลแล้ว)
-                # 	7.1.12. START_X ต้องเป็น Number ต้องไม่ใช่ 0 หรือว่าง
-                # 	7.1.13. START_Y ต้องเป็น Number ต้องไม่ใช่ 0 หรือว่าง
-                # 	7.1.14. END_X ต้องเป็น Number ต้องไม่ใช่ 0 หรือว่าง
-                # 	7.1.15. END_Y ต้องเป็น Number ต้องไม่ใช่ 0 หรือว่าง
-                for fld in ("DEPTH_R","START_X","START_Y","END_X","END_Y"):
-                    val = rec.get(fld)
-                    if val is None or (can_be_number(val) and float(val)==0.0):
-                        write_error_report(error_list, gdb_path, fc_name, "Data Required", oid, fld, val, f"{fld} ต้องไม่ใช่ 0 หรือค่าว่าง")
-            
-            # 7.1.2. REL_RN ต้องเป็น Number    และใน BRANCH_CODE เดียวกันจะต้องไม่ซ้ำกัน
-            for key, oids in branch_rel_rn.items():
-                if len(oids) > 1:
-                    branch_key, rn_val = key
-                    write_error_report(error_list, gdb_path, fc_name, "Duplicate Value", str(oids), "REL_RN", rn_val, f"ซ้ำภายใน BRANCH_CODE '{branch_key}'")
 
-    except Exception as ex:
-        write_error_report(error_list, gdb_path, fc_name, "Cursor Error", -1, "", "", str(ex))
+    # 7.1. ตรวจสอบฟิลด์ ประเภทข้อมูล และความถูกต้องของข้อมูล (ตาราง ไม่มีการตรวจทับซ้อน)
+    check_layer_fields("PARCEL_REL", fc_path, fields, error_list)
+    return scan_layer_rules("PARCEL_REL", fc_path, fields, error_list, reference_taps("PARCEL_REL", fc_path, fields))
 
-##############################################  
+##############################################
 #---------------- 8) NS3K_REL
 ##############################################
 def validate_ns3k_rel(fc_path, error_list, basename=None):
@@ -1082,157 +946,114 @@ def validate_ns3k_rel(fc_path, error_list, basename=None):
     gdb_path, fc_name = os.path.split(fc_path)
     print(f"  Validating NS3K_REL: {fc_name}")
     fields = safe_list_fields(fc_path)
-    
-    #   8.1. ตรวจสอบฟิลด์ที่จำเป็น
-    required = ["BRANCH_CODE","REL_RN","NS3K_RN","STREET_RN","BLOCK_FIX_RN","BLOCK_BLUE_RN","BLOCK_PRICE_RN","TABLE_NO","SUB_TABLE_NO","DEPTH_R","DEPTH_GROUP","START_X","START_Y","END_X","END_Y"]
-    for f in required:
-        if f.upper() not in fields:
-            write_error_report(error_list, gdb_path, fc_name, "Field Check", -1, f, "", "ไม่พบ field")
-    
-    #--- (ตรวจสอบประเภทข้อมูล) ---ที่เป็น Number
-    numeric_fields = ["REL_RN","NS3K_RN","STREET_RN","BLOCK_FIX_RN","BLOCK_BLUE_RN","BLOCK_PRICE_RN","TABLE_NO","SUB_TABLE_NO","DEPTH_R","DEPTH_GROUP","START_X","START_Y","END_X","END_Y"]
-    for nf in numeric_fields:
-        if nf in fields and not is_numeric_field_type(fields[nf]):
-            write_error_report(error_list, gdb_path, fc_name, "Field Type", -1, nf, fields[nf], "ต้องเป็น Number")
 
+    # 8.1. ตรวจสอบฟิลด์ ประเภทข้อมูล และความถูกต้องของข้อมูล (ตาราง ไม่มีการตรวจทับซ้อน)
+    check_layer_fields("NS3K_REL", fc_path, fields, error_list)
+    return scan_layer_rules("NS3K_REL", fc_path, fields, error_list, reference_taps("NS3K_REL", fc_path, fields))
+################################################
+# --------------- MAIN
+################################################
 
-    chk_fields = [f for f in required if f.upper() in fields]
-    VALID_TABLE_NO = REL_TABLE_NO_DOMAIN
-    VALID_SUB_TABLE_NO = REL_SUB_TABLE_NO_RANGE
-    
-    branch_rel_rn = defaultdict(list)
-    branch_ns3k_rn = defaultdict(list)
-    
-    try:
-        with arcpy.da.SearchCursor(fc_path, ["OID@"]+chk_fields) as cur:
-            for row in cur:
-                rec = dict(zip(["OID@"]+[f.upper() for f in chk_fields], row))
-                oid = rec.get("OID@", -1)
-                branch = rec.get("BRANCH_CODE"); 
-                rel_rn = rec.get("REL_RN")
-                ns3k_rn = rec.get("NS3K_RN")
-                
-                # 8.1.1. BRANCH_CODE ต้องเป็น String และมี 8 หลักเท่านั้น
-                if not (branch and isinstance(branch,str) and len(branch.strip())==8 and branch.strip().isdigit()):
-                    write_error_report(error_list, gdb_path, fc_name, "Data Format", oid, "BRANCH_CODE", branch, "BRANCH_CODE ต้องเป็น 8 หลัก")
-
-                # 8.1.2. REL_RN ต้องเป็น Number และภายใน BRANCH_CODE เดียวกันจะต้องไม่ซ้ำกัน
-                if rel_rn is None or not can_be_number(rel_rn):
-                    write_error_report(error_list, gdb_path, fc_name, "Data Format", oid, "REL_RN",rel_rn , "ต้องเป็น Number")
-                else:
-                    branch_key = branch.strip() if branch else "NULL"
-                    branch_rel_rn[(branch_key, int(float(rel_rn)))].append(oid)
-                
-                # 8.1.3 NS3K_RN ต้องเป็น Number
-                # 8.1.4. STREET_RN ต้องเป็น Number
-                # 8.1.5. BLOCK_FIX_RN ต้องเป็น Number
-                # 8.1.6. BLOCK_BLUE_RN ต้องเป็น Number
-                # 8.1.7. BLOCK_PRICE_RN ต้องเป็น Number
-                
-
-                if ns3k_rn is None or not can_be_number(ns3k_rn):
-                    write_error_report(error_list, gdb_path, fc_name, "Data Format", oid, "NS3K_RN", ns3k_rn, "NS3K_RN ต้องเป็น Number")
-   
-                # 8.1.8. TABLE_NO ต้องเป็น Number และมีค่าเป็น 1 หรือ 2 หรือ 3 หรือ 41 หรือ 42 หรือ 5 หรือ 6 หรือ 7 เท่านั้น
-                table_no = rec.get("TABLE_NO"); sub_no = rec.get("SUB_TABLE_NO")
-                if not can_be_number(table_no) or int(float(table_no)) not in VALID_TABLE_NO:
-                    write_error_report(error_list, gdb_path, fc_name, "Data Specified", oid, "TABLE_NO", table_no, f"ต้องเป็น {sorted(VALID_TABLE_NO)} ")
-                
-                #  SUB_TABLE_NO ต้องเป็น Number และต้องมีค่าระหว่าง 0 – 6 หรือค่าว่าง เท่านั้น
-                if sub_no is not None:
-                    # ถ้าไม่ว่าง ต้องเป็น 0 หรือ 1-6
-
-                    if not can_be_number(sub_no) or int(float(sub_no)) not in VALID_SUB_TABLE_NO:
-                        write_error_report(error_list, gdb_path, fc_name, "Data Specified", oid, "SUB_TABLE_NO", sub_no, "ต้องเป็น 0 หรือ 1-6 ")
-                
-                # 8.1.10.  DEPTH_R ต้องเป็น Number ต้องไม่ใช่ 0 หรือว่าง
-                # 8.1.11. DEPTH_GROUP ต้องเป็น Number (เช็คจากประเภทข้อมูลแล้ว)
-                # 8.1.12. START_X ต้องเป็น Number ต้องไม่ใช่ 0 หรือว่าง
-                # 8.1.13. START_Y ต้องเป็น Number ต้องไม่ใช่ 0 หรือว่าง
-                # 8.1.14. END_X ต้องเป็น Number ต้องไม่ใช่ 0 หรือว่าง
-                # 8.1.15. END_Y ต้องเป็น Number ต้องไม่ใช่ 0 หรือว่าง
-
-                for fld in ("DEPTH_R","START_X","START_Y","END_X","END_Y"):
-                    val = rec.get(fld)
-                    if val is None or (can_be_number(val) and float(val)==0.0):
-                        write_error_report(error_list, gdb_path, fc_name, "Data Required", oid, fld, val, f"{fld} จะต้องไม่ใช่ 0 หรือค่าว่าง")
-            
-            # 8.1.2. REL_RN ต้องเป็น Number และภายใน BRANCH_CODE เดียวกันจะต้องไม่ซ้ำกัน
-            for key, oids in branch_rel_rn.items():
-                if len(oids) > 1:
-                    branch_key, rn_val = key
-                    write_error_report(error_list, gdb_path, fc_name, "Duplicate Value", str(oids), "REL_RN", rn_val, f"REL_RN ซ้ำภายใน BRANCH_CODE '{branch_key}'")
+VALIDATION_MAP = {
+    "PARCEL": {"pattern": re.compile(r'^PARCEL_\d{2}_\d{2}$', re.IGNORECASE), "func": validate_parcel},
+    "PARCEL_NS3K": {"pattern": re.compile(r'^PARCEL_\d{2}_NS3K_\d{2}$', re.IGNORECASE), "func": validate_parcel_ns3k},
+    "ROAD": {"pattern": re.compile(r'^ROAD_\d{2}$', re.IGNORECASE), "func": validate_road},
+    "BLOCK_FIX": {"pattern": re.compile(r'^BLOCK_FIX_\d{2}$', re.IGNORECASE), "func": validate_block_fix},
+    "BLOCK_PRICE": {"pattern": re.compile(r'^BLOCK_PRICE_\d{2}$', re.IGNORECASE), "func": validate_block_price},
+    "BLOCK_BLUE": {"pattern": re.compile(r'^BLOCK_BLUE_\d{2}$', re.IGNORECASE), "func": validate_block_blue},
+    "PARCEL_REL": {"pattern": re.compile(r'^PARCEL_REL_\d{2}$', re.IGNORECASE), "func": validate_parcel_rel},
+    "NS3K_REL": {"pattern": re.compile(r'^NS3K_REL_\d{2}$', re.IGNORECASE), "func": validate_ns3k_rel}
+}
 
+def check_references(index, gdb, error_list):
+    """
+    ตรวจว่า RN ที่ PARCEL_REL / NS3K_REL อ้างถึงมีอยู่ในชั้นต้นทางโซนเดียวกัน และ BRANCH_CODE เดียวกัน
+    (ใช้ key ที่เก็บไว้ระหว่างตรวจแต่ละชั้น ไม่ได้อ่านข้อมูลซ้ำ)
+    ข้ามฟิลด์ที่ไม่มีชั้นต้นทางในโซนนั้น หรือชั้นต้นทางอ่านไม่ครบ
+    """
+    for rel in index.pending:
+        with measure("phase", rel.fc_name, "references", error_list=error_list) as timer:
+            timer.rows = rel.rows
+            dangling, skipped = index.dangling(rel)
+            for oid, field, rn, branch, layers in dangling:
+                write_error_report(error_list, gdb, rel.fc_name, "Referential Integrity", oid, field, rn,
+                                   f"ไม่พบ {field} นี้ใน {', '.join(layers)} ที่ BRANCH_CODE {branch} เดียวกัน")
+        if skipped:
+            print(f"  ข้ามการตรวจการอ้างอิงของ {rel.fc_name}: {', '.join(skipped)} (ไม่มีชั้นต้นทางในโซน {rel.zone} หรืออ่านไม่ครบ)")
+
+def get_gdb_basename(gdb):
+    """
+    ชื่อที่ใช้ตั้งชื่อไฟล์รายงานของ GDB เช่น 49_มุกดาหาร_GDB_49_2
+    """
+    parent = os.path.basename(os.path.dirname(gdb))
+    grandparent = os.path.basename(os.path.dirname(os.path.dirname(gdb)))
+    return f"{grandparent}_{parent}"
 
-    except Exception as ex:
-        write_error_report(error_list, gdb_path, fc_name, "Cursor Error", -1, "", "", str(ex))
+def layer_of(fc_name):
+    """(ชั้นข้อมูลตาม VALIDATION_MAP, โซน) ของ featureclass หรือ (None, None) ถ้าไม่ใช่ชั้นที่ตรวจ"""
+    key = next((k for k, meta in VALIDATION_MAP.items() if meta["pattern"].match(fc_name.upper())), None)
+    return (key, layer_zone(key, fc_name)) if key else (None, None)
 
-################################################
-# --------------- MAIN
-################################################
+def use_store():
+    return PARQUET_STORE and store_available()
 
-def main():
-    print("เริ่มต้นกระบวนการตรวจสอบมาตรฐาน...")
+def new_error_file(gdb, run_timestamp, basename):
+    """ErrorFileWriter ของ GDB (ไฟล์เดียวกับที่ write_store เขียน) ไว้เขียน error ทีละ row group ในโหมดประหยัด"""
+    province = extract_province(get_short_gdb_path(gdb))
+    return ErrorFileWriter(PARQUET_ROOT, run_timestamp, province, basename, get_short_gdb_path, layer_of)
 
-    validation_map = {
-        "PARCEL": {"pattern": re.compile(r'^PARCEL_\d{2}_\d{2}$', re.IGNORECASE), "func": validate_parcel},
-        "PARCEL_NS3K": {"pattern": re.compile(r'^PARCEL_\d{2}_NS3K_\d{2}$', re.IGNORECASE), "func": validate_parcel_ns3k},
-        "ROAD": {"pattern": re.compile(r'^ROAD_\d{2}$', re.IGNORECASE), "func": validate_road},
-        "BLOCK_FIX": {"pattern": re.compile(r'^BLOCK_FIX_\d{2}$', re.IGNORECASE), "func": validate_block_fix},
-        "BLOCK_PRICE": {"pattern": re.compile(r'^BLOCK_PRICE_\d{2}$', re.IGNORECASE), "func": validate_block_price},
-        "BLOCK_BLUE": {"pattern": re.compile(r'^BLOCK_BLUE_\d{2}$', re.IGNORECASE), "func": validate_block_blue},
-        "PARCEL_REL": {"pattern": re.compile(r'^PARCEL_REL_\d{2}$', re.IGNORECASE), "func": validate_parcel_rel},
-        "NS3K_REL": {"pattern": re.compile(r'^NS3K_REL_\d{2}$', re.IGNORECASE), "func": validate_ns3k_rel}
-    }
-
-    gdb_paths = find_gdb_paths(ROOT_DIR)
-    if not gdb_paths:
-        print("ไม่พบ GDBs ยกเลิกการดำเนินการ.")
-        return
+def write_store(gdb, run_timestamp, error_store, data_records, basename, error_file=None):
+    """
+    เขียน error ทุกแถว (error_store) และ All_DATA ของ GDB ลง PARQUET_ROOT (gdb_store)
+    error_file : ErrorFileWriter ที่โหมดประหยัดเขียน error บางส่วนไปแล้ว (new_error_file)
+    คืน {dataset: path} หรือ None ถ้าเขียนไม่สำเร็จ
+    """
+    try:
+        with measure("phase", "", "store") as timer:
+            timer.rows = len(error_store)
+            province = extract_province(get_short_gdb_path(gdb))
+            return write_gdb_results(PARQUET_ROOT, run_timestamp, province, basename, error_store, data_records,
+                                     get_short_gdb_path, layer_of, error_file)
+    except Exception as e:
+        print(f"  !! ไม่สามารถเขียน Parquet ของ {gdb}: {e}")
+        return None
 
-    today_str = datetime.datetime.now().strftime('%Y-%m-%d')
-    run_timestamp = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-    
-    gdb_report_dir = os.path.join(REPORT_ROOT, today_str)
-    os.makedirs(gdb_report_dir, exist_ok=True)
-    
-    ### ส่วนการวนลูป GDBs และรัน Validator
-    all_data_records = []
-    error_summary_records = []
+def validate_layers(gdb, error_list, run_timestamp, data_records, basename):
+    """
+    ตรวจทุกชั้นข้อมูลของ GDB ตาม VALIDATION_MAP แล้วตรวจการอ้างอิงข้ามชั้น (REFERENCE_CHECK)
+    error เขียนลง error_list, จำนวนแถวของแต่ละชั้น (Sheet All_DATA) เพิ่มลง data_records
+    ใช้ร่วมกันระหว่าง process_gdb และ check_required_featureclass.py
+    คืน False ถ้า GDB ไม่มีชั้นข้อมูลเลย
+    """
+    row_source = get_row_source(READER_BACKEND)
+    fcs_and_tables = row_source.list_layers(gdb)
+    if not fcs_and_tables:
+        return False
 
+    if REFERENCE_CHECK:
+        start_indexing()
+    try:
+        for fc in fcs_and_tables:
+            fc_upper = fc.upper() 
+            for key,meta in VALIDATION_MAP.items():
+                if meta["pattern"].match(fc_upper): 
+                    fc_path = os.path.join(gdb, fc)
+                    with measure("featureclass", fc, key, error_list=error_list) as timer:
+                        # รัน Validator (SINGLE_SCAN: validator คืนจำนวนแถวที่อ่านระหว่างตรวจ ไม่ต้องนับแยก)
+                        count = None
+                        try:
+                            count = meta["func"](fc_path, error_list, basename)
+                        except Exception as e:
+                            write_error_report(error_list, gdb, fc, "Validator Error", -1, "", "", str(e))
 
-    for gdb in gdb_paths:
-        print(f"\nกำลังดำเนินการ: {gdb}")
-        
-        gdb_error_list = []
-        
-        try:
-            arcpy.env.workspace = gdb
-            parent = os.path.basename(os.path.dirname(gdb))
-            grandparent = os.path.basename(os.path.dirname(os.path.dirname(gdb)))
-            basename = f"{grandparent}_{parent}"
-           
-            #basename = re.sub(r'[\\/*?:"<>|]','_',basename)
-            # (ส่วนการล้าง basename สำหรับ in_memory ... ไม่เปลี่ยนแปลง)
-            basename_for_mem = re.sub(r'[^A-Za-z0-9_]', '_', basename)
-            if not basename_for_mem[0].isalpha():
-                basename_for_mem = "GDB_" + basename_for_mem
-
-            fcs_and_tables = (arcpy.ListFeatureClasses() or []) + (arcpy.ListTables() or [])
-            if not fcs_and_tables:
-                print("  ไม่พบฟิเจอร์คลาสใน GDB.")
-                continue
-            
-            for fc in fcs_and_tables:
-                fc_upper = fc.upper() 
-                for key,meta in validation_map.items():
-                    if meta["pattern"].match(fc_upper): 
-                        fc_path = os.path.join(gdb, fc)
-                        
                         # (Sheet 1: นับจำนวน - ยังใช้ gdb path เต็ม)
+                        # นับด้วย GetCount เฉพาะเมื่อ validator อ่านไม่ครบ หรือปิด SINGLE_SCAN
                         try:
-                            count = int(arcpy.management.GetCount(fc_path)[0])
-                            all_data_records.append([
+                            if count is None or not SINGLE_SCAN:
+                                with measure("phase", fc, "count") as count_timer:
+                                    count = count_timer.rows = row_source.get_count(fc_path)
+                            timer.rows = count
+                            data_records.append([
                                 run_timestamp,
                                 gdb, 
                                 fc,
@@ -1240,142 +1061,761 @@ def main():
                             ])
                         except Exception as e:
                             print(f"  !! ไม่สามารถนับจำนวน {fc} ได้: {e}")
-                            all_data_records.append([
+                            data_records.append([
                                 run_timestamp,
                                 gdb, 
                                 fc,
                                 "Error"
                             ])
-                        
-                        # รัน Validator 
-                        try:
-                            meta["func"](fc_path, gdb_error_list, basename)
-                        except Exception as e:
-                            write_error_report(gdb_error_list, gdb, fc, "Validator Error", -1, "", "", str(e))
-                        break
+                    break
+
+        # ตรวจการอ้างอิงข้ามชั้น (หลังอ่านครบทุกชั้น key ของชั้นต้นทางอยู่ใน index แล้ว)
+        if REFERENCE_CHECK:
+            check_references(current_index(), gdb, error_list)
+    finally:
+        if REFERENCE_CHECK:
+            stop_indexing()
+    return True
+
+def _on_over_budget(gdb, error_list, result, error_store=None, error_file=None):
+    """
+    ฟังก์ชันที่ monitor หน่วยความจำเรียกเมื่อ RSS เกิน MEMORY_BUDGET_MB (ครั้งเดียวต่อ GDB)
+    สลับ GDB นี้เป็นโหมดประหยัด: จำกัดแถวรายละเอียดของ error ที่พบต่อจากนี้
+    error สำหรับ Parquet (error_store) เขียนลง error_file ทุก MEMORY_DEGRADED_STORE_ROWS แถว
+    (การตรวจค่าซ้ำลดงบเองผ่าน memory_pressure) และเขียน snapshot ถ้าเปิด MEMORY_TRACEMALLOC
+    ทำงานใน thread ของ monitor: แค่ตั้งค่ารอไว้ thread ที่ตรวจเป็นคนเปลี่ยนเพดาน / เขียนไฟล์
+    """
+    def degrade(rss):
+        result["degraded"] = True
+        print(f"  !! หน่วยความจำ {rss / MB:.0f} MB เกินงบ {MEMORY_BUDGET_MB} MB: "
+              f"รายละเอียด error ไม่เกิน {MEMORY_DEGRADED_ERROR_CAP} แถวต่อกฎ และเขียน key ค่าซ้ำลงดิสก์")
+        error_list.tighten_cap(MEMORY_DEGRADED_ERROR_CAP)
+        if error_store is not None and error_file is not None:
+            error_store.limit_rows(MEMORY_DEGRADED_STORE_ROWS, error_file.write)
+        if MEMORY_TRACEMALLOC:
+            path = write_snapshot(os.path.join(MEMORY_SNAPSHOT_DIR, f"{get_gdb_basename(gdb)}_memory.txt"))
+            if path:
+                print(f"  !! บันทึก snapshot หน่วยความจำ: {path}")
+    return degrade
+
+def process_gdb(gdb, run_timestamp, gdb_report_dir, fingerprint=None, cache_dir=None):
+    """
+    ตรวจสอบ GDB 1 ก้อน เขียนรายงาน Excel ของ GDB นั้น แล้วคืนผลสำหรับรวมในรายงานสรุป
+    ใช้ได้ทั้งตอนรันทีละ GDB และใน worker process
+    ถ้าส่ง fingerprint + cache_dir มา จะเก็บผลลง cache เมื่อตรวจเสร็จสมบูรณ์
+
+    Returns
+    -------
+    dict
+        gdb, data_records (Sheet All_DATA), summary_records (Sheet Error SUM), error_count,
+        perf (ผลการวัดสำหรับ Sheet Perf ถ้า PERF_ENABLED),
+        degraded (True ถ้าหน่วยความจำเกิน MEMORY_BUDGET_MB ระหว่างตรวจ ผลนี้ไม่ถูกเก็บลง cache),
+        failed (True ถ้าตรวจล้มเหลวกลางทาง ผลไม่ครบ ไม่ถูกเก็บลง journal / cache) และ error (สาเหตุ)
+    """
+    print(f"\nกำลังดำเนินการ: {gdb}")
+
+    data_records = []
+    summary_records = []
+    result = {"gdb": gdb, "data_records": data_records, "summary_records": summary_records, "error_count": 0}
+
+    recorder = start_recording(gdb) if PERF_ENABLED else None
+    if recorder is not None:
+        gdb_slot = recorder.reserve()
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+    monitoring = MEMORY_TRACKING or MEMORY_BUDGET_MB is not None
+    memory_window = None
+    error_file = None
+
+    try:
+        basename = get_gdb_basename(gdb)
+        # error ทั้งหมดของ GDB นี้เขียนลง Excel แบบ streaming (ไม่เก็บไว้ใน list)
+        report_path = os.path.join(gdb_report_dir, f"{basename}_error_report.xlsx")
+        # error ทุกแถว (รวมแถวที่เกิน cap) เก็บแบบ compact ไว้เขียน Parquet ตอนจบ GDB
+        error_store = ErrorStore() if use_store() else None
+        gdb_error_list = ErrorReportWriter(report_path, path_formatter=get_short_gdb_path, timestamp=run_timestamp,
+                                           cap=ERROR_DETAIL_CAP, caps=ERROR_DETAIL_CAPS, store=error_store)
+        if monitoring:
+            budget = None if MEMORY_BUDGET_MB is None else int(MEMORY_BUDGET_MB * MB)
+            if error_store is not None and budget is not None:
+                error_file = new_error_file(gdb, run_timestamp, basename)
+            start_monitor(budget=budget, on_over_budget=_on_over_budget(gdb, gdb_error_list, result, error_store, error_file),
+                          trace=MEMORY_TRACEMALLOC)
+            memory_window = open_window()
+       
+        #basename = re.sub(r'[\\/*?:"<>|]','_',basename)
+        # (ส่วนการล้าง basename สำหรับ in_memory ... ไม่เปลี่ยนแปลง)
+        basename_for_mem = re.sub(r'[^A-Za-z0-9_]', '_', basename)
+        if not basename_for_mem[0].isalpha():
+            basename_for_mem = "GDB_" + basename_for_mem
+
+        if not validate_layers(gdb, gdb_error_list, run_timestamp, data_records, basename):
+            print("  ไม่พบฟิเจอร์คลาสใน GDB.")
+            return result
+        
+        result["error_count"] = len(gdb_error_list)
+        report_saved = False
+        if gdb_error_list:
+            # บันทึกรายงาน excel ของ GDB นี้ (แถว error ถูกเขียนลงไฟล์ชั่วคราวระหว่างตรวจแล้ว)
+            try:
+                with measure("phase", "", "report") as timer:
+                    timer.rows = gdb_error_list.rows_written
+                    report_saved = gdb_error_list.save()
+                sheets = f", {gdb_error_list.sheet_count} sheets" if gdb_error_list.sheet_count > 1 else ""
+                if gdb_error_list.rows_written < len(gdb_error_list):
+                    sheets += f", เขียนรายละเอียด {gdb_error_list.rows_written} แถว ที่เหลือสรุปใน sheet 'Capped'"
+                print(f"  -> รายงาน Excel ถูกบันทึก: {report_path} (พบ {len(gdb_error_list)} errors{sheets})")
             
-            if gdb_error_list:
-                # ส่งรายงานเป็น excel แยกต่างหากสำหรับ GDB นี้
-                report_path = os.path.join(gdb_report_dir, f"{basename}_error_report.xlsx") 
-                try:
-                    # 1. กำหนด Headers
-                    headers = ['Timestamp','GDB_Path','Featureclass','Check_Type','Object_ID(s)','Field_Name','Invalid_Value','Message']
-                    
-                    # 2. สร้าง DataFrame
-                    error_df_gdb = pd.DataFrame(gdb_error_list, columns=headers)
-                    
-                    # *** แปลง GDB_Path เป็นแบบย่อ ***
-                    error_df_gdb['GDB_Path'] = error_df_gdb['GDB_Path'].apply(get_short_gdb_path)
-                    
-                    # 3. บันทึกเป็น Excel
-                    with pd.ExcelWriter(report_path, engine='openpyxl') as writer:
-                        error_df_gdb.to_excel(writer, sheet_name='Errors', index=False)
-                    
-                    print(f"  -> รายงาน Excel ถูกบันทึก: {report_path} (พบ {len(gdb_error_list)} errors)")
-                
-                except Exception as e:
-                     print(f"  !! ไม่สามารถเขียนรายงาน Excel ได้ {report_path}: {e}")
-                
-                # สรุป Error สำหรับ Sheet 2
-                try:
-                    error_df = pd.DataFrame(gdb_error_list, columns=['Timestamp', 'GDB_Path', 'Featureclass', 'Check_Type', 'Object_ID(s)', 'Field_Name', 'Invalid_Value', 'Message'])
-                    summary_df = error_df.groupby(['GDB_Path', 'Featureclass', 'Check_Type']).size().reset_index(name='Count of Errors')
-                    summary_df['Timestamp'] = run_timestamp
-                    summary_df = summary_df[['Timestamp', 'GDB_Path', 'Featureclass', 'Check_Type', 'Count of Errors']]
-                    error_summary_records.extend(summary_df.values.tolist())
-                    
-                except Exception as e:
-                    print(f"  !! ไม่สามารถสรุป Error GDB นี้ได้: {e}")
+            except Exception as e:
+                 print(f"  !! ไม่สามารถเขียนรายงาน Excel ได้ {report_path}: {e}")
+            
+            # สรุป Error สำหรับ Sheet 2 (นับไว้ระหว่างเขียนแล้ว)
+            summary_records.extend(
+                [run_timestamp, gdb_path, fc_name, check_type, count]
+                for gdb_path, fc_name, check_type, count in gdb_error_list.summary_counts()
+            )
 
-            else:
-                print(f"  -> ไม่พบข้อผิดพลาด (ไม่ต้องสร้างไฟล์สำหรับ {basename})")
+        else:
+            print(f"  -> ไม่พบข้อผิดพลาด (ไม่ต้องสร้างไฟล์สำหรับ {basename})")
 
+        clear_in_memory()
+
+        # Parquet: errors + All_DATA ของ GDB นี้ (GDB ที่ไม่มี error ก็เขียนไฟล์ว่าง แทนผลเดิมของวันเดียวกัน)
+        store_saved = True
+        if error_store is not None:
+            result["store_files"] = write_store(gdb, run_timestamp, error_store, data_records, basename, error_file)
+            store_saved = result["store_files"] is not None
+
+        # เก็บผลลง cache (เฉพาะเมื่อรายงานถูกบันทึกครบ และไม่ได้ตรวจแบบโหมดประหยัด)
+        if fingerprint and cache_dir and store_saved and (report_saved or not gdb_error_list) and not result.get("degraded"):
             try:
-                arcpy.management.Delete("in_memory")
-            except Exception:
-                pass
+                ResultCache(cache_dir).store(gdb, fingerprint, result, report_path if report_saved else None)
+            except Exception as e:
+                print(f"  !! ไม่สามารถบันทึก cache ของ {gdb}: {e}")
 
-        except Exception as e:
-            print(f"  Failed processing {gdb}: {e}")
+    except Exception as e:
+        print(f"  Failed processing {gdb}: {e}")
+        result["error"] = str(e)
+        result["failed"] = True  # ตรวจไม่ครบ: ไม่บันทึกลง journal / cache รอบหน้า (--resume) ตรวจใหม่
 
-    # *** เขียนรายงานสรุป Excel ***
-    print(f"\nกำลังเขียนรายงานสรุป Excel ที่: {SUMMARY_SUMMARY_EXCEL_PATH}")
-    try:
-        with pd.ExcelWriter(SUMMARY_SUMMARY_EXCEL_PATH, engine='openpyxl') as writer:
-            # Sheet 1: All_DATA
-            if all_data_records:
-                all_data_df = pd.DataFrame(all_data_records, columns=['Timestamp', 'GDB_Path', 'Featureclass', 'Count of Polygon or Polyline'])
-                
-                # *** แปลง Path ใน Sheet 1 ***
-                all_data_df['GDB_Path'] = all_data_df['GDB_Path'].apply(get_short_gdb_path)
-                
-                all_data_df.to_excel(writer, sheet_name='All_DATA', index=False)
-                print(f"  -> เขียน Sheet 'All_DATA' ({len(all_data_df)} แถว)")
-            else:
-                print("  -> ไม่มีข้อมูลสำหรับ 'All_DATA'")
-
-            # Sheet 2: Error SUM
-            if error_summary_records:
-                error_sum_df = pd.DataFrame(error_summary_records, columns=['Timestamp', 'GDB_Path', 'Featureclass', 'Check_Type', 'Count of Errors'])
-                
-                # *** แปลง Path ใน Sheet 2 ***
-                error_sum_df['GDB_Path'] = error_sum_df['GDB_Path'].apply(get_short_gdb_path)
-                
-                error_sum_df.to_excel(writer, sheet_name='Error SUM', index=False)
-                print(f"  -> เขียน Sheet 'Error SUM' ({len(error_sum_df)} แถว)")
-                # -------------------------------------------------
-                # *** (ส่วนที่เพิ่มใหม่) สร้าง Sheet 3: Report_by_Province ***
-                # -------------------------------------------------
-                try:
-                    # 1. ใช้ DataFrame (df) จาก Sheet 2
-                    # (เรา copy() เพื่อป้องกัน SettingWithCopyWarning)
-                    df_report = error_sum_df.copy()
-
-                    # 2. (ข้อ 1) สร้างคอลัมน์ "Province"
-                    df_report["Province"] = df_report["GDB_Path"].apply(extract_province)
-
-                    # 3. (ข้อ 2) สร้างคอลัมน์ "Category"
-                    df_report["Category"] = df_report["Featureclass"].apply(categorize_featureclass)
-                    
-                    # 4. ลบแถวที่ไม่ใช่ Category ที่เราสนใจ (ถ้ามี)
-                    df_report = df_report.dropna(subset=["Category"])
-
-                    # 5. Group by และ Sum
-                    # เราจะรวม error ทั้งหมด โดยนับตาม "Province" และ "Category"
-                    grouped_df = df_report.groupby(["Province", "Category"])["Count of Errors"].sum().reset_index()
-
-                    # 6. Pivot ตารางให้อ่านง่าย
-                    # แถว = Province
-                    # คอลัมน์ = Category
-                    # ค่า = Count of Errors
-                    pivot_df = grouped_df.pivot(
-                        index="Province", 
-                        columns="Category", 
-                        values="Count of Errors"
-                    ).fillna(0).astype(int) # เติม 0 ในช่องที่ไม่มี error
-
-                    # 7. บันทึกลง Sheet ใหม่
-                    pivot_df.to_excel(writer, sheet_name='Report_by_Province', index=True) # index=True เพื่อเก็บชื่อจังหวัด
-                    print(f"  -> เขียน Sheet 'Report_by_Province' ({len(pivot_df)} แถว)")
+    finally:
+        if error_file is not None:
+            error_file.abort()  # ไฟล์ที่ยังเขียนไม่จบ (ตรวจล้ม / เขียน store ไม่สำเร็จ) ไม่แทนผลเดิม
+        if memory_window is not None:
+            close_window(memory_window)
+            if memory_window.peak_rss is not None:
+                print(f"  -> หน่วยความจำสูงสุด {memory_window.peak_rss_mb} MB")
+        if monitoring:
+            stop_monitor()
+        if recorder is not None:
+            rows = sum(r[3] for r in data_records if isinstance(r[3], int))
+            recorder.add("gdb", wall=time.perf_counter() - wall_start, cpu=time.process_time() - cpu_start,
+                         rows=rows, errors=result["error_count"], slot=gdb_slot, memory=memory_window)
+            result["perf"] = stop_recording()
+
+    return result
 
-                except Exception as e:
-                    print(f"  !! ล้มเหลวในการสร้าง Sheet 'Report_by_Province': {e}")
-                # -------------------------------------------------
-                # *** (สิ้นสุดส่วนที่เพิ่มใหม่) ***
-                # -------------------------------------------------
+# --------------------------------------------
+#   ตรวจหลาย GDB พร้อมกันด้วย process pool
+# --------------------------------------------
+
+def _init_worker():
+    """
+    ตั้งค่าเริ่มต้นของ worker process ให้มี scratch workspace ของตัวเอง
+    (in_memory แยกกันตาม process อยู่แล้ว จึงไม่ชนกับ worker อื่น)
+    """
+    arcpy = _arcpy() if READER_BACKEND == "arcpy" or OVERLAP_ENGINE != "hash" else None
+    if arcpy is None:
+        return
+    scratch_dir = os.path.join(tempfile.gettempdir(), f"validate_gdb_{os.getpid()}")
+    os.makedirs(scratch_dir, exist_ok=True)
+    arcpy.env.scratchWorkspace = scratch_dir
+
+def _process_gdb_group(gdbs, run_timestamp, gdb_report_dir, fingerprints, cache_dir):
+    return [process_gdb(gdb, run_timestamp, gdb_report_dir, fp, cache_dir) for gdb, fp in zip(gdbs, fingerprints)]
+
+def run_validation(gdb_paths, run_timestamp, gdb_report_dir, max_workers=MAX_WORKERS, fingerprints=None, cache_dir=None, on_result=None):
+    """
+    ตรวจทุก GDB แล้วคืนผลลัพธ์เรียงตามลำดับของ gdb_paths เสมอ
+    ไม่ว่าจะรันแบบทีละ GDB (max_workers <= 1) หรือแบบขนาน
+    fingerprints : dict {gdb: fingerprint} สำหรับเก็บผลลง cache_dir (ไม่ส่ง = ไม่ใช้ cache)
+    on_result : เรียก on_result(result) ทันทีที่แต่ละ GDB ตรวจเสร็จ (เช่น บันทึก journal)
+                GDB ที่ worker ล้มเหลวจะไม่ถูกส่งให้ on_result
+    """
+    fingerprints = fingerprints or {}
+    if max_workers <= 1 or len(gdb_paths) <= 1:
+        results = []
+        for gdb in gdb_paths:
+            res = process_gdb(gdb, run_timestamp, gdb_report_dir, fingerprints.get(gdb), cache_dir)
+            if on_result is not None:
+                on_result(res)
+            results.append(res)
+        return results
+
+    # GDB ที่ basename ซ้ำกันจะเขียนรายงาน/shapefile ชื่อเดียวกัน
+    # จึงต้องให้ worker เดียวกันตรวจตามลำดับเดิม ผลลัพธ์จะได้เหมือนตอนรันทีละ GDB
+    groups = defaultdict(list)
+    for i, gdb in enumerate(gdb_paths):
+        groups[get_gdb_basename(gdb)].append(i)
+
+    # ArcGIS Pro: ให้ worker รันด้วย python ของ environment เดียวกัน (ไม่ใช่ ArcGISPro.exe)
+    if os.name == "nt":
+        multiprocessing.set_executable(os.path.join(sys.exec_prefix, "python.exe"))
+
+    results = [None] * len(gdb_paths)
+    print(f"ตรวจสอบแบบขนาน {max_workers} workers")
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker) as executor:
+        futures = {
+            executor.submit(_process_gdb_group, [gdb_paths[i] for i in indexes], run_timestamp, gdb_report_dir,
+                            [fingerprints.get(gdb_paths[i]) for i in indexes], cache_dir): indexes
+            for indexes in groups.values()
+        }
+        for future in as_completed(futures):
+            indexes = futures[future]
+            try:
+                group_results = future.result()
+            except Exception as e:
+                print(f"  !! worker ล้มเหลว {[gdb_paths[i] for i in indexes]}: {e}")
+                group_results = [
+                    {"gdb": gdb_paths[i], "data_records": [], "summary_records": [], "error_count": 0,
+                     "failed": True, "error": f"worker ล้มเหลว: {e}"}
+                    for i in indexes
+                ]
             else:
-                print("  -> ไม่มีข้อมูลสำหรับ 'Error SUM'")
+                if on_result is not None:
+                    for res in group_results:
+                        on_result(res)
+            for i, res in zip(indexes, group_results):
+                results[i] = res
+    return results
+
+# --------------------------------------------
+#   ข้าม GDB ที่ไม่เปลี่ยนแปลง (cache)
+# --------------------------------------------
+
+def validator_signature():
+    """
+    ลายเซ็นของโค้ดตรวจ + การตั้งค่าที่มีผลต่อผลลัพธ์ (แก้กฎเมื่อไร cache เดิมจะไม่ถูกใช้)
+    """
+    modules = ["gdb_rules", "gdb_columnar", "gdb_overlap", "gdb_partial_overlap", "gdb_reader", "gdb_report", "gdb_refs",
+               "gdb_store", "gdb_dupkeys"]
+    paths = [os.path.abspath(__file__)] + [importlib.util.find_spec(m).origin for m in modules]  # ไม่ต้อง import โมดูล
+    return source_signature(paths, {"OVERLAP_ROOT": OVERLAP_ROOT, "OVERLAP_ENGINE": OVERLAP_ENGINE,
+                                    "REFERENCE_CHECK": REFERENCE_CHECK, "ERROR_DETAIL_CAP": ERROR_DETAIL_CAP,
+                                    "ERROR_DETAIL_CAPS": repr(ERROR_DETAIL_CAPS), "PARQUET_STORE": use_store(),
+                                    "PARTIAL_OVERLAP": use_partial_overlap(), "PARTIAL_OVERLAP_MIN_AREA": PARTIAL_OVERLAP_MIN_AREA,
+                                    "OVERLAP_TOLERANCES": repr(OVERLAP_TOLERANCES), "RULE_SET": RULE_SET})
+
+def restore_cached_results(gdb_paths, run_timestamp, gdb_report_dir, full=False):
+    """
+    คำนวณ fingerprint ของทุก GDB แล้วดึงผลเดิมจาก cache ของ GDB ที่ไม่เปลี่ยนแปลง
+    (full=True ไม่ใช้ผลเดิม แต่ยังคำนวณ fingerprint เพื่อเก็บผลรอบนี้ลง cache)
+
+    Returns
+    -------
+    tuple
+        (fingerprints {gdb: fingerprint}, cached_results {gdb: result})
+    """
+    cache = ResultCache(CACHE_DIR)
+    signature = validator_signature()
+    fingerprints = {}
+    cached_results = {}
+    for gdb in gdb_paths:
+        try:
+            fingerprints[gdb] = gdb_fingerprint(gdb, CACHE_HASH_CONTENTS, signature)
+        except OSError as e:
+            print(f"  !! ไม่สามารถอ่าน fingerprint ของ {gdb}: {e}")
+            continue
+        if full:
+            continue
+        entry = cache.lookup(gdb, fingerprints[gdb])
+        if entry is None:
+            continue
+        report_path = os.path.join(gdb_report_dir, f"{get_gdb_basename(gdb)}_error_report.xlsx")
+        try:
+            result = cache.restore(entry, run_timestamp, report_path)
+        except OSError as e:
+            print(f"  !! ไม่สามารถคัดลอกรายงานเดิมของ {gdb}: {e}")
+            continue
+        if entry.get("store_files"):
+            # Parquet ของรอบก่อน -> partition ของรอบนี้ (ไม่สำเร็จ = ตรวจ GDB นี้ใหม่)
+            try:
+                result["store_files"] = restamp_gdb_results(entry["store_files"], PARQUET_ROOT, run_timestamp,
+                                                            extract_province(get_short_gdb_path(gdb)), get_gdb_basename(gdb))
+            except Exception as e:
+                print(f"  !! ไม่สามารถคัดลอก Parquet เดิมของ {gdb}: {e}")
+                continue
+        cached_results[gdb] = result
+        print(f"  = ไม่มีการเปลี่ยนแปลง ใช้ผลตรวจเดิม: {gdb} ({entry['error_count']} errors)")
+    return fingerprints, cached_results
 
+def new_summary_counts(records=()):
+    """SummaryCounts ที่แปลง GDB_Path แบบย่อ และแยกจังหวัด / Category ตามรายงานสรุป (records = แถว Error SUM)"""
+    summary = SummaryCounts(get_short_gdb_path, extract_province, categorize_featureclass)
+    summary.extend(records)
+    return summary
+
+def write_summary_report(summary_path, run_timestamp, all_data_records, error_summary, perf_records=(), failed_records=()):
+    """
+    เขียนรายงานสรุปรวม (Sheet All_DATA, Error SUM, Report_by_Province, Perf, Failed)
+    failed_records = แถว [Timestamp, GDB_Path, สาเหตุ] ของ GDB ที่ตรวจไม่สำเร็จ (ไม่มี = ไม่สร้าง Sheet)
+    error_summary = SummaryCounts (new_summary_counts) หรือ list ของแถว [Timestamp, GDB_Path, Featureclass, Check_Type, จำนวน]
+    ใช้ร่วมกันระหว่าง main และ check_required_featureclass.py
+    """
+    print(f"\nกำลังเขียนรายงานสรุป Excel ที่: {summary_path}")
+    try:
+        if not isinstance(error_summary, SummaryCounts):
+            error_summary = new_summary_counts(error_summary)
+        workbook = new_workbook()
+
+        # Sheet 1: All_DATA
+        if all_data_records:
+            sheet = ExcelSheetStream(workbook, 'All_DATA', ['Timestamp', 'GDB_Path', 'Featureclass', 'Count of Polygon or Polyline'])
+            for timestamp, gdb_path, fc_name, count in all_data_records:
+                # *** แปลง Path ใน Sheet 1 ***
+                sheet.append([timestamp, get_short_gdb_path(gdb_path), fc_name, count])
+            print(f"  -> เขียน Sheet 'All_DATA' ({sheet.row_count} แถว)")
+        else:
+            print("  -> ไม่มีข้อมูลสำหรับ 'All_DATA'")
+
+        # Sheet 2: Error SUM (GDB_Path แปลงแบบย่อแล้วใน SummaryCounts)
+        if error_summary:
+            sheet = ExcelSheetStream(workbook, 'Error SUM', ['Timestamp', 'GDB_Path', 'Featureclass', 'Check_Type', 'Count of Errors'])
+            for record in error_summary.records:
+                sheet.append(record)
+            print(f"  -> เขียน Sheet 'Error SUM' ({sheet.row_count} แถว)")
+            # -------------------------------------------------
+            # *** สร้าง Sheet 3: Report_by_Province ***
+            # -------------------------------------------------
+            try:
+                # Pivot ตารางให้อ่านง่าย (รวมไว้แล้วตอนเพิ่มแถว Error SUM)
+                # แถว = Province
+                # คอลัมน์ = Category
+                # ค่า = Count of Errors (เติม 0 ในช่องที่ไม่มี error)
+                categories, rows = error_summary.by_province()
+                sheet = ExcelSheetStream(workbook, 'Report_by_Province', ['Province'] + categories)
+                for row in rows:
+                    sheet.append(row)
+                print(f"  -> เขียน Sheet 'Report_by_Province' ({sheet.row_count} แถว)")
+
+            except Exception as e:
+                print(f"  !! ล้มเหลวในการสร้าง Sheet 'Report_by_Province': {e}")
+            # -------------------------------------------------
+        else:
+            print("  -> ไม่มีข้อมูลสำหรับ 'Error SUM'")
+
+        # Sheet 4: Perf (เวลา/จำนวนแถว/error ราย GDB, featureclass, ขั้นตอน และกฎ)
+        if perf_records:
+            sheet = ExcelSheetStream(workbook, 'Perf', PERF_HEADERS)
+            for record in perf_records:
+                row = [record.get(h) for h in PERF_HEADERS]  # ผลจาก cache รุ่นก่อนอาจไม่มีคอลัมน์ใหม่
+                row[0] = get_short_gdb_path(row[0])
+                sheet.append(row)
+            print(f"  -> เขียน Sheet 'Perf' ({sheet.row_count} แถว)")
+
+        # Sheet 5: Failed (GDB ที่ตรวจไม่สำเร็จ ตัวเลขใน Sheet อื่นของ GDB เหล่านี้ไม่ครบ)
+        if failed_records:
+            sheet = ExcelSheetStream(workbook, 'Failed', ['Timestamp', 'GDB_Path', 'Reason'])
+            for timestamp, gdb_path, reason in failed_records:
+                sheet.append([timestamp, get_short_gdb_path(gdb_path), reason])
+            print(f"  -> เขียน Sheet 'Failed' ({sheet.row_count} แถว)")
+
+        # ใช้ Timestamp ของรอบเป็นเวลาของไฟล์ ไฟล์สรุปของรอบที่ resume จึงเหมือนรันรวดเดียวทุกไบต์
+        # (ยกเว้น Sheet Perf ซึ่งเป็นเวลาที่วัดได้จริงของแต่ละรอบ ปิดได้ด้วย PERF_ENABLED = False)
+        save_workbook(workbook, summary_path, datetime.datetime.strptime(run_timestamp, '%Y-%m-%d %H:%M:%S'))
         print("  -> บันทึกไฟล์สรุป Excel เรียบร้อยแล้ว")
 
+        if perf_records:
+            write_perf_json(PERF_JSON_PATH, run_timestamp, perf_records)
+            print(f"  -> บันทึกผลการวัดเวลา: {PERF_JSON_PATH}")
+
     except Exception as e:
         print(f"  !! ล้มเหลวในการเขียนไฟล์สรุป Excel: {e}")
         print("  !! (โปรดตรวจสอบว่าไฟล์ Excel ปิดอยู่ และคุณมีสิทธิ์เขียนทับ)")
 
+def write_results_summary(gdb_paths, results, run_timestamp):
+    """
+    เขียนรายงานสรุปจากผลตรวจ {gdb: result} เรียงตาม gdb_paths (GDB ที่ไม่มีผลจะข้าม)
+    GDB ที่ผลมี failed (ตรวจไม่ครบ / worker ล้ม) แสดงใน Sheet Failed
+    """
+    all_data_records = []
+    error_summary = new_summary_counts()  # รวม Error SUM / Report_by_Province ทีละ GDB
+    perf_records = []
+    failed_records = []
+    for gdb in gdb_paths:
+        if gdb not in results:
+            continue
+        all_data_records.extend(results[gdb]["data_records"])
+        error_summary.extend(results[gdb]["summary_records"])
+        perf_records.extend(results[gdb].get("perf", []))
+        if results[gdb].get("failed"):
+            failed_records.append([run_timestamp, gdb, results[gdb].get("error", "")])
+    write_summary_report(SUMMARY_SUMMARY_EXCEL_PATH, run_timestamp, all_data_records, error_summary, perf_records,
+                         failed_records)
+
+def main(max_workers=MAX_WORKERS, full=False, resume=False, rescan=False):
+    print("เริ่มต้นกระบวนการตรวจสอบมาตรฐาน...")
+    if PARQUET_STORE and not store_available():
+        print("คำเตือน: ไม่มี pyarrow ข้ามการเขียน Parquet (PARQUET_STORE)")
+
+    # ทำต่อจากรอบที่หยุดกลางทาง: ใช้รายชื่อ GDB, Timestamp และโฟลเดอร์รายงานเดิม
+    journal = RunJournal.load(JOURNAL_PATH) if resume else None
+    if journal is not None:
+        gdb_paths = journal.gdb_paths
+        run_timestamp = journal.run_timestamp
+        gdb_report_dir = journal.gdb_report_dir
+        print(f"ทำต่อจากรอบ {run_timestamp}: ตรวจเสร็จแล้ว {len(journal.completed)}/{len(gdb_paths)} GDB")
+    else:
+        if resume:
+            print(f"ไม่พบ journal ที่ใช้ทำต่อได้ ({JOURNAL_PATH}) เริ่มรอบใหม่")
+        gdb_paths = find_gdb_paths(ROOT_DIR, rescan)
+        if not gdb_paths:
+            print("ไม่พบ GDBs ยกเลิกการดำเนินการ.")
+            return {}
+
+        today_str = datetime.datetime.now().strftime('%Y-%m-%d')
+        run_timestamp = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        gdb_report_dir = os.path.join(REPORT_ROOT, today_str)
+        journal = RunJournal.start(JOURNAL_PATH, run_timestamp, gdb_report_dir, gdb_paths)
+
+    os.makedirs(gdb_report_dir, exist_ok=True)
+    
+    ### ส่วนการวนลูป GDBs และรัน Validator
+    results = dict(journal.completed)
+    remaining = [gdb for gdb in gdb_paths if gdb not in results]
+
+    fingerprints, cached_results = {}, {}
+    if USE_CACHE:
+        fingerprints, cached_results = restore_cached_results(remaining, run_timestamp, gdb_report_dir, full)
+        print(f"ใช้ผลตรวจเดิมจาก cache {len(cached_results)} GDB, ตรวจใหม่ {len(remaining) - len(cached_results)} GDB")
+        for res in cached_results.values():
+            journal.record(res)
+    results.update(cached_results)
+
+    pending = [gdb for gdb in remaining if gdb not in cached_results]
+    try:
+        for res in run_validation(pending, run_timestamp, gdb_report_dir, max_workers, fingerprints,
+                                  CACHE_DIR if USE_CACHE else None, on_result=journal.record):
+            results[res["gdb"]] = res
+    finally:
+        journal.close()
+
+    # *** เขียนรายงานสรุป Excel ***
+    write_results_summary(gdb_paths, results, run_timestamp)
+
+    print("\nเสร็จแล้วจ้า ดูผลลัพธ์ได้เลยจ้า")
+    return results
+
+# --------------------------------------------
+#   โหมดเฝ้าโฟลเดอร์ (--watch)
+# --------------------------------------------
+
+def _watch_job(gdb):
+    """เตรียมตรวจ GDB 1 ก้อนในโหมดเฝ้าโฟลเดอร์ คืน (run_timestamp, gdb_report_dir, fingerprint, ผลจาก cache หรือ None)"""
+    run_timestamp = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    gdb_report_dir = os.path.join(REPORT_ROOT, run_timestamp[:10])
+    os.makedirs(gdb_report_dir, exist_ok=True)
+    if not USE_CACHE:
+        return run_timestamp, gdb_report_dir, None, None
+    fingerprints, cached_results = restore_cached_results([gdb], run_timestamp, gdb_report_dir)
+    return run_timestamp, gdb_report_dir, fingerprints.get(gdb), cached_results.get(gdb)
+
+def watch(max_workers=MAX_WORKERS, full=False, rescan=False):
+    """
+    เฝ้า ROOT_DIR ไม่หยุด (Ctrl+C เพื่อหยุด): ตรวจทุก GDB 1 รอบแบบ main() ก่อน
+    จากนั้น GDB ที่เพิ่มเข้ามาใหม่หรือถูกแก้ไข เมื่อไฟล์นิ่งครบ WATCH_QUIET_SECONDS (gdb_watch.py)
+    จะถูกส่งตรวจด้วย process pool ที่เปิดค้างไว้ แล้วเขียนรายงานของ GDB นั้นและรายงานสรุปใหม่
+    worker ตาย (BrokenProcessPool) = สร้าง pool ใหม่ แล้วส่ง GDB ที่ค้างอยู่ตรวจซ้ำไม่เกิน WATCH_MAX_RETRIES ครั้ง
+    (watcher ถือว่า GDB ถูกส่งตรวจแล้ว จะไม่ส่งให้อีกจนกว่าไฟล์จะเปลี่ยน)
+    """
+    watcher = GdbWatcher(ROOT_DIR, GDB_CATALOGUE_PATH, WATCH_QUIET_SECONDS, WATCH_POLL_SECONDS)
+    watcher.start()  # จำสถานะก่อนตรวจรอบแรก: GDB ที่เปลี่ยนระหว่างตรวจรอบแรกจะถูกตรวจซ้ำ
+    results = main(max_workers, full=full, rescan=rescan)
+
+    print(f"\nเฝ้าโฟลเดอร์ {ROOT_DIR} ({watcher.mode}) รอไฟล์นิ่ง {WATCH_QUIET_SECONDS} วินาทีก่อนตรวจ (Ctrl+C เพื่อหยุด)")
+    if os.name == "nt":
+        multiprocessing.set_executable(os.path.join(sys.exec_prefix, "python.exe"))
+    max_workers = max(1, max_workers)
+    new_executor = lambda: ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker)
+    executor = new_executor()  # worker เปิดค้างไว้ตลอด
+    queue = []  # GDB ที่นิ่งแล้ว รอ worker ว่าง
+    jobs = {}   # future -> gdb ที่กำลังตรวจ
+    failures = {}  # gdb -> จำนวนครั้งที่ตรวจล้มเหลวติดกัน
+    broken = False  # worker ตาย: pool ใช้ต่อไม่ได้ สร้างใหม่เมื่องานที่ค้างใน pool เดิมจบครบ
+    dirty = False
+    last_summary = time.monotonic()
+
+    def retry(gdb, reason):
+        """ส่ง GDB ที่ตรวจล้มเหลวกลับเข้าคิว คืน False ถ้าครบ WATCH_MAX_RETRIES แล้ว"""
+        failures[gdb] = failures.get(gdb, 0) + 1
+        if failures[gdb] > WATCH_MAX_RETRIES:
+            print(f"  !! {reason} {gdb}: ล้มเหลว {failures[gdb]} ครั้ง ไม่ตรวจซ้ำจนกว่าไฟล์จะเปลี่ยน")
+            return False
+        print(f"  !! {reason} {gdb}: ส่งตรวจซ้ำ (ครั้งที่ {failures[gdb]}/{WATCH_MAX_RETRIES})")
+        if gdb in watcher.states and gdb not in queue:
+            queue.append(gdb)
+        return True
+
+    try:
+        while True:
+            ready, removed = watcher.poll()
+            for gdb in removed:
+                print(f"  - GDB ถูกลบ/ย้ายออก: {gdb}")
+                results.pop(gdb, None)
+                failures.pop(gdb, None)
+                if gdb in queue:
+                    queue.remove(gdb)
+                dirty = True
+            for gdb in ready:
+                failures.pop(gdb, None)  # ไฟล์เปลี่ยน เริ่มนับครั้งที่ล้มเหลวใหม่
+                if gdb not in queue:
+                    print(f"  + พบ GDB ใหม่/เปลี่ยนแปลง: {gdb}")
+                    queue.append(gdb)
+
+            # GDB ที่ basename ซ้ำกันเขียนรายงานชื่อเดียวกัน จึงไม่ตรวจพร้อมกัน
+            busy = {get_gdb_basename(gdb) for gdb in jobs.values()}
+            for gdb in list(queue):
+                if broken or len(jobs) >= max_workers:
+                    break
+                if get_gdb_basename(gdb) in busy:
+                    continue
+                queue.remove(gdb)
+                run_timestamp, gdb_report_dir, fingerprint, cached = _watch_job(gdb)
+                if cached is not None:
+                    results[gdb] = cached
+                    dirty = True
+                    continue
+                try:
+                    future = executor.submit(_process_gdb_group, [gdb], run_timestamp, gdb_report_dir, [fingerprint],
+                                             CACHE_DIR if USE_CACHE else None)
+                except BrokenProcessPool:  # pool พังไปแล้ว (worker ตาย) สร้างใหม่ด้านล่าง
+                    queue.insert(0, gdb)
+                    broken = True
+                    break
+                jobs[future] = gdb
+                busy.add(get_gdb_basename(gdb))
+
+            for future in [f for f in jobs if f.done()]:
+                gdb = jobs.pop(future)
+                try:
+                    res = future.result()[0]
+                except BrokenProcessPool as e:
+                    broken = True
+                    retry(gdb, f"worker ตาย ({e})")
+                    continue
+                except Exception as e:
+                    retry(gdb, f"worker ล้มเหลว ({e})")
+                    continue
+                if res.get("failed"):
+                    if retry(gdb, "ตรวจไม่ครบ"):
+                        continue
+                else:
+                    failures.pop(gdb, None)
+                    print(f"  ✓ ตรวจเสร็จ: {gdb} ({res['error_count']} errors)")
+                if gdb in watcher.states:  # ถูกลบไประหว่างตรวจ = ไม่ใส่ในรายงานสรุป
+                    results[gdb] = res
+                    dirty = True
+            if broken and not jobs:
+                print("  !! process pool เสีย สร้าง worker ใหม่")
+                executor.shutdown(wait=False)
+                executor = new_executor()
+                broken = False
+
+            now = time.monotonic()
+            if dirty and (not jobs and not queue or now - last_summary >= WATCH_SUMMARY_SECONDS):
+                write_results_summary(watcher.gdb_paths(), results, datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+                dirty = False
+                last_summary = now
+    except KeyboardInterrupt:
+        print("\nหยุดเฝ้าโฟลเดอร์")
+    finally:
+        watcher.close()
+        executor.shutdown(wait=False)
+
+# --------------------------------------------
+#   ตรวจหลายเครื่อง: coordinator แบ่งงานลงคิว (--coordinate) worker แต่ละเครื่องรับงาน (--work)
+# --------------------------------------------
+
+def gdb_size(gdb):
+    """ขนาดรวมของไฟล์ในโฟลเดอร์ .gdb (ไบต์) ใช้เรียงงานใหญ่ก่อน"""
+    try:
+        with os.scandir(gdb) as it:
+            return sum(e.stat().st_size for e in it if e.is_file())
+    except OSError:
+        return 0
+
+def shard_gdbs(gdb_paths, shard=QUEUE_SHARD):
+    """
+    แบ่ง GDB เป็นงาน (list ของ list GDB) เรียงงานที่ขนาดรวมใหญ่ก่อน (เครื่องที่ว่างทีหลังได้งานเล็ก จบพร้อมกัน)
+    shard = "province" : 1 งานต่อจังหวัด, "size" : 1 งานต่อ GDB
+    GDB ที่ basename ซ้ำกันอยู่งานเดียวกันเสมอ (เขียนรายงานชื่อเดียวกัน ต้องตรวจตามลำดับเดิม)
+    """
+    if shard not in ("province", "size"):
+        raise ValueError(f"QUEUE_SHARD ต้องเป็น 'province' หรือ 'size' ไม่ใช่ {shard!r}")
+    groups = defaultdict(list)
+    for gdb in gdb_paths:
+        groups[get_gdb_basename(gdb)].append(gdb)
+    tasks = defaultdict(list)
+    for basename, gdbs in groups.items():
+        key = extract_province(get_short_gdb_path(gdbs[0])) if shard == "province" else basename
+        tasks[key].extend(gdbs)
+    sizes = {key: sum(gdb_size(gdb) for gdb in gdbs) for key, gdbs in tasks.items()}
+    return [tasks[key] for key in sorted(tasks, key=lambda k: -sizes[k])]
+
+def coordinate(shard=QUEUE_SHARD, full=False, resume=False, rescan=False):
+    """
+    coordinator: หา GDB ทั้งหมด ใช้ผลจาก cache กับ GDB ที่ไม่เปลี่ยน แบ่งที่เหลือเป็นงานลง QUEUE_DIR
+    รอจน worker (validate_gdb.py --work บนเครื่องใดก็ได้) ตรวจครบทุกงาน แล้วรวมผลเขียนรายงานสรุป
+    resume=True รอรอบเดิมที่ยังไม่ปิดต่อ (เช่น coordinator ถูกปิดกลางทาง) แทนการสร้างรอบใหม่
+    """
+    print("เริ่มต้นกระบวนการตรวจสอบมาตรฐาน (coordinator)...")
+    queue = WorkQueue.open(QUEUE_DIR) if resume else None
+    if queue is not None and not queue.closed:
+        print(f"ทำต่อจากรอบ {queue.header['run_timestamp']} ในคิว {QUEUE_DIR}")
+    else:
+        gdb_paths = find_gdb_paths(ROOT_DIR, rescan)
+        if not gdb_paths:
+            print("ไม่พบ GDBs ยกเลิกการดำเนินการ.")
+            return {}
+        today_str = datetime.datetime.now().strftime('%Y-%m-%d')
+        run_timestamp = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        gdb_report_dir = os.path.join(REPORT_ROOT, today_str)
+        os.makedirs(gdb_report_dir, exist_ok=True)
+
+        cached_results = {}
+        if USE_CACHE:
+            _, cached_results = restore_cached_results(gdb_paths, run_timestamp, gdb_report_dir, full)
+        tasks = shard_gdbs([gdb for gdb in gdb_paths if gdb not in cached_results], shard)
+        header = {"run_timestamp": run_timestamp, "gdb_report_dir": gdb_report_dir, "gdb_paths": gdb_paths,
+                  "signature": validator_signature()}
+        queue = WorkQueue.create(QUEUE_DIR, header, tasks)
+        if cached_results:
+            queue.add_task("cache", list(cached_results), list(cached_results.values()))
+        print(f"ใช้ผลตรวจเดิมจาก cache {len(cached_results)} GDB, แบ่งงานตรวจใหม่ {len(tasks)} งาน ({shard}) ลงคิว {QUEUE_DIR}")
+
+    last = None
+    while True:
+        done, leased, total = queue.progress()
+        if (done, leased) != last:
+            print(f"  [{datetime.datetime.now():%H:%M:%S}] เสร็จ {done}/{total} งาน, กำลังตรวจ {leased} งาน")
+            last = (done, leased)
+        if done >= total:
+            break
+        time.sleep(QUEUE_POLL_SECONDS)
+
+    results = {}
+    for task_id, data in sorted(queue.results().items()):
+        for res in data["results"]:
+            results[res["gdb"]] = res
+        if data["failed"]:  # GDB ที่ไม่มีผล (เครื่องล้มทุกครั้ง) หรือผลไม่ครบ แสดงใน Sheet Failed ของรายงานสรุป
+            failed = [gdb for gdb in queue.task(task_id)["gdbs"] if results.get(gdb, {"failed": True}).get("failed")]
+            print(f"  !! งาน {task_id} ล้มเหลว: {failed}")
+            for gdb in failed:
+                results.setdefault(gdb, {"gdb": gdb, "data_records": [], "summary_records": [], "error_count": 0,
+                                         "failed": True, "error": f"งาน {task_id} ถูกรับไป {queue.attempts(task_id)} ครั้งแต่ไม่เสร็จ"})
+    queue.close()
+
+    # *** เขียนรายงานสรุป Excel ***
+    write_results_summary(queue.header["gdb_paths"], results, queue.header["run_timestamp"])
     print("\nเสร็จแล้วจ้า ดูผลลัพธ์ได้เลยจ้า")
+    return results
+
+def work(max_workers=MAX_WORKERS, worker_id=None):
+    """
+    worker: รอรอบที่เปิดอยู่ใน QUEUE_DIR แล้วรับงานทีละงาน ตรวจด้วย max_workers process บนเครื่องนี้
+    ต่ออายุ lease ระหว่างตรวจ และเขียนผลคืนลงคิว เลิกเมื่อทุกงานของรอบเสร็จหรือ coordinator ปิดรอบ
+    """
+    worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+    signature = validator_signature()
+    print(f"worker {worker_id}: รองานจาก {QUEUE_DIR}")
+    queue = None
+    while queue is None:
+        queue = WorkQueue.open(QUEUE_DIR)
+        if queue is None or queue.closed:
+            queue = None
+            time.sleep(QUEUE_POLL_SECONDS)
+    if queue.header["signature"] != signature:
+        print("  !! โค้ดตรวจหรือการตั้งค่าของเครื่องนี้ต่างจาก coordinator (validator_signature) ไม่รับงาน")
+        return
+
+    cache_dir = CACHE_DIR if USE_CACHE else None
+    run_timestamp = queue.header["run_timestamp"]
+    gdb_report_dir = queue.header["gdb_report_dir"]
+    os.makedirs(gdb_report_dir, exist_ok=True)
+    completed = 0
+    while queue.refresh() and not queue.closed:
+        leased = queue.lease(worker_id, QUEUE_LEASE_SECONDS, QUEUE_MAX_ATTEMPTS)
+        if leased is None:
+            done, _, total = queue.progress()
+            if done >= total:
+                break
+            time.sleep(QUEUE_POLL_SECONDS)  # งานที่เหลือมีเครื่องอื่นรับอยู่ รอเผื่อ lease หมดอายุ
+            continue
+        task_id, task = leased
+        print(f"\nworker {worker_id}: รับงาน {task_id} ({len(task['gdbs'])} GDB)")
+        fingerprints = {}
+        if USE_CACHE:
+            fingerprints, _ = restore_cached_results(task["gdbs"], run_timestamp, gdb_report_dir, full=True)
+        try:
+            with Heartbeat(queue, task_id, worker_id, QUEUE_LEASE_SECONDS):
+                results = run_validation(task["gdbs"], run_timestamp, gdb_report_dir, max_workers, fingerprints, cache_dir)
+        except Exception as e:
+            print(f"  !! ตรวจงาน {task_id} ล้มเหลว: {e} (คืนงานให้เครื่องอื่น)")
+            queue.release(task_id, worker_id)
+            continue
+        failed = [res["gdb"] for res in results if res.get("failed")]
+        if failed and queue.attempts(task_id) < QUEUE_MAX_ATTEMPTS:
+            print(f"  !! ตรวจไม่สำเร็จ {failed} (คืนงานให้เครื่องอื่น)")
+            queue.release(task_id, worker_id)
+            continue
+        if failed:
+            print(f"  !! ตรวจไม่สำเร็จ {failed} ครบ {QUEUE_MAX_ATTEMPTS} ครั้ง บันทึกงาน {task_id} ว่าล้มเหลว")
+        queue.complete(task_id, worker_id, results, failed=bool(failed))
+        completed += 1
+    print(f"worker {worker_id}: ตรวจเสร็จ {completed} งาน")
+
+def summary_from_store(run_date):
+    """
+    สร้างรายงานสรุปของวันที่ run_date (YYYY-MM-DD) จาก Parquet ใน PARQUET_ROOT
+    ไม่ตรวจ GDB และไม่เปิดรายงาน Excel ของแต่ละ GDB (Sheet All_DATA / Error SUM เรียงตาม GDB)
+    """
+    all_data_records, error_summary_records = read_summary(PARQUET_ROOT, run_date)
+    if not all_data_records and not error_summary_records:
+        print(f"ไม่พบข้อมูลวันที่ {run_date} ใน {PARQUET_ROOT}")
+        return
+    run_timestamp = max(r[0] for r in all_data_records + error_summary_records)
+    summary_path = f"{os.path.splitext(SUMMARY_SUMMARY_EXCEL_PATH)[0]}_{run_date}.xlsx"
+    write_summary_report(summary_path, run_timestamp, all_data_records, error_summary_records)
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="ตรวจสอบมาตรฐานข้อมูล GIS ใน GDB ทุกก้อนใต้ ROOT_DIR")
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS, help="จำนวน process ที่ตรวจ GDB พร้อมกัน")
+    parser.add_argument("--full", action="store_true", help="ตรวจใหม่ทุก GDB ไม่ใช้ผลเดิมจาก cache")
+    parser.add_argument("--resume", action="store_true", help="ทำต่อจากรอบที่หยุดกลางทาง ตรวจเฉพาะ GDB ที่ยังไม่เสร็จ")
+    parser.add_argument("--rescan", action="store_true", help="ค้นหา .gdb ใหม่ทุกโฟลเดอร์ ไม่ใช้รายการเดิมใน GDB_CATALOGUE_PATH")
+    parser.add_argument("--summary-from-store", nargs="?", const=datetime.date.today().isoformat(), metavar="YYYY-MM-DD",
+                        help="สร้างรายงานสรุปจาก Parquet ใน PARQUET_ROOT (ไม่ตรวจ GDB) ค่าเริ่มต้น = วันนี้")
+    parser.add_argument("--coordinate", action="store_true",
+                        help="แบ่ง GDB เป็นงานลง QUEUE_DIR ให้หลายเครื่องตรวจ (--work) แล้วรวมผลเขียนรายงานสรุป")
+    parser.add_argument("--shard", choices=("province", "size"), default=QUEUE_SHARD,
+                        help="--coordinate: แบ่งงานตามจังหวัด หรือ 1 งานต่อ GDB")
+    parser.add_argument("--work", action="store_true", help="รับงานจาก QUEUE_DIR มาตรวจบนเครื่องนี้ (ใช้ --workers process)")
+    parser.add_argument("--worker-id", help="--work: ชื่อของ worker (ค่าเริ่มต้น = ชื่อเครื่อง-pid)")
+    parser.add_argument("--watch", action="store_true",
+                        help="ตรวจทุก GDB 1 รอบ แล้วเฝ้า ROOT_DIR ตรวจ GDB ที่เพิ่ม/แก้ไขทันทีที่ upload เสร็จ (Ctrl+C เพื่อหยุด)")
+    return parser.parse_args(argv)
 
 if __name__ == "__main__":
-    main()
+    args = parse_args()
+    if args.summary_from_store:
+        summary_from_store(args.summary_from_store)
+    elif args.coordinate:
+        coordinate(args.shard, full=args.full, resume=args.resume, rescan=args.rescan)
+    elif args.work:
+        work(args.workers, args.worker_id)
+    elif args.watch:
+        watch(args.workers, full=args.full, rescan=args.rescan)
+    else:
+        main(args.workers, full=args.full, resume=args.resume, rescan=args.rescan)
 
 ######################################################
 ############### END ALL ##############################